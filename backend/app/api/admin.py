@@ -1,4 +1,8 @@
+from typing import Any
+
 from sqladmin import ModelView
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
 
 from app.db.models import (
     File,
@@ -27,6 +31,25 @@ class TestAdmin(ModelView, model=Test):
     icon = "fa-solid fa-file-lines"
     name_plural = "Testy"
 
+    # a new revision invalidates the cached test detail and its ETag; the
+    # owners' user_stats are recomputed, the repositories never saw the edit
+    async def on_model_change(
+        self, data: dict[str, Any], model: Any, is_created: bool, request: Request
+    ) -> None:
+        if not is_created:
+            request.state.previous_owner_id = model.owner_id
+
+    async def after_model_change(
+        self, data: dict[str, Any], model: Any, is_created: bool, request: Request
+    ) -> None:
+        if not is_created:
+            await run_in_threadpool(_test_service().test_changed, model.id)
+        previous = getattr(request.state, "previous_owner_id", None)
+        await _rebuild_user_stats(model.owner_id, previous)
+
+    async def after_model_delete(self, model: Any, request: Request) -> None:
+        await _rebuild_user_stats(model.owner_id)
+
 
 class QuestionAdmin(ModelView, model=Question):
     column_list = ["id", "test_id", "text", "difficulty"]
@@ -34,6 +57,21 @@ class QuestionAdmin(ModelView, model=Question):
     icon = "fa-solid fa-question"
     name_plural = "Pytania"
 
+    async def on_model_change(
+        self, data: dict[str, Any], model: Any, is_created: bool, request: Request
+    ) -> None:
+        if not is_created:
+            request.state.previous_test_id = model.test_id
+
+    async def after_model_change(
+        self, data: dict[str, Any], model: Any, is_created: bool, request: Request
+    ) -> None:
+        previous = getattr(request.state, "previous_test_id", None)
+        await _tests_changed(model.test_id, previous)
+
+    async def after_model_delete(self, model: Any, request: Request) -> None:
+        await _tests_changed(model.test_id)
+
 
 class MaterialAdmin(ModelView, model=Material):
     column_list = [
@@ -92,6 +130,55 @@ class NotificationAdmin(ModelView, model=SystemNotification):
     icon = "fa-solid fa-bell"
     name_plural = "Powiadomienia Systemowe"
 
+    # keep the cached unread counters in step with admin edits
+    async def after_model_change(
+        self, data: dict[str, Any], model: Any, is_created: bool, request: Request
+    ) -> None:
+        service = _notification_service()
+        if is_created:
+            await run_in_threadpool(service.notification_added, model.recipient_id)
+        else:
+            # the previous recipient is unknown here, so reset every count
+            await run_in_threadpool(service.notification_removed, None)
+
+    async def after_model_delete(self, model: Any, request: Request) -> None:
+        service = _notification_service()
+        await run_in_threadpool(service.notification_removed, model.recipient_id)
+
+
+def _notification_service() -> Any:
+    from app.bootstrap import get_container
+
+    return get_container().provide_notification_service()
+
+
+def _test_service() -> Any:
+    from app.bootstrap import get_container
+
+    return get_container().provide_test_service()
+
+
+def _user_service() -> Any:
+    from app.bootstrap import get_container
+
+    return get_container().provide_user_service()
+
+
+async def _tests_changed(*test_ids: int | None) -> None:
+    owner_ids = [
+        await run_in_threadpool(_test_service().test_changed, test_id)
+        for test_id in dict.fromkeys(test_ids)
+        if test_id is not None
+    ]
+    await _rebuild_user_stats(*owner_ids)
+
+
+async def _rebuild_user_stats(*owner_ids: int | None) -> None:
+    service = _user_service()
+    for owner_id in dict.fromkeys(owner_ids):
+        if owner_id is not None:
+            await run_in_threadpool(service.rebuild_user_statistics, user_id=owner_id)
+
 
 def setup_admin_views(admin):
     admin.add_view(UserAdmin)
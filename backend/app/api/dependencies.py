@@ -17,6 +17,7 @@ from app.application.services import (
     TestService,
     UserService,
 )
+from app.core.quota import QuotaEngine
 from app.domain.services import FileStorage
 
 if TYPE_CHECKING:  # pragma: no cover - only for type hints
@@ -34,6 +35,12 @@ def get_app_container(request: Request) -> Any:
     return cast("AppContainer", container)
 
 
+def get_quota_engine(
+    container: Annotated[Any, Depends(get_app_container)],
+) -> QuotaEngine | None:
+    return container.provide_quota_engine()
+
+
 def get_auth_service(
     container: Annotated[Any, Depends(get_app_container)],
 ) -> AuthService:
@@ -117,6 +124,7 @@ __all__ = [
     "get_material_service",
     "get_materials_storage",
     "get_notification_service",
+    "get_quota_engine",
     "get_storage",
     "get_support_service",
     "get_test_service",
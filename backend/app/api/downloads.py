@@ -0,0 +1,209 @@
+"""Serving stored objects: chunked streaming, byte ranges and conditional GET.
+
+Bodies are streamed from storage in ``DOWNLOAD_CHUNK_SIZE`` chunks, so memory
+per download stays flat regardless of file size. With ``DOWNLOAD_MODE =
+"redirect"`` clients are sent to a short-lived presigned URL instead, as long
+as they can follow it: navigations and non-browser clients always can, a
+``fetch()`` only from origins the bucket's CORS policy allows.
+"""
+
+from __future__ import annotations
+
+import mimetypes
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import NoReturn
+from urllib.parse import quote
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.responses import RedirectResponse, StreamingResponse
+
+from app.core.config import get_settings
+from app.domain.models import StoredObjectInfo
+from app.domain.services import FileStorage
+
+
+def content_disposition(filename: str) -> str:
+    return f"attachment; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+def serve_stored_object(
+    request: Request,
+    storage: FileStorage,
+    stored_path: str,
+    *,
+    media_type: str | None = None,
+    filename: str | None = None,
+    cache_control: str = "private, no-cache",
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """Respond with the object at ``stored_path`` (200, 206, 304 or 416).
+
+    ``filename`` makes it an attachment; ``media_type`` defaults to the
+    stored content type, then to a guess from the filename.
+    """
+    settings = get_settings()
+    if settings.DOWNLOAD_MODE == "redirect" and _can_follow_redirect(request):
+        url = storage.presigned_url(
+            stored_path=stored_path,
+            expires_in=settings.DOWNLOAD_PRESIGN_EXPIRATION_SECONDS,
+            filename=filename,
+            content_type=media_type,
+        )
+        if url:
+            # the target expires, so the redirect itself must not be cached
+            return RedirectResponse(
+                url,
+                status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+                headers={"Cache-Control": "no-store"},
+            )
+
+    try:
+        info = storage.stat(stored_path=stored_path)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="File not found in storage"
+        ) from None
+
+    response_headers = {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": cache_control,
+        "ETag": info.etag,
+        **(headers or {}),
+    }
+    if info.last_modified is not None:
+        response_headers["Last-Modified"] = format_datetime(
+            info.last_modified, usegmt=True
+        )
+    if _not_modified(request, info):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers=response_headers
+        )
+
+    media_type = media_type or info.content_type or _guess_type(filename)
+    if filename:
+        response_headers["Content-Disposition"] = content_disposition(filename)
+
+    byte_range = _requested_range(request, info)
+    status_code = status.HTTP_200_OK
+    start, end = 0, info.size - 1
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        response_headers["Content-Range"] = f"bytes {start}-{end}/{info.size}"
+    response_headers["Content-Length"] = str(end - start + 1)
+
+    chunks = (
+        storage.iter_bytes(
+            stored_path=stored_path,
+            start=start,
+            end=end,
+            chunk_size=settings.DOWNLOAD_CHUNK_SIZE,
+        )
+        if info.size
+        else iter(())
+    )
+    return StreamingResponse(
+        chunks,
+        status_code=status_code,
+        media_type=media_type,
+        headers=response_headers,
+    )
+
+
+def _can_follow_redirect(request: Request) -> bool:
+    if request.headers.get("sec-fetch-mode") != "cors":
+        return True
+    origin = request.headers.get("origin")
+    return origin in get_settings().DOWNLOAD_REDIRECT_CORS_ORIGINS
+
+
+def _not_modified(request: Request, info: StoredObjectInfo) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # weak comparison, as for any GET
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or info.etag.removeprefix("W/") in tags
+    since = _parse_http_date(request.headers.get("if-modified-since"))
+    if since is None or info.last_modified is None:
+        return False
+    return info.last_modified.replace(microsecond=0) <= since
+
+
+def _requested_range(
+    request: Request, info: StoredObjectInfo
+) -> tuple[int, int] | None:
+    """The single range to serve, or None for the whole body; may raise 416.
+
+    Malformed and multi-part ranges are ignored (answered with the whole
+    body), as is a range whose If-Range validator no longer matches.
+    """
+    header = request.headers.get("range")
+    if not header or not _if_range_matches(request.headers.get("if-range"), info):
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else info.size - 1
+        else:  # suffix range: the last N bytes
+            suffix = int(last)
+            if suffix <= 0:
+                _range_not_satisfiable(info)
+            start, end = max(0, info.size - suffix), info.size - 1
+    except ValueError:
+        return None
+    if start >= info.size:
+        _range_not_satisfiable(info)
+    if start < 0 or end < start:
+        return None
+    return start, min(end, info.size - 1)
+
+
+def _range_not_satisfiable(info: StoredObjectInfo) -> NoReturn:
+    raise HTTPException(
+        status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+        detail="Requested range not satisfiable",
+        headers={"Content-Range": f"bytes */{info.size}"},
+    )
+
+
+def _if_range_matches(if_range: str | None, info: StoredObjectInfo) -> bool:
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith(('"', "W/")):
+        # strong comparison: a weak tag never matches
+        return not info.etag.startswith("W/") and if_range == info.etag
+    since = _parse_http_date(if_range)
+    return (
+        since is not None
+        and info.last_modified is not None
+        and info.last_modified.replace(microsecond=0) == since
+    )
+
+
+def _parse_http_date(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)
+
+
+def _guess_type(filename: str | None) -> str:
+    if filename:
+        guessed, _ = mimetypes.guess_type(filename)
+        if guessed:
+            return guessed
+    return "application/octet-stream"
+
+
+__all__ = ["content_disposition", "serve_stored_object"]
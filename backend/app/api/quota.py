@@ -0,0 +1,41 @@
+"""Charging LLM endpoints against the token quota (see app/core/quota.py)."""
+
+from __future__ import annotations
+
+from fastapi import HTTPException, Response, status
+
+from app.core.quota import QuotaEngine
+
+
+def charge_quota(
+    engine: QuotaEngine | None, response: Response, *, user_id: int, cost: int
+) -> int | None:
+    """Charge ``cost`` tokens or raise 429; returns the charge to settle later.
+
+    None means quotas are disabled and nothing needs settling.
+    """
+    if engine is None:
+        return None
+    decision = engine.charge(user_id, cost)
+    response.headers.update(decision.headers())
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=(
+                "Przekroczono limit użycia AI. "
+                f"Spróbuj ponownie za {decision.retry_after} s."
+            ),
+            headers=decision.headers(),
+        )
+    return cost
+
+
+def refund_quota(
+    engine: QuotaEngine | None, *, user_id: int, charged: int | None
+) -> None:
+    """Return a charge for work that was never started."""
+    if engine is not None and charged:
+        engine.refund(user_id, charged)
+
+
+__all__ = ["charge_quota", "refund_quota"]
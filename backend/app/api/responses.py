@@ -0,0 +1,28 @@
+"""JSON responses for DTOs the application built itself.
+
+A model returned from a route is dumped to Python objects, validated again
+against ``response_model`` and run through ``jsonable_encoder`` before
+``json.dumps``. DTOs from ``app.application.dto`` are valid by
+construction, so ``TrustedJSONResponse`` serializes them straight to JSON
+bytes in one pydantic-core pass. Routes keep ``response_model`` for the
+OpenAPI schema.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pydantic_core
+from fastapi import Response
+
+
+class TrustedJSONResponse(Response):
+    """Models, lists of models or plain JSON-able values, not re-validated."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
+
+
+__all__ = ["TrustedJSONResponse"]
@@ -1,10 +1,11 @@
-from . import auth, files, jobs, materials, support, tests, users
+from . import auth, files, jobs, materials, metrics, support, tests, users
 
 __all__ = [
     "auth",
     "files",
     "jobs",
     "materials",
+    "metrics",
     "notifications",
     "support",
     "tests",
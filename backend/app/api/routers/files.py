@@ -11,16 +11,16 @@ from fastapi import (
     UploadFile,
     status,
 )
-from fastapi.responses import FileResponse, RedirectResponse
+from fastapi.responses import RedirectResponse
 
 from app.api.dependencies import get_export_storage, get_file_service
+from app.api.downloads import serve_stored_object
 from app.api.schemas.tests import FileUploadResponse
 from app.application.services import FileService
 from app.core.limiter import limiter
 from app.core.security import get_current_user
-from app.db.models import User
+from app.domain.models import Principal
 from app.domain.services import FileStorage
-from app.infrastructure.storage import R2FileStorage
 
 router = APIRouter()
 
@@ -32,7 +32,7 @@ _ALLOWED_EXTENSIONS = [".pdf", ".png", ".jpg", ".jpeg"]
 def upload_file(
     request: Request,
     uploaded_file: Annotated[UploadFile, File(...)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     file_service: Annotated[FileService, Depends(get_file_service)],
 ) -> FileUploadResponse:
     if current_user.id is None:
@@ -56,7 +56,7 @@ def upload_file(
 @router.post("/upload-text")
 def upload_text(
     payload: dict[str, Any],
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ) -> dict[str, Any]:
     """Temporary endpoint returning the provided text payload."""
     _ = current_user
@@ -65,58 +65,27 @@ def upload_text(
 
 @router.get("/exports/{file_path:path}")
 def download_export(
+    request: Request,
     file_path: str,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     export_storage: Annotated[FileStorage, Depends(get_export_storage)],
 ) -> Response:
-    # basic path traversal protection
     _ = current_user
-    if ".." in file_path:
+    # basic path traversal protection
+    if ".." in file_path or Path(file_path).is_absolute():
         raise HTTPException(status_code=400, detail="Invalid filename")
 
-    # For R2 and other remote storages, proxy the file through the API to avoid CORS.
-    if isinstance(export_storage, R2FileStorage):
-        try:
-            obj = export_storage._client.get_object(
-                Bucket=export_storage._bucket, Key=file_path
-            )
-            data = obj["Body"].read()
-            return Response(
-                content=data,
-                media_type=obj.get("ContentType") or "application/pdf",
-                headers={
-                    "Content-Disposition": (
-                        f'attachment; filename="{Path(file_path).name}"'
-                    )
-                },
-            )
-        except Exception:
-            # fall back to presigned URL redirect if direct fetch fails
-            generated = export_storage.get_url(stored_path=file_path)
-            if generated.startswith("http"):
-                return RedirectResponse(url=generated)
-
+    # public bucket URLs need no proxying
     generated = export_storage.get_url(stored_path=file_path)
     if generated.startswith("http"):
         return RedirectResponse(url=generated)
 
-    base = (
-        Path(export_storage._base_dir)
-        if hasattr(export_storage, "_base_dir")
-        else Path("uploads/exports")
-    )
-    abs_path = (base / file_path).resolve()
-
-    try:
-        abs_path.relative_to(base.resolve())
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid path") from None
-
-    if not abs_path.exists():
-        raise HTTPException(status_code=404, detail="File not found")
-
-    return FileResponse(
-        path=abs_path, media_type="application/pdf", filename=abs_path.name
+    return serve_stored_object(
+        request,
+        export_storage,
+        file_path,
+        media_type="application/pdf",
+        filename=Path(file_path).name,
     )
 
 
@@ -1,51 +1,121 @@
 from __future__ import annotations
 
-from typing import Annotated
+import json
+from collections.abc import AsyncIterator
+from datetime import timedelta
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
 from app.api.dependencies import get_job_service
-from app.api.schemas.jobs import JobOut
+from app.api.responses import TrustedJSONResponse
+from app.api.schemas.jobs import JobOut, JobPageOut
 from app.application import dto
 from app.application.services import JobService
-from app.core.security import get_current_user
-from app.db.models import User
+from app.core.config import get_settings
+from app.core.security import get_current_user, get_current_user_async
+from app.domain.models import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, Principal
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
 
+@router.get("/page", response_model=JobPageOut)
+def list_jobs_page(
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    job_service: Annotated[JobService, Depends(get_job_service)],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+) -> Response:
+    """Newest-first jobs without payload/result, keyset-paginated."""
+    if current_user.id is None:
+        raise HTTPException(status_code=401, detail="User ID is missing")
+    try:
+        page = job_service.list_jobs_page(
+            owner_id=current_user.id, cursor=cursor, limit=limit
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return TrustedJSONResponse(dto.to_job_page_out(page))
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_jobs(
+    current_user: Annotated[Principal, Depends(get_current_user_async)],
+    job_service: Annotated[JobService, Depends(get_job_service)],
+    last_event_id: Annotated[str | None, Header()] = None,
+) -> StreamingResponse:
+    """Server-sent events with the caller's job changes (replaces polling).
+
+    Each ``job`` event carries the full job as in ``GET /jobs/{id}``.
+    Reconnecting with ``Last-Event-ID`` replays what was missed; when that
+    is too old or too much, a ``resync`` event asks the client to reload
+    ``GET /jobs`` instead. Comment lines are sent as a heartbeat while
+    nothing changes.
+    """
+    if not job_service.streaming_enabled:
+        raise HTTPException(status_code=503, detail="Job stream is not available")
+    settings = get_settings()
+    events = job_service.stream_job_events(
+        owner_id=current_user.id,
+        last_event_id=last_event_id,
+        heartbeat_seconds=settings.JOB_STREAM_HEARTBEAT_SECONDS,
+        max_seconds=settings.JOB_STREAM_MAX_SECONDS,
+        replay=timedelta(seconds=settings.JOB_STREAM_REPLAY_SECONDS),
+    )
+    return StreamingResponse(
+        _server_sent_events(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _server_sent_events(
+    events: AsyncIterator[dict[str, Any] | None],
+) -> AsyncIterator[str]:
+    yield "retry: 3000\n\n"
+    async for event in events:
+        if event is None:
+            yield ": keepalive\n\n"
+        elif event.get("resync"):
+            yield f"id: {event['id']}\nevent: resync\ndata: {{}}\n\n"
+        else:
+            data = json.dumps(event["job"], separators=(",", ":"))
+            yield f"id: {event['id']}\nevent: job\ndata: {data}\n\n"
+
+
 @router.get("/{job_id}", response_model=JobOut)
-def get_job(
+async def get_job(
     job_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user_async)],
     job_service: Annotated[JobService, Depends(get_job_service)],
-) -> JobOut:
+) -> Response:
     if current_user.id is None:
         raise HTTPException(
             status_code=401, detail="User ID is missing"
         )
     try:
-        job = job_service.get_job(owner_id=current_user.id, job_id=job_id)
+        job = await job_service.get_job_async(owner_id=current_user.id, job_id=job_id)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
-    return dto.to_job_out(job)
+    return TrustedJSONResponse(dto.to_job_out(job))
 
 
 @router.get("", response_model=list[JobOut])
-def list_jobs(
-    current_user: Annotated[User, Depends(get_current_user)],
+async def list_jobs(
+    current_user: Annotated[Principal, Depends(get_current_user_async)],
     job_service: Annotated[JobService, Depends(get_job_service)],
     ids: list[int] | None = None,
-) -> list[JobOut]:
+) -> Response:
     if current_user.id is None:
         raise HTTPException(
             status_code=401, detail="User ID is missing"
         )
     if ids is not None and len(ids) > 0:
-        jobs = job_service.get_jobs(owner_id=current_user.id, job_ids=ids)
+        jobs = await job_service.get_jobs_async(owner_id=current_user.id, job_ids=ids)
     else:
-        jobs = job_service.list_jobs(owner_id=current_user.id)
-    return [dto.to_job_out(job) for job in jobs]
+        jobs = await job_service.list_jobs_async(owner_id=current_user.id)
+    return TrustedJSONResponse([dto.to_job_out(job) for job in jobs])
 
 
 __all__ = ["router"]
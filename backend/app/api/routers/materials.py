@@ -6,6 +6,7 @@ from fastapi import (
     Depends,
     File,
     HTTPException,
+    Query,
     Request,
     Response,
     UploadFile,
@@ -16,24 +17,31 @@ from app.api.dependencies import (
     get_job_service,
     get_material_service,
     get_materials_storage,
+    get_quota_engine,
 )
+from app.api.downloads import serve_stored_object
+from app.api.quota import charge_quota, refund_quota
+from app.api.responses import TrustedJSONResponse
 from app.api.schemas.materials import (
     MaterialAnalyzeRequest,
     MaterialAnalyzeResponse,
     MaterialDeepAnalyzeRequest,
     MaterialDeepAnalyzeResponse,
     MaterialOut,
+    MaterialPageOut,
     MaterialUpdate,
     MaterialUploadBatchResponse,
     MaterialUploadEnqueueResponse,
 )
 from app.application.services import JobService, MaterialService
 from app.core.limiter import limiter
-from app.core.security import get_current_user
-from app.db.models import User
-from app.domain.models.enums import JobType
+from app.core.quota import QuotaEngine, estimate_analysis_cost
+from app.core.security import get_current_user, get_current_user_async
+from app.domain.events import AnalyticsEvent
+from app.domain.models import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, Job, Principal
+from app.domain.models.enums import JobStatus, JobType
 from app.domain.services import FileStorage
-from app.infrastructure.monitoring.posthog_client import analytics
+from app.infrastructure.thumbnails import FALLBACK_SIZE
 from app.tasks.materials import analyze_material_task, process_material_task
 
 router = APIRouter(prefix="/materials", tags=["materials"])
@@ -47,7 +55,7 @@ _MAX_TOTAL_PAGES = 20
 def upload_material(
     request: Request,
     uploaded_file: Annotated[UploadFile, File(...)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     material_service: Annotated[MaterialService, Depends(get_material_service)],
     job_service: Annotated[JobService, Depends(get_job_service)],
 ) -> MaterialUploadEnqueueResponse:
@@ -75,23 +83,9 @@ def upload_material(
         owner_id=current_user.id,
         job_type=JobType.MATERIAL_PROCESSING,
         payload={"material_id": material.id},
-    )
-    
-    analytics.capture(
-        user_id=current_user.id,
-        event="material_processing_started",
-        properties={
-            "material_id": material.id,
-            "filename": material.filename,
-            "job_id": job.id,
-            "mime_type": material.mime_type,
-            "size_mb": (
-                round(material.size_bytes / (1024 * 1024), 2)
-                if material.size_bytes
-                else 0
-            ),
-            "page_count": material.page_count,
-        }
+        analytics=_material_event(
+            current_user.id, "material_processing_started", material
+        ),
     )
 
     process_material_task.delay(job.id, current_user.id, material.id)
@@ -108,7 +102,7 @@ def upload_material(
 def upload_material_batch(
     request: Request,
     uploaded_files: Annotated[list[UploadFile], File(...)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     material_service: Annotated[MaterialService, Depends(get_material_service)],
     job_service: Annotated[JobService, Depends(get_job_service)],
 ) -> MaterialUploadBatchResponse:
@@ -159,7 +153,7 @@ def upload_material_batch(
 def analyze_materials(
     request: Request,
     payload: MaterialAnalyzeRequest,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     material_service: Annotated[MaterialService, Depends(get_material_service)],
     job_service: Annotated[JobService, Depends(get_job_service)],
 ) -> MaterialAnalyzeResponse:
@@ -197,23 +191,9 @@ def analyze_materials(
             owner_id=current_user.id,
             job_type=JobType.MATERIAL_PROCESSING,
             payload={"material_id": material.id},
-        )
-
-        analytics.capture(
-            user_id=current_user.id,
-            event="material_processing_started",
-            properties={
-                "material_id": material.id,
-                "filename": material.filename,
-                "job_id": job.id,
-                "mime_type": material.mime_type,
-                "size_mb": (
-                    round(material.size_bytes / (1024 * 1024), 2)
-                    if material.size_bytes
-                    else 0
-                ),
-                "page_count": material.page_count,
-            },
+            analytics=_material_event(
+                current_user.id, "material_processing_started", material
+            ),
         )
 
         process_material_task.delay(job.id, current_user.id, material.id)
@@ -233,10 +213,12 @@ def analyze_materials(
 @limiter.limit("5/minute")
 def analyze_materials_deep(
     request: Request,
+    response: Response,
     payload: MaterialDeepAnalyzeRequest,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     material_service: Annotated[MaterialService, Depends(get_material_service)],
     job_service: Annotated[JobService, Depends(get_job_service)],
+    quota_engine: Annotated[QuotaEngine | None, Depends(get_quota_engine)],
 ) -> MaterialDeepAnalyzeResponse:
     if current_user.id is None:
         raise HTTPException(
@@ -266,32 +248,45 @@ def analyze_materials_deep(
             detail=f"Limit stron przekroczony (max {_MAX_TOTAL_PAGES}).",
         )
 
-    jobs = []
-    for material in materials:
-        job = job_service.create_job(
-            owner_id=current_user.id,
-            job_type=JobType.MATERIAL_ANALYSIS,
-            payload={"material_id": material.id},
-        )
+    costs = [estimate_analysis_cost(material.page_count or 1) for material in materials]
+    charged = charge_quota(
+        quota_engine, response, user_id=current_user.id, cost=sum(costs)
+    )
 
-        analytics.capture(
-            user_id=current_user.id,
-            event="material_analysis_started",
-            properties={
-                "material_id": material.id,
-                "filename": material.filename,
-                "job_id": job.id,
-                "mime_type": material.mime_type,
-                "size_mb": (
-                    round(material.size_bytes / (1024 * 1024), 2)
-                    if material.size_bytes
-                    else 0
+    jobs = []
+    for index, (material, cost) in enumerate(zip(materials, costs, strict=True)):
+        job: Job | None = None
+        try:
+            job = job_service.create_job(
+                owner_id=current_user.id,
+                job_type=JobType.MATERIAL_ANALYSIS,
+                payload={"material_id": material.id},
+                analytics=_material_event(
+                    current_user.id, "material_analysis_started", material
                 ),
-                "page_count": material.page_count,
-            },
-        )
+            )
 
-        analyze_material_task.delay(job.id, current_user.id, material.id)
+            # each job settles its own share of the charge
+            analyze_material_task.delay(
+                job.id,
+                current_user.id,
+                material.id,
+                quota_charged=None if charged is None else cost,
+            )
+        except Exception as exc:
+            # the jobs already enqueued settle their shares themselves
+            unsettled = None if charged is None else sum(costs[index:])
+            refund_quota(quota_engine, user_id=current_user.id, charged=unsettled)
+            if job is not None and job.id is not None:
+                job_service.update_job_status(
+                    job_id=job.id,
+                    status=JobStatus.FAILED,
+                    error=f"Nie udało się uruchomić zadania: {exc}",
+                )
+            raise HTTPException(
+                status_code=503,
+                detail="Nie udało się uruchomić analizy materiałów.",
+            ) from exc
 
         jobs.append(
             {
@@ -305,98 +300,91 @@ def analyze_materials_deep(
 
 
 @router.get("", response_model=list[MaterialOut])
-def list_materials(
-    current_user: Annotated[User, Depends(get_current_user)],
+async def list_materials(
+    current_user: Annotated[Principal, Depends(get_current_user_async)],
     material_service: Annotated[MaterialService, Depends(get_material_service)],
-) -> list[MaterialOut]:
+) -> Response:
     if current_user.id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="User ID is missing"
         )
-    return material_service.list_materials(owner_id=current_user.id)
+    materials = await material_service.list_materials_async(owner_id=current_user.id)
+    return TrustedJSONResponse(materials)
+
+
+@router.get("/page", response_model=MaterialPageOut)
+def list_materials_page(
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    material_service: Annotated[MaterialService, Depends(get_material_service)],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+) -> Response:
+    """Newest-first material cards without text bodies, keyset-paginated."""
+    if current_user.id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="User ID is missing"
+        )
+    try:
+        page = material_service.list_materials_page(
+            owner_id=current_user.id, cursor=cursor, limit=limit
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
+    return TrustedJSONResponse(page)
 
 
 @router.get("/{material_id}/thumbnail")
 def get_material_thumbnail(
+    request: Request,
     material_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     material_service: Annotated[MaterialService, Depends(get_material_service)],
     storage: Annotated[FileStorage, Depends(get_materials_storage)],
+    size: Annotated[str, Query(max_length=20)] = FALLBACK_SIZE,
 ) -> Response:
-    """Get thumbnail image for a material."""
-    from fastapi.responses import FileResponse, RedirectResponse
-
-    from app.infrastructure.storage import R2FileStorage
-
+    """Get thumbnail image for a material (WebP when accepted, JPEG otherwise)."""
     if current_user.id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="User ID is missing"
         )
     try:
-        material = material_service.get_material(
-            owner_id=current_user.id, material_id=material_id
+        thumb_path, media_type = material_service.get_thumbnail_for_download(
+            owner_id=current_user.id,
+            material_id=material_id,
+            size=size,
+            accept_webp=_accepts_webp(request.headers.get("accept")),
         )
-        if not material.thumbnail_path:
-            raise HTTPException(status_code=404, detail="Thumbnail not available")
-        
-        # For R2, proxy through API to avoid CORS
-        if isinstance(storage, R2FileStorage):
-            try:
-                obj = storage._client.get_object(
-                    Bucket=storage._bucket, Key=material.thumbnail_path
-                )
-                data = obj["Body"].read()
-                return Response(
-                    content=data,
-                    media_type="image/jpeg",
-                    headers={"Cache-Control": "public, max-age=31536000"},
-                )
-            except Exception:
-                # Fallback to URL if direct fetch fails
-                url = storage.get_url(stored_path=material.thumbnail_path)
-                if url.startswith("http"):
-                    return RedirectResponse(url=url)
-        
-        # If it already contains base_dir, use it directly.
-        if hasattr(storage, "_base_dir"):
-            thumb_path_str = material.thumbnail_path
-            base_dir_path = Path(storage._base_dir)
-            base_dir_str = str(base_dir_path)
-
-            # Check if thumbnail_path already starts with base_dir
-            # If yes, use it directly (it's already a full path from save())
-            # If no, it might be just a filename, so join with base_dir
-            if thumb_path_str.startswith(base_dir_str):
-                thumb_path = Path(thumb_path_str)
-            else:
-                if hasattr(storage, "_resolve"):
-                    thumb_path = storage._resolve(thumb_path_str)
-                else:
-                    thumb_path = base_dir_path / thumb_path_str
-
-            thumb_path_abs = thumb_path.resolve()
-            if thumb_path_abs.exists():
-                return FileResponse(
-                    path=thumb_path_abs,
-                    media_type="image/jpeg",
-                    headers={"Cache-Control": "public, max-age=31536000"},
-                )
-        
-        raise HTTPException(status_code=404, detail="Thumbnail file not found")
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
+    return serve_stored_object(
+        request,
+        storage,
+        thumb_path,
+        media_type=media_type,
+        cache_control="public, max-age=31536000",
+        headers={"Vary": "Accept"},
+    )
+
+
+def _accepts_webp(accept: str | None) -> bool:
+    """Browsers list image/webp explicitly; fetch() sends */*."""
+    if not accept:
+        return True
+    accept = accept.lower()
+    return "image/webp" in accept or "image/*" in accept or "*/*" in accept
 
 
 @router.get("/{material_id}/download")
 def download_material(
+    request: Request,
     material_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     material_service: Annotated[MaterialService, Depends(get_material_service)],
     storage: Annotated[FileStorage, Depends(get_materials_storage)],
 ) -> Response:
-    """Download the original file for a material."""
-    from urllib.parse import quote
-
+    """Download the original file for a material (streamed, range-capable)."""
     if current_user.id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="User ID is missing"
@@ -410,56 +398,35 @@ def download_material(
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
-    try:
-        with storage.download_to_temp(stored_path=stored_path) as local_path:
-            content = local_path.read_bytes()
-    except Exception:
-        raise HTTPException(
-            status_code=404, detail="File not found in storage"
-        ) from None
-
-    media_type = "application/octet-stream"
-    if mime_type:
-        media_type = mime_type
-    elif filename:
-        import mimetypes
-        guessed, _ = mimetypes.guess_type(filename)
-        if guessed:
-            media_type = guessed
-
-    safe_filename = quote(filename, safe="")
-    return Response(
-        content=content,
-        media_type=media_type,
-        headers={
-            "Content-Disposition": f"attachment; filename*=UTF-8''{safe_filename}",
-        },
+    return serve_stored_object(
+        request, storage, stored_path, media_type=mime_type, filename=filename
     )
 
 
 @router.get("/{material_id}", response_model=MaterialOut)
 def get_material(
     material_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     material_service: Annotated[MaterialService, Depends(get_material_service)],
-) -> MaterialOut:
+) -> Response:
     if current_user.id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="User ID is missing"
         )
     try:
-        return material_service.get_material(
+        material = material_service.get_material(
             owner_id=current_user.id, material_id=material_id
         )
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
+    return TrustedJSONResponse(material)
 
 
 @router.patch("/{material_id}", response_model=MaterialOut)
 def update_material(
     material_id: int,
     body: MaterialUpdate,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     material_service: Annotated[MaterialService, Depends(get_material_service)],
 ) -> MaterialOut:
     if current_user.id is None:
@@ -479,7 +446,7 @@ def update_material(
 @router.delete("/{material_id}", status_code=204)
 def delete_material(
     material_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     material_service: Annotated[MaterialService, Depends(get_material_service)],
 ) -> Response:
     if current_user.id is None:
@@ -495,5 +462,23 @@ def delete_material(
     return Response(status_code=204)
 
 
+def _material_event(user_id: int, event: str, material: MaterialOut) -> AnalyticsEvent:
+    return AnalyticsEvent.create(
+        user_id=user_id,
+        event=event,
+        properties={
+            "material_id": material.id,
+            "filename": material.filename,
+            "mime_type": material.mime_type,
+            "size_mb": (
+                round(material.size_bytes / (1024 * 1024), 2)
+                if material.size_bytes
+                else 0
+            ),
+            "page_count": material.page_count,
+        },
+    )
+
+
 __all__ = ["router"]
 
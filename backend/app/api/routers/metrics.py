@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import secrets
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from app.api.dependencies import get_app_container
+from app.core.config import get_settings
+from app.core.security import get_password_hashing_executor
+
+
+def require_metrics_token(
+    authorization: Annotated[str | None, Header()] = None,
+) -> None:
+    """``Authorization: Bearer <METRICS_TOKEN>``; the routes 404 while it is unset."""
+    token = get_settings().METRICS_TOKEN
+    if not token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    scheme, _, credentials = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(
+        credentials.encode(), token.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+# internal process statistics, for monitoring only
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+    dependencies=[Depends(require_metrics_token)],
+    include_in_schema=False,
+)
+
+
+@router.get("/cache")
+def cache_metrics(
+    container: Annotated[Any, Depends(get_app_container)],
+) -> dict[str, Any]:
+    """Per-process counters (hit rate, bytes saved) of the payload caches."""
+    return {"test_detail": container.provide_test_detail_cache().stats()}
+
+
+@router.get("/password-hashing")
+def password_hashing_metrics() -> dict[str, Any]:
+    """Queue depth, waits and shed requests of the password hashing pool."""
+    return get_password_hashing_executor().stats()
+
+
+__all__ = ["require_metrics_token", "router"]
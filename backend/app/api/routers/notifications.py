@@ -1,18 +1,23 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from app.api.dependencies import get_notification_service
-from app.api.schemas.notifications import NotificationOut, UnreadCount
+from app.api.schemas.notifications import (
+    NotificationOut,
+    NotificationPageOut,
+    UnreadCount,
+)
+from app.application import dto
 from app.application.services import NotificationService
 from app.core.security import get_current_user
-from app.db.models import User
+from app.domain.models import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, Principal
 
 router = APIRouter()
 
 @router.get("/me/list", response_model=list[NotificationOut])
 def get_my_notifications(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     notification_service: Annotated[
         NotificationService, Depends(get_notification_service)
     ],
@@ -24,9 +29,28 @@ def get_my_notifications(
     return notification_service.get_my_notifications(current_user.id) # type: ignore
 
 
+@router.get("/me/page", response_model=NotificationPageOut)
+def get_my_notifications_page(
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    notification_service: Annotated[
+        NotificationService, Depends(get_notification_service)
+    ],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+) -> NotificationPageOut:
+    """Newest-first notification feed with read flags, keyset-paginated."""
+    try:
+        page = notification_service.get_my_notifications_page(
+            current_user.id, cursor=cursor, limit=limit
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return dto.to_notification_page_out(page)
+
+
 @router.get("/me/unread-count", response_model=UnreadCount)
 def get_unread_count(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     notification_service: Annotated[
         NotificationService, Depends(get_notification_service)
     ],
@@ -37,7 +61,7 @@ def get_unread_count(
 @router.post("/{notification_id}/read", status_code=status.HTTP_204_NO_CONTENT)
 def mark_as_read(
     notification_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     notification_service: Annotated[
         NotificationService, Depends(get_notification_service)
     ],
@@ -7,7 +7,7 @@ from app.api.schemas.support import SupportTicketCreate
 from app.application.services import SupportService
 from app.core.limiter import limiter
 from app.core.security import get_optional_current_user
-from app.db.models import User
+from app.domain.models import Principal
 
 router = APIRouter()
 
@@ -21,7 +21,7 @@ async def create_support_ticket(
     request: Request,
     ticket_in: SupportTicketCreate,
     support_service: Annotated[SupportService, Depends(get_support_service)],
-    current_user: Annotated[User | None, Depends(get_optional_current_user)],
+    current_user: Annotated[Principal | None, Depends(get_optional_current_user)],
 ) -> dict[str, str]:
     """
     Create a new support ticket.
@@ -1,8 +1,9 @@
-from typing import Annotated, Any, cast
+from typing import Annotated, Any
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 
-from app.api.dependencies import get_job_service, get_test_service
+from app.api.dependencies import get_job_service, get_quota_engine, get_test_service
+from app.api.quota import charge_quota, refund_quota
 from app.api.schemas.jobs import JobEnqueueResponse
 from app.api.schemas.tests import (
     AssignQuestionsToGroupRequest,
@@ -26,8 +27,9 @@ from app.api.schemas.tests import (
 )
 from app.application.services import JobService, TestService
 from app.core.limiter import limiter
-from app.core.security import get_current_user
-from app.db.models import User
+from app.core.quota import QuotaEngine, estimate_question_cost
+from app.core.security import get_current_user, get_current_user_async
+from app.domain.models import Job, Principal
 from app.domain.models.enums import JobStatus, JobType
 from app.tasks.tests import (
     bulk_convert_questions_task,
@@ -49,30 +51,39 @@ router = APIRouter()
 @limiter.limit("10/minute")
 def generate_test(
     request: Request,
+    response: Response,
     req: TestGenerateRequest,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    test_service: Annotated[TestService, Depends(get_test_service)],
     job_service: Annotated[JobService, Depends(get_job_service)],
+    quota_engine: Annotated[QuotaEngine | None, Depends(get_quota_engine)],
 ) -> JobEnqueueResponse:
     if current_user.id is None:
         raise HTTPException(status_code=401, detail="User ID is missing")
-    job = job_service.create_job(
-        owner_id=current_user.id,
-        job_type=JobType.TEST_GENERATION,
-        payload=req.model_dump(),
+    charged = charge_quota(
+        quota_engine,
+        response,
+        user_id=current_user.id,
+        cost=test_service.estimate_generation_cost(
+            owner_id=current_user.id, request=req
+        ),
     )
+    job: Job | None = None
     try:
+        job = job_service.create_job(
+            owner_id=current_user.id,
+            job_type=JobType.TEST_GENERATION,
+            payload=req.model_dump(),
+        )
         if job.id is None:
             raise HTTPException(
                 status_code=500, detail="Nie udało się utworzyć zadania"
             )
-        generate_test_task.delay(job.id, current_user.id, req.model_dump())
+        generate_test_task.delay(
+            job.id, current_user.id, req.model_dump(), quota_charged=charged
+        )
     except Exception as exc:
-        if job.id is not None:
-            job_service.update_job_status(
-                job_id=job.id,
-                status=JobStatus.FAILED,
-                error=f"Nie udało się uruchomić zadania: {exc}",
-            )
+        _abandon_job(job_service, job, quota_engine, current_user.id, charged, exc)
         raise HTTPException(
             status_code=503,
             detail="Nie udało się uruchomić zadania generowania testu.",
@@ -83,13 +94,13 @@ def generate_test(
 @router.post("/", response_model=TestOut, status_code=status.HTTP_201_CREATED)
 def create_test(
     payload: TestTitleUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     test_service: TestService = Depends(get_test_service),
 ):
     """Create a new empty test with a title."""
     try:
         return test_service.create_empty_test(
-            owner_id=cast(int, current_user.id),
+            owner_id=current_user.id,
             title=payload.title,
         )
     except Exception as exc:
@@ -97,23 +108,33 @@ def create_test(
 
 
 @router.get("/{test_id}", response_model=TestDetailOut)
-def get_test(
+async def get_test(
     test_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    request: Request,
+    current_user: Annotated[Principal, Depends(get_current_user_async)],
     test_service: Annotated[TestService, Depends(get_test_service)],
-) -> TestDetailOut:
+) -> Response:
     if current_user.id is None:
         raise HTTPException(status_code=401, detail="User ID is missing")
     try:
-        return test_service.get_test_detail(owner_id=current_user.id, test_id=test_id)
+        etag, payload = await test_service.get_test_detail_payload_async(
+            owner_id=current_user.id,
+            test_id=test_id,
+            if_none_match=request.headers.get("if-none-match"),
+        )
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
+    # no-cache: the browser may store it but must revalidate with If-None-Match
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if payload is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
 
 
 @router.delete("/{test_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_test(
     test_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
 ) -> Response:
     if current_user.id is None:
@@ -134,7 +155,7 @@ def edit_question(
     test_id: int,
     question_id: int,
     payload: QuestionUpdate,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
 ) -> QuestionOut:
     if current_user.id is None:
@@ -159,7 +180,7 @@ def edit_question(
 def add_question(
     test_id: int,
     payload: QuestionCreate,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
 ) -> QuestionOut:
     if current_user.id is None:
@@ -181,7 +202,7 @@ def add_question(
 def delete_question(
     test_id: int,
     question_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
 ) -> Response:
     if current_user.id is None:
@@ -202,7 +223,7 @@ def delete_question(
 def bulk_update_questions(
     test_id: int,
     payload: BulkUpdateQuestionsRequest,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
 ) -> dict[str, str]:
     if current_user.id is None:
@@ -222,7 +243,7 @@ def bulk_update_questions(
 def bulk_delete_questions(
     test_id: int,
     payload: BulkDeleteQuestionsRequest,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
 ) -> Response:
     if current_user.id is None:
@@ -242,7 +263,7 @@ def bulk_delete_questions(
 def reorder_questions(
     test_id: int,
     payload: ReorderQuestionsRequest,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
 ) -> Response:
     if current_user.id is None:
@@ -264,11 +285,13 @@ def reorder_questions(
 @limiter.limit("10/minute")
 def bulk_regenerate_questions(
     request: Request,
+    response: Response,
     test_id: int,
     payload: BulkRegenerateQuestionsRequest,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
     job_service: Annotated[JobService, Depends(get_job_service)],
+    quota_engine: Annotated[QuotaEngine | None, Depends(get_quota_engine)],
 ) -> JobEnqueueResponse:
     if current_user.id is None:
         raise HTTPException(status_code=401, detail="User ID is missing")
@@ -287,18 +310,32 @@ def bulk_regenerate_questions(
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
-    job = job_service.create_job(
-        owner_id=current_user.id,
-        job_type=JobType.QUESTIONS_REGENERATION,
-        payload={
-            "test_id": test_id,
-            "question_ids": payload.question_ids,
-            "instruction": payload.instruction,
-        },
-    )
-    bulk_regenerate_questions_task.delay(
-        job.id, current_user.id, test_id, payload.model_dump()
+    charged = charge_quota(
+        quota_engine,
+        response,
+        user_id=current_user.id,
+        cost=estimate_question_cost(len(payload.question_ids)),
     )
+    job: Job | None = None
+    try:
+        job = job_service.create_job(
+            owner_id=current_user.id,
+            job_type=JobType.QUESTIONS_REGENERATION,
+            payload={
+                "test_id": test_id,
+                "question_ids": payload.question_ids,
+                "instruction": payload.instruction,
+            },
+        )
+        bulk_regenerate_questions_task.delay(
+            job.id, current_user.id, test_id, payload.model_dump()
+        )
+    except Exception as exc:
+        _abandon_job(job_service, job, quota_engine, current_user.id, charged, exc)
+        raise HTTPException(
+            status_code=503,
+            detail="Nie udało się uruchomić regeneracji pytań.",
+        ) from exc
     return JobEnqueueResponse(job_id=job.id, status=job.status.value)
 
 
@@ -306,11 +343,13 @@ def bulk_regenerate_questions(
 @limiter.limit("10/minute")
 def bulk_convert_questions(
     request: Request,
+    response: Response,
     test_id: int,
     payload: BulkConvertQuestionsRequest,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
     job_service: Annotated[JobService, Depends(get_job_service)],
+    quota_engine: Annotated[QuotaEngine | None, Depends(get_quota_engine)],
 ) -> JobEnqueueResponse:
     if current_user.id is None:
         raise HTTPException(status_code=401, detail="User ID is missing")
@@ -328,18 +367,32 @@ def bulk_convert_questions(
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
-    job = job_service.create_job(
-        owner_id=current_user.id,
-        job_type=JobType.QUESTIONS_CONVERSION,
-        payload={
-            "test_id": test_id,
-            "question_ids": payload.question_ids,
-            "target_type": payload.target_type,
-        },
-    )
-    bulk_convert_questions_task.delay(
-        job.id, current_user.id, test_id, payload.model_dump()
+    charged = charge_quota(
+        quota_engine,
+        response,
+        user_id=current_user.id,
+        cost=estimate_question_cost(len(payload.question_ids)),
     )
+    job: Job | None = None
+    try:
+        job = job_service.create_job(
+            owner_id=current_user.id,
+            job_type=JobType.QUESTIONS_CONVERSION,
+            payload={
+                "test_id": test_id,
+                "question_ids": payload.question_ids,
+                "target_type": payload.target_type,
+            },
+        )
+        bulk_convert_questions_task.delay(
+            job.id, current_user.id, test_id, payload.model_dump()
+        )
+    except Exception as exc:
+        _abandon_job(job_service, job, quota_engine, current_user.id, charged, exc)
+        raise HTTPException(
+            status_code=503,
+            detail="Nie udało się uruchomić zmiany typu pytań.",
+        ) from exc
     return JobEnqueueResponse(job_id=job.id, status=job.status.value)
 
 
@@ -348,7 +401,7 @@ def bulk_convert_questions(
 def export_pdf(
     request: Request,
     test_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
     job_service: Annotated[JobService, Depends(get_job_service)],
     show_answers: bool = False,
@@ -375,7 +428,7 @@ def export_custom_pdf(
     request: Request,
     test_id: int,
     config: PdfExportConfig,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
     job_service: Annotated[JobService, Depends(get_job_service)],
 ) -> JobEnqueueResponse:
@@ -403,7 +456,7 @@ def export_custom_pdf(
 @router.get("/{test_id}/export/xml")
 def export_xml(
     test_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
 ) -> Response:
     if current_user.id is None:
@@ -426,7 +479,7 @@ def export_xml(
 def update_test_title(
     test_id: int,
     payload: TestTitleUpdate,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
 ) -> TestOut:
     if current_user.id is None:
@@ -449,7 +502,7 @@ def update_test_title(
 def create_group(
     test_id: int,
     payload: GroupCreate,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
 ) -> GroupOut:
     if current_user.id is None:
@@ -470,7 +523,7 @@ def update_group(
     test_id: int,
     group_id: int,
     payload: GroupUpdate,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
 ) -> GroupOut:
     if current_user.id is None:
@@ -493,7 +546,7 @@ def update_group(
 def delete_group(
     test_id: int,
     group_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
 ) -> Response:
     if current_user.id is None:
@@ -517,11 +570,13 @@ def delete_group(
 @limiter.limit("10/minute")
 def generate_group_ai_variant(
     request: Request,
+    response: Response,
     test_id: int,
     group_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
     job_service: Annotated[JobService, Depends(get_job_service)],
+    quota_engine: Annotated[QuotaEngine | None, Depends(get_quota_engine)],
     payload: GenerateGroupVariantRequest | None = None,
 ) -> JobEnqueueResponse:
     if current_user.id is None:
@@ -535,10 +590,19 @@ def generate_group_ai_variant(
             ),
         )
     try:
-        test_service.get_test_detail(owner_id=current_user.id, test_id=test_id)
+        detail = test_service.get_test_detail(
+            owner_id=current_user.id, test_id=test_id
+        )
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
+    group_size = sum(1 for q in detail.questions if q.group_id == group_id)
+    charge_quota(
+        quota_engine,
+        response,
+        user_id=current_user.id,
+        cost=estimate_question_cost(group_size),
+    )
     instruction = payload.instruction if payload else None
     job = job_service.create_job(
         owner_id=current_user.id,
@@ -561,7 +625,7 @@ def generate_group_ai_variant(
 def duplicate_group(
     test_id: int,
     group_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
 ):
     if current_user.id is None:
@@ -581,7 +645,7 @@ def duplicate_group(
 def create_shuffled_variant_group(
     test_id: int,
     group_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
 ) -> GroupOut:
     if current_user.id is None:
@@ -600,7 +664,7 @@ def create_shuffled_variant_group(
 def assign_questions_to_group(
     test_id: int,
     payload: AssignQuestionsToGroupRequest,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
 ) -> Response:
     if current_user.id is None:
@@ -619,7 +683,7 @@ def assign_questions_to_group(
 @router.get("/{test_id}/config")
 def get_test_config(
     test_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
 ) -> dict[str, Any]:
     if current_user.id is None:
@@ -632,5 +696,22 @@ def get_test_config(
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
 
-__all__ = ["router"]
+def _abandon_job(
+    job_service: JobService,
+    job: Job | None,
+    quota_engine: QuotaEngine | None,
+    user_id: int,
+    charged: int | None,
+    exc: Exception,
+) -> None:
+    """Refund and fail a job whose task could not be enqueued."""
+    refund_quota(quota_engine, user_id=user_id, charged=charged)
+    if job is not None and job.id is not None:
+        job_service.update_job_status(
+            job_id=job.id,
+            status=JobStatus.FAILED,
+            error=f"Nie udało się uruchomić zadania: {exc}",
+        )
+
 
+__all__ = ["router"]
@@ -1,9 +1,10 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 
 from app.api.dependencies import get_test_service, get_user_service
-from app.api.schemas.tests import TestOut
+from app.api.responses import TrustedJSONResponse
+from app.api.schemas.tests import TestOut, TestPageOut
 from app.api.schemas.users import (
     ChangePasswordRequest,
     UserConsentsUpdate,
@@ -12,32 +13,59 @@ from app.api.schemas.users import (
 )
 from app.application.services import TestService, UserService
 from app.core.security import get_current_user
-from app.db.models import User
+from app.domain.models import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, Principal
 
 router = APIRouter()
 
 
 @router.get("/me", response_model=UserRead)
-def read_profile(current_user: Annotated[User, Depends(get_current_user)]) -> User:
+def read_profile(
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    user_service: Annotated[UserService, Depends(get_user_service)],
+) -> UserRead:
     """Return data for the currently authenticated user."""
-    return current_user
+    try:
+        return user_service.get_profile(user_id=current_user.id)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
 
 
 @router.get("/me/tests", response_model=list[TestOut])
 def list_my_tests(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
-) -> list[TestOut]:
+) -> Response:
     """Return tests owned by the currently authenticated user."""
     if current_user.id is None:
         raise HTTPException(status_code=401, detail="User ID is missing")
-    return test_service.list_tests_for_user(owner_id=current_user.id)
+    return TrustedJSONResponse(
+        test_service.list_tests_for_user(owner_id=current_user.id)
+    )
+
+
+@router.get("/me/tests/page", response_model=TestPageOut)
+def list_my_tests_page(
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    test_service: Annotated[TestService, Depends(get_test_service)],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+) -> Response:
+    """Return one newest-first page of the user's tests."""
+    if current_user.id is None:
+        raise HTTPException(status_code=401, detail="User ID is missing")
+    try:
+        page = test_service.list_tests_page(
+            owner_id=current_user.id, cursor=cursor, limit=limit
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return TrustedJSONResponse(page)
 
 
 @router.delete("/me/tests/{test_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_my_test(
     test_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     test_service: Annotated[TestService, Depends(get_test_service)],
 ) -> Response:
     """Delete a test by ID if it belongs to the current user."""
@@ -52,7 +80,7 @@ def delete_my_test(
 
 @router.get("/me/statistics", response_model=UserStatistics)
 def get_my_statistics(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     user_service: Annotated[UserService, Depends(get_user_service)],
 ) -> UserStatistics:
     if current_user.id is None:
@@ -63,7 +91,7 @@ def get_my_statistics(
 @router.post("/me/change-password", status_code=status.HTTP_200_OK)
 def change_my_password(
     payload: ChangePasswordRequest,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     user_service: Annotated[UserService, Depends(get_user_service)],
 ) -> dict[str, str]:
     if current_user.id is None:
@@ -85,7 +113,7 @@ def change_my_password(
 @router.put("/me/consents", status_code=status.HTTP_200_OK)
 def update_my_consents(
     payload: UserConsentsUpdate,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     user_service: Annotated[UserService, Depends(get_user_service)],
 ) -> dict[str, str]:
     if current_user.id is None:
@@ -101,7 +129,7 @@ def update_my_consents(
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
 def delete_my_account(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     user_service: Annotated[UserService, Depends(get_user_service)],
 ) -> Response:
     if current_user.id is None:
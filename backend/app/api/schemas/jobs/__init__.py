@@ -18,9 +18,24 @@ class JobOut(BaseModel):
     updated_at: datetime
 
 
+class JobSummaryOut(BaseModel):
+    id: int
+    owner_id: int
+    job_type: str
+    status: str
+    error: str | None = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class JobPageOut(BaseModel):
+    items: list[JobSummaryOut]
+    next_cursor: str | None = None
+
+
 class JobEnqueueResponse(BaseModel):
     job_id: int
     status: str
 
 
-__all__ = ["JobEnqueueResponse", "JobOut"]
+__all__ = ["JobEnqueueResponse", "JobOut", "JobPageOut", "JobSummaryOut"]
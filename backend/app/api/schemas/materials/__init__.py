@@ -5,6 +5,13 @@ from typing import Literal
 from pydantic import BaseModel
 
 
+class MaterialThumbnailOut(BaseModel):
+    size: str
+    width: int
+    height: int
+    format: str
+
+
 class MaterialOut(BaseModel):
     id: int
     file_id: int
@@ -17,6 +24,7 @@ class MaterialOut(BaseModel):
     analysis_status: str | None = None
     routing_tier: str | None = None
     analysis_version: str | None = None
+    analysis_pipeline: str | None = None
     created_at: datetime
     extracted_text: str | None = None
     markdown_twin: str | None = None
@@ -24,10 +32,38 @@ class MaterialOut(BaseModel):
     cache_hit: bool | None = None
     duration_ocr_sec: float | None = None
     thumbnail_path: str | None = None
+    thumbnails: list[MaterialThumbnailOut] | None = None
 
     class Config:
         from_attributes = True
 
+class MaterialSummaryOut(BaseModel):
+    """List card: text bodies are only served by GET /materials/{id}."""
+
+    id: int
+    file_id: int
+    filename: str
+    mime_type: str | None = None
+    size_bytes: int | None = None
+    page_count: int | None = None
+    checksum: str | None = None
+    processing_status: str
+    analysis_status: str | None = None
+    routing_tier: str | None = None
+    analysis_version: str | None = None
+    analysis_pipeline: str | None = None
+    created_at: datetime
+    has_text: bool = False
+    processing_error: str | None = None
+    thumbnail_path: str | None = None
+    thumbnails: list[MaterialThumbnailOut] | None = None
+
+
+class MaterialPageOut(BaseModel):
+    items: list[MaterialSummaryOut]
+    next_cursor: str | None = None
+
+
 class MaterialUpdate(BaseModel):
     extracted_text: str | None = None
     processing_status: Literal["pending", "done", "failed"] | None = None
@@ -75,6 +111,9 @@ __all__ = [
     "MaterialDeepAnalyzeRequest",
     "MaterialDeepAnalyzeResponse",
     "MaterialOut",
+    "MaterialPageOut",
+    "MaterialSummaryOut",
+    "MaterialThumbnailOut",
     "MaterialUpdate",
     "MaterialUploadBatchResponse",
     "MaterialUploadEnqueueResponse",
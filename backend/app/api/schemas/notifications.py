@@ -11,6 +11,12 @@ class NotificationOut(BaseModel):
     created_at: datetime
     is_read: bool
 
+
+class NotificationPageOut(BaseModel):
+    items: list[NotificationOut]
+    next_cursor: str | None = None
+
+
 class UnreadCount(BaseModel):
     count: int
 
@@ -41,6 +41,10 @@ class TestOut(BaseModel):
     class Config:
         from_attributes = True
 
+class TestPageOut(BaseModel):
+    items: list[TestOut]
+    next_cursor: str | None = None
+
 class GenerateParams(BaseModel):
     closed: ClosedBreakdown = Field(default_factory=ClosedBreakdown)
     num_open: int = 0
@@ -283,6 +287,7 @@ __all__ = [
     "TestGenerateRequest",
     "TestGenerateResponse",
     "TestOut",
+    "TestPageOut",
     "TestTitleUpdate",
     "TextInput",
 ]
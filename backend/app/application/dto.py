@@ -6,11 +6,36 @@ import json
 from collections.abc import Iterable
 from typing import Any
 
-from app.api.schemas.jobs import JobOut
-from app.api.schemas.materials import MaterialOut
-from app.api.schemas.tests import GroupOut, QuestionOut, TestDetailOut, TestOut
+from app.api.schemas.jobs import JobOut, JobPageOut, JobSummaryOut
+from app.api.schemas.materials import (
+    MaterialOut,
+    MaterialPageOut,
+    MaterialSummaryOut,
+    MaterialThumbnailOut,
+)
+from app.api.schemas.notifications import NotificationOut, NotificationPageOut
+from app.api.schemas.tests import (
+    GroupOut,
+    QuestionOut,
+    TestDetailOut,
+    TestOut,
+    TestPageOut,
+)
 from app.api.schemas.users import UserRead
-from app.domain.models import Job, Material, Question, QuestionGroup, Test, User
+from app.domain.models import (
+    Job,
+    JobSummary,
+    Material,
+    MaterialSummary,
+    NotificationFeedItem,
+    Page,
+    Question,
+    QuestionGroup,
+    Test,
+    TestDetailProjection,
+    User,
+    normalize_choices,
+)
 
 
 def _as_list(value: Any) -> list[str] | None:
@@ -25,9 +50,15 @@ def _as_list(value: Any) -> list[str] | None:
     if value is None:
         return None
     if isinstance(value, list):
+        # JSON columns already hold lists of strings
+        if all(type(x) is str for x in value):
+            return list(value)
         return [str(x) for x in value]
     if isinstance(value, str):
         s = value.strip()
+        if not s.startswith(("[", '"')):
+            # zwykły string, nie JSON -> jednoelementowa lista
+            return [s.strip("'")]
         # spróbuj sparsować JSON listę
         try:
             parsed = json.loads(s)
@@ -92,6 +123,56 @@ def to_test_detail(test: Test, groups: list[QuestionGroup]) -> TestDetailOut:
     )
 
 
+def test_detail_from_projection(projection: TestDetailProjection) -> TestDetailOut:
+    """Same payload as ``to_test_detail`` built straight from the read projection.
+
+    No domain entities are created and values are already typed, so the
+    schemas are built with ``model_construct`` (no re-validation).
+    """
+    questions: list[QuestionOut] = []
+    for (
+        question_id,
+        text,
+        is_closed,
+        difficulty,
+        group_id,
+        choices,
+        correct_choices,
+        citations,
+    ) in projection.questions:
+        choices, correct_choices = normalize_choices(
+            is_closed, _as_list(choices), _as_list(correct_choices)
+        )
+        questions.append(
+            QuestionOut.model_construct(
+                id=question_id,
+                text=text.strip(),
+                is_closed=is_closed,
+                difficulty=difficulty,
+                group_id=group_id or 0,
+                choices=choices,
+                correct_choices=correct_choices,
+                citations=_as_list(citations) or [],
+            )
+        )
+    return TestDetailOut.model_construct(
+        test_id=projection.test_id,
+        title=(projection.title or "").strip() or "Untitled Test",
+        groups=[
+            GroupOut.model_construct(id=group_id, label=label, position=position)
+            for group_id, label, position in projection.groups
+        ],
+        questions=questions,
+    )
+
+
+def to_test_page_out(page: Page[Test]) -> TestPageOut:
+    return TestPageOut(
+        items=[to_test_out(t) for t in page.items],
+        next_cursor=page.next_cursor.encode() if page.next_cursor else None,
+    )
+
+
 def to_test_response(test: Test) -> dict:
     return {
         "test_id": test.id,
@@ -122,6 +203,7 @@ def to_material_out(
         if material.routing_tier
         else None,
         analysis_version=material.analysis_version,
+        analysis_pipeline=material.analysis_pipeline,
         created_at=material.file.uploaded_at,
         extracted_text=material.extracted_text,
         markdown_twin=material.markdown_twin,
@@ -129,9 +211,57 @@ def to_material_out(
         cache_hit=cache_hit,
         duration_ocr_sec=duration_ocr_sec,
         thumbnail_path=material.thumbnail_path,
+        thumbnails=to_material_thumbnails_out(material.thumbnails),
+    )
+
+
+def to_material_summary_out(material: MaterialSummary) -> MaterialSummaryOut:
+    return MaterialSummaryOut(
+        id=material.id,
+        file_id=material.file_id,
+        filename=material.filename,
+        mime_type=material.mime_type,
+        size_bytes=material.size_bytes,
+        page_count=material.page_count,
+        checksum=material.checksum,
+        processing_status=material.status.value,
+        analysis_status=material.analysis_status.value
+        if material.analysis_status
+        else None,
+        routing_tier=material.routing_tier.value if material.routing_tier else None,
+        analysis_version=material.analysis_version,
+        analysis_pipeline=material.analysis_pipeline,
+        created_at=material.uploaded_at,
+        has_text=material.has_text,
+        processing_error=material.processing_error,
+        thumbnail_path=material.thumbnail_path,
+        thumbnails=to_material_thumbnails_out(material.thumbnails),
+    )
+
+
+def to_material_page_out(page: Page[MaterialSummary]) -> MaterialPageOut:
+    return MaterialPageOut(
+        items=[to_material_summary_out(m) for m in page.items],
+        next_cursor=page.next_cursor.encode() if page.next_cursor else None,
     )
 
 
+def to_material_thumbnails_out(
+    thumbnails: dict[str, dict[str, Any]] | None,
+) -> list[MaterialThumbnailOut] | None:
+    if not thumbnails:
+        return None
+    return [
+        MaterialThumbnailOut(
+            size=size,
+            width=int(variant.get("width") or 0),
+            height=int(variant.get("height") or 0),
+            format=str(variant.get("format") or "jpeg"),
+        )
+        for size, variant in thumbnails.items()
+    ]
+
+
 def to_materials_out(materials: Iterable[Material]) -> list[MaterialOut]:
     return [to_material_out(m) for m in materials]
 
@@ -150,14 +280,59 @@ def to_job_out(job: Job) -> JobOut:
     )
 
 
+def to_job_summary_out(job: JobSummary) -> JobSummaryOut:
+    return JobSummaryOut(
+        id=job.id,
+        owner_id=job.owner_id,
+        job_type=job.job_type.value,
+        status=job.status.value,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
+def to_job_page_out(page: Page[JobSummary]) -> JobPageOut:
+    return JobPageOut(
+        items=[to_job_summary_out(j) for j in page.items],
+        next_cursor=page.next_cursor.encode() if page.next_cursor else None,
+    )
+
+
+def to_notification_out(item: NotificationFeedItem) -> NotificationOut:
+    return NotificationOut(
+        id=item.id,
+        title=item.title,
+        message=item.message,
+        type=item.type,
+        created_at=item.created_at,
+        is_read=item.is_read,
+    )
+
+
+def to_notification_page_out(page: Page[NotificationFeedItem]) -> NotificationPageOut:
+    return NotificationPageOut(
+        items=[to_notification_out(n) for n in page.items],
+        next_cursor=page.next_cursor.encode() if page.next_cursor else None,
+    )
+
+
 __all__ = [
+    "test_detail_from_projection",
     "to_job_out",
+    "to_job_page_out",
+    "to_job_summary_out",
     "to_material_out",
+    "to_material_page_out",
+    "to_material_summary_out",
     "to_materials_out",
+    "to_notification_out",
+    "to_notification_page_out",
     "to_question_dict",
     "to_question_out",
     "to_test_detail",
     "to_test_out",
+    "to_test_page_out",
     "to_test_response",
     "to_user_read",
 ]
@@ -5,11 +5,15 @@ from __future__ import annotations
 from typing import Any, Protocol
 
 from app.domain.repositories import (
+    AsyncJobRepository,
+    AsyncMaterialRepository,
+    AsyncTestRepository,
     FileRepository,
     JobRepository,
     MaterialRepository,
     NotificationRepository,
     OcrCacheRepository,
+    OutboxRepository,
     PasswordResetTokenRepository,
     PdfExportCacheRepository,
     PendingVerificationRepository,
@@ -17,12 +21,19 @@ from app.domain.repositories import (
     SupportRepository,
     TestRepository,
     UserRepository,
+    UserStatsRepository,
 )
 from app.domain.services import (
+    AnalyticsSink,
     DocumentAnalyzer,
     FileStorage,
+    JobEventBus,
+    JobEventSubscription,
     OCRService,
+    PayloadCache,
+    PrincipalCache,
     QuestionGenerator,
+    UnreadCounter,
 )
 
 
@@ -75,6 +86,14 @@ class UnitOfWork(Protocol):
     def ocr_cache(self) -> OcrCacheRepository:
         ...
 
+    @property
+    def user_stats(self) -> UserStatsRepository:
+        ...
+
+    @property
+    def outbox(self) -> OutboxRepository:
+        ...
+
     def __enter__(self) -> UnitOfWork:
         ...
 
@@ -93,11 +112,43 @@ class UnitOfWork(Protocol):
         ...
 
 
+class AsyncUnitOfWork(Protocol):
+    @property
+    def tests(self) -> AsyncTestRepository:
+        ...
+
+    @property
+    def materials(self) -> AsyncMaterialRepository:
+        ...
+
+    @property
+    def jobs(self) -> AsyncJobRepository:
+        ...
+
+    async def __aenter__(self) -> AsyncUnitOfWork:
+        ...
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: Any,
+    ) -> None:
+        ...
+
+
 __all__ = [
+    "AnalyticsSink",
+    "AsyncUnitOfWork",
     "DocumentAnalyzer",
     "FileStorage",
+    "JobEventBus",
+    "JobEventSubscription",
     "OCRService",
+    "PayloadCache",
+    "PrincipalCache",
     "QuestionGenerator",
     "UnitOfWork",
+    "UnreadCounter",
 ]
 
@@ -2,21 +2,27 @@
 
 from .auth_service import AuthService
 from .file_service import FileService
+from .housekeeping_service import HousekeepingService, PurgeResult
 from .job_service import JobService
 from .material_analysis_service import MaterialAnalysisService
 from .material_service import MaterialService
 from .notification_service import NotificationService
+from .outbox_dispatcher import DispatchResult, OutboxDispatcher
 from .support_service import SupportService
 from .test_service import TestService
 from .user_service import UserService
 
 __all__ = [
     "AuthService",
+    "DispatchResult",
     "FileService",
+    "HousekeepingService",
     "JobService",
     "MaterialAnalysisService",
     "MaterialService",
     "NotificationService",
+    "OutboxDispatcher",
+    "PurgeResult",
     "SupportService",
     "TestService",
     "UserService",
@@ -10,21 +10,23 @@ from urllib.parse import urlparse, urlunparse
 
 from app.api.schemas.auth import Token
 from app.api.schemas.users import UserCreate
-from app.application.interfaces import UnitOfWork
+from app.application.interfaces import PrincipalCache, UnitOfWork
 from app.core.config import get_settings
 from app.core.security import (
     create_access_token,
     get_password_hash,
+    password_needs_rehash,
+    run_password_task_in_background,
     verify_password,
 )
 from app.db.models import SystemNotification
+from app.domain.events import AnalyticsEvent
 from app.domain.models import (
     PasswordResetToken,
     PendingVerification,
     RefreshToken,
     User,
 )
-from app.infrastructure.monitoring.posthog_client import analytics
 
 
 def normalize_frontend_base_url(url: str | None) -> str:
@@ -62,21 +64,31 @@ class AuthService:
         password_hasher: Callable[[str], str] = get_password_hash,
         password_verifier: Callable[[str, str], bool] = verify_password,
         token_issuer: Callable[..., str] = create_access_token,
+        principal_cache: PrincipalCache | None = None,
+        password_needs_rehash: Callable[[str], bool] = password_needs_rehash,
+        background_runner: Callable[
+            [Callable[[], None]], bool
+        ] = run_password_task_in_background,
     ) -> None:
         self._uow_factory = uow_factory
         self._password_hasher = password_hasher
         self._password_verifier = password_verifier
+        self._password_needs_rehash = password_needs_rehash
+        self._background_runner = background_runner
         self._token_issuer = token_issuer
+        self._principal_cache = principal_cache
 
     def register_user(self, payload: UserCreate) -> None:
         """Creates pending verification and enqueues verification email."""
 
         with self._uow_factory() as uow:
-            existing = uow.users.get_by_email(payload.email)
-            if existing:
+            if uow.users.get_by_email(payload.email):
                 raise ValueError("Email jest już zarejestrowany")
 
-            hashed_password = self._password_hasher(payload.password)
+        # hashed between transactions so no pooled connection waits on bcrypt
+        hashed_password = self._password_hasher(payload.password)
+
+        with self._uow_factory() as uow:
             settings = get_settings()
             if not settings.FRONTEND_BASE_URL:
                 raise ValueError("FRONTEND_BASE_URL is not configured")
@@ -109,17 +121,17 @@ class AuthService:
                 created_at=datetime.utcnow(),
             )
             uow.pending_verifications.upsert(pending_entry)
-
-        analytics.capture(
-            user_id=payload.email,
-            event="user_registration_requested",
-            properties={
-                "email": payload.email,
-                "first_name": payload.first_name,
-                "last_name": payload.last_name,
-            }
-        )
-        analytics.flush()
+            uow.outbox.add(
+                AnalyticsEvent.create(
+                    user_id=payload.email,
+                    event="user_registration_requested",
+                    properties={
+                        "email": payload.email,
+                        "first_name": payload.first_name,
+                        "last_name": payload.last_name,
+                    },
+                )
+            )
 
         from app.tasks.email import (
             send_verification_email_task,  # local import to avoid cycles
@@ -147,9 +159,24 @@ class AuthService:
                     )
                 raise ValueError("Niepoprawny e-mail lub hasło")
 
-            if not self._password_verifier(password, user.hashed_password):
-                raise ValueError("Niepoprawny e-mail lub hasło")
-            return user
+        if not self._password_verifier(password, user.hashed_password):
+            raise ValueError("Niepoprawny e-mail lub hasło")
+        if user.id is not None and self._password_needs_rehash(user.hashed_password):
+            user_id, old_hash = user.id, user.hashed_password
+            self._background_runner(
+                lambda: self._rehash_password(user_id, password, old_hash)
+            )
+        return user
+
+    def _rehash_password(self, user_id: int, password: str, old_hash: str) -> None:
+        """Store a hash with the current cost unless the password changed since."""
+        new_hash = self._password_hasher(password)
+        with self._uow_factory() as uow:
+            user = uow.users.get(user_id)
+            if user is None or user.hashed_password != old_hash:
+                return
+            user.hashed_password = new_hash
+            uow.users.update(user)
 
     def _create_refresh_token(self, user_id: int, uow: UnitOfWork) -> str:
         settings = get_settings()
@@ -178,7 +205,7 @@ class AuthService:
         with self._uow_factory() as uow:
             # Generate Access Token
             access_token = self._token_issuer(
-                data={"sub": user.email},
+                data={"sub": user.email, "uid": user.id},
                 expires_delta=expires_delta,
             )
             
@@ -215,7 +242,7 @@ class AuthService:
             settings = get_settings()
             expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
             new_access_token = self._token_issuer(
-                data={"sub": user.email},
+                data={"sub": user.email, "uid": user.id},
                 expires_delta=expires_delta,
             )
             if user.id is None:
@@ -237,9 +264,11 @@ class AuthService:
                 raise ValueError("Nieprawidłowy lub wygasły token")
             if pending.expires_at < datetime.utcnow():
                 uow.pending_verifications.delete_by_email(pending.email)
+                uow.commit()
                 raise ValueError("Token wygasł")
             if uow.users.get_by_email(pending.email):
                 uow.pending_verifications.delete_by_email(pending.email)
+                uow.commit()
                 raise ValueError("Email jest już zarejestrowany")
 
             user = User(
@@ -273,22 +302,23 @@ class AuthService:
             )
             
             # Track sign up
-            analytics.capture(
-                user_id=created.email,
-                event="user_signed_up",
-                properties={
-                    "user_id": created.id,
-                    "email": created.email,
-                    "first_name": created.first_name,
-                    "last_name": created.last_name,
-                }
+            uow.outbox.add(
+                AnalyticsEvent.create(
+                    user_id=created.email,
+                    event="user_signed_up",
+                    properties={
+                        "user_id": created.id,
+                        "email": created.email,
+                        "first_name": created.first_name,
+                        "last_name": created.last_name,
+                    },
+                )
             )
-            analytics.flush()
 
             # Create tokens for the new user
             expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
             access_token = self._token_issuer(
-                data={"sub": created.email},
+                data={"sub": created.email, "uid": created.id},
                 expires_delta=expires_delta,
             )
             if created.id is None:
@@ -347,11 +377,13 @@ class AuthService:
 
             if reset_token.expires_at < datetime.utcnow():
                 uow.password_reset_tokens.delete_by_email(reset_token.email)
+                uow.commit()
                 raise ValueError("Token wygasł")
 
             user = uow.users.get_by_email(reset_token.email)
             if not user:
                 uow.password_reset_tokens.delete_by_email(reset_token.email)
+                uow.commit()
                 raise ValueError("Użytkownik nie został znaleziony")
 
             hashed_password = self._password_hasher(new_password)
@@ -362,6 +394,8 @@ class AuthService:
             # Optionally revoke all refresh tokens for security
             if user.id is not None:
                 uow.refresh_tokens.revoke_all_for_user(user.id)
+        if user.id is not None and self._principal_cache is not None:
+            self._principal_cache.invalidate(user.id)
 
 
 __all__ = ["AuthService"]
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from app.application.interfaces import UnitOfWork
+
+
+@dataclass(slots=True)
+class PurgeResult:
+    target: str
+    rows: int = 0
+    batches: int = 0
+    duration: float = 0.0  # seconds
+    complete: bool = True  # False when max_batches stopped the run early
+    stored_paths: list[str] = field(default_factory=list)
+
+    def log_fields(self) -> dict[str, object]:
+        return {
+            "housekeeping_target": self.target,
+            "housekeeping_rows": self.rows,
+            "housekeeping_batches": self.batches,
+            "housekeeping_ms": round(self.duration * 1000, 1),
+            "housekeeping_complete": self.complete,
+        }
+
+
+class HousekeepingService:
+    """Set-based retention deletes, one short transaction per batch.
+
+    Each batch deletes at most ``batch_size`` rows (skipping rows locked by
+    live requests) and commits, so no run holds long locks or builds one
+    huge transaction; a run stops after ``max_batches`` and the next
+    scheduled run continues.
+    """
+
+    def __init__(
+        self,
+        uow_factory: Callable[[], UnitOfWork],
+        *,
+        batch_size: int = 1000,
+        max_batches: int = 100,
+    ) -> None:
+        self._uow_factory = uow_factory
+        self._batch_size = max(1, batch_size)
+        self._max_batches = max(1, max_batches)
+
+    def purge_expired_refresh_tokens(self, *, grace: timedelta) -> PurgeResult:
+        before = datetime.utcnow() - grace
+        return self._purge(
+            "refresh_tokens",
+            lambda uow: uow.refresh_tokens.remove_expired(
+                before, limit=self._batch_size
+            ),
+        )
+
+    def purge_expired_pending_verifications(self, *, grace: timedelta) -> PurgeResult:
+        before = datetime.utcnow() - grace
+        return self._purge(
+            "pending_email_verification",
+            lambda uow: uow.pending_verifications.purge_expired(
+                before, limit=self._batch_size
+            ),
+        )
+
+    def purge_expired_password_reset_tokens(self, *, grace: timedelta) -> PurgeResult:
+        before = datetime.utcnow() - grace
+        return self._purge(
+            "password_reset_tokens",
+            lambda uow: uow.password_reset_tokens.purge_expired(
+                before, limit=self._batch_size
+            ),
+        )
+
+    def purge_finished_jobs(self, *, older_than: timedelta) -> PurgeResult:
+        before = datetime.utcnow() - older_than
+        return self._purge(
+            "job",
+            lambda uow: uow.jobs.purge_finished(before, limit=self._batch_size),
+        )
+
+    def purge_processed_outbox(self, *, older_than: timedelta) -> PurgeResult:
+        """Delivered (and given-up) outbox events."""
+        before = datetime.utcnow() - older_than
+        return self._purge(
+            "outbox_events",
+            lambda uow: uow.outbox.purge_processed(before, limit=self._batch_size),
+        )
+
+    def purge_pdf_exports(self, *, older_than: timedelta) -> PurgeResult:
+        """Drop old export cache entries; ``stored_paths`` lists their files."""
+        cutoff = datetime.utcnow() - older_than
+        result = PurgeResult(target="pdf_exports")
+
+        def batch(uow: UnitOfWork) -> int:
+            paths = uow.pdf_exports.purge_older_than(cutoff, limit=self._batch_size)
+            result.stored_paths.extend(paths)
+            return len(paths)
+
+        return self._purge("pdf_exports", batch, result=result)
+
+    def _purge(
+        self,
+        target: str,
+        run_batch: Callable[[UnitOfWork], int],
+        *,
+        result: PurgeResult | None = None,
+    ) -> PurgeResult:
+        result = result or PurgeResult(target=target)
+        started = time.perf_counter()
+        while True:
+            if result.batches >= self._max_batches:
+                result.complete = False
+                break
+            with self._uow_factory() as uow:
+                deleted = run_batch(uow)
+            result.batches += 1
+            result.rows += deleted
+            if deleted < self._batch_size:
+                break
+        result.duration = time.perf_counter() - started
+        return result
+
+
+__all__ = ["HousekeepingService", "PurgeResult"]
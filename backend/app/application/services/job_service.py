@@ -1,21 +1,86 @@
 from __future__ import annotations
 
-from collections.abc import Callable
-from datetime import datetime
+import time
+from collections.abc import AsyncIterator, Callable
+from dataclasses import replace
+from datetime import datetime, timedelta
 from typing import Any
 
-from app.application.interfaces import UnitOfWork
-from app.domain.models import Job
+from app.application import dto
+from app.application.interfaces import AsyncUnitOfWork, JobEventBus, UnitOfWork
+from app.domain.events import AnalyticsEvent
+from app.domain.models import Job, JobSummary, KeysetCursor, Page
 from app.domain.models.enums import JobStatus, JobType
 
+_EPOCH = datetime(1970, 1, 1)
+# resume re-sends changes this much older than Last-Event-ID: commits may
+# land out of updated_at order and the catch-up read may hit a lagging
+# replica; events are full job states, so repeats are harmless
+_RESUME_OVERLAP = timedelta(seconds=5)
+_CATCH_UP_LIMIT = 200
+# a catch-up larger than this is replaced by a resync event
+_MAX_CATCH_UP_EVENTS = 1000
+
+
+def job_event(job: Job) -> dict[str, Any]:
+    """Stream event for a job's current state; the id orders by updated_at."""
+    updated_at = job.updated_at or datetime.utcnow()
+    event_id = (updated_at - _EPOCH) // timedelta(microseconds=1)
+    return {"id": str(event_id), "job": dto.to_job_out(job).model_dump(mode="json")}
+
+
+def resync_event(at: datetime) -> dict[str, Any]:
+    """Tells the client to reload its jobs instead of getting a replay."""
+    return {"id": str((at - _EPOCH) // timedelta(microseconds=1)), "resync": True}
+
+
+def _event_time(event_id: str | None) -> datetime | None:
+    if not event_id:
+        return None
+    try:
+        return _EPOCH + timedelta(microseconds=int(event_id))
+    except (OverflowError, ValueError):
+        return None
+
 
 class JobService:
-    def __init__(self, uow_factory: Callable[[], UnitOfWork]) -> None:
+    def __init__(
+        self,
+        uow_factory: Callable[[], UnitOfWork],
+        *,
+        read_uow_factory: Callable[[int], UnitOfWork] | None = None,
+        async_uow_factory: Callable[[int], AsyncUnitOfWork] | None = None,
+        event_bus: JobEventBus | None = None,
+    ) -> None:
         self._uow_factory = uow_factory
+        self._read_uow_factory = read_uow_factory
+        self._async_uow_factory = async_uow_factory
+        self._event_bus = event_bus
+
+    @property
+    def streaming_enabled(self) -> bool:
+        return self._event_bus is not None
+
+    def _read_uow(self, owner_id: int) -> UnitOfWork:
+        """Read-only unit of work for ``owner_id``'s data (replica-eligible)."""
+        if self._read_uow_factory is None:
+            return self._uow_factory()
+        return self._read_uow_factory(owner_id)
+
+    def _async_uow(self, owner_id: int) -> AsyncUnitOfWork:
+        if self._async_uow_factory is None:
+            raise RuntimeError("Async unit of work is not configured")
+        return self._async_uow_factory(owner_id)
 
     def create_job(
-        self, *, owner_id: int, job_type: JobType, payload: dict[str, Any]
+        self,
+        *,
+        owner_id: int,
+        job_type: JobType,
+        payload: dict[str, Any],
+        analytics: AnalyticsEvent | None = None,
     ) -> Job:
+        """Create a pending job; ``analytics`` is recorded with it, plus job_id."""
         job = Job(
             id=None,
             owner_id=owner_id,
@@ -28,25 +93,58 @@ class JobService:
             updated_at=datetime.utcnow(),
         )
         with self._uow_factory() as uow:
-            return uow.jobs.add(job)
+            created = uow.jobs.add(job)
+            if analytics is not None:
+                uow.outbox.add(
+                    replace(
+                        analytics,
+                        properties={**analytics.properties, "job_id": created.id},
+                    )
+                )
+        self._publish(created)
+        return created
 
     def get_job(self, *, owner_id: int, job_id: int) -> Job:
-        with self._uow_factory() as uow:
+        with self._read_uow(owner_id) as uow:
             job = uow.jobs.get(job_id)
             if not job or job.owner_id != owner_id:
                 raise ValueError("Job not found")
             return job
 
     def list_jobs(self, *, owner_id: int) -> list[Job]:
-        with self._uow_factory() as uow:
+        with self._read_uow(owner_id) as uow:
             jobs = list(uow.jobs.list_for_user(owner_id))
         return jobs
 
+    def list_jobs_page(
+        self, *, owner_id: int, cursor: str | None, limit: int
+    ) -> Page[JobSummary]:
+        after = KeysetCursor.decode(cursor) if cursor else None
+        with self._read_uow(owner_id) as uow:
+            return uow.jobs.list_page(owner_id, cursor=after, limit=limit)
+
+    async def get_job_async(self, *, owner_id: int, job_id: int) -> Job:
+        async with self._async_uow(owner_id) as uow:
+            job = await uow.jobs.get(job_id)
+        if not job or job.owner_id != owner_id:
+            raise ValueError("Job not found")
+        return job
+
+    async def list_jobs_async(self, *, owner_id: int) -> list[Job]:
+        async with self._async_uow(owner_id) as uow:
+            return await uow.jobs.list_for_user(owner_id)
+
+    async def get_jobs_async(self, *, owner_id: int, job_ids: list[int]) -> list[Job]:
+        if not job_ids:
+            return []
+        async with self._async_uow(owner_id) as uow:
+            return await uow.jobs.get_many(owner_id=owner_id, job_ids=job_ids)
+
     def get_jobs(self, *, owner_id: int, job_ids: list[int]) -> list[Job]:
         """Return jobs by ids that belong to owner (one request for batch polling)."""
         if not job_ids:
             return []
-        with self._uow_factory() as uow:
+        with self._read_uow(owner_id) as uow:
             return uow.jobs.get_many(owner_id=owner_id, job_ids=job_ids)
 
     def update_job_status(
@@ -56,6 +154,7 @@ class JobService:
         status: JobStatus,
         result: dict[str, Any] | None = None,
         error: str | None = None,
+        analytics: AnalyticsEvent | None = None,
     ) -> Job:
         with self._uow_factory() as uow:
             job = uow.jobs.get(job_id)
@@ -65,7 +164,98 @@ class JobService:
             job.result = result
             job.error = error
             job.updated_at = datetime.utcnow()
-            return uow.jobs.update(job)
+            updated = uow.jobs.update(job)
+            if analytics is not None:
+                uow.outbox.add(analytics)
+        self._publish(updated)
+        return updated
+
+    def update_job_stages(self, *, job_id: int, stages: dict[str, str]) -> Job:
+        """Record per-stage progress in job.result without changing the status."""
+        with self._uow_factory() as uow:
+            job = uow.jobs.get(job_id)
+            if not job:
+                raise ValueError("Job not found")
+            job.result = {**(job.result or {}), "stages": stages}
+            job.updated_at = datetime.utcnow()
+            updated = uow.jobs.update(job)
+        self._publish(updated)
+        return updated
+
+    async def stream_job_events(
+        self,
+        *,
+        owner_id: int,
+        last_event_id: str | None,
+        heartbeat_seconds: float,
+        max_seconds: float,
+        replay: timedelta,
+    ) -> AsyncIterator[dict[str, Any] | None]:
+        """Job events for ``owner_id``; None marks an idle ``heartbeat_seconds``.
+
+        Changes since ``last_event_id`` (or within ``replay`` for a new
+        stream) are read from the database first. The subscription is opened
+        before that read, so nothing published in between is lost. A
+        ``last_event_id`` older than ``replay``, or more than
+        ``_MAX_CATCH_UP_EVENTS`` changes to replay, yields one resync event
+        (see ``resync_event``) instead. The stream ends after ``max_seconds``
+        or when events were dropped; the client reconnects with the last id
+        it received.
+        """
+        if self._event_bus is None:
+            raise RuntimeError("Job event bus is not configured")
+        deadline = time.monotonic() + max_seconds
+        async with self._event_bus.subscribe(owner_id) as subscription:
+            now = datetime.utcnow()
+            resumed_at = _event_time(last_event_id)
+            since = now - replay
+            # an id from before the replay window cannot be caught up cheaply
+            resync = resumed_at is not None and resumed_at < since
+            if resumed_at is not None and not resync:
+                since = resumed_at - _RESUME_OVERLAP
+            # read everything before yielding: a slow client must not hold
+            # the database connection
+            missed: list[Job] = []
+            if not resync:
+                async with self._async_uow(owner_id) as uow:
+                    while True:
+                        batch = await uow.jobs.list_updated_since(
+                            owner_id, since, limit=_CATCH_UP_LIMIT
+                        )
+                        missed.extend(batch)
+                        if len(batch) < _CATCH_UP_LIMIT:
+                            break
+                        if len(missed) >= _MAX_CATCH_UP_EVENTS:
+                            resync = True
+                            break
+                        since = batch[-1].updated_at or datetime.utcnow()
+            if resync:
+                # the subscription predates ``now``: live events cover the rest
+                missed = []
+                yield resync_event(now)
+            sent: dict[int, int] = {}
+            for job in missed:
+                event = job_event(job)
+                sent[int(event["job"]["id"])] = int(event["id"])
+                yield event
+
+            while not subscription.closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                live = await subscription.next(min(heartbeat_seconds, remaining))
+                if live is None:
+                    yield None
+                    continue
+                job_id, event_id = int(live["job"]["id"]), int(live["id"])
+                if sent.get(job_id, -1) >= event_id:
+                    continue  # already sent during catch-up
+                sent[job_id] = event_id
+                yield live
+
+    def _publish(self, job: Job) -> None:
+        if self._event_bus is not None and job.id is not None:
+            self._event_bus.publish(job.owner_id, job_event(job))
 
 
-__all__ = ["JobService"]
+__all__ = ["JobService", "job_event", "resync_event"]
@@ -9,6 +9,7 @@ from pathlib import Path
 from app.api.schemas.materials import MaterialOut
 from app.application import dto
 from app.application.interfaces import DocumentAnalyzer, FileStorage, UnitOfWork
+from app.core.quota import QuotaEngine
 from app.domain.models.enums import AnalysisStatus
 from app.infrastructure.converters import convert_docx_to_pdf
 from app.infrastructure.extractors.text import _read_docx
@@ -26,13 +27,17 @@ class MaterialAnalysisService:
         storage: FileStorage,
         analyzer: DocumentAnalyzer,
         mime_detector: Callable[[Path], str | None] | None = None,
+        quota_engine: QuotaEngine | None = None,
     ) -> None:
         self._uow_factory = uow_factory
         self._storage = storage
         self._analyzer = analyzer
         self._mime_detector = mime_detector
+        self._quota_engine = quota_engine
 
-    def analyze_material(self, *, owner_id: int, material_id: int) -> MaterialOut:
+    def analyze_material(
+        self, *, owner_id: int, material_id: int, quota_charged: int | None = None
+    ) -> MaterialOut:
         with self._uow_factory() as uow:
             material = uow.materials.get(material_id)
             if not material or material.owner_id != owner_id:
@@ -73,7 +78,7 @@ class MaterialAnalysisService:
 
                 try:
                     if docx_text_fallback is not None:
-                        markdown_twin, routing, _usage, _title = self._analyzer.analyze(
+                        markdown_twin, routing, usage, _title = self._analyzer.analyze(
                             source_text=docx_text_fallback,
                             filename=file_record.filename,
                             mime_type="text/plain",
@@ -82,7 +87,7 @@ class MaterialAnalysisService:
                             ocr_cache_repository=uow.ocr_cache,
                         )
                     else:
-                        markdown_twin, routing, _usage, _title = self._analyzer.analyze(
+                        markdown_twin, routing, usage, _title = self._analyzer.analyze(
                             source_text="",
                             filename=file_record.filename,
                             mime_type=mime_type,
@@ -107,8 +112,14 @@ class MaterialAnalysisService:
                 if converted_pdf and converted_pdf.exists():
                     converted_pdf.unlink()
 
+                if self._quota_engine is not None:
+                    # OCR cache hits cost no tokens
+                    actual = 0 if usage.get("cache_hit") else usage.get("total_tokens")
+                    self._quota_engine.settle(owner_id, quota_charged, actual)
+
                 material.routing_tier = routing
                 material.analysis_version = ANALYSIS_PIPELINE_VERSION
+                material.analysis_pipeline = usage.get("pipeline")
                 material.markdown_twin = markdown_twin
                 material.analysis_status = AnalysisStatus.DONE
 
@@ -116,6 +127,28 @@ class MaterialAnalysisService:
 
         return dto.to_material_out(updated)
 
+    def list_outdated_materials(
+        self, *, include_missing: bool = False, after_id: int = 0, limit: int = 500
+    ) -> list[tuple[int, int]]:
+        """Keyset page of (material_id, owner_id) analyzed by an older pipeline."""
+        with self._uow_factory() as uow:
+            return uow.materials.list_with_outdated_analysis(
+                ANALYSIS_PIPELINE_VERSION,
+                include_missing=include_missing,
+                after_id=after_id,
+                limit=limit,
+            )
+
+    def count_outdated_materials(
+        self, *, include_missing: bool = False, after_id: int = 0
+    ) -> int:
+        with self._uow_factory() as uow:
+            return uow.materials.count_with_outdated_analysis(
+                ANALYSIS_PIPELINE_VERSION,
+                include_missing=include_missing,
+                after_id=after_id,
+            )
+
     def _detect_mime(self, path: Path) -> str | None:
         if not self._mime_detector:
             return None
@@ -5,19 +5,30 @@ from __future__ import annotations
 import hashlib
 import logging
 import math
+import re
+import threading
 from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
-from app.api.schemas.materials import MaterialOut, MaterialUpdate
+from app.api.schemas.materials import MaterialOut, MaterialPageOut, MaterialUpdate
 from app.application import dto
-from app.application.interfaces import DocumentAnalyzer, FileStorage, UnitOfWork
+from app.application.interfaces import (
+    AsyncUnitOfWork,
+    DocumentAnalyzer,
+    FileStorage,
+    UnitOfWork,
+)
 from app.domain.models import File as FileDomain
+from app.domain.models import KeysetCursor, OcrCache
 from app.domain.models import Material as MaterialDomain
-from app.domain.models.enums import AnalysisStatus, ProcessingStatus
+from app.domain.models.enums import AnalysisStatus, ProcessingStatus, RoutingTier
+from app.domain.repositories import OcrCacheRepository
 from app.infrastructure.converters import convert_docx_to_pdf
 from app.infrastructure.extractors.text import _read_docx
 from app.infrastructure.thumbnails import (
+    FALLBACK_SIZE,
     can_generate_thumbnail,
     generate_and_save_thumbnail,
 )
@@ -35,14 +46,29 @@ class MaterialService:
         analyzer: DocumentAnalyzer | None = None,
         mime_detector: Callable[[Path], str | None] | None = None,
         max_text_length: int = 1_000_000,
+        read_uow_factory: Callable[[int], UnitOfWork] | None = None,
+        async_uow_factory: Callable[[int], AsyncUnitOfWork] | None = None,
     ) -> None:
         self._uow_factory = uow_factory
+        self._read_uow_factory = read_uow_factory
+        self._async_uow_factory = async_uow_factory
         self._storage = storage
         self._text_extractor = text_extractor
         self._analyzer = analyzer
         self._mime_detector = mime_detector
         self._max_text_length = max_text_length
 
+    def _read_uow(self, owner_id: int) -> UnitOfWork:
+        """Read-only unit of work for ``owner_id``'s data (replica-eligible)."""
+        if self._read_uow_factory is None:
+            return self._uow_factory()
+        return self._read_uow_factory(owner_id)
+
+    def _async_uow(self, owner_id: int) -> AsyncUnitOfWork:
+        if self._async_uow_factory is None:
+            raise RuntimeError("Async unit of work is not configured")
+        return self._async_uow_factory(owner_id)
+
     def upload_material(
         self,
         *,
@@ -114,6 +140,7 @@ class MaterialService:
                 material.status = ProcessingStatus.DONE
                 # Copy thumbnail if it exists, otherwise we'll generate it
                 material.thumbnail_path = existing_material.thumbnail_path
+                material.thumbnails = existing_material.thumbnails
 
             material_record = uow.materials.add(material)
             
@@ -130,7 +157,7 @@ class MaterialService:
                         tmp.write(content)
                         tmp.flush()
                         local_path = Path(tmp.name)
-                        thumb_path = generate_and_save_thumbnail(
+                        thumbs = generate_and_save_thumbnail(
                             self._storage,
                             owner_id=owner_id,
                             material_id=mid,
@@ -138,8 +165,9 @@ class MaterialService:
                             mime_type=mime_type,
                             filename=filename,
                         )
-                        if thumb_path:
-                            material_record.thumbnail_path = thumb_path
+                        if thumbs:
+                            material_record.thumbnail_path = thumbs.fallback_path
+                            material_record.thumbnails = thumbs.variants
                             material_record = uow.materials.update(material_record)
                         else:
                             logger.warning(
@@ -150,13 +178,26 @@ class MaterialService:
         return dto.to_material_out(material_record)
 
     def list_materials(self, *, owner_id: int) -> list[MaterialOut]:
-        with self._uow_factory() as uow:
+        with self._read_uow(owner_id) as uow:
             materials = list(uow.materials.list_for_user(owner_id))
 
         return dto.to_materials_out(materials)
 
+    async def list_materials_async(self, *, owner_id: int) -> list[MaterialOut]:
+        async with self._async_uow(owner_id) as uow:
+            materials = await uow.materials.list_for_user(owner_id)
+        return dto.to_materials_out(materials)
+
+    def list_materials_page(
+        self, *, owner_id: int, cursor: str | None, limit: int
+    ) -> MaterialPageOut:
+        after = KeysetCursor.decode(cursor) if cursor else None
+        with self._read_uow(owner_id) as uow:
+            page = uow.materials.list_page(owner_id, cursor=after, limit=limit)
+        return dto.to_material_page_out(page)
+
     def get_material(self, *, owner_id: int, material_id: int) -> MaterialOut:
-        with self._uow_factory() as uow:
+        with self._read_uow(owner_id) as uow:
             material = uow.materials.get(material_id)
             if not material or material.owner_id != owner_id:
                 raise ValueError("Materiał nie został znaleziony")
@@ -184,7 +225,7 @@ class MaterialService:
                 ) as local_path:
                     local = Path(local_path)
                     mime_type = self._detect_mime(local) or material.mime_type
-                    thumb_path = generate_and_save_thumbnail(
+                    thumbs = generate_and_save_thumbnail(
                         self._storage,
                         owner_id=owner_id,
                         material_id=material.id,
@@ -192,8 +233,9 @@ class MaterialService:
                         mime_type=mime_type,
                         filename=file_record.filename,
                     )
-                    if thumb_path:
-                        material.thumbnail_path = thumb_path
+                    if thumbs:
+                        material.thumbnail_path = thumbs.fallback_path
+                        material.thumbnails = thumbs.variants
                         uow.materials.update(material)
                         return True
             except Exception as exc:
@@ -205,11 +247,43 @@ class MaterialService:
                 )
         return False
 
-    def list_materials_without_thumbnail(self) -> list[tuple[int, int]]:
-        """List (owner_id, material_id) for materials without thumbnail (backfill)."""
+    def list_materials_without_thumbnail(
+        self, *, after_id: int = 0, limit: int = 500
+    ) -> list[tuple[int, int]]:
+        """Keyset page of (material_id, owner_id) without thumbnail (backfill)."""
+        with self._uow_factory() as uow:
+            return uow.materials.list_without_thumbnail(
+                after_id=after_id, limit=limit
+            )
+
+    def count_materials_without_thumbnail(self, *, after_id: int = 0) -> int:
+        with self._uow_factory() as uow:
+            return uow.materials.count_without_thumbnail(after_id=after_id)
+
+    def get_thumbnail_for_download(
+        self,
+        *,
+        owner_id: int,
+        material_id: int,
+        size: str = FALLBACK_SIZE,
+        accept_webp: bool = True,
+    ) -> tuple[str, str]:
+        """Return (stored_path, media_type) of the best thumbnail variant.
+        Falls back to the JPEG card thumbnail for unknown sizes, clients
+        without WebP support and materials thumbnailed before variants existed.
+        Raises ValueError if not found."""
         with self._uow_factory() as uow:
-            materials = list(uow.materials.list_without_thumbnail())
-        return [(m.owner_id, m.id) for m in materials if m.id is not None]
+            material = uow.materials.get(material_id)
+            if not material or material.owner_id != owner_id:
+                raise ValueError("Materiał nie został znaleziony")
+        variant = (material.thumbnails or {}).get(size)
+        if variant and variant.get("path"):
+            fmt = str(variant.get("format") or "jpeg")
+            if fmt != "webp" or accept_webp:
+                return str(variant["path"]), f"image/{fmt}"
+        if not material.thumbnail_path:
+            raise ValueError("Thumbnail not available")
+        return material.thumbnail_path, "image/jpeg"
 
     def get_material_file_for_download(
         self, *, owner_id: int, material_id: int
@@ -264,31 +338,16 @@ class MaterialService:
             # Jeśli materiał ma checksum, usuń wszystkie materiały z tym samym checksum
             # (duplikaty tego samego pliku)
             if material.checksum:
-                # Znajdź wszystkie materiały użytkownika z tym samym checksum
-                all_materials = list(uow.materials.list_for_user(owner_id))
-                duplicates = [
-                    m for m in all_materials
-                    if m.checksum == material.checksum and m.id is not None
-                ]
-                
-                # Usuń wszystkie duplikaty
-                stored_paths_to_delete = set()
-                file_ids_to_delete = set()
-                
-                for dup in duplicates:
-                    if dup.file and dup.file.id:
-                        stored_paths_to_delete.add(str(dup.file.stored_path))
-                        file_ids_to_delete.add(dup.file.id)
-                    if dup.id:
-                        uow.materials.remove(dup.id)
-                
+                # Usuń wszystkie duplikaty (indeks owner_id + checksum) i ich pliki
+                file_ids, thumbnails = uow.materials.remove_by_checksum(
+                    owner_id, material.checksum
+                )
+                removed_files = uow.files.remove_many(file_ids)
+
                 # Usuń pliki z storage (tylko raz dla każdego unikalnego path)
-                for stored_path in stored_paths_to_delete:
+                stored_paths = {str(f.stored_path) for f in removed_files}
+                for stored_path in stored_paths | thumbnails:
                     self._storage.delete(stored_path=stored_path)
-                
-                # Usuń rekordy File z bazy
-                for file_id in file_ids_to_delete:
-                    uow.files.remove(file_id)
             else:
                 # Jeśli nie ma checksum, usuń tylko ten jeden materiał
                 single_file_id: int | None = (
@@ -301,6 +360,8 @@ class MaterialService:
                 uow.materials.remove(material_id)
                 if single_stored_path:
                     self._storage.delete(stored_path=single_stored_path)
+                for thumbnail in material.thumbnail_paths():
+                    self._storage.delete(stored_path=thumbnail)
                 if single_file_id is not None:
                     uow.files.remove(single_file_id)
 
@@ -417,7 +478,21 @@ class MaterialService:
             )
         return "Could not extract text (unsupported or empty)."
 
-    def process_material(self, *, owner_id: int, material_id: int) -> MaterialOut:
+    def process_material(
+        self,
+        *,
+        owner_id: int,
+        material_id: int,
+        on_progress: Callable[[dict[str, str]], None] | None = None,
+    ) -> MaterialOut:
+        """Run the material pipeline as independent stages.
+
+        After download and metadata, the thumbnail and the analysis run
+        concurrently on the same local file. Each stage commits its own result
+        in a short transaction, so the thumbnail is visible to the UI long
+        before a slow analysis finishes. Stage states are reported through
+        on_progress as {stage: pending|running|done|failed|skipped}.
+        """
         with self._uow_factory() as uow:
             material = uow.materials.get(material_id)
             if not material or material.owner_id != owner_id:
@@ -427,175 +502,280 @@ class MaterialService:
             if not file_record:
                 raise ValueError("Plik nie został znaleziony dla tego materiału")
 
-            with self._storage.download_to_temp(
-                stored_path=str(file_record.stored_path)
-            ) as local_path:
-                local = Path(local_path)
-
-                # .docx → PDF so Gemini can process embedded images/charts
-                converted_pdf: Path | None = None
-                docx_text_fallback: str | None = None
-                is_docx = (
-                    (file_record.filename or "").lower().endswith(".docx")
-                    or local.suffix.lower() == ".docx"
-                )
-                if is_docx:
+        progress = _StageProgress(PIPELINE_STAGES, on_progress)
+        usage: dict = {}
+
+        progress.set("download", "running")
+        with self._storage.download_to_temp(
+            stored_path=str(file_record.stored_path)
+        ) as local_path:
+            progress.set("download", "done")
+            local = Path(local_path)
+
+            # .docx → PDF so Gemini can process embedded images/charts
+            converted_pdf: Path | None = None
+            docx_text_fallback: str | None = None
+            is_docx = (
+                (file_record.filename or "").lower().endswith(".docx")
+                or local.suffix.lower() == ".docx"
+            )
+            if is_docx:
+                try:
+                    converted_pdf = convert_docx_to_pdf(local)
+                    local = converted_pdf
+                except Exception as exc:
+                    logger.warning(
+                        "DOCX→PDF conversion failed, using text fallback: %s",
+                        exc,
+                    )
                     try:
-                        converted_pdf = convert_docx_to_pdf(local)
-                        local = converted_pdf
-                    except Exception as exc:
-                        logger.warning(
-                            "DOCX→PDF conversion failed, using text fallback: %s",
-                            exc,
-                        )
-                        try:
-                            docx_text_fallback = _read_docx(local) or ""
-                        except Exception:
-                            docx_text_fallback = ""
+                        docx_text_fallback = _read_docx(local) or ""
+                    except Exception:
+                        docx_text_fallback = ""
 
+            try:
+                progress.set("metadata", "running")
                 mime_type = self._detect_mime(local)
                 material.mime_type = mime_type
                 material.size_bytes = local.stat().st_size if local.exists() else None
-
                 if material.page_count is None:
                     material.page_count = self._estimate_page_count(
                         local, mime_type, filename=file_record.filename
                     )
-
-                # 0. Generate thumbnail (if supported);
-                # stored with material_id in metadata.
-                can_thumb = can_generate_thumbnail(mime_type, file_record.filename)
-                if can_thumb and material.id:
-                    thumb_path = generate_and_save_thumbnail(
-                        self._storage,
-                        owner_id=owner_id,
-                        material_id=material.id,
-                        local_path=local,
-                        mime_type=mime_type,
-                        filename=file_record.filename,
-                    )
-                    if thumb_path:
-                        material.thumbnail_path = thumb_path
-                    else:
+                with self._uow_factory() as uow:
+                    if uow.materials.update_file_info(material) is None:
+                        # deleted by the user while the task was queued
                         logger.warning(
-                            "Thumbnail None for material %s mime %s",
+                            "Material %s was deleted during processing — skipping",
                             material.id,
-                            mime_type,
                         )
+                        return dto.to_material_out(material)
+                progress.set("metadata", "done")
+
+                with ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="material-thumbnail"
+                ) as pool:
+                    thumbnail_stage = pool.submit(
+                        self._thumbnail_stage,
+                        material,
+                        local,
+                        mime_type,
+                        progress,
+                    )
+                    usage = self._analysis_stage(
+                        material,
+                        local,
+                        mime_type,
+                        docx_text_fallback=docx_text_fallback,
+                        progress=progress,
+                    )
+                    thumbnail_stage.result()
+            finally:
+                if converted_pdf and converted_pdf.exists():
+                    converted_pdf.unlink()
 
-                # 1. LLM Analysis (Multi-modal) - Gemini extracts from files.
-                # We skip local text extraction and rely on Gemini.
-                is_txt = (file_record.filename or "").lower().endswith(".txt")
+        with self._uow_factory() as uow:
+            updated = uow.materials.get(material_id)
+        return dto.to_material_out(
+            updated or material,
+            cache_hit=bool(usage.get("cache_hit", False)),
+            duration_ocr_sec=usage.get("duration_sec"),
+        )
 
-                if docx_text_fallback is not None and self._analyzer:
-                    # PDF conversion failed; pass extracted text as source_text
-                    try:
-                        markdown_twin, routing, _usage, _title = self._analyzer.analyze(
-                            source_text=docx_text_fallback,
-                            filename=file_record.filename,
-                            mime_type="text/plain",
-                            file_path=None,
-                            user_id=owner_id,
-                            ocr_cache_repository=uow.ocr_cache,
-                        )
-                        material.markdown_twin = markdown_twin
-                        material.routing_tier = routing
-                        material.analysis_status = AnalysisStatus.DONE
-                        material.analysis_version = "v1"
-                        if markdown_twin:
-                            import re
-                            plain_text = re.sub(r'[#*_`\[\]()]', '', markdown_twin)
-                            plain_text = re.sub(r'\n+', '\n', plain_text).strip()
-                            if plain_text:
-                                material.extracted_text = plain_text
-                                material.status = ProcessingStatus.DONE
-                                material.processing_error = None
-                            else:
-                                material.mark_failed("Gemini returned empty content")
-                        else:
-                            material.mark_failed("Gemini returned no content")
-                    except Exception as exc:
-                        material.analysis_status = AnalysisStatus.FAILED
-                        material.processing_error = f"LLM Analysis failed: {exc}"
-                        material.mark_failed(material.processing_error)
-                elif is_txt:
-                    # For .txt files, read directly and use as markdown_twin
-                    try:
-                        raw_text: str | None = self._text_extractor(local, mime_type)
-                        normalized_text: str | None = self._sanitize_text(raw_text)
-                        if normalized_text and normalized_text.strip():
-                            material.markdown_twin = normalized_text
-                            material.extracted_text = normalized_text
-                            material.analysis_status = AnalysisStatus.DONE
-                            material.status = ProcessingStatus.DONE
-                        else:
-                            error_msg = self._empty_extraction_error(
-                                local, mime_type, filename=file_record.filename
-                            )
-                            material.mark_failed(error_msg)
-                    except Exception as exc:
-                        material.mark_failed(str(exc))
-                elif self._analyzer:
-                    # Use Gemini to extract and analyze text from file
-                    try:
-                        markdown_twin, routing, _usage, _title = self._analyzer.analyze(
-                            source_text="",  # Gemini extracts from file_path
-                            filename=file_record.filename,
-                            mime_type=mime_type,
-                            file_path=str(local),
-                            user_id=owner_id,
-                            ocr_cache_repository=uow.ocr_cache,
-                        )
-                        material.markdown_twin = markdown_twin
-                        material.routing_tier = routing
-                        material.analysis_status = AnalysisStatus.DONE
-                        material.analysis_version = "v1"
-                        
-                        # Extract plain text from markdown for extracted_text
-                        if markdown_twin:
-                            import re
-                            # Remove markdown formatting to get plain text
-                            plain_text = re.sub(r'[#*_`\[\]()]', '', markdown_twin)
-                            plain_text = re.sub(r'\n+', '\n', plain_text).strip()
-                            if plain_text:
-                                material.extracted_text = plain_text
-                                material.status = ProcessingStatus.DONE
-                                material.processing_error = None
-                            else:
-                                # Empty markdown_twin - mark as failed
-                                material.mark_failed("Gemini returned empty content")
-                        else:
-                            material.mark_failed("Gemini returned no content")
-                    except Exception as exc:
-                        material.analysis_status = AnalysisStatus.FAILED
-                        material.processing_error = f"LLM Analysis failed: {exc}"
-                        material.mark_failed(material.processing_error)
+    def _thumbnail_stage(
+        self,
+        material: MaterialDomain,
+        local: Path,
+        mime_type: str | None,
+        progress: _StageProgress,
+    ) -> None:
+        filename = material.file.filename if material.file else None
+        if not material.id or not can_generate_thumbnail(mime_type, filename):
+            progress.set("thumbnail", "skipped")
+            return
+        progress.set("thumbnail", "running")
+        try:
+            # stored with material_id in metadata
+            thumbs = generate_and_save_thumbnail(
+                self._storage,
+                owner_id=material.owner_id,
+                material_id=material.id,
+                local_path=local,
+                mime_type=mime_type,
+                filename=filename,
+            )
+            if not thumbs:
+                logger.warning(
+                    "Thumbnail None for material %s mime %s", material.id, mime_type
+                )
+                progress.set("thumbnail", "failed")
+                return
+            material.thumbnail_path = thumbs.fallback_path
+            material.thumbnails = thumbs.variants
+            with self._uow_factory() as uow:
+                uow.materials.update_thumbnails(material)
+        except Exception:
+            # the material is usable without a thumbnail; do not fail the job
+            logger.exception("Thumbnail stage failed for material %s", material.id)
+            progress.set("thumbnail", "failed")
+            return
+        progress.set("thumbnail", "done")
+
+    def _analysis_stage(
+        self,
+        material: MaterialDomain,
+        local: Path,
+        mime_type: str | None,
+        *,
+        docx_text_fallback: str | None,
+        progress: _StageProgress,
+    ) -> dict:
+        """Analyze the file and commit the result; returns analyzer usage."""
+        progress.set("analysis", "running")
+        filename = material.file.filename if material.file else None
+        is_txt = (filename or "").lower().endswith(".txt")
+        # the analyzer talks to the cache between slow Gemini calls, so each
+        # lookup gets its own short transaction instead of one held open
+        ocr_cache = _ShortTransactionOcrCache(self._uow_factory)
+        usage: dict = {}
+
+        if docx_text_fallback is not None and self._analyzer:
+            # PDF conversion failed; pass extracted text as source_text
+            try:
+                markdown_twin, routing, usage, _title = self._analyzer.analyze(
+                    source_text=docx_text_fallback,
+                    filename=filename,
+                    mime_type="text/plain",
+                    file_path=None,
+                    user_id=material.owner_id,
+                    ocr_cache_repository=ocr_cache,
+                )
+                self._apply_analysis(material, markdown_twin, routing, usage)
+            except Exception as exc:
+                material.analysis_status = AnalysisStatus.FAILED
+                material.processing_error = f"LLM Analysis failed: {exc}"
+                material.mark_failed(material.processing_error)
+        elif is_txt:
+            # For .txt files, read directly and use as markdown_twin
+            try:
+                raw_text: str | None = self._text_extractor(local, mime_type)
+                normalized_text: str | None = self._sanitize_text(raw_text)
+                if normalized_text and normalized_text.strip():
+                    material.markdown_twin = normalized_text
+                    material.extracted_text = normalized_text
+                    material.analysis_status = AnalysisStatus.DONE
+                    material.status = ProcessingStatus.DONE
                 else:
-                    # No analyzer available - mark as failed
-                    error_msg = "No analyzer available for this file type"
+                    error_msg = self._empty_extraction_error(
+                        local, mime_type, filename=filename
+                    )
                     material.mark_failed(error_msg)
+            except Exception as exc:
+                material.mark_failed(str(exc))
+        elif self._analyzer:
+            # Use Gemini to extract and analyze text from file
+            try:
+                markdown_twin, routing, usage, _title = self._analyzer.analyze(
+                    source_text="",  # Gemini extracts from file_path
+                    filename=filename,
+                    mime_type=mime_type,
+                    file_path=str(local),
+                    user_id=material.owner_id,
+                    ocr_cache_repository=ocr_cache,
+                )
+                self._apply_analysis(material, markdown_twin, routing, usage)
+            except Exception as exc:
+                material.analysis_status = AnalysisStatus.FAILED
+                material.processing_error = f"LLM Analysis failed: {exc}"
+                material.mark_failed(material.processing_error)
+        else:
+            # No analyzer available - mark as failed
+            material.mark_failed("No analyzer available for this file type")
 
-                if converted_pdf and converted_pdf.exists():
-                    converted_pdf.unlink()
-
-            # Update material with all changes (including thumbnail_path).
-            # Guard against the race condition where the user deleted the material
-            # while the background task was processing it.
-            if material.id is None or uow.materials.get(material.id) is None:
+        with self._uow_factory() as uow:
+            if uow.materials.update_processing_result(material) is None:
                 logger.warning(
                     "Material %s was deleted during processing — skipping update",
                     material.id,
                 )
-                return dto.to_material_out(
-                    material, cache_hit=False, duration_ocr_sec=None
-                )
-            updated = uow.materials.update(material)
-
-        return dto.to_material_out(
-            updated,
-            cache_hit=False,
-            duration_ocr_sec=None,
+        progress.set(
+            "analysis",
+            "done" if material.status == ProcessingStatus.DONE else "failed",
         )
+        return usage
+
+    @staticmethod
+    def _apply_analysis(
+        material: MaterialDomain,
+        markdown_twin: str,
+        routing: RoutingTier,
+        usage: dict,
+    ) -> None:
+        material.markdown_twin = markdown_twin
+        material.routing_tier = routing
+        material.analysis_status = AnalysisStatus.DONE
+        material.analysis_version = "v1"
+        material.analysis_pipeline = usage.get("pipeline")
+
+        # Extract plain text from markdown for extracted_text
+        if not markdown_twin:
+            material.mark_failed("Gemini returned no content")
+            return
+        # Remove markdown formatting to get plain text
+        plain_text = re.sub(r"[#*_`\[\]()]", "", markdown_twin)
+        plain_text = re.sub(r"\n+", "\n", plain_text).strip()
+        if plain_text:
+            material.extracted_text = plain_text
+            material.status = ProcessingStatus.DONE
+            material.processing_error = None
+        else:
+            # Empty markdown_twin - mark as failed
+            material.mark_failed("Gemini returned empty content")
+
+
+PIPELINE_STAGES = ("download", "metadata", "thumbnail", "analysis")
+
+
+class _StageProgress:
+    """Thread-safe stage states; every change is pushed to the callback."""
+
+    def __init__(
+        self,
+        stages: Sequence[str],
+        callback: Callable[[dict[str, str]], None] | None,
+    ) -> None:
+        self._states = dict.fromkeys(stages, "pending")
+        self._callback = callback
+        self._lock = threading.Lock()
+
+    def set(self, stage: str, state: str) -> None:
+        with self._lock:
+            self._states[stage] = state
+            if self._callback is None:
+                return
+            try:
+                self._callback(dict(self._states))
+            except Exception as exc:
+                logger.warning("Stage progress callback failed: %s", exc)
+
+
+class _ShortTransactionOcrCache(OcrCacheRepository):
+    """OCR cache repository that opens a unit of work per call."""
+
+    def __init__(self, uow_factory: Callable[[], UnitOfWork]) -> None:
+        self._uow_factory = uow_factory
+
+    def add(self, entry: OcrCache) -> OcrCache:
+        with self._uow_factory() as uow:
+            return uow.ocr_cache.add(entry)
+
+    def get_by_key(self, cache_key: str) -> OcrCache | None:
+        with self._uow_factory() as uow:
+            return uow.ocr_cache.get_by_key(cache_key)
+
+    def remove(self, entry_id: int) -> None:
+        with self._uow_factory() as uow:
+            uow.ocr_cache.remove(entry_id)
 
 
 __all__ = ["MaterialService"]
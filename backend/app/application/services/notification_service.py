@@ -1,41 +1,64 @@
 from __future__ import annotations
 
+import logging
 from collections.abc import Callable
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, cast
 
-from app.db.models import UserReadNotification
+from app.db.models import SystemNotification
+from app.domain.models import KeysetCursor, NotificationFeedItem, Page
 
 if TYPE_CHECKING:
     from app.api.schemas.notifications import NotificationOut, UnreadCount
-    from app.application.interfaces import UnitOfWork
+    from app.application.interfaces import UnitOfWork, UnreadCounter
+
+logger = logging.getLogger(__name__)
+
 
 class NotificationService:
-    def __init__(self, uow_factory: Callable[[], UnitOfWork]) -> None:
+    def __init__(
+        self,
+        uow_factory: Callable[[], UnitOfWork],
+        *,
+        unread_counter: UnreadCounter | None = None,
+        read_uow_factory: Callable[[int], UnitOfWork] | None = None,
+    ) -> None:
         self._uow_factory = uow_factory
+        self._unread_counter = unread_counter
+        self._read_uow_factory = read_uow_factory
+
+    def _read_uow(self, user_id: int) -> UnitOfWork:
+        if self._read_uow_factory is None:
+            return self._uow_factory()
+        return self._read_uow_factory(user_id)
 
     def get_my_notifications(self, user_id: int) -> list[NotificationOut]:
-        from app.api.schemas.notifications import NotificationOut
-        with self._uow_factory() as uow:
-            notifications = uow.notifications.get_notifications_for_user(user_id)
-            read_ids = uow.notifications.get_read_notification_ids(user_id)
-            
-            return [
-                NotificationOut(
-                    id=n.id, # type: ignore
-                    title=n.title,
-                    message=n.message,
-                    type=n.type,
-                    created_at=n.created_at,
-                    is_read=(n.id in read_ids) # type: ignore
-                )
-                for n in notifications
-            ]
+        from app.application.dto import to_notification_out
+
+        with self._read_uow(user_id) as uow:
+            feed = uow.notifications.get_feed(user_id)
+        return [to_notification_out(item) for item in feed]
+
+    def get_my_notifications_page(
+        self, user_id: int, *, cursor: str | None, limit: int
+    ) -> Page[NotificationFeedItem]:
+        after = KeysetCursor.decode(cursor) if cursor else None
+        with self._read_uow(user_id) as uow:
+            return uow.notifications.list_feed_page(user_id, cursor=after, limit=limit)
 
     def get_unread_count(self, user_id: int) -> UnreadCount:
         from app.api.schemas.notifications import UnreadCount
-        with self._uow_factory() as uow:
+
+        counter = self._unread_counter
+        if counter is not None:
+            cached = counter.get(user_id)
+            if cached is not None:
+                return UnreadCount(count=cached)
+        with self._read_uow(user_id) as uow:
+            broadcasts = uow.notifications.count_broadcasts()
             count = uow.notifications.get_unread_count_for_user(user_id)
-            return UnreadCount(count=count)
+        if counter is not None:
+            counter.prime(user_id, count, broadcasts)
+        return UnreadCount(count=count)
 
     def mark_as_read(self, user_id: int, notification_id: int) -> None:
         with self._uow_factory() as uow:
@@ -43,14 +66,77 @@ class NotificationService:
                 notification_id, user_id
             )
             if not notification:
-                return # Or raise a specific domain exception
+                return  # Or raise a specific domain exception
+            inserted = uow.notifications.mark_read(user_id, notification_id)
+        # dropped, not decremented: a count primed between the commit and a
+        # decrement would already include the read and end up one too low
+        if inserted and self._unread_counter is not None:
+            self._unread_counter.invalidate(user_id)
 
-            existing = uow.notifications.get_read_record(user_id, notification_id)
-            if not existing:
-                new_entry = UserReadNotification(
-                    user_id=user_id,
-                    notification_id=notification_id
+    def create_notification(
+        self,
+        *,
+        title: str,
+        message: str,
+        kind: str = "info",
+        recipient_id: int | None = None,
+    ) -> int:
+        with self._uow_factory() as uow:
+            notification = uow.notifications.add_notification(
+                SystemNotification(
+                    title=title, message=message, type=kind, recipient_id=recipient_id
                 )
-                uow.notifications.add_read_record(new_entry)
-                uow.commit()
+            )
+            notification_id = cast(int, notification.id)
+        self.notification_added(recipient_id)
+        return notification_id
+
+    def notification_added(self, recipient_id: int | None) -> None:
+        """Update cached counts for a committed notification.
+
+        A broadcast bumps the shared total (a racing prime is rejected by
+        the total mismatch); a personal one drops the recipient's count,
+        which a delta could double-count the same way as a read.
+        """
+        if self._unread_counter is None:
+            return
+        if recipient_id is None:
+            self._unread_counter.incr_broadcast()
+        else:
+            self._unread_counter.invalidate(recipient_id)
+
+    def notification_removed(self, recipient_id: int | None) -> None:
+        """Drop cached counts after a notification was deleted or edited.
+
+        Whether it was unread for a given user is unknown without a query,
+        so the affected counts are recomputed on their next read.
+        """
+        if self._unread_counter is None:
+            return
+        if recipient_id is None:
+            self._unread_counter.reset()
+        else:
+            self._unread_counter.invalidate(recipient_id)
+
+    def reconcile_unread_counters(self) -> bool:
+        """Reset the cache if its broadcast total drifted from the table."""
+        counter = self._unread_counter
+        if counter is None:
+            return False
+        cached = counter.current_broadcasts()
+        if cached is None:
+            return False
+        with self._uow_factory() as uow:
+            broadcasts = uow.notifications.count_broadcasts()
+        if cached == broadcasts:
+            return False
+        logger.warning(
+            "Unread counter drifted (cached %s broadcasts, table has %s); resetting",
+            cached,
+            broadcasts,
+        )
+        counter.reset()
+        return True
+
 
+__all__ = ["NotificationService"]
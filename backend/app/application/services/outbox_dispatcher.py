@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from app.application.interfaces import AnalyticsSink, UnitOfWork
+from app.domain.events import AnalyticsEvent, DomainEvent, TestGenerated
+from app.domain.models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[Sequence[OutboxMessage]], None]
+
+_MAX_RETRY_DELAY = timedelta(hours=1)
+# uuids sent to PostHog derive from the outbox row, so redelivery dedupes
+_EVENT_UUID_NAMESPACE = uuid.UUID("6f1d0a7e-52c4-4d43-9a55-0c3e0b6a8d21")
+
+
+@dataclass(slots=True)
+class DispatchResult:
+    delivered: int = 0
+    retried: int = 0
+    dead: int = 0  # given up: unknown type, no handler or out of attempts
+    batches: int = 0
+    duration: float = 0.0  # seconds
+    complete: bool = True  # False when max_batches stopped the run early
+
+    def log_fields(self) -> dict[str, object]:
+        return {
+            "outbox_delivered": self.delivered,
+            "outbox_retried": self.retried,
+            "outbox_dead": self.dead,
+            "outbox_batches": self.batches,
+            "outbox_ms": round(self.duration * 1000, 1),
+            "outbox_complete": self.complete,
+        }
+
+
+class OutboxDispatcher:
+    """Delivers outbox events to their handlers, one batch per transaction.
+
+    A batch is claimed with row locks that concurrent dispatchers skip, each
+    handler gets all of its events from the batch in one call, and the rows
+    are marked processed in the same transaction. Delivery is at least once:
+    if a handler fails, every event it was given is retried with exponential
+    backoff (other handlers may see those events again), up to
+    ``max_attempts``.
+    """
+
+    def __init__(
+        self,
+        uow_factory: Callable[[], UnitOfWork],
+        *,
+        handlers: Mapping[type[DomainEvent], Sequence[EventHandler]],
+        batch_size: int = 200,
+        max_batches: int = 20,
+        max_attempts: int = 10,
+        retry_base_seconds: float = 10.0,
+    ) -> None:
+        self._uow_factory = uow_factory
+        self._handlers = handlers
+        self._batch_size = max(1, batch_size)
+        self._max_batches = max(1, max_batches)
+        self._max_attempts = max(1, max_attempts)
+        self._retry_base = retry_base_seconds
+
+    def dispatch(self) -> DispatchResult:
+        result = DispatchResult()
+        started = time.perf_counter()
+        while True:
+            if result.batches >= self._max_batches:
+                result.complete = False
+                break
+            claimed = self._dispatch_batch(result)
+            if not claimed:
+                break
+            result.batches += 1
+            if claimed < self._batch_size:
+                break
+        result.duration = time.perf_counter() - started
+        return result
+
+    def _dispatch_batch(self, result: DispatchResult) -> int:
+        with self._uow_factory() as uow:
+            messages = uow.outbox.claim_pending(limit=self._batch_size)
+            if not messages:
+                return 0
+            errors: dict[int, str] = {}
+            undeliverable: set[int] = set()
+            by_handler: dict[EventHandler, list[OutboxMessage]] = {}
+            for message in messages:
+                handlers = (
+                    self._handlers.get(type(message.event))
+                    if message.event is not None
+                    else None
+                )
+                if not handlers:
+                    errors[message.id] = f"No handler for {message.event_type}"
+                    undeliverable.add(message.id)
+                    continue
+                for handler in handlers:
+                    by_handler.setdefault(handler, []).append(message)
+
+            for handler, batch in by_handler.items():
+                try:
+                    handler(batch)
+                except Exception as exc:
+                    logger.warning(
+                        "Outbox handler %s failed for %d events: %s",
+                        getattr(handler, "__qualname__", handler),
+                        len(batch),
+                        exc,
+                    )
+                    for message in batch:
+                        errors.setdefault(message.id, f"{type(exc).__name__}: {exc}")
+
+            uow.outbox.mark_processed(
+                [message.id for message in messages if message.id not in errors]
+            )
+            result.delivered += len(messages) - len(errors)
+            now = datetime.utcnow()
+            for message in messages:
+                error = errors.get(message.id)
+                if error is None:
+                    continue
+                retry_at = self._retry_at(message, now)
+                if message.id in undeliverable or retry_at is None:
+                    logger.error(
+                        "Outbox event %s (%s) given up: %s",
+                        message.id,
+                        message.event_type,
+                        error,
+                    )
+                    uow.outbox.mark_failed(message.id, error=error, retry_at=None)
+                    result.dead += 1
+                else:
+                    uow.outbox.mark_failed(message.id, error=error, retry_at=retry_at)
+                    result.retried += 1
+        return len(messages)
+
+    def _retry_at(self, message: OutboxMessage, now: datetime) -> datetime | None:
+        attempts = message.attempts + 1
+        if attempts >= self._max_attempts:
+            return None
+        delay = timedelta(seconds=self._retry_base * 2 ** (attempts - 1))
+        return now + min(delay, _MAX_RETRY_DELAY)
+
+
+def analytics_handler(sink: AnalyticsSink) -> EventHandler:
+    """Forward a batch's analytics-worthy events to ``sink`` in one call."""
+
+    def forward(messages: Sequence[OutboxMessage]) -> None:
+        batch = [
+            (_event_uuid(message), event)
+            for message in messages
+            if message.event is not None
+            and (event := analytics_event_for(message.event)) is not None
+        ]
+        sink.capture_batch(batch)
+
+    return forward
+
+
+def analytics_event_for(event: DomainEvent) -> AnalyticsEvent | None:
+    if isinstance(event, AnalyticsEvent):
+        return event
+    if isinstance(event, TestGenerated):
+        return AnalyticsEvent(
+            occurred_at=event.occurred_at,
+            distinct_id=str(event.owner_id),
+            event="test_generated",
+            properties={
+                "test_id": event.test_id,
+                "question_count": event.question_count,
+                "title": event.title,
+                "source": event.source,
+                **event.usage,
+            },
+        )
+    return None
+
+
+def _event_uuid(message: OutboxMessage) -> str:
+    occurred_at = message.event.occurred_at.isoformat() if message.event else ""
+    return str(uuid.uuid5(_EVENT_UUID_NAMESPACE, f"{message.id}:{occurred_at}"))
+
+
+__all__ = [
+    "DispatchResult",
+    "EventHandler",
+    "OutboxDispatcher",
+    "analytics_event_for",
+    "analytics_handler",
+]
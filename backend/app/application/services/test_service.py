@@ -30,19 +30,23 @@ from app.api.schemas.tests import (
     TestGenerateRequest,
     TestGenerateResponse,
     TestOut,
+    TestPageOut,
 )
 from app.application import dto
 from app.application.interfaces import (
+    AsyncUnitOfWork,
     FileStorage,
+    PayloadCache,
     QuestionGenerator,
     UnitOfWork,
 )
+from app.core import quota
 from app.core.config import get_settings
 from app.db.models import Question as QuestionRow
 from app.db.models import Test as TestRow
 from app.db.models import User as UserRow
-from app.domain.events import TestGenerated
-from app.domain.models import PdfExportCache
+from app.domain.events import AnalyticsEvent, DomainEvent, TestGenerated
+from app.domain.models import KeysetCursor, PdfExportCache
 from app.domain.models import Question as QuestionDomain
 from app.domain.models import Test as TestDomain
 from app.domain.models.enums import QuestionDifficulty
@@ -59,10 +63,12 @@ from app.infrastructure.exporting import (
 )
 from app.infrastructure.llm.gemini import GeminiQuestionGenerator
 from app.infrastructure.llm.prompts import PromptBuilder
-from app.infrastructure.monitoring.posthog_client import analytics
 
 logger = logging.getLogger(__name__)
 
+# bump when the TestDetailOut serialization changes: new ETags and cache keys
+DETAIL_CACHE_VERSION = "v1"
+
 
 class TestService:
     def __init__(
@@ -78,8 +84,16 @@ class TestService:
         custom_tex_renderer: (
             Callable[[dict[str, Any]], str]
         ) = render_custom_test_to_tex,
+        detail_cache: PayloadCache | None = None,
+        read_uow_factory: Callable[[int], UnitOfWork] | None = None,
+        async_uow_factory: Callable[[int], AsyncUnitOfWork] | None = None,
+        quota_engine: quota.QuotaEngine | None = None,
     ) -> None:
         self._uow_factory = uow_factory
+        self._read_uow_factory = read_uow_factory
+        self._async_uow_factory = async_uow_factory
+        self._detail_cache = detail_cache
+        self._quota_engine = quota_engine
         self._question_generator_fast = question_generator_fast
         self._question_generator_reasoning = question_generator_reasoning
         self._storage = storage
@@ -88,6 +102,22 @@ class TestService:
         self._test_to_xml = xml_serializer
         self._render_custom_test_to_tex = custom_tex_renderer
 
+    def _read_uow(self, owner_id: int) -> UnitOfWork:
+        """Read-only unit of work for ``owner_id``'s data (replica-eligible)."""
+        if self._read_uow_factory is None:
+            return self._uow_factory()
+        return self._read_uow_factory(owner_id)
+
+    def _record_event(self, event: DomainEvent) -> None:
+        """Store an event that belongs to no write of its own (own transaction)."""
+        with self._uow_factory() as uow:
+            uow.outbox.add(event)
+
+    def _async_uow(self, owner_id: int) -> AsyncUnitOfWork:
+        if self._async_uow_factory is None:
+            raise RuntimeError("Async unit of work is not configured")
+        return self._async_uow_factory(owner_id)
+
     @staticmethod
     def _difficulty_order(value: Any) -> int:
         """
@@ -287,11 +317,38 @@ class TestService:
 
         return variants
 
+    def estimate_generation_cost(
+        self, *, owner_id: int, request: TestGenerateRequest
+    ) -> int:
+        """Up-front token estimate for the quota; settled after generation."""
+        questions = request.closed.total() + request.num_open
+        extra_chars = len(request.additional_instructions or "")
+        text = (request.text or "").strip()
+        if text:
+            return quota.estimate_generation_cost(
+                chars=len(text) + extra_chars, questions=questions
+            )
+        counts: list[int | None] = []
+        if request.material_ids or request.file_id is not None:
+            with self._read_uow(owner_id) as uow:
+                counts = uow.materials.get_page_counts(
+                    owner_id,
+                    material_ids=request.material_ids or None,
+                    file_id=None if request.material_ids else request.file_id,
+                )
+        pages = sum(c or quota.DEFAULT_SOURCE_PAGES for c in counts)
+        return quota.estimate_generation_cost(
+            pages=pages or quota.DEFAULT_SOURCE_PAGES,
+            chars=extra_chars,
+            questions=questions,
+        )
+
     def generate_test_from_input(
         self,
         *,
         request: TestGenerateRequest,
         owner_id: int,
+        quota_charged: int | None = None,
     ) -> TestGenerateResponse:
         with self._uow_factory() as uow:
             session = getattr(uow, "session", None)
@@ -390,26 +447,34 @@ class TestService:
                     source_text=source_text,
                     params=request,
                 )
+                if self._quota_engine is not None:
+                    self._quota_engine.settle(
+                        owner_id, quota_charged, usage.get("total_tokens")
+                    )
             except ValueError as exc:
-                analytics.capture(
-                    user_id=owner_id,
-                    event="test_generation_failed",
-                    properties={
-                        "error_type": "ValueError",
-                        "error_message": str(exc),
-                        "source": "file" if request.file_id else "text"
-                    }
+                self._record_event(
+                    AnalyticsEvent.create(
+                        user_id=owner_id,
+                        event="test_generation_failed",
+                        properties={
+                            "error_type": "ValueError",
+                            "error_message": str(exc),
+                            "source": "file" if request.file_id else "text",
+                        },
+                    )
                 )
                 raise HTTPException(status_code=400, detail=str(exc)) from exc
             except Exception as exc:
-                analytics.capture(
-                    user_id=owner_id,
-                    event="test_generation_failed",
-                    properties={
-                        "error_type": type(exc).__name__,
-                        "error_message": str(exc),
-                        "source": "file" if request.file_id else "text"
-                    }
+                self._record_event(
+                    AnalyticsEvent.create(
+                        user_id=owner_id,
+                        event="test_generation_failed",
+                        properties={
+                            "error_type": type(exc).__name__,
+                            "error_message": str(exc),
+                            "source": "file" if request.file_id else "text",
+                        },
+                    )
                 )
                 raise HTTPException(
                     status_code=500, detail=f"LLM error: {exc}"
@@ -442,22 +507,16 @@ class TestService:
                 raise RuntimeError("Failed to create default group")
             uow.tests.bulk_add_questions(persisted_test.id, questions, default_group.id)
 
-            TestGenerated.create(
-                test_id=persisted_test.id,
-                owner_id=owner_id,
-                question_count=len(questions),
-            )
-            
-            analytics.capture(
-                user_id=owner_id,
-                event="test_generated",
-                properties={
-                    "test_id": persisted_test.id,
-                    "question_count": len(questions),
-                    "title": final_title,
-                    "source": "file" if request.file_id else "text",
-                    **usage
-                }
+            # delivered to analytics by the outbox dispatcher after commit
+            uow.outbox.add(
+                TestGenerated.create(
+                    test_id=persisted_test.id,
+                    owner_id=owner_id,
+                    question_count=len(questions),
+                    title=final_title,
+                    source="file" if request.file_id else "text",
+                    usage=usage,
+                )
             )
 
             return TestGenerateResponse(
@@ -466,18 +525,135 @@ class TestService:
             )
 
     def get_test_detail(self, *, owner_id: int, test_id: int) -> TestDetailOut:
+        with self._read_uow(owner_id) as uow:
+            projection = uow.tests.get_detail_projection(test_id)
+        if not projection or projection.owner_id != owner_id:
+            raise ValueError("Test nie został znaleziony")
+        return dto.test_detail_from_projection(projection)
+
+    def get_test_detail_payload(
+        self,
+        *,
+        owner_id: int,
+        test_id: int,
+        if_none_match: str | None = None,
+    ) -> tuple[str, bytes | None]:
+        """Serialized ``TestDetailOut`` with its strong ETag.
+
+        Only the revision is read first: a matching ``If-None-Match`` returns
+        ``(etag, None)``, and a cached payload for the revision is returned
+        without loading the test. Mutations bump the revision (``touch``), so
+        cached entries never need invalidation.
+        """
+        with self._read_uow(owner_id) as uow:
+            current = uow.tests.get_revision(test_id)
+        if not current or current[0] != owner_id:
+            raise ValueError("Test nie został znaleziony")
+        revision = current[1]
+        etag = self._detail_etag(test_id, revision)
+        if if_none_match and self._etag_matches(etag, if_none_match):
+            if self._detail_cache is not None:
+                self._detail_cache.record_not_modified()
+            return etag, None
+
+        cache_key = f"{DETAIL_CACHE_VERSION}:{test_id}:{revision}"
+        if self._detail_cache is not None:
+            cached = self._detail_cache.get(cache_key)
+            if cached is not None:
+                return etag, cached
+
+        with self._read_uow(owner_id) as uow:
+            projection = uow.tests.get_detail_projection(test_id)
+        if not projection or projection.owner_id != owner_id:
+            raise ValueError("Test nie został znaleziony")
+        payload = dto.test_detail_from_projection(projection).model_dump_json()
+        content = payload.encode()
+        if self._detail_cache is not None:
+            self._detail_cache.set(
+                f"{DETAIL_CACHE_VERSION}:{test_id}:{projection.revision}", content
+            )
+        return self._detail_etag(test_id, projection.revision), content
+
+    async def get_test_detail_payload_async(
+        self,
+        *,
+        owner_id: int,
+        test_id: int,
+        if_none_match: str | None = None,
+    ) -> tuple[str, bytes | None]:
+        """``get_test_detail_payload`` on the async engine and cache client."""
+        async with self._async_uow(owner_id) as uow:
+            current = await uow.tests.get_revision(test_id)
+        if not current or current[0] != owner_id:
+            raise ValueError("Test nie został znaleziony")
+        revision = current[1]
+        etag = self._detail_etag(test_id, revision)
+        if if_none_match and self._etag_matches(etag, if_none_match):
+            if self._detail_cache is not None:
+                self._detail_cache.record_not_modified()
+            return etag, None
+
+        cache_key = f"{DETAIL_CACHE_VERSION}:{test_id}:{revision}"
+        if self._detail_cache is not None:
+            cached = await self._detail_cache.get_async(cache_key)
+            if cached is not None:
+                return etag, cached
+
+        async with self._async_uow(owner_id) as uow:
+            projection = await uow.tests.get_detail_projection(test_id)
+        if not projection or projection.owner_id != owner_id:
+            raise ValueError("Test nie został znaleziony")
+        content = dto.test_detail_from_projection(projection).model_dump_json().encode()
+        if self._detail_cache is not None:
+            await self._detail_cache.set_async(
+                f"{DETAIL_CACHE_VERSION}:{test_id}:{projection.revision}", content
+            )
+        return self._detail_etag(test_id, projection.revision), content
+
+    def test_changed(self, test_id: int) -> int | None:
+        """Bump the revision after a change made outside this service (admin).
+
+        Returns the test's owner id, None if the test no longer exists.
+        """
         with self._uow_factory() as uow:
-            test = uow.tests.get_with_questions(test_id)
-            if not test or test.owner_id != owner_id:
-                raise ValueError("Test nie został znaleziony")
-            groups = uow.tests.get_groups_for_test(test_id)
-            return dto.to_test_detail(test, groups)
+            uow.tests.touch(test_id)
+            revision = uow.tests.get_revision(test_id)
+            return revision[0] if revision else None
 
-    def list_tests_for_user(self, *, owner_id: int) -> list[TestOut]:
+    @staticmethod
+    def _detail_etag(test_id: int, revision: int) -> str:
+        return f'"t{test_id}-r{revision}-{DETAIL_CACHE_VERSION}"'
+
+    @staticmethod
+    def _etag_matches(etag: str, if_none_match: str) -> bool:
+        # If-None-Match uses the weak comparison (RFC 9110 13.1.2)
+        candidates = {c.strip().removeprefix("W/") for c in if_none_match.split(",")}
+        return "*" in candidates or etag in candidates
+
+    def list_test_ids(
+        self, *, after_id: int = 0, limit: int = 500
+    ) -> list[tuple[int, int]]:
+        """Keyset page of (test_id, owner_id) across all users (maintenance)."""
         with self._uow_factory() as uow:
+            return uow.tests.list_ids(after_id=after_id, limit=limit)
+
+    def count_tests(self, *, after_id: int = 0) -> int:
+        with self._uow_factory() as uow:
+            return uow.tests.count(after_id=after_id)
+
+    def list_tests_for_user(self, *, owner_id: int) -> list[TestOut]:
+        with self._read_uow(owner_id) as uow:
             tests = uow.tests.list_for_user(owner_id)
         return [dto.to_test_out(t) for t in tests]
 
+    def list_tests_page(
+        self, *, owner_id: int, cursor: str | None, limit: int
+    ) -> TestPageOut:
+        after = KeysetCursor.decode(cursor) if cursor else None
+        with self._read_uow(owner_id) as uow:
+            page = uow.tests.list_page(owner_id, cursor=after, limit=limit)
+        return dto.to_test_page_out(page)
+
     def create_empty_test(self, *, owner_id: int, title: str) -> TestOut:
         with self._uow_factory() as uow:
             test = TestDomain(
@@ -489,16 +665,17 @@ class TestService:
             if persisted_test.id is None:
                 raise RuntimeError("Failed to create test")
             uow.tests.create_group(persisted_test.id, "Grupa A", 0)
-
-        analytics.capture(
-            user_id=owner_id,
-            event="test_created",
-            properties={
-                "test_id": persisted_test.id,
-                "title": title,
-                "source": "manual",
-            },
-        )
+            uow.outbox.add(
+                AnalyticsEvent.create(
+                    user_id=owner_id,
+                    event="test_created",
+                    properties={
+                        "test_id": persisted_test.id,
+                        "title": title,
+                        "source": "manual",
+                    },
+                )
+            )
 
         return dto.to_test_out(persisted_test)
 
@@ -509,6 +686,7 @@ class TestService:
             test = uow.tests.get(test_id)
             if not test or test.owner_id != owner_id:
                 raise ValueError("Test nie został znaleziony")
+            uow.tests.touch(test_id)
             group = uow.tests.create_group(test_id, label, position)
             return dto.to_group_out(group)
 
@@ -524,6 +702,7 @@ class TestService:
             test = uow.tests.get(test_id)
             if not test or test.owner_id != owner_id:
                 raise ValueError("Test nie został znaleziony")
+            uow.tests.touch(test_id)
             group = uow.tests.get_group(group_id)
             if not group or group.test_id != test_id:
                 raise ValueError("Grupa nie należy do tego testu")
@@ -540,6 +719,7 @@ class TestService:
             test = uow.tests.get(test_id)
             if not test or test.owner_id != owner_id:
                 raise ValueError("Test nie został znaleziony")
+            uow.tests.touch(test_id)
             group = uow.tests.get_group(group_id)
             if not group or group.test_id != test_id:
                 raise ValueError("Grupa nie należy do tego testu")
@@ -555,6 +735,7 @@ class TestService:
             test = uow.tests.get(test_id)
             if not test or test.owner_id != owner_id:
                 raise ValueError("Test nie został znaleziony")
+            uow.tests.touch(test_id)
             new_group, new_questions = uow.tests.duplicate_group(test_id, group_id)
             return dto.to_group_out(new_group), [
                 dto.to_question_out(q) for q in new_questions
@@ -597,6 +778,7 @@ class TestService:
             test = uow.tests.get(test_id)
             if not test or test.owner_id != owner_id:
                 raise ValueError("Test nie został znaleziony")
+            uow.tests.touch(test_id)
             groups = uow.tests.get_groups_for_test(test_id)
             next_letter = chr(65 + len(groups))
             new_group = uow.tests.create_group(
@@ -604,8 +786,8 @@ class TestService:
             )
             if new_group.id is None:
                 raise RuntimeError("Nie udało się utworzyć grupy")
-            for p in shuffled:
-                q_domain = QuestionDomain(
+            questions = [
+                QuestionDomain(
                     id=None,
                     text=str(p.get("text", "")),
                     is_closed=bool(p.get("is_closed", True)),
@@ -615,7 +797,9 @@ class TestService:
                     correct_choices=p.get("correct_choices") or [],
                     citations=[],
                 )
-                uow.tests.add_question(test_id, q_domain, new_group.id)
+                for p in shuffled
+            ]
+            uow.tests.bulk_add_questions(test_id, questions, new_group.id)
             return dto.to_group_out(new_group)
 
     def assign_questions_to_group(
@@ -629,6 +813,7 @@ class TestService:
             test = uow.tests.get(test_id)
             if not test or test.owner_id != owner_id:
                 raise ValueError("Test nie został znaleziony")
+            uow.tests.touch(test_id)
             group = uow.tests.get_group(payload.group_id)
             if not group or group.test_id != test_id:
                 raise ValueError("Grupa nie należy do tego testu")
@@ -673,6 +858,7 @@ class TestService:
             test = uow.tests.get(test_id)
             if not test or test.owner_id != owner_id:
                 raise ValueError("Test nie został znaleziony")
+            uow.tests.touch(test_id)
             groups = uow.tests.get_groups_for_test(test_id)
             next_letter = chr(65 + len(groups))
             new_group = uow.tests.create_group(
@@ -680,8 +866,8 @@ class TestService:
             )
             if new_group.id is None:
                 raise RuntimeError("Nie udało się utworzyć grupy")
-            for v in variants:
-                q_domain = QuestionDomain(
+            questions = [
+                QuestionDomain(
                     id=None,
                     text=str(v.get("text", "")),
                     is_closed=bool(v.get("is_closed", True)),
@@ -691,7 +877,9 @@ class TestService:
                     correct_choices=v.get("correct_choices") or [],
                     citations=[],
                 )
-                uow.tests.add_question(test_id, q_domain, new_group.id)
+                for v in variants
+            ]
+            uow.tests.bulk_add_questions(test_id, questions, new_group.id)
             return dto.to_group_out(new_group)
 
     def delete_test(self, *, owner_id: int, test_id: int) -> None:
@@ -699,11 +887,23 @@ class TestService:
             test = uow.tests.get(test_id)
             if not test or test.owner_id != owner_id:
                 raise ValueError("Test nie został znaleziony")
-            uow.pdf_exports.remove_for_test(test_id)
+            export_paths = uow.pdf_exports.remove_for_test(test_id)
             uow.tests.remove(test_id)
 
+        if export_paths:
+            from app.tasks.materials import (
+                cleanup_user_files_task,  # local import to avoid cycles
+            )
+
+            cleanup_user_files_task.delay(export_paths, storage_name="exports")
+
     def export_test_pdf(
-        self, *, owner_id: int, test_id: int, show_answers: bool = False
+        self,
+        *,
+        owner_id: int,
+        test_id: int,
+        show_answers: bool = False,
+        track_analytics: bool = True,
     ) -> tuple[bytes | None, str, str, str, str, str | None]:
         start_time = time.time()
         detail = self.get_test_detail(owner_id=owner_id, test_id=test_id)
@@ -716,18 +916,21 @@ class TestService:
         )
         if cached_path:
             duration_sec = time.time() - start_time
-            analytics.capture(
-                user_id=owner_id,
-                event="test_pdf_exported",
-                properties={
-                    "test_id": test_id,
-                    "is_custom": False,
-                    "show_answers": show_answers,
-                    "duration_sec": duration_sec,
-                    "question_count": len(detail.questions),
-                    "cache_hit": True,
-                },
-            )
+            if track_analytics:
+                self._record_event(
+                    AnalyticsEvent.create(
+                        user_id=owner_id,
+                        event="test_pdf_exported",
+                        properties={
+                            "test_id": test_id,
+                            "is_custom": False,
+                            "show_answers": show_answers,
+                            "duration_sec": duration_sec,
+                            "question_count": len(detail.questions),
+                            "cache_hit": True,
+                        },
+                    )
+                )
             return (
                 None,
                 filename,
@@ -757,18 +960,21 @@ class TestService:
         pdf_bytes = self._compile_tex_to_pdf(tex)
 
         duration_sec = time.time() - start_time
-        analytics.capture(
-            user_id=owner_id,
-            event="test_pdf_exported",
-            properties={
-                "test_id": test_id,
-                "is_custom": False,
-                "show_answers": show_answers,
-                "duration_sec": duration_sec,
-                "question_count": len(questions_payload),
-                "cache_hit": False,
-            },
-        )
+        if track_analytics:
+            self._record_event(
+                AnalyticsEvent.create(
+                    user_id=owner_id,
+                    event="test_pdf_exported",
+                    properties={
+                        "test_id": test_id,
+                        "is_custom": False,
+                        "show_answers": show_answers,
+                        "duration_sec": duration_sec,
+                        "question_count": len(questions_payload),
+                        "cache_hit": False,
+                    },
+                )
+            )
 
         return (
             pdf_bytes,
@@ -821,7 +1027,41 @@ class TestService:
         )
         if cached_path:
             duration_sec = time.time() - start_time
-            analytics.capture(
+            self._record_event(
+                AnalyticsEvent.create(
+                    user_id=owner_id,
+                    event="test_pdf_exported",
+                    properties={
+                        "test_id": test_id,
+                        "is_custom": (
+                            config.generate_variants or config.variant_mode != "shuffle"
+                        ),
+                        "duration_sec": duration_sec,
+                        "question_count": len(detail.questions),
+                        "config": (
+                            config.model_dump()
+                            if hasattr(config, "model_dump")
+                            else str(config)
+                        ),
+                        "cache_hit": True,
+                    },
+                )
+            )
+            return (
+                None,
+                filename,
+                cache_key,
+                config_hash,
+                PDF_TEMPLATE_VERSION,
+                cached_path,
+            )
+        context = self._prepare_pdf_context(detail, config)
+        tex = self._render_custom_test_to_tex(context)
+        pdf_bytes = self._compile_tex_to_pdf(tex)
+
+        duration_sec = time.time() - start_time
+        self._record_event(
+            AnalyticsEvent.create(
                 user_id=owner_id,
                 event="test_pdf_exported",
                 properties={
@@ -836,39 +1076,9 @@ class TestService:
                         if hasattr(config, "model_dump")
                         else str(config)
                     ),
-                    "cache_hit": True,
+                    "cache_hit": False,
                 },
             )
-            return (
-                None,
-                filename,
-                cache_key,
-                config_hash,
-                PDF_TEMPLATE_VERSION,
-                cached_path,
-            )
-        context = self._prepare_pdf_context(detail, config)
-        tex = self._render_custom_test_to_tex(context)
-        pdf_bytes = self._compile_tex_to_pdf(tex)
-
-        duration_sec = time.time() - start_time
-        analytics.capture(
-            user_id=owner_id,
-            event="test_pdf_exported",
-            properties={
-                "test_id": test_id,
-                "is_custom": (
-                    config.generate_variants or config.variant_mode != "shuffle"
-                ),
-                "duration_sec": duration_sec,
-                "question_count": len(detail.questions),
-                "config": (
-                    config.model_dump()
-                    if hasattr(config, "model_dump")
-                    else str(config)
-                ),
-                "cache_hit": False,
-            },
         )
 
         return (
@@ -1041,6 +1251,7 @@ class TestService:
             test = uow.tests.get(test_id)
             if not test or test.owner_id != owner_id:
                 raise ValueError("Test nie został znaleziony")
+            uow.tests.touch(test_id)
 
             session = getattr(uow, "session", None)
             if session is None:
@@ -1069,26 +1280,30 @@ class TestService:
                 data["choices"] = None
                 data["correct_choices"] = None
 
-            for field, value in data.items():
-                if field in allowed_fields:
-                    if field in {"choices", "correct_choices"}:
-                        setattr(question_row, field, self._coerce_to_list(value))
-                    else:
-                        setattr(question_row, field, value)
-
-            session.add(question_row)
-            session.flush()
+            changes = {
+                field: (
+                    self._coerce_to_list(value)
+                    if field in {"choices", "correct_choices"}
+                    else value
+                )
+                for field, value in data.items()
+                if field in allowed_fields
+            }
+            # the repository updates the row loaded above (same session)
+            uow.tests.update_questions(test_id, {question_id: changes})
 
-            analytics.capture(
-                user_id=owner_id,
-                event="question_manually_edited",
-                properties={
-                    "test_id": test_id,
-                    "question_id": question_id,
-                    "fields_changed": list(data.keys()),
-                    "is_closed": question_row.is_closed,
-                    "difficulty": question_row.difficulty
-                }
+            uow.outbox.add(
+                AnalyticsEvent.create(
+                    user_id=owner_id,
+                    event="question_manually_edited",
+                    properties={
+                        "test_id": test_id,
+                        "question_id": question_id,
+                        "fields_changed": list(data.keys()),
+                        "is_closed": question_row.is_closed,
+                        "difficulty": question_row.difficulty,
+                    },
+                )
             )
 
             return QuestionOut(
@@ -1112,33 +1327,22 @@ class TestService:
             test = uow.tests.get(test_id)
             if not test or test.owner_id != owner_id:
                 raise ValueError("Test nie został znaleziony")
+            uow.tests.touch(test_id)
 
-            session = getattr(uow, "session", None)
-            if session is None:
-                raise RuntimeError("UnitOfWork session is not initialized")
-
-            # Pobieramy pytania należące do tego testu
-            from sqlmodel import select
-
-            statement: Any = select(QuestionRow).where(
-                QuestionRow.test_id == test_id,
-                cast(Any, QuestionRow.id).in_(payload.question_ids),
-            )
-            questions = session.exec(statement).all()
-
-            for q in questions:
-                if payload.difficulty is not None:
-                    q.difficulty = payload.difficulty
+            changes: dict[str, Any] = {}
+            if payload.difficulty is not None:
+                changes["difficulty"] = payload.difficulty
 
-                if payload.is_closed is not None:
-                    q.is_closed = payload.is_closed
-                    if payload.is_closed is False:
-                        q.choices = None
-                        q.correct_choices = None
+            if payload.is_closed is not None:
+                changes["is_closed"] = payload.is_closed
+                if payload.is_closed is False:
+                    changes["choices"] = None
+                    changes["correct_choices"] = None
 
-                session.add(q)
-
-            session.flush()
+            if changes:
+                uow.tests.update_questions(
+                    test_id, dict.fromkeys(payload.question_ids, changes)
+                )
 
     def bulk_delete_questions(
         self,
@@ -1151,19 +1355,8 @@ class TestService:
             test = uow.tests.get(test_id)
             if not test or test.owner_id != owner_id:
                 raise ValueError("Test nie został znaleziony")
-
-            session = getattr(uow, "session", None)
-            if session is None:
-                raise RuntimeError("UnitOfWork session is not initialized")
-
-            from sqlalchemy import delete
-
-            statement: Any = delete(QuestionRow).where(
-                QuestionRow.test_id == test_id,
-                cast(Any, QuestionRow.id).in_(payload.question_ids),
-            )
-            session.exec(statement)
-            session.flush()
+            uow.tests.touch(test_id)
+            uow.tests.delete_questions(test_id, payload.question_ids)
 
     def reorder_questions(
         self,
@@ -1176,6 +1369,7 @@ class TestService:
             test = uow.tests.get_with_questions(test_id)
             if not test or test.owner_id != owner_id:
                 raise ValueError("Test nie został znaleziony")
+            uow.tests.touch(test_id)
             uow.tests.reorder_questions(test_id, payload.question_ids)
 
     def bulk_regenerate_questions(
@@ -1228,28 +1422,32 @@ class TestService:
             )
 
             # Aktualizujemy rekordy w bazie
-            updated_count = 0
+            changes: dict[int, dict[str, Any]] = {}
             for row in questions_rows:
                 # Szukamy odpowiadającego wariantu po ID
                 # (nasza metoda _generate_llm_variant zachowuje ID)
                 variant = next((v for v in new_variants if v.get("id") == row.id), None)
                 if variant:
-                    row.text = variant["text"]
-                    row.choices = variant["choices"]
-                    row.correct_choices = variant["correct_choices"]
-                    session.add(row)
-                    updated_count += 1
+                    changes[cast(int, row.id)] = {
+                        "text": variant["text"],
+                        "choices": variant["choices"],
+                        "correct_choices": variant["correct_choices"],
+                    }
+            updated_count = uow.tests.update_questions(test_id, changes)
 
-            session.flush()
-            
-            analytics.capture(
-                user_id=owner_id,
-                event="bulk_questions_regenerated",
-                properties={
-                    "test_id": test_id,
-                    "count": updated_count,
-                    "instruction": payload.instruction
-                }
+            # bumped after the LLM call so the test row is not locked meanwhile
+            uow.tests.touch(test_id)
+
+            uow.outbox.add(
+                AnalyticsEvent.create(
+                    user_id=owner_id,
+                    event="bulk_questions_regenerated",
+                    properties={
+                        "test_id": test_id,
+                        "count": updated_count,
+                        "instruction": payload.instruction,
+                    },
+                )
             )
             
             return updated_count
@@ -1285,7 +1483,7 @@ class TestService:
             if not questions_rows:
                 return 0
 
-            updated_count = 0
+            changes: dict[int, dict[str, Any]] = {}
 
             # 1. Konwersja na Otwarte (wymaga LLM do wygładzenia treści)
             if payload.target_type == "open":
@@ -1325,26 +1523,30 @@ class TestService:
                             (v for v in parsed if v.get("id") == row.id), None
                         )
                         if variant:
-                            row.is_closed = False
-                            # AI wygładza treść, usuwając kontekst opcji wyboru
-                            row.text = str(variant.get("text", row.text)).strip()
-                            row.choices = None
-                            row.correct_choices = None
-                            session.add(row)
-                            updated_count += 1
-
-                    session.flush()
-                    
-                    analytics.capture(
-                        user_id=owner_id,
-                        event="bulk_questions_converted",
-                        properties={
-                            "test_id": test_id,
-                            "count": updated_count,
-                            "target_type": "open"
-                        }
+                            changes[cast(int, row.id)] = {
+                                "is_closed": False,
+                                # AI wygładza treść, usuwając kontekst opcji wyboru
+                                "text": str(variant.get("text", row.text)).strip(),
+                                "choices": None,
+                                "correct_choices": None,
+                            }
+
+                    updated_count = uow.tests.update_questions(test_id, changes)
+
+                    uow.outbox.add(
+                        AnalyticsEvent.create(
+                            user_id=owner_id,
+                            event="bulk_questions_converted",
+                            properties={
+                                "test_id": test_id,
+                                "count": updated_count,
+                                "target_type": "open",
+                            },
+                        )
                     )
-                    
+
+                    uow.tests.touch(test_id)
+
                     return updated_count
                 except Exception as exc:
                     logger.error("Failed to convert questions to open via LLM: %s", exc)
@@ -1387,14 +1589,9 @@ class TestService:
                 for row in to_convert_to_closed:
                     variant = next((v for v in parsed if v.get("id") == row.id), None)
                     if variant:
-                        row.is_closed = True
-
-                        # Aktualizujemy tekst pytania na ten od AI
-                        row.text = str(variant.get("text", row.text)).strip()
-
                         # Pobieramy i czyścimy opcje
                         raw_choices = variant.get("choices", ["A", "B", "C", "D"])
-                        row.choices = [
+                        choices = [
                             str(c).strip() for c in raw_choices if str(c).strip()
                         ]
 
@@ -1407,29 +1604,37 @@ class TestService:
                         clean_correct = [
                             str(c).strip() for c in raw_correct if str(c).strip()
                         ]
-                        valid_correct = [c for c in clean_correct if c in row.choices]
+                        valid_correct = [c for c in clean_correct if c in choices]
 
                         # Jeśli LLM nawaliło i nie podało poprawnej z listy,
                         # bierzemy pierwszą jako fallback
-                        if not valid_correct and row.choices:
-                            valid_correct = [row.choices[0]]
+                        if not valid_correct and choices:
+                            valid_correct = [choices[0]]
+
+                        changes[cast(int, row.id)] = {
+                            "is_closed": True,
+                            # Aktualizujemy tekst pytania na ten od AI
+                            "text": str(variant.get("text", row.text)).strip(),
+                            "choices": choices,
+                            "correct_choices": valid_correct,
+                        }
 
-                        row.correct_choices = valid_correct
-                        session.add(row)
-                        updated_count += 1
+                updated_count = uow.tests.update_questions(test_id, changes)
 
-                session.flush()
-                
-                analytics.capture(
-                    user_id=owner_id,
-                    event="bulk_questions_converted",
-                    properties={
-                        "test_id": test_id,
-                        "count": updated_count,
-                        "target_type": "closed"
-                    }
+                uow.outbox.add(
+                    AnalyticsEvent.create(
+                        user_id=owner_id,
+                        event="bulk_questions_converted",
+                        properties={
+                            "test_id": test_id,
+                            "count": updated_count,
+                            "target_type": "closed",
+                        },
+                    )
                 )
-                
+
+                uow.tests.touch(test_id)
+
                 return updated_count
             except Exception as exc:
                 logger.error("Failed to convert questions to closed via LLM: %s", exc)
@@ -1450,6 +1655,7 @@ class TestService:
             test = uow.tests.get(test_id)
             if not test or test.owner_id != owner_id:
                 raise ValueError("Test nie został znaleziony")
+            uow.tests.touch(test_id)
 
             group = uow.tests.get_group(payload.group_id)
             if not group or group.test_id != test_id:
@@ -1496,6 +1702,7 @@ class TestService:
             test = uow.tests.get(test_id)
             if not test or test.owner_id != owner_id:
                 raise ValueError("Test nie został znaleziony")
+            uow.tests.touch(test_id)
 
             session = getattr(uow, "session", None)
             if session is None:
@@ -1506,7 +1713,7 @@ class TestService:
                 raise ValueError("Pytanie nie zostało znalezione")
                 raise ValueError("Pytanie nie zostało znalezione")
 
-            session.delete(question_row)
+            uow.tests.delete_questions(test_id, [question_id])
 
     @staticmethod
     def _coerce_to_list(value: Any) -> list[Any] | None:
@@ -1557,6 +1764,7 @@ class TestService:
             if not test_row or test_row.owner_id != owner_id:
                 raise ValueError("Test nie został znaleziony")
                 raise ValueError("Test nie został znaleziony")
+            uow.tests.touch(test_id)
 
             test_row.title = title
             session.add(test_row)
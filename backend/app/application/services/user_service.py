@@ -3,10 +3,11 @@ from __future__ import annotations
 from collections.abc import Callable
 from datetime import datetime
 
-from app.api.schemas.users import UserStatistics
-from app.application.interfaces import UnitOfWork
+from app.api.schemas.users import UserRead, UserStatistics
+from app.application.interfaces import PrincipalCache, UnitOfWork
 from app.core.security import get_password_hash, verify_password
 from app.db.models import User as UserRow
+from app.domain.models import thumbnail_paths
 
 
 class UserService:
@@ -16,93 +17,57 @@ class UserService:
         *,
         password_verifier: Callable[[str, str], bool] = verify_password,
         password_hasher: Callable[[str], str] = get_password_hash,
+        principal_cache: PrincipalCache | None = None,
     ) -> None:
         self._uow_factory = uow_factory
         self._password_verifier = password_verifier
         self._password_hasher = password_hasher
+        self._principal_cache = principal_cache
+
+    def _invalidate_principal(self, user_id: int) -> None:
+        # after commit, so a concurrent request cannot re-cache the old row
+        if self._principal_cache is not None:
+            self._principal_cache.invalidate(user_id)
+
+    def get_profile(self, *, user_id: int) -> UserRead:
+        with self._uow_factory() as uow:
+            user = uow.users.get(user_id)
+        if not user:
+            raise ValueError("Użytkownik nie został znaleziony")
+        return UserRead.model_validate(user)
 
     def get_user_statistics(self, *, user_id: int) -> UserStatistics:
+        """Dashboard counters from the user_stats read model (one PK lookup).
+        The row is rebuilt from the source tables if it doesn't exist yet."""
         with self._uow_factory() as uow:
-            tests = list(uow.tests.list_for_user(user_id))
-
-            files_repo = getattr(uow, "files", None)
-            total_files = 0
-            if files_repo:
-                total_files = len(list(files_repo.list_for_user(user_id)))
-
-            total_tests = len(tests)
-            total_questions = 0
-
-            total_closed = 0
-            total_open = 0
-            easy = medium = hard = 0
-            last_test_created_at: datetime | None = None
-
-            for test in tests:
-                if test.id is None:
-                    continue
-                test_with_q = uow.tests.get_with_questions(test.id)
-                if not test_with_q:
-                    continue
-
-                questions = list(getattr(test_with_q, "questions", []) or [])
-                total_questions += len(questions)
-
-                for q in questions:
-                    is_closed = bool(getattr(q, "is_closed", True))
-                    if is_closed:
-                        total_closed += 1
-                    else:
-                        total_open += 1
-
-                    raw_diff = getattr(q, "difficulty", None)
-
-                    v = getattr(raw_diff, "value", raw_diff)
-
-                    diff: int
-                    if isinstance(v, int):
-                        diff = v
-                    else:
-                        name = str(getattr(raw_diff, "name", v)).lower()
-                        if "easy" in name or name == "1":
-                            diff = 1
-                        elif "medium" in name or name == "2":
-                            diff = 2
-                        elif "hard" in name or name == "3":
-                            diff = 3
-                        else:
-                            diff = 1
-
-                    if diff == 1:
-                        easy += 1
-                    elif diff == 2:
-                        medium += 1
-                    elif diff == 3:
-                        hard += 1
-                    else:
-                        easy += 1
-
-                created_at = getattr(test, "created_at", None)
-                if created_at and (
-                    last_test_created_at is None or created_at > last_test_created_at
-                ):
-                    last_test_created_at = created_at
-
-            avg = float(total_questions) / total_tests if total_tests > 0 else 0.0
-
-            return UserStatistics(
-                total_tests=total_tests,
-                total_questions=total_questions,
-                total_files=total_files,
-                avg_questions_per_test=avg,
-                last_test_created_at=last_test_created_at,
-                total_closed_questions=total_closed,
-                total_open_questions=total_open,
-                total_easy_questions=easy,
-                total_medium_questions=medium,
-                total_hard_questions=hard,
-            )
+            stats = uow.user_stats.get(user_id) or uow.user_stats.rebuild(user_id)
+
+        avg = (
+            float(stats.total_questions) / stats.total_tests
+            if stats.total_tests > 0
+            else 0.0
+        )
+        return UserStatistics(
+            total_tests=stats.total_tests,
+            total_questions=stats.total_questions,
+            total_files=stats.total_files,
+            avg_questions_per_test=avg,
+            last_test_created_at=stats.last_test_created_at,
+            total_closed_questions=stats.closed_questions,
+            total_open_questions=stats.open_questions,
+            total_easy_questions=stats.easy_questions,
+            total_medium_questions=stats.medium_questions,
+            total_hard_questions=stats.hard_questions,
+        )
+
+    def rebuild_user_statistics(self, *, user_id: int) -> None:
+        """Recompute the user_stats row from scratch (maintenance)."""
+        with self._uow_factory() as uow:
+            uow.user_stats.rebuild(user_id)
 
+    def list_user_ids(self, *, after_id: int = 0, limit: int = 500) -> list[int]:
+        with self._uow_factory() as uow:
+            return uow.users.list_ids(after_id=after_id, limit=limit)
 
     def change_password(
         self, *, user_id: int, old_password: str, new_password: str
@@ -118,15 +83,16 @@ class UserService:
                 raise ValueError("Użytkownik nie został znaleziony")
 
             # Weryfikacja starego hasła
-            if not verify_password(old_password, user.hashed_password):
+            if not self._password_verifier(old_password, user.hashed_password):
                 raise ValueError("Nieprawidłowe aktualne hasło")
 
             # Ustawienie nowego hasła
-            user.hashed_password = get_password_hash(new_password)
+            user.hashed_password = self._password_hasher(new_password)
 
             # Encja jest zmapowana, więc samo session.add(user) jest opcjonalne,
             # ale nie zaszkodzi:
             session.add(user)
+        self._invalidate_principal(user_id)
 
     def update_consents(
         self, *, user_id: int, terms_accepted: bool, marketing_accepted: bool
@@ -151,6 +117,7 @@ class UserService:
                 )
 
             session.add(user)
+        self._invalidate_principal(user_id)
 
     def delete_account(self, *, user_id: int) -> None:
         with self._uow_factory() as uow:
@@ -168,10 +135,9 @@ class UserService:
                 if file_row.filepath:
                     file_paths.append(file_row.filepath)
 
-            # Collect thumbnail paths from materials
-            for material_row in user.materials:
-                if material_row.thumbnail_path:
-                    file_paths.append(material_row.thumbnail_path)
+            # Collect thumbnail paths (fallback and size variants) from materials
+            for row in user.materials:
+                file_paths.extend(thumbnail_paths(row.thumbnail_path, row.thumbnails))
 
             # SQLModel/SQLAlchemy cascade delete will handle related entities
             # if configured
@@ -182,3 +148,4 @@ class UserService:
                 from app.tasks.materials import cleanup_user_files_task
 
                 cleanup_user_files_task.delay(file_paths)
+        self._invalidate_principal(user_id)
@@ -1,17 +1,23 @@
 from __future__ import annotations
 
 from collections.abc import Callable
-from contextlib import AbstractContextManager
+from contextlib import AbstractAsyncContextManager, AbstractContextManager
 from typing import Any
 
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.db.replica import ReplicaRouter
 from app.domain.repositories import (
+    AsyncJobRepository,
+    AsyncMaterialRepository,
+    AsyncTestRepository,
     FileRepository,
     JobRepository,
     MaterialRepository,
     NotificationRepository,
     OcrCacheRepository,
+    OutboxRepository,
     PasswordResetTokenRepository,
     PdfExportCacheRepository,
     PendingVerificationRepository,
@@ -19,13 +25,18 @@ from app.domain.repositories import (
     SupportRepository,
     TestRepository,
     UserRepository,
+    UserStatsRepository,
 )
 from app.infrastructure.persistence.sqlmodel import (
+    SqlModelAsyncJobRepository,
+    SqlModelAsyncMaterialRepository,
+    SqlModelAsyncTestRepository,
     SqlModelFileRepository,
     SqlModelJobRepository,
     SqlModelMaterialRepository,
     SqlModelNotificationRepository,
     SqlModelOcrCacheRepository,
+    SqlModelOutboxRepository,
     SqlModelPasswordResetTokenRepository,
     SqlModelPdfExportCacheRepository,
     SqlModelPendingVerificationRepository,
@@ -33,12 +44,22 @@ from app.infrastructure.persistence.sqlmodel import (
     SqlModelSupportRepository,
     SqlModelTestRepository,
     SqlModelUserRepository,
+    SqlModelUserStatsRepository,
 )
 
 
 class SqlAlchemyUnitOfWork(AbstractContextManager["SqlAlchemyUnitOfWork"]):
-    def __init__(self, session_factory: Callable[[], Session]):
+    """Owns the transaction: repositories only flush, ``__exit__`` commits once.
+
+    A ``read_only`` unit of work (possibly on a replica session) never
+    commits; leaving the block rolls its transaction back.
+    """
+
+    def __init__(
+        self, session_factory: Callable[[], Session], *, read_only: bool = False
+    ):
         self._session_factory = session_factory
+        self._read_only = read_only
         self.session: Session | None = None
         self._users: UserRepository | None = None
         self._tests: TestRepository | None = None
@@ -52,6 +73,8 @@ class SqlAlchemyUnitOfWork(AbstractContextManager["SqlAlchemyUnitOfWork"]):
         self._refresh_tokens: RefreshTokenRepository | None = None
         self._pdf_exports: PdfExportCacheRepository | None = None
         self._ocr_cache: OcrCacheRepository | None = None
+        self._user_stats: UserStatsRepository | None = None
+        self._outbox: OutboxRepository | None = None
 
     @property
     def users(self) -> UserRepository:
@@ -125,6 +148,18 @@ class SqlAlchemyUnitOfWork(AbstractContextManager["SqlAlchemyUnitOfWork"]):
             raise RuntimeError("UnitOfWork not initialized")
         return self._ocr_cache
 
+    @property
+    def user_stats(self) -> UserStatsRepository:
+        if self._user_stats is None:
+            raise RuntimeError("UnitOfWork not initialized")
+        return self._user_stats
+
+    @property
+    def outbox(self) -> OutboxRepository:
+        if self._outbox is None:
+            raise RuntimeError("UnitOfWork not initialized")
+        return self._outbox
+
     def __enter__(self) -> SqlAlchemyUnitOfWork:
         self.session = self._session_factory()
         self.session.begin()
@@ -144,6 +179,8 @@ class SqlAlchemyUnitOfWork(AbstractContextManager["SqlAlchemyUnitOfWork"]):
         self._refresh_tokens = SqlModelRefreshTokenRepository(self.session)
         self._pdf_exports = SqlModelPdfExportCacheRepository(self.session)
         self._ocr_cache = SqlModelOcrCacheRepository(self.session)
+        self._user_stats = SqlModelUserStatsRepository(self.session)
+        self._outbox = SqlModelOutboxRepository(self.session)
         return self
 
     def __exit__(
@@ -153,7 +190,7 @@ class SqlAlchemyUnitOfWork(AbstractContextManager["SqlAlchemyUnitOfWork"]):
         tb: Any,
     ) -> None:
         try:
-            if exc_type is None:
+            if exc_type is None and not self._read_only:
                 self.commit()
             else:
                 self.rollback()
@@ -164,6 +201,8 @@ class SqlAlchemyUnitOfWork(AbstractContextManager["SqlAlchemyUnitOfWork"]):
     def commit(self) -> None:
         if self.session is None:
             raise RuntimeError("UnitOfWork session is not initialized")
+        if self._read_only:
+            raise RuntimeError("Read-only UnitOfWork cannot commit")
         self.session.commit()
 
     def rollback(self) -> None:
@@ -172,4 +211,70 @@ class SqlAlchemyUnitOfWork(AbstractContextManager["SqlAlchemyUnitOfWork"]):
         self.session.rollback()
 
 
-__all__ = ["SqlAlchemyUnitOfWork"]
+class SqlAlchemyAsyncUnitOfWork(
+    AbstractAsyncContextManager["SqlAlchemyAsyncUnitOfWork"]
+):
+    """Read-only unit of work on the asyncpg engine (hot API read paths).
+
+    Nothing is written through it, so leaving the block only closes the
+    session; its implicit transaction is rolled back. With a ``router`` the
+    session comes from the replica unless it lags or ``principal_id`` wrote
+    recently.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        *,
+        router: ReplicaRouter | None = None,
+        principal_id: int | None = None,
+    ):
+        self._session_factory = session_factory
+        self._router = router
+        self._principal_id = principal_id
+        self.session: AsyncSession | None = None
+        self._tests: AsyncTestRepository | None = None
+        self._materials: AsyncMaterialRepository | None = None
+        self._jobs: AsyncJobRepository | None = None
+
+    @property
+    def tests(self) -> AsyncTestRepository:
+        if self._tests is None:
+            raise RuntimeError("UnitOfWork not initialized")
+        return self._tests
+
+    @property
+    def materials(self) -> AsyncMaterialRepository:
+        if self._materials is None:
+            raise RuntimeError("UnitOfWork not initialized")
+        return self._materials
+
+    @property
+    def jobs(self) -> AsyncJobRepository:
+        if self._jobs is None:
+            raise RuntimeError("UnitOfWork not initialized")
+        return self._jobs
+
+    async def __aenter__(self) -> SqlAlchemyAsyncUnitOfWork:
+        factory = self._session_factory
+        if self._router is not None:
+            factory = await self._router.read_session_factory_async(
+                self._principal_id
+            )
+        self.session = factory()
+        self._tests = SqlModelAsyncTestRepository(self.session)
+        self._materials = SqlModelAsyncMaterialRepository(self.session)
+        self._jobs = SqlModelAsyncJobRepository(self.session)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: Any,
+    ) -> None:
+        if self.session:
+            await self.session.close()
+
+
+__all__ = ["SqlAlchemyAsyncUnitOfWork", "SqlAlchemyUnitOfWork"]
@@ -12,7 +12,6 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
 from sqladmin import Admin
 
 from app.api.admin import setup_admin_views
@@ -21,6 +20,7 @@ from app.api.routers import (
     files,
     jobs,
     materials,
+    metrics,
     notifications,
     support,
     tests,
@@ -29,19 +29,40 @@ from app.api.routers import (
 from app.application.services import (
     AuthService,
     FileService,
+    HousekeepingService,
     JobService,
     MaterialAnalysisService,
     MaterialService,
     NotificationService,
+    OutboxDispatcher,
     SupportService,
     TestService,
     UserService,
 )
-from app.application.unit_of_work import SqlAlchemyUnitOfWork
+from app.application.services.outbox_dispatcher import analytics_handler
+from app.application.unit_of_work import (
+    SqlAlchemyAsyncUnitOfWork,
+    SqlAlchemyUnitOfWork,
+)
 from app.core.config import Settings, get_settings
 from app.core.limiter import limiter
 from app.core.monitoring import init_sentry
-from app.db.session import get_engine, get_session_factory, init_db
+from app.core.password_hashing import PasswordHashingBusyError
+from app.core.quota import QuotaEngine, get_quota_engine
+from app.core.security import get_password_hashing_executor, get_principal_cache
+from app.db.replica import ReplicaRouter
+from app.db.session import (
+    get_async_engine,
+    get_async_replica_engine,
+    get_async_replica_session_factory,
+    get_async_session_factory,
+    get_engine,
+    get_replica_engine,
+    get_replica_session_factory,
+    get_session_factory,
+    init_db,
+)
+from app.domain.events import AnalyticsEvent, TestGenerated
 from app.domain.services import FileStorage
 from app.infrastructure import (
     DefaultOCRService,
@@ -56,8 +77,22 @@ from app.infrastructure import (
     SqlModelTestRepository,
     SqlModelUserRepository,
 )
+from app.infrastructure.cache.notification_counter import (
+    RedisUnreadNotificationCounter,
+)
+from app.infrastructure.cache.payload_cache import TieredPayloadCache
+from app.infrastructure.cache.principal_cache import TieredPrincipalCache
+from app.infrastructure.cache.recent_writes import RecentWriteTracker
 from app.infrastructure.extractors.extract_composite import composite_text_extractor
-from app.middleware import LoggingMiddleware
+from app.infrastructure.messaging import RedisJobEventBus
+from app.infrastructure.monitoring.posthog_client import create_analytics_sink
+from app.middleware import (
+    CompressionMiddleware,
+    LoggingMiddleware,
+    RateLimitMiddleware,
+    ReadYourWritesMiddleware,
+    SqlTimingMiddleware,
+)
 from app.middleware.sentry import SentryUserContextMiddleware
 
 
@@ -82,7 +117,43 @@ class AppContainer:
         )
         self._exports_storage = self._create_storage(base_dir=Path("uploads/exports"))
         self._session_factory = get_session_factory(settings)
+        self._async_session_factory = get_async_session_factory(settings)
+        replica_configured = bool(settings.DATABASE_REPLICA_URL)
+        self._recent_writes = (
+            RecentWriteTracker(
+                redis_url=settings.READ_YOUR_WRITES_REDIS_URL,
+                ttl_seconds=settings.READ_YOUR_WRITES_SECONDS,
+            )
+            if replica_configured
+            else None
+        )
+        self._replica_router = ReplicaRouter(
+            primary=self._session_factory,
+            replica=get_replica_session_factory(settings),
+            replica_engine=get_replica_engine(settings),
+            async_primary=self._async_session_factory,
+            async_replica=get_async_replica_session_factory(settings),
+            async_replica_engine=get_async_replica_engine(settings),
+            recent_writes=self._recent_writes,
+            max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+            check_interval_seconds=settings.REPLICA_LAG_CHECK_SECONDS,
+        )
         self._email_sender = self._create_email_sender()
+        self._test_detail_cache = TieredPayloadCache(
+            namespace="test_detail",
+            redis_url=settings.TEST_DETAIL_CACHE_REDIS_URL,
+            local_size=settings.TEST_DETAIL_CACHE_LOCAL_SIZE,
+            ttl_seconds=settings.TEST_DETAIL_CACHE_TTL_SECONDS,
+        )
+        self._job_event_bus = (
+            RedisJobEventBus(redis_url=settings.JOB_EVENTS_REDIS_URL)
+            if settings.JOB_EVENTS_REDIS_URL
+            else None
+        )
+        self._unread_counter = RedisUnreadNotificationCounter(
+            redis_url=settings.NOTIFICATION_COUNTER_REDIS_URL,
+            ttl_seconds=settings.NOTIFICATION_COUNTER_TTL_SECONDS,
+        )
 
     @property
     def settings(self) -> Settings:
@@ -99,6 +170,24 @@ class AppContainer:
     def provide_question_generator(self) -> GeminiQuestionGenerator:
         return self._question_generator_fast
 
+    def provide_replica_router(self) -> ReplicaRouter:
+        return self._replica_router
+
+    def provide_principal_cache(self) -> TieredPrincipalCache:
+        return get_principal_cache()
+
+    def provide_test_detail_cache(self) -> TieredPayloadCache:
+        return self._test_detail_cache
+
+    def provide_quota_engine(self) -> QuotaEngine | None:
+        return get_quota_engine() if self._settings.QUOTA_ENABLED else None
+
+    def provide_job_event_bus(self) -> RedisJobEventBus | None:
+        return self._job_event_bus
+
+    def provide_unread_counter(self) -> RedisUnreadNotificationCounter:
+        return self._unread_counter
+
     def provide_ocr_service(self) -> DefaultOCRService:
         return self._ocr_service
 
@@ -129,8 +218,28 @@ class AppContainer:
     def provide_unit_of_work(self) -> SqlAlchemyUnitOfWork:
         return SqlAlchemyUnitOfWork(self._session_factory)
 
+    def provide_read_unit_of_work(self, owner_id: int) -> SqlAlchemyUnitOfWork:
+        """Read-only unit of work; on the replica unless it lags or the owner
+        wrote within READ_YOUR_WRITES_SECONDS."""
+        router = self._replica_router
+        return SqlAlchemyUnitOfWork(
+            lambda: router.read_session_factory(owner_id)(), read_only=True
+        )
+
+    def provide_async_unit_of_work(
+        self, owner_id: int | None = None
+    ) -> SqlAlchemyAsyncUnitOfWork:
+        return SqlAlchemyAsyncUnitOfWork(
+            self._async_session_factory,
+            router=self._replica_router,
+            principal_id=owner_id,
+        )
+
     def provide_auth_service(self) -> AuthService:
-        return AuthService(lambda: self.provide_unit_of_work())
+        return AuthService(
+            lambda: self.provide_unit_of_work(),
+            principal_cache=self.provide_principal_cache(),
+        )
 
     def provide_test_service(self) -> TestService:
         return TestService(
@@ -138,6 +247,10 @@ class AppContainer:
             question_generator_fast=self._question_generator_fast,
             question_generator_reasoning=self._question_generator_reasoning,
             storage=self._file_storage,
+            detail_cache=self._test_detail_cache,
+            read_uow_factory=self.provide_read_unit_of_work,
+            async_uow_factory=self.provide_async_unit_of_work,
+            quota_engine=self.provide_quota_engine(),
         )
 
     def provide_file_service(self) -> FileService:
@@ -147,13 +260,46 @@ class AppContainer:
         )
 
     def provide_user_service(self) -> UserService:
-        return UserService(lambda: self.provide_unit_of_work())
+        return UserService(
+            lambda: self.provide_unit_of_work(),
+            principal_cache=self.provide_principal_cache(),
+        )
 
     def provide_job_service(self) -> JobService:
-        return JobService(lambda: self.provide_unit_of_work())
+        return JobService(
+            lambda: self.provide_unit_of_work(),
+            read_uow_factory=self.provide_read_unit_of_work,
+            async_uow_factory=self.provide_async_unit_of_work,
+            event_bus=self._job_event_bus,
+        )
+
+    def provide_housekeeping_service(self) -> HousekeepingService:
+        return HousekeepingService(
+            lambda: self.provide_unit_of_work(),
+            batch_size=self._settings.HOUSEKEEPING_BATCH_SIZE,
+            max_batches=self._settings.HOUSEKEEPING_MAX_BATCHES,
+        )
+
+    def provide_outbox_dispatcher(self) -> OutboxDispatcher:
+        forward_analytics = analytics_handler(create_analytics_sink())
+        return OutboxDispatcher(
+            lambda: self.provide_unit_of_work(),
+            handlers={
+                AnalyticsEvent: [forward_analytics],
+                TestGenerated: [forward_analytics],
+            },
+            batch_size=self._settings.OUTBOX_BATCH_SIZE,
+            max_batches=self._settings.OUTBOX_MAX_BATCHES_PER_RUN,
+            max_attempts=self._settings.OUTBOX_MAX_ATTEMPTS,
+            retry_base_seconds=self._settings.OUTBOX_RETRY_BASE_SECONDS,
+        )
 
     def provide_notification_service(self) -> NotificationService:
-        return NotificationService(lambda: self.provide_unit_of_work())
+        return NotificationService(
+            lambda: self.provide_unit_of_work(),
+            unread_counter=self._unread_counter,
+            read_uow_factory=self.provide_read_unit_of_work,
+        )
 
     def provide_support_service(self) -> SupportService:
         return SupportService(lambda: self.provide_unit_of_work())
@@ -165,6 +311,8 @@ class AppContainer:
             text_extractor=composite_text_extractor,
             analyzer=self._document_analyzer,
             mime_detector=self._detect_mime,
+            read_uow_factory=self.provide_read_unit_of_work,
+            async_uow_factory=self.provide_async_unit_of_work,
         )
 
     def provide_material_analysis_service(self) -> MaterialAnalysisService:
@@ -173,6 +321,7 @@ class AppContainer:
             storage=self._materials_storage,
             analyzer=self._document_analyzer,
             mime_detector=self._detect_mime,
+            quota_engine=self.provide_quota_engine(),
         )
 
     def provide_email_sender(self) -> ResendEmailSender:
@@ -279,7 +428,21 @@ def create_app(settings_override: Settings | None = None) -> FastAPI:
     # Dodaj middleware do logowania requestów (przed CORS,
     # żeby logować wszystkie requesty)
     app.add_middleware(LoggingMiddleware)
-    app.add_middleware(SentryUserContextMiddleware)
+    if current_settings.SENTRY_DSN:
+        app.add_middleware(SentryUserContextMiddleware)
+    if current_settings.SQL_INSTRUMENTATION:
+        app.add_middleware(
+            SqlTimingMiddleware,
+            budget=current_settings.SQL_STATEMENT_BUDGET,
+            n_plus_one_threshold=current_settings.SQL_N_PLUS_ONE_THRESHOLD,
+        )
+    if current_settings.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=current_settings.COMPRESSION_MINIMUM_SIZE,
+            brotli_quality=current_settings.COMPRESSION_BROTLI_QUALITY,
+            gzip_level=current_settings.COMPRESSION_GZIP_LEVEL,
+        )
 
     app.add_middleware(
         CORSMiddleware,
@@ -353,7 +516,21 @@ def create_app(settings_override: Settings | None = None) -> FastAPI:
     app.state.settings = current_settings
     app.state.limiter = container.provide_limiter()
     app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-    app.add_middleware(SlowAPIMiddleware)
+
+    @app.exception_handler(PasswordHashingBusyError)
+    async def password_hashing_busy_handler(
+        request: Request, exc: PasswordHashingBusyError
+    ) -> JSONResponse:
+        """Login/registration burst: shed load instead of queueing threads."""
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Serwer jest przeciążony, spróbuj ponownie za chwilę."},
+            headers={"Retry-After": "2"},
+        )
+
+    app.add_middleware(RateLimitMiddleware)
+    if current_settings.DATABASE_REPLICA_URL:
+        app.add_middleware(ReadYourWritesMiddleware)
 
     @app.on_event("startup")
     def on_startup() -> None:
@@ -363,6 +540,17 @@ def create_app(settings_override: Settings | None = None) -> FastAPI:
         else:
             logger.info("Skipping auto table creation (AUTO_CREATE_TABLES=False)")
 
+    @app.on_event("shutdown")
+    async def on_shutdown() -> None:
+        await get_async_engine(current_settings).dispose()
+        replica_engine = get_async_replica_engine(current_settings)
+        if replica_engine is not None:
+            await replica_engine.dispose()
+        get_password_hashing_executor().shutdown()
+        job_event_bus = get_container().provide_job_event_bus()
+        if job_event_bus is not None:
+            await job_event_bus.aclose()
+
     @app.get("/ping")
     def pong() -> dict[str, str]:
         return {"msg": "pong"}
@@ -377,6 +565,7 @@ def create_app(settings_override: Settings | None = None) -> FastAPI:
     app.include_router(support.router, prefix="/support", tags=["support"])
     app.include_router(materials.router)
     app.include_router(jobs.router)
+    app.include_router(metrics.router)
 
     # Initialize SQLAdmin
     engine = get_engine(current_settings)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from celery import Celery
+from celery.schedules import crontab
 
 from app.core.config import get_settings
 from app.core.monitoring import init_sentry
@@ -22,6 +23,34 @@ celery_app.conf.update(
     task_time_limit=60 * 7,  # hard limit
     task_soft_time_limit=60 * 5,  # graceful limit
     result_expires=3600,
+    beat_schedule={
+        "housekeeping-auth-tokens": {
+            "task": "app.tasks.housekeeping.purge_auth_tokens",
+            "schedule": crontab(minute=17),
+        },
+        "housekeeping-finished-jobs": {
+            "task": "app.tasks.housekeeping.purge_finished_jobs",
+            "schedule": crontab(hour=3, minute=7),
+        },
+        "housekeeping-pdf-exports": {
+            "task": "app.tasks.housekeeping.purge_pdf_exports",
+            "schedule": crontab(hour=3, minute=37),
+        },
+        "housekeeping-outbox": {
+            "task": "app.tasks.housekeeping.purge_outbox",
+            "schedule": crontab(hour=4, minute=7),
+        },
+        "outbox-dispatch": {
+            "task": "app.tasks.outbox.dispatch_outbox",
+            "schedule": settings.OUTBOX_DISPATCH_INTERVAL_SECONDS,
+            # a missed run is superseded by the next one
+            "options": {"expires": settings.OUTBOX_DISPATCH_INTERVAL_SECONDS},
+        },
+        "notifications-reconcile-unread-counters": {
+            "task": "app.tasks.housekeeping.reconcile_unread_counters",
+            "schedule": crontab(minute="*/10"),
+        },
+    },
 )
 
 # Autodiscover tasks under app.tasks.* (pass the app package, not app.tasks)
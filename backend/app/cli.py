@@ -2,7 +2,22 @@
 CLI for one-off admin operations (e.g. run on Hetzner prod).
 
 Usage:
-  python -m app.cli backfill-thumbnails [--limit N] [--dry-run]
+  python -m app.cli backfill-thumbnails [--limit N] [--dry-run] [--concurrency N]
+  python -m app.cli reanalyze-materials [--include-missing] [--llm-rpm R]
+  python -m app.cli warm-pdf-cache [--show-answers]
+  python -m app.cli rebuild-user-stats
+  python -m app.cli bench-thumbnails DIR [--repeat N]
+  python -m app.cli bench-test-detail [--sizes 10,100,500] [--test-id ID]
+  python -m app.cli bench-lists --owner-id ID [--limit 50] [--repeat N]
+  python -m app.cli bench-middleware [--requests N]
+  python -m app.cli bench-serialization [--sizes 10,100,500] [--repeat N]
+  python -m app.cli load-test URL [URL ...] --token JWT [--concurrency 64]
+
+Maintenance commands page candidates by id (keyset), run them on a worker
+pool and save a checkpoint (.maintenance/<command>.json by default), so an
+interrupted run resumes where it stopped. Shared options: --concurrency,
+--page-size, --limit, --dry-run, --checkpoint PATH, --reset-checkpoint,
+--storage-rps.
 
 Example on prod (Docker):
   docker compose exec backend python -m app.cli backfill-thumbnails
@@ -14,44 +29,748 @@ from __future__ import annotations
 
 import argparse
 import sys
+from pathlib import Path
+
+from app.infrastructure.maintenance import (
+    Checkpoint,
+    MaintenanceRunner,
+    MaintenanceTask,
+    RateLimiter,
+)
+
+
+def _build_runner(args: argparse.Namespace, task: MaintenanceTask) -> MaintenanceRunner:
+    checkpoint = Checkpoint(
+        args.checkpoint or Path(".maintenance") / f"{args.command}.json"
+    )
+    if args.reset_checkpoint:
+        checkpoint.reset()
+    return MaintenanceRunner(
+        task,
+        concurrency=args.concurrency,
+        page_size=args.page_size,
+        limit=args.limit,
+        checkpoint=checkpoint,
+    )
+
+
+def _rate_limiters(args: argparse.Namespace, *, llm: bool) -> tuple[RateLimiter, ...]:
+    limiters: list[RateLimiter] = []
+    if args.storage_rps:
+        limiters.append(RateLimiter(args.storage_rps, burst=args.concurrency))
+    if llm and args.llm_rpm:
+        limiters.append(RateLimiter(args.llm_rpm, per=60.0))
+    return tuple(limiters)
+
+
+def _run(args: argparse.Namespace, task: MaintenanceTask) -> int:
+    runner = _build_runner(args, task)
+    if args.dry_run:
+        candidates, total = runner.preview()
+        print(f"[DRY RUN] Would process {len(candidates)} items (total: {total})")
+        for key, owner_id in candidates:
+            print(f"  owner_id={owner_id} id={key}")
+        return 0
+
+    stats = runner.run()
+    print(
+        f"Done. Processed: {stats.processed}, skipped: {stats.skipped}, "
+        f"failed: {stats.failed}"
+    )
+    if stats.failed_keys:
+        print(f"Failed ids: {', '.join(map(str, stats.failed_keys[-50:]))}")
+    return 0 if stats.failed == 0 else 1
 
 
 def _cmd_backfill_thumbnails(args: argparse.Namespace) -> int:
     from app.bootstrap import get_container
 
+    material_service = get_container().provide_material_service()
+
+    def _process(owner_id: int, material_id: int) -> bool:
+        return material_service.generate_thumbnail_for_material(
+            owner_id=owner_id, material_id=material_id
+        )
+
+    task = MaintenanceTask(
+        name="backfill-thumbnails",
+        fetch_page=lambda after, limit: (
+            material_service.list_materials_without_thumbnail(
+                after_id=after, limit=limit
+            )
+        ),
+        process=_process,
+        count=lambda after: material_service.count_materials_without_thumbnail(
+            after_id=after
+        ),
+        rate_limiters=_rate_limiters(args, llm=False),
+    )
+    return _run(args, task)
+
+
+def _cmd_reanalyze_materials(args: argparse.Namespace) -> int:
+    from app.bootstrap import get_container
+
+    analysis_service = get_container().provide_material_analysis_service()
+
+    def _process(owner_id: int, material_id: int) -> bool:
+        analysis_service.analyze_material(owner_id=owner_id, material_id=material_id)
+        return True
+
+    task = MaintenanceTask(
+        name="reanalyze-materials",
+        fetch_page=lambda after, limit: analysis_service.list_outdated_materials(
+            include_missing=args.include_missing, after_id=after, limit=limit
+        ),
+        process=_process,
+        count=lambda after: analysis_service.count_outdated_materials(
+            include_missing=args.include_missing, after_id=after
+        ),
+        rate_limiters=_rate_limiters(args, llm=True),
+    )
+    return _run(args, task)
+
+
+def _cmd_warm_pdf_cache(args: argparse.Namespace) -> int:
+    from app.bootstrap import get_container
+
     container = get_container()
-    material_service = container.provide_material_service()
+    test_service = container.provide_test_service()
+    export_storage = container.provide_export_storage()
 
-    candidates = material_service.list_materials_without_thumbnail()
-    total = len(candidates)
-    if args.limit is not None:
-        candidates = candidates[: args.limit]
+    def _process(owner_id: int, test_id: int) -> bool:
+        (
+            pdf_bytes,
+            filename,
+            cache_key,
+            config_hash,
+            template_version,
+            cached_path,
+        ) = test_service.export_test_pdf(
+            owner_id=owner_id,
+            test_id=test_id,
+            show_answers=args.show_answers,
+            track_analytics=False,
+        )
+        if cached_path:
+            return False
+        stored_path = export_storage.save(
+            owner_id=owner_id, filename=filename, content=pdf_bytes or b""
+        )
+        test_service.record_pdf_export_cache(
+            test_id=test_id,
+            cache_key=cache_key,
+            config_hash=config_hash,
+            template_version=template_version,
+            stored_path=stored_path,
+        )
+        return True
+
+    task = MaintenanceTask(
+        name="warm-pdf-cache",
+        fetch_page=lambda after, limit: test_service.list_test_ids(
+            after_id=after, limit=limit
+        ),
+        process=_process,
+        count=lambda after: test_service.count_tests(after_id=after),
+        rate_limiters=_rate_limiters(args, llm=False),
+    )
+    return _run(args, task)
+
+
+def _cmd_rebuild_user_stats(args: argparse.Namespace) -> int:
+    from app.bootstrap import get_container
+
+    user_service = get_container().provide_user_service()
+
+    def _process(user_id: int, _key: int) -> bool:
+        user_service.rebuild_user_statistics(user_id=user_id)
+        return True
+
+    task = MaintenanceTask(
+        name="rebuild-user-stats",
+        fetch_page=lambda after, limit: [
+            (user_id, user_id)
+            for user_id in user_service.list_user_ids(after_id=after, limit=limit)
+        ],
+        process=_process,
+    )
+    return _run(args, task)
+
+
+def _cmd_bench_thumbnails(args: argparse.Namespace) -> int:
+    """Compare legacy (150 dpi + LANCZOS) vs direct-size thumbnail rendering."""
+    import io
+    import resource
+    import time
+    from collections.abc import Callable
+    from typing import Any
+
+    from PIL import ImageFile
+
+    from app.infrastructure.thumbnails import (
+        generate_thumbnails_from_image,
+        generate_thumbnails_from_pdf,
+    )
+
+    def _cpu() -> float:
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+    def _legacy(path: Path) -> None:
+        from pdf2image import convert_from_path  # type: ignore[attr-defined]
+        from PIL import Image
+
+        if path.suffix.lower() == ".pdf":
+            images = convert_from_path(str(path), first_page=1, last_page=1, dpi=150)
+            image = images[0]
+        else:
+            image = Image.open(path)
+            image.load()
+        thumb = image.convert("RGB").resize((250, 354), Image.Resampling.LANCZOS)
+        thumb.save(io.BytesIO(), format="JPEG", quality=85, optimize=True)
+
+    def _direct(path: Path) -> None:
+        if path.suffix.lower() == ".pdf":
+            thumbs = generate_thumbnails_from_pdf(path)
+        else:
+            thumbs = generate_thumbnails_from_image(path)
+        if not thumbs:
+            raise ValueError(f"No thumbnails for {path}")
+
+    # the largest bitmap decoded from a file (PDF pages arrive as PPM files):
+    # the decoder's output, not the thumbnail canvas
+    decoded_mb = 0.0
+    original_load = ImageFile.ImageFile.load
+
+    def _measured_load(image: ImageFile.ImageFile) -> Any:
+        nonlocal decoded_mb
+        result = original_load(image)
+        width, height = image.size
+        size_mb = width * height * len(image.getbands()) / (1024 * 1024)
+        decoded_mb = max(decoded_mb, size_mb)
+        return result
+
+    suffixes = {".pdf", ".png", ".jpg", ".jpeg", ".webp"}
+    corpus = sorted(
+        p for p in Path(args.directory).rglob("*") if p.suffix.lower() in suffixes
+    )
+    if not corpus:
+        print(f"No PDF/image files found in {args.directory}")
+        return 1
+
+    print(f"Benchmarking {len(corpus)} files x {args.repeat} runs...")
+    cases: tuple[tuple[str, Callable[[Path], None]], ...] = (
+        ("legacy", _legacy),
+        ("direct", _direct),
+    )
+    ImageFile.ImageFile.load = _measured_load  # type: ignore[method-assign]
+    try:
+        for label, fn in cases:
+            decoded_mb = 0.0
+            cpu_start, wall_start = _cpu(), time.perf_counter()
+            failed = 0
+            for _ in range(args.repeat):
+                for path in corpus:
+                    try:
+                        fn(path)
+                    except Exception:
+                        failed += 1
+            runs = len(corpus) * args.repeat
+            cpu_ms = (_cpu() - cpu_start) * 1000 / runs
+            wall_ms = (time.perf_counter() - wall_start) * 1000 / runs
+            print(
+                f"  {label}: cpu={cpu_ms:.1f} ms/thumb wall={wall_ms:.1f} ms/thumb "
+                f"peak_bitmap={decoded_mb:.1f} MB failed={failed}"
+            )
+    finally:
+        ImageFile.ImageFile.load = original_load  # type: ignore[method-assign]
+    return 0
+
+
+def _cmd_bench_test_detail(args: argparse.Namespace) -> int:
+    """Compare the entity-based and projection-based test detail read paths."""
+    import time
+    import tracemalloc
+    from collections.abc import Callable
+    from typing import Any
+
+    from app.application import dto
+    from app.db import models as db_models
+    from app.domain.models import QuestionGroup, Test, TestDetailProjection
+    from app.infrastructure.persistence.sqlmodel import mappers
+
+    def _measure(label: str, fn: Callable[[], Any], extra: str = "") -> None:
+        fn()  # warm-up
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            fn()
+        per_call_ms = (time.perf_counter() - started) * 1000 / args.repeat
+        tracemalloc.start()
+        fn()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"  {label}: {per_call_ms:.2f} ms/call peak={peak / 1024:.0f} KiB"
+            f" retained={current / 1024:.0f} KiB{extra}"
+        )
+
+    for size in args.sizes:
+        choices = ["Odpowiedź A", "Odpowiedź B", "Odpowiedź C", "Odpowiedź D"]
+        rows = [
+            db_models.Question(
+                id=i,
+                test_id=1,
+                group_id=1,
+                position=i,
+                text=f"Pytanie {i}: " + "treść " * 20,
+                is_closed=i % 4 != 0,
+                difficulty=i % 3 + 1,
+                choices=choices,
+                correct_choices=choices[:1],
+                citations=["strona 1"],
+            )
+            for i in range(1, size + 1)
+        ]
+        group = QuestionGroup(id=1, test_id=1, label="Grupa A", position=0)
+        projection = TestDetailProjection(
+            test_id=1,
+            owner_id=1,
+            title="Benchmark",
+            revision=0,
+            groups=[[1, "Grupa A", 0]],
+            questions=[
+                [
+                    r.id,
+                    r.text,
+                    r.is_closed,
+                    r.difficulty,
+                    r.group_id,
+                    r.choices,
+                    r.correct_choices,
+                    r.citations,
+                ]
+                for r in rows
+            ],
+        )
+
+        def _entities(rows: list[Any] = rows, group: QuestionGroup = group) -> Any:
+            test = Test(
+                id=1,
+                owner_id=1,
+                title="Benchmark",
+                questions=[mappers.question_to_domain(r) for r in rows],
+            )
+            return dto.to_test_detail(test, [group])
+
+        def _projection(projection: TestDetailProjection = projection) -> Any:
+            return dto.test_detail_from_projection(projection)
+
+        print(f"{size} questions (mapping only, {args.repeat} runs):")
+        _measure("entities  ", _entities)
+        _measure("projection", _projection)
+
+    if args.test_id is not None:
+        from app.bootstrap import get_container
+        from app.db.instrumentation import track_sql
+
+        container = get_container()
+
+        def _db_entities() -> Any:
+            with container.provide_unit_of_work() as uow:
+                test = uow.tests.get_with_questions(args.test_id)
+                if test is None:
+                    raise SystemExit(f"Test {args.test_id} not found")
+                groups = uow.tests.get_groups_for_test(args.test_id)
+                return dto.to_test_detail(test, groups)
+
+        def _db_projection() -> Any:
+            with container.provide_unit_of_work() as uow:
+                projection = uow.tests.get_detail_projection(args.test_id)
+            if projection is None:
+                raise SystemExit(f"Test {args.test_id} not found")
+            return dto.test_detail_from_projection(projection)
+
+        print(f"test {args.test_id} from the database ({args.repeat} runs):")
+        for label, fn in (("entities  ", _db_entities), ("projection", _db_projection)):
+            with track_sql() as queries:
+                fn()
+            _measure(label, fn, f" queries={queries.count}")
+    return 0
+
+
+def _cmd_bench_lists(args: argparse.Namespace) -> int:
+    """Compare full list endpoints with the first keyset page for one owner."""
+    import time
+    from collections.abc import Callable
+
+    from pydantic import TypeAdapter
+
+    from app.api.schemas.jobs import JobOut
+    from app.api.schemas.materials import MaterialOut
+    from app.api.schemas.tests import TestOut
+    from app.application import dto
+    from app.bootstrap import get_container
+    from app.db.instrumentation import track_sql
+
+    container = get_container()
+    materials = container.provide_material_service()
+    jobs = container.provide_job_service()
+    tests = container.provide_test_service()
+    owner_id = args.owner_id
+
+    def _measure(label: str, fn: Callable[[], bytes]) -> None:
+        with track_sql() as queries:
+            body = fn()
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            fn()
+        per_call_ms = (time.perf_counter() - started) * 1000 / args.repeat
+        print(
+            f"  {label}: {per_call_ms:.2f} ms/call payload={len(body) / 1024:.1f} KiB"
+            f" queries={queries.count}"
+        )
+
+    cases: list[tuple[str, Callable[[], bytes], Callable[[], bytes]]] = [
+        (
+            "materials",
+            lambda: TypeAdapter(list[MaterialOut]).dump_json(
+                materials.list_materials(owner_id=owner_id)
+            ),
+            lambda: materials.list_materials_page(
+                owner_id=owner_id, cursor=None, limit=args.limit
+            ).model_dump_json().encode(),
+        ),
+        (
+            "jobs",
+            lambda: TypeAdapter(list[JobOut]).dump_json(
+                [dto.to_job_out(j) for j in jobs.list_jobs(owner_id=owner_id)]
+            ),
+            lambda: dto.to_job_page_out(
+                jobs.list_jobs_page(owner_id=owner_id, cursor=None, limit=args.limit)
+            ).model_dump_json().encode(),
+        ),
+        (
+            "tests",
+            lambda: TypeAdapter(list[TestOut]).dump_json(
+                tests.list_tests_for_user(owner_id=owner_id)
+            ),
+            lambda: tests.list_tests_page(
+                owner_id=owner_id, cursor=None, limit=args.limit
+            ).model_dump_json().encode(),
+        ),
+    ]
+    for name, full, page in cases:
+        print(f"{name} for user {owner_id} ({args.repeat} runs):")
+        _measure("full list ", full)
+        _measure(f"page({args.limit:>3})", page)
+    return 0
 
-    if args.dry_run:
-        msg = f"[DRY RUN] Would process {len(candidates)} materials (total: {total})"
-        print(msg)
-        for owner_id, material_id in candidates:
-            print(f"  owner_id={owner_id} material_id={material_id}")
-        return 0
 
-    print(f"Processing {len(candidates)} materials (total: {total})...")
-    ok = 0
-    fail = 0
-    for i, (owner_id, material_id) in enumerate(candidates, 1):
-        try:
-            if material_service.generate_thumbnail_for_material(
-                owner_id=owner_id, material_id=material_id
-            ):
-                ok += 1
-                print(f"  [{i}/{len(candidates)}] material_id={material_id} OK")
+def _cmd_bench_middleware(args: argparse.Namespace) -> int:
+    """Per-request overhead of the HTTP middleware stack.
+
+    Compares no middleware, the former BaseHTTPMiddleware stack (the token
+    decoded by the Sentry middleware and again by the auth dependency) and
+    the pure ASGI stack sharing one decode, on a trivial authenticated route.
+    ASGI calls are made in-process, so only framework overhead is measured.
+    """
+    import asyncio
+    import time
+    from typing import Any
+
+    from fastapi import FastAPI, Request, Response
+    from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+    from starlette.types import Message
+
+    from app.core.security import (
+        access_token_claims,
+        create_access_token,
+        decode_access_token,
+    )
+    from app.db.instrumentation import track_sql
+    from app.middleware import LoggingMiddleware, SqlTimingMiddleware
+    from app.middleware.sentry import SentryUserContextMiddleware
+
+    class _LegacyLogging(BaseHTTPMiddleware):
+        async def dispatch(
+            self, request: Request, call_next: RequestResponseEndpoint
+        ) -> Response:
+            return await call_next(request)
+
+    class _LegacySentryUser(BaseHTTPMiddleware):
+        async def dispatch(
+            self, request: Request, call_next: RequestResponseEndpoint
+        ) -> Response:
+            auth_header = request.headers.get("Authorization")
+            if auth_header and auth_header.startswith("Bearer "):
+                decode_access_token(auth_header.split(" ")[1])
+            return await call_next(request)
+
+    class _LegacySqlTiming(BaseHTTPMiddleware):
+        async def dispatch(
+            self, request: Request, call_next: RequestResponseEndpoint
+        ) -> Response:
+            started = time.perf_counter()
+            with track_sql() as stats:
+                response = await call_next(request)
+            total_ms = (time.perf_counter() - started) * 1000
+            response.headers["Server-Timing"] = (
+                f"db;dur={stats.duration_ms:.1f}, app;dur={total_ms:.1f}"
+            )
+            return response
+
+    token = create_access_token({"sub": "bench@example.com", "uid": 1})
+
+    def _app(stack: str) -> FastAPI:
+        app = FastAPI()
+
+        @app.get("/bench")
+        async def bench(request: Request) -> dict[str, Any]:
+            if stack == "asgi":
+                claims = access_token_claims(request.scope, token)
             else:
-                fail += 1
-                print(f"  [{i}/{len(candidates)}] material_id={material_id} skip")
-        except Exception as e:
-            fail += 1
-            print(f"  [{i}/{len(candidates)}] material_id={material_id} error: {e}")
-    print(f"Done. Generated: {ok}, skipped/failed: {fail}")
-    return 0 if fail == 0 else 1
+                claims = decode_access_token(token)
+            return {"uid": claims.get("uid")}
+
+        if stack == "legacy":
+            app.add_middleware(_LegacyLogging)
+            app.add_middleware(_LegacySentryUser)
+            app.add_middleware(_LegacySqlTiming)
+        elif stack == "asgi":
+            app.add_middleware(LoggingMiddleware)
+            app.add_middleware(SentryUserContextMiddleware)
+            app.add_middleware(
+                SqlTimingMiddleware, budget=10**6, n_plus_one_threshold=10**6
+            )
+        return app
+
+    async def _call(app: FastAPI) -> None:
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/bench",
+            "raw_path": b"/bench",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+            "client": ("127.0.0.1", 1),
+            "server": ("bench", 80),
+        }
+        requested = False
+
+        async def receive() -> Message:
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Event().wait()  # no disconnect until cancelled
+            return {"type": "http.disconnect"}
+
+        async def send(message: Message) -> None:
+            _ = message
+
+        await app(scope, receive, send)
+
+    async def _measure(stack: str) -> float:
+        app = _app(stack)
+        for _ in range(min(args.requests, 200)):  # warm-up
+            await _call(app)
+        started = time.perf_counter()
+        for _ in range(args.requests):
+            await _call(app)
+        return (time.perf_counter() - started) * 1e6 / args.requests
+
+    async def _run() -> None:
+        results = {stack: await _measure(stack) for stack in ("none", "legacy", "asgi")}
+        print(f"{args.requests} sequential requests per stack:")
+        for stack, per_request_us in results.items():
+            overhead = per_request_us - results["none"]
+            print(
+                f"  {stack:>6}: {per_request_us:7.1f} us/request"
+                f" (middleware {overhead:+.1f} us)"
+            )
+
+    asyncio.run(_run())
+    return 0
+
+
+def _cmd_bench_serialization(args: argparse.Namespace) -> int:
+    """Serialization time and wire size of test details and material lists.
+
+    Compares FastAPI's default path (re-validating the returned model
+    against ``response_model``, then ``jsonable_encoder`` and ``json.dumps``)
+    with ``TrustedJSONResponse``, and reports gzip/Brotli sizes and times
+    at the levels the compression middleware uses.
+    """
+    import asyncio
+    import gzip
+    import time
+    from collections.abc import Callable
+    from datetime import UTC, datetime
+    from typing import Any
+
+    import brotli
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+
+    from app.api.responses import TrustedJSONResponse
+    from app.api.schemas.materials import MaterialOut
+    from app.api.schemas.tests import GroupOut, QuestionOut, TestDetailOut
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    loop = asyncio.new_event_loop()
+
+    def _measure(fn: Callable[[], Any]) -> tuple[float, Any]:
+        result = fn()  # warm-up
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            fn()
+        return (time.perf_counter() - started) * 1000 / args.repeat, result
+
+    def _report(label: str, content: Any, response_model: Any) -> None:
+        field = create_response_field(name="bench", type_=response_model)
+
+        def _default() -> bytes:
+            payload = loop.run_until_complete(
+                serialize_response(field=field, response_content=content)
+            )
+            return bytes(JSONResponse(payload).body)
+
+        def _trusted() -> bytes:
+            return bytes(TrustedJSONResponse(content).body)
+
+        default_ms, _ = _measure(_default)
+        trusted_ms, body = _measure(_trusted)
+        gzip_ms, gzipped = _measure(
+            lambda: gzip.compress(body, settings.COMPRESSION_GZIP_LEVEL)
+        )
+        br_ms, brotlied = _measure(
+            lambda: brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+        )
+        print(f"{label} ({args.repeat} runs):")
+        print(f"  default: {default_ms:.2f} ms/call")
+        print(
+            f"  trusted: {trusted_ms:.2f} ms/call"
+            f" ({default_ms / max(trusted_ms, 1e-9):.1f}x)"
+        )
+        print(f"  size: raw={len(body) / 1024:.1f} KiB")
+        print(f"    gzip: {len(gzipped) / 1024:.1f} KiB in {gzip_ms:.2f} ms")
+        print(f"      br: {len(brotlied) / 1024:.1f} KiB in {br_ms:.2f} ms")
+
+    choices = ["Odpowiedź A", "Odpowiedź B", "Odpowiedź C", "Odpowiedź D"]
+    for size in args.sizes:
+        detail = TestDetailOut(
+            test_id=1,
+            title="Benchmark",
+            groups=[GroupOut(id=1, label="Grupa A", position=0)],
+            questions=[
+                QuestionOut(
+                    id=i,
+                    text=f"Pytanie {i}: " + "treść " * 20,
+                    is_closed=i % 4 != 0,
+                    difficulty=i % 3 + 1,
+                    group_id=1,
+                    choices=choices,
+                    correct_choices=choices[:1],
+                    citations=["strona 1"],
+                )
+                for i in range(1, size + 1)
+            ],
+        )
+        _report(f"test detail, {size} questions", detail, TestDetailOut)
+
+    for size in args.sizes:
+        materials = [
+            MaterialOut(
+                id=i,
+                file_id=i,
+                filename=f"material-{i}.pdf",
+                mime_type="application/pdf",
+                size_bytes=1_000_000,
+                page_count=12,
+                processing_status="done",
+                analysis_status="done",
+                created_at=datetime.now(UTC),
+                extracted_text="Tekst strony. " * 200,
+                markdown_twin="## Rozdział\n\nTreść akapitu. " * 200,
+            )
+            for i in range(1, size + 1)
+        ]
+        _report(f"material list, {size} items", materials, list[MaterialOut])
+    loop.close()
+    return 0
+
+
+def _cmd_load_test(args: argparse.Namespace) -> int:
+    """Closed-loop HTTP load: N clients hammer the URLs for a fixed duration.
+
+    Run it against one API worker (uvicorn --workers 1) to get requests/s
+    per worker, e.g. for the job polling and test detail endpoints.
+    """
+    import asyncio
+    import statistics
+    import time
+
+    import httpx
+
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+
+    async def _client(
+        client: httpx.AsyncClient,
+        deadline: float,
+        latencies: list[float],
+        errors: list[int],
+    ) -> None:
+        i = 0
+        while time.perf_counter() < deadline:
+            url = args.urls[i % len(args.urls)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                response = await client.get(url, headers=headers)
+                if response.status_code >= 400:
+                    errors.append(response.status_code)
+            except httpx.HTTPError:
+                errors.append(0)
+            latencies.append(time.perf_counter() - started)
+
+    async def _run() -> tuple[list[float], list[int], float]:
+        latencies: list[float] = []
+        errors: list[int] = []
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+            started = time.perf_counter()
+            deadline = started + args.duration
+            await asyncio.gather(
+                *(
+                    _client(client, deadline, latencies, errors)
+                    for _ in range(args.concurrency)
+                )
+            )
+            return latencies, errors, time.perf_counter() - started
+
+    latencies, errors, elapsed = asyncio.run(_run())
+    if not latencies:
+        print("no requests completed")
+        return 1
+    ordered = sorted(latencies)
+    print(
+        f"{len(latencies)} requests in {elapsed:.1f}s with {args.concurrency} clients:"
+        f" {len(latencies) / elapsed:.1f} req/s, errors={len(errors)}"
+    )
+    print(
+        f"  latency p50={statistics.median(ordered) * 1000:.1f} ms"
+        f" p95={ordered[int(len(ordered) * 0.95) - 1] * 1000:.1f} ms"
+        f" p99={ordered[int(len(ordered) * 0.99) - 1] * 1000:.1f} ms"
+    )
+    return 1 if errors else 0
 
 
 def main() -> int:
@@ -60,23 +779,168 @@ def main() -> int:
     )
     subparsers = parser.add_subparsers(dest="command", required=True)
 
-    backfill = subparsers.add_parser(
+    def _maintenance_parser(name: str, help_text: str) -> argparse.ArgumentParser:
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            metavar="N",
+            help="Process at most N items in this run (default: all)",
+        )
+        sub.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list items that would be processed",
+        )
+        sub.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            metavar="N",
+            help="Worker threads (default: 4)",
+        )
+        sub.add_argument(
+            "--page-size",
+            type=int,
+            default=200,
+            metavar="N",
+            help="Candidates fetched per keyset page (default: 200)",
+        )
+        sub.add_argument(
+            "--checkpoint",
+            default=None,
+            metavar="PATH",
+            help=f"Checkpoint file (default: .maintenance/{name}.json)",
+        )
+        sub.add_argument(
+            "--reset-checkpoint",
+            action="store_true",
+            help="Ignore the saved checkpoint and start from the beginning",
+        )
+        sub.add_argument(
+            "--storage-rps",
+            type=float,
+            default=None,
+            metavar="R",
+            help="Max items per second hitting storage (default: unlimited)",
+        )
+        return sub
+
+    backfill = _maintenance_parser(
         "backfill-thumbnails",
-        help="Generate thumbnails for materials that don't have one",
+        "Generate thumbnails for materials that don't have one",
     )
-    backfill.add_argument(
-        "--limit",
-        type=int,
+    backfill.set_defaults(func=_cmd_backfill_thumbnails)
+
+    reanalyze = _maintenance_parser(
+        "reanalyze-materials",
+        "Re-run analysis for materials with an outdated analysis_version",
+    )
+    reanalyze.add_argument(
+        "--include-missing",
+        action="store_true",
+        help="Also analyze materials that were never analyzed",
+    )
+    reanalyze.add_argument(
+        "--llm-rpm",
+        type=float,
         default=None,
-        metavar="N",
-        help="Process at most N materials (default: all)",
+        metavar="R",
+        help="Max LLM analyses per minute (default: unlimited)",
+    )
+    reanalyze.set_defaults(func=_cmd_reanalyze_materials)
+
+    warm = _maintenance_parser(
+        "warm-pdf-cache",
+        "Render and cache standard PDF exports for all tests",
     )
-    backfill.add_argument(
-        "--dry-run",
+    warm.add_argument(
+        "--show-answers",
         action="store_true",
-        help="Only list materials that would be processed",
+        help="Warm the answer-key variant instead of the student one",
     )
-    backfill.set_defaults(func=_cmd_backfill_thumbnails)
+    warm.set_defaults(func=_cmd_warm_pdf_cache)
+
+    stats = _maintenance_parser(
+        "rebuild-user-stats",
+        "Recompute the user_stats dashboard counters from scratch",
+    )
+    stats.set_defaults(func=_cmd_rebuild_user_stats)
+
+    bench = subparsers.add_parser(
+        "bench-thumbnails",
+        help="Measure CPU time and bitmap memory per thumbnail on a local corpus",
+    )
+    bench.add_argument("directory", help="Directory with sample PDFs/images")
+    bench.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        metavar="N",
+        help="Repeat the corpus N times (default: 3)",
+    )
+    bench.set_defaults(func=_cmd_bench_thumbnails)
+
+    bench_detail = subparsers.add_parser(
+        "bench-test-detail",
+        help="Latency/allocations of the test detail read path (editor, export)",
+    )
+    bench_detail.add_argument(
+        "--sizes",
+        type=lambda v: [int(x) for x in v.split(",")],
+        default=[10, 100, 500],
+        help="Comma-separated synthetic test sizes (default: 10,100,500)",
+    )
+    bench_detail.add_argument(
+        "--test-id",
+        type=int,
+        default=None,
+        help="Also time a real test from the database, with query counts",
+    )
+    bench_detail.add_argument("--repeat", type=int, default=200)
+    bench_detail.set_defaults(func=_cmd_bench_test_detail)
+
+    bench_lists = subparsers.add_parser(
+        "bench-lists",
+        help="Latency/payload/query count of full lists vs. keyset pages",
+    )
+    bench_lists.add_argument("--owner-id", type=int, required=True)
+    bench_lists.add_argument("--limit", type=int, default=50, help="Page size")
+    bench_lists.add_argument("--repeat", type=int, default=20)
+    bench_lists.set_defaults(func=_cmd_bench_lists)
+
+    bench_middleware = subparsers.add_parser(
+        "bench-middleware",
+        help="Per-request overhead of BaseHTTPMiddleware vs. pure ASGI middleware",
+    )
+    bench_middleware.add_argument("--requests", type=int, default=5000)
+    bench_middleware.set_defaults(func=_cmd_bench_middleware)
+
+    bench_serialization = subparsers.add_parser(
+        "bench-serialization",
+        help="JSON serialization time and compressed size of API responses",
+    )
+    bench_serialization.add_argument(
+        "--sizes",
+        type=lambda v: [int(x) for x in v.split(",")],
+        default=[10, 100, 500],
+        help="Comma-separated question/material counts",
+    )
+    bench_serialization.add_argument("--repeat", type=int, default=50)
+    bench_serialization.set_defaults(func=_cmd_bench_serialization)
+
+    load_test = subparsers.add_parser(
+        "load-test",
+        help="Requests/s and latency of GET endpoints under concurrent clients",
+    )
+    load_test.add_argument("urls", nargs="+", metavar="URL")
+    load_test.add_argument("--token", default=None, help="Bearer access token")
+    load_test.add_argument("--concurrency", type=int, default=64)
+    load_test.add_argument(
+        "--duration", type=float, default=30.0, help="Seconds (default: 30)"
+    )
+    load_test.set_defaults(func=_cmd_load_test)
 
     args = parser.parse_args()
     return args.func(args)
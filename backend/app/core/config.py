@@ -13,17 +13,69 @@ class Settings(BaseSettings):
         env_ignore_empty=True,
     )
     DATABASE_URL: str
+    # asyncpg URL for the async read path; derived from DATABASE_URL when unset
+    ASYNC_DATABASE_URL: str | None = None
+    ASYNC_DB_POOL_SIZE: int = 20
+    # streaming replica for opted-in read-only units of work (unset = primary)
+    DATABASE_REPLICA_URL: str | None = None
+    ASYNC_DATABASE_REPLICA_URL: str | None = None
+    REPLICA_MAX_LAG_SECONDS: float = 2.0
+    REPLICA_LAG_CHECK_SECONDS: float = 1.0
+    # after a user's own write their reads go to the primary for this long
+    READ_YOUR_WRITES_SECONDS: int = 10
+    READ_YOUR_WRITES_REDIS_URL: str | None = "redis://redis:6379/3"
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # raising the cost rehashes existing passwords on their next login
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 16
+    PASSWORD_HASH_USE_PROCESSES: bool = False
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     GEMINI_API_KEY: str
     GEMINI_ANALYSIS_MODEL: str = "gemini-3-flash-preview"
     GEMINI_QUIZ_FAST_MODEL: str = "gemini-3-flash-preview"
     GEMINI_QUIZ_REASONING_MODEL: str = "gemini-3-flash-preview"
+    # PDFs longer than this are analyzed in page ranges in parallel (0 = off)
+    GEMINI_ANALYSIS_PAGES_PER_RANGE: int = 5
+    GEMINI_ANALYSIS_MAX_PARALLEL: int = 4
+    # PDF pages with a good text layer are sent as text instead of images
+    GEMINI_ANALYSIS_TEXT_LAYER_FAST_PATH: bool = True
     CELERY_BROKER_URL: str = "redis://redis:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://redis:6379/1"
     CELERY_TASK_DEFAULT_QUEUE: str = "default"
+    # housekeeping (celery beat): retention deletes in short batches
+    HOUSEKEEPING_BATCH_SIZE: int = 1000
+    HOUSEKEEPING_MAX_BATCHES: int = 100
+    EXPIRED_TOKEN_GRACE_HOURS: int = 24
+    JOB_RETENTION_DAYS: int = 30
+    PDF_EXPORT_RETENTION_DAYS: int = 14
+    # token-weighted budgets for LLM endpoints (see app/core/quota.py);
+    # without Redis each API process enforces them on its own
+    QUOTA_ENABLED: bool = True
+    QUOTA_REDIS_URL: str | None = "redis://redis:6379/5"
+    QUOTA_TOKENS_PER_MINUTE: int = 150_000
+    QUOTA_TOKENS_PER_DAY: int = 2_000_000
+    QUOTA_SYNC_INTERVAL_SECONDS: float = 1.0
+    # GET /jobs/stream: job changes over Redis pub/sub (None disables it)
+    JOB_EVENTS_REDIS_URL: str | None = "redis://redis:6379/4"
+    JOB_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    # streams are closed after this long; clients resume with Last-Event-ID
+    JOB_STREAM_MAX_SECONDS: float = 900.0
+    # a new stream first replays jobs changed within this window
+    JOB_STREAM_REPLAY_SECONDS: int = 300
+    # Serialized GET /tests/{id} payloads: per-process LRU in front of Redis
+    TEST_DETAIL_CACHE_REDIS_URL: str | None = "redis://redis:6379/2"
+    TEST_DETAIL_CACHE_LOCAL_SIZE: int = 256
+    TEST_DETAIL_CACHE_TTL_SECONDS: int = 24 * 3600
+    PRINCIPAL_CACHE_REDIS_URL: str | None = "redis://redis:6379/2"
+    PRINCIPAL_CACHE_LOCAL_SIZE: int = 4096
+    PRINCIPAL_CACHE_LOCAL_TTL_SECONDS: int = 5
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    # unread-notification counts; None counts in SQL on every request
+    NOTIFICATION_COUNTER_REDIS_URL: str | None = "redis://redis:6379/2"
+    NOTIFICATION_COUNTER_TTL_SECONDS: int = 600
     STORAGE_BACKEND: str = "r2"  # options: "r2", "local"
     R2_ACCESS_KEY_ID: str | None = None
     R2_SECRET_ACCESS_KEY: str | None = None
@@ -32,6 +84,18 @@ class Settings(BaseSettings):
     R2_REGION: str = "auto"
     R2_PUBLIC_BASE_URL: str | None = None
     R2_PRESIGN_EXPIRATION: int = 3600
+    # downloads: "proxy" streams through the API, "redirect" sends clients
+    # that can follow it to a presigned R2 URL (see app/api/downloads.py)
+    DOWNLOAD_MODE: str = "proxy"  # options: "proxy", "redirect"
+    DOWNLOAD_PRESIGN_EXPIRATION_SECONDS: int = 300
+    # origins the bucket's CORS policy allows; fetch() from others is proxied
+    DOWNLOAD_REDIRECT_CORS_ORIGINS: list[str] = Field(default_factory=list)
+    DOWNLOAD_CHUNK_SIZE: int = 256 * 1024
+    # Brotli/gzip for JSON and text responses (app/middleware/compression.py)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_GZIP_LEVEL: int = 6
     RESEND_API_KEY: str | None = None
     EMAIL_FROM: str | None = None
     FRONTEND_BASE_URL: str | None = None
@@ -54,10 +118,50 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
     AUTO_CREATE_TABLES: bool = False
     SQL_ECHO: bool = True
+    # per-request / per-task SQL statistics (Server-Timing, N+1 warnings)
+    SQL_INSTRUMENTATION: bool = True
+    SQL_STATEMENT_BUDGET: int = 25
+    SQL_TASK_STATEMENT_BUDGET: int = 200
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+    # bearer token for the internal /metrics routes; unset disables them
+    METRICS_TOKEN: str | None = None
     SENTRY_DSN: str | None = None
     SENTRY_ENV: str = "production"
+    # tracing policy (SamplingPolicy in app/core/monitoring.py): failed and
+    # slow transactions are always kept, others at their route/task rate
+    SENTRY_TRACES_SAMPLE_RATE: float = 0.1
+    SENTRY_TRACES_SAMPLE_RATES: dict[str, float] = Field(
+        default_factory=lambda: {
+            "/tests/generate": 0.5,
+            "/materials/analyze-deep": 0.5,
+            "app.tasks.generate_test": 0.5,
+            "app.tasks.analyze_material": 0.5,
+            "app.tasks.process_material": 0.25,
+        }
+    )
+    SENTRY_SLOW_TRANSACTION_MS: float = 2000.0
+    # high-volume polling routes, sampled before anything is recorded
+    SENTRY_POLLING_ROUTES: list[str] = Field(
+        default_factory=lambda: [
+            "/jobs/{job_id}",
+            "/jobs/stream",
+            "/notifications/me/unread-count",
+            "/ping",
+            "/metrics/cache",
+            "/metrics/password-hashing",
+        ]
+    )
+    SENTRY_POLLING_SAMPLE_RATE: float = 0.01
+    SENTRY_PROFILES_SAMPLE_RATE: float = 0.05
     POSTHOG_API_KEY: str | None = None
     POSTHOG_HOST: str = "https://eu.i.posthog.com"
+    # transactional outbox (app/application/services/outbox_dispatcher.py)
+    OUTBOX_DISPATCH_INTERVAL_SECONDS: float = 5.0
+    OUTBOX_BATCH_SIZE: int = 200
+    OUTBOX_MAX_BATCHES_PER_RUN: int = 20
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    OUTBOX_RETRY_BASE_SECONDS: float = 10.0
+    OUTBOX_RETENTION_DAYS: int = 7
 
 
 @lru_cache
@@ -1,4 +1,9 @@
 import logging
+import random
+import re
+from collections.abc import Iterable, Mapping
+from datetime import datetime
+from typing import Any
 
 import sentry_sdk
 from sentry_sdk.integrations.celery import CeleryIntegration
@@ -6,17 +11,146 @@ from sentry_sdk.integrations.fastapi import FastApiIntegration
 from sentry_sdk.integrations.logging import LoggingIntegration
 from sentry_sdk.integrations.redis import RedisIntegration
 from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+from sentry_sdk.types import Event
 
 from app.core.config import get_settings
 
+_FAILED_STATUSES = frozenset({"internal_error", "unknown_error", "unknown"})
+_PATH_PARAM = re.compile(r"\\\{([^}]*)\\\}")
+
+
+class SamplingPolicy:
+    """Decides which API requests and Celery tasks end up as Sentry traces.
+
+    A trace continued from an upstream that already decided (the frontend,
+    or the request that queued a task) follows that decision: unsampled
+    parents are not recorded, and requests whose parent sampled them are
+    always kept. Polling endpoints (job status, unread count, health
+    checks) are sampled up front at ``polling_rate`` and otherwise not
+    recorded at all. Every other transaction is recorded and decided when
+    it finishes: failures and slow requests are always kept, the rest at
+    the rate configured for its route or task name, ``default_rate`` if
+    none is.
+    """
+
+    def __init__(
+        self,
+        *,
+        default_rate: float,
+        rates: Mapping[str, float],
+        polling: Iterable[str],
+        polling_rate: float,
+        slow_ms: float,
+    ) -> None:
+        self._default_rate = default_rate
+        self._rates = dict(rates)
+        self._polling = frozenset(polling)
+        self._polling_rate = polling_rate
+        self._slow_ms = slow_ms
+        # the sampler sees the raw path, before routing picked a template
+        self._templates = [
+            (re.compile(_PATH_PARAM.sub(_param_pattern, re.escape(name)) + "$"), name)
+            for name in sorted(self._polling | self._rates.keys())
+            if "{" in name
+        ]
+
+    def traces_sampler(self, sampling_context: dict[str, Any]) -> float:
+        parent_sampled = sampling_context.get("parent_sampled")
+        if parent_sampled is not None:
+            return 1.0 if parent_sampled else 0.0  # the caller already decided
+        name = self._name(sampling_context)
+        if name in self._polling:
+            return self._polling_rate
+        return 1.0
+
+    def before_send_transaction(
+        self, event: Event, hint: dict[str, Any]
+    ) -> Event | None:
+        _ = hint
+        trace = event.get("contexts", {}).get("trace", {})
+        if _failed(trace):
+            return event
+        if trace.get("op") == "http.server" and _duration_ms(event) >= self._slow_ms:
+            return event
+        name = self._route(str(event.get("transaction", "")))
+        if name in self._polling:
+            return event  # sampled before it was recorded
+        if trace.get("op") == "http.server" and _parent_sampled(trace):
+            return event  # the frontend sampled this trace; keep it whole
+        rate = self._rates.get(name, self._default_rate)
+        return event if random.random() < rate else None
+
+    def _name(self, sampling_context: dict[str, Any]) -> str:
+        celery_job = sampling_context.get("celery_job")
+        if celery_job:
+            return str(celery_job.get("task", ""))
+        asgi_scope = sampling_context.get("asgi_scope")
+        if asgi_scope:
+            return self._route(str(asgi_scope.get("path", "")))
+        context = sampling_context.get("transaction_context") or {}
+        return self._route(str(context.get("name", "")))
+
+    def _route(self, name: str) -> str:
+        if name in self._rates or name in self._polling:
+            return name
+        for pattern, template in self._templates:
+            if pattern.match(name):
+                return template
+        return name
+
+
+def _param_pattern(match: re.Match[str]) -> str:
+    # ids are integers, so "/jobs/{job_id}" does not swallow "/jobs/page"
+    return r"\d+" if match.group(1).endswith("id") else "[^/]+"
+
+
+def _failed(trace: dict[str, Any]) -> bool:
+    if trace.get("status") in _FAILED_STATUSES:
+        return True
+    status_code = trace.get("data", {}).get("http.response.status_code")
+    return isinstance(status_code, int) and status_code >= 500
+
+
+def _parent_sampled(trace: dict[str, Any]) -> bool:
+    # a continued trace whose head sampled it; the sampling context travels
+    # as baggage, the recorded parent_sampled flag does not
+    context = trace.get("dynamic_sampling_context") or {}
+    return bool(trace.get("parent_span_id")) and context.get("sampled") == "true"
+
+
+def _duration_ms(event: Event) -> float:
+    start = _timestamp(event.get("start_timestamp"))
+    end = _timestamp(event.get("timestamp"))
+    if start is None or end is None:
+        return 0.0
+    return (end - start) * 1000
+
+
+def _timestamp(value: Any) -> float | None:
+    if isinstance(value, int | float):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
 
 def init_sentry() -> None:
     settings = get_settings()
     if not settings.SENTRY_DSN:
         return
 
-    traces_sample_rate = 1.0
-    profiles_sample_rate = 1.0
+    policy = SamplingPolicy(
+        default_rate=settings.SENTRY_TRACES_SAMPLE_RATE,
+        rates=settings.SENTRY_TRACES_SAMPLE_RATES,
+        polling=settings.SENTRY_POLLING_ROUTES,
+        polling_rate=settings.SENTRY_POLLING_SAMPLE_RATE,
+        slow_ms=settings.SENTRY_SLOW_TRANSACTION_MS,
+    )
 
     sentry_sdk.init(
         dsn=settings.SENTRY_DSN,
@@ -31,8 +165,10 @@ def init_sentry() -> None:
                 event_level=logging.ERROR,  # Logi ERROR jako eventy w Sentry
             ),
         ],
-        traces_sample_rate=traces_sample_rate,
-        profiles_sample_rate=profiles_sample_rate,
+        traces_sampler=policy.traces_sampler,
+        before_send_transaction=policy.before_send_transaction,
+        # share of recorded transactions that are profiled; profiles of
+        # transactions dropped at the end are dropped with them
+        profiles_sample_rate=settings.SENTRY_PROFILES_SAMPLE_RATE,
         send_default_pii=False,  # Nie wysyłaj wrażliwych danych (np. haseł)
     )
-
@@ -0,0 +1,196 @@
+"""Bounded executor for bcrypt so hashing bursts cannot starve other requests.
+
+Hashing runs on a fixed pool (threads by default; bcrypt releases the GIL,
+a process pool is available for CPU isolation). Callers block on the result,
+so at most ``max_workers + max_queue`` request threads wait on hashing at a
+time; beyond that ``PasswordHashingBusyError`` is raised and the API answers 503
+instead of queueing without bound.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, TypeVar
+
+from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class PasswordHashingBusyError(RuntimeError):
+    """The hashing queue is full; the caller should retry later."""
+
+
+@lru_cache
+def crypt_context(rounds: int) -> CryptContext:
+    # min_rounds == default: hashes made with a lower cost need an update
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+    )
+
+
+def _hash(password: str, rounds: int) -> str:
+    return crypt_context(rounds).hash(password)
+
+
+def _verify(password: str, hashed: str, rounds: int) -> bool:
+    return crypt_context(rounds).verify(password, hashed)
+
+
+@dataclass(slots=True)
+class HashingStats:
+    submitted: int = 0
+    completed: int = 0
+    rejected: int = 0
+    background_dropped: int = 0
+    wait_seconds: float = 0.0  # queued + hashing, summed over completed calls
+    max_wait_seconds: float = 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "background_dropped": self.background_dropped,
+            "avg_wait_ms": (
+                round(self.wait_seconds / self.completed * 1000, 2)
+                if self.completed
+                else 0.0
+            ),
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+        }
+
+
+class PasswordHashingExecutor:
+    def __init__(
+        self,
+        *,
+        rounds: int = 12,
+        max_workers: int = 2,
+        max_queue: int = 16,
+        use_processes: bool = False,
+        max_background: int = 64,
+    ) -> None:
+        self._rounds = rounds
+        self._max_workers = max(1, max_workers)
+        self._max_in_flight = self._max_workers + max(0, max_queue)
+        self._max_background = max(1, max_background)
+        self._use_processes = use_processes
+        self._executor: Executor | None = None
+        self._background: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._background_pending = 0
+        self._stats = HashingStats()
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password, self._rounds)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self._run(_verify, password, hashed, self._rounds)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return crypt_context(self._rounds).needs_update(hashed)
+
+    def submit_background(self, fn: Callable[[], None]) -> bool:
+        """Run ``fn`` (e.g. a rehash) off the request; dropped when backlogged."""
+        with self._lock:
+            if self._background_pending >= self._max_background:
+                self._stats.background_dropped += 1
+                return False
+            self._background_pending += 1
+            if self._background is None:
+                self._background = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="password-background"
+                )
+            background = self._background
+        background.submit(self._run_background, fn)
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats.snapshot(),
+                "in_flight": self._in_flight,
+                "queued": max(0, self._in_flight - self._max_workers),
+                "max_workers": self._max_workers,
+                "max_in_flight": self._max_in_flight,
+                "background_pending": self._background_pending,
+                "rounds": self._rounds,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executors = [self._executor, self._background]
+            self._executor = self._background = None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self._in_flight >= self._max_in_flight:
+                self._stats.rejected += 1
+                rejected = True
+            else:
+                rejected = False
+                self._in_flight += 1
+                self._stats.submitted += 1
+                executor = self._get_executor()
+        if rejected:
+            logger.warning(
+                "Password hashing queue full (%d in flight), shedding request",
+                self._max_in_flight,
+            )
+            raise PasswordHashingBusyError("Password hashing queue is full")
+
+        started = time.perf_counter()
+        try:
+            return executor.submit(fn, *args).result()
+        finally:
+            waited = time.perf_counter() - started
+            with self._lock:
+                self._in_flight -= 1
+                self._stats.completed += 1
+                self._stats.wait_seconds += waited
+                self._stats.max_wait_seconds = max(self._stats.max_wait_seconds, waited)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self._use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    def _run_background(self, fn: Callable[[], None]) -> None:
+        try:
+            fn()
+        except PasswordHashingBusyError:
+            logger.info("Background password task skipped: hashing queue full")
+        except Exception:
+            logger.exception("Background password task failed")
+        finally:
+            with self._lock:
+                self._background_pending -= 1
+
+
+__all__ = [
+    "HashingStats",
+    "PasswordHashingBusyError",
+    "PasswordHashingExecutor",
+    "crypt_context",
+]
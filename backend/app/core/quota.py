@@ -0,0 +1,350 @@
+"""Token-weighted quotas for LLM-backed endpoints.
+
+Requests are charged their estimated token cost up front; workers settle
+the difference once the model reports actual usage. Each user has a
+per-minute and a per-day budget. Counters live in Redis (fixed windows),
+but most checks are answered in-process: a local token bucket absorbs
+bursts and charges are pushed to Redis in batches every
+``sync_interval_seconds``. A user close to a limit is synced on every
+request, so the final decision uses fresh totals. Without Redis the local
+buckets still cap what one process lets through.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any
+
+from cachetools import TTLCache
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_REDIS_RETRY_AFTER_SECONDS = 30.0
+_MINUTE_KEY_TTL = 120
+_DAY_KEY_TTL = 2 * 24 * 3600
+
+# rough cost model; settlement replaces it with reported usage
+BASE_REQUEST_TOKENS = 1_500
+TOKENS_PER_SOURCE_PAGE = 600
+TOKENS_PER_ANALYZED_PAGE = 800
+TOKENS_PER_QUESTION = 400
+CHARS_PER_TOKEN = 4
+DEFAULT_SOURCE_PAGES = 10
+
+
+def estimate_generation_cost(*, pages: int = 0, chars: int = 0, questions: int) -> int:
+    source = pages * TOKENS_PER_SOURCE_PAGE + chars // CHARS_PER_TOKEN
+    return BASE_REQUEST_TOKENS + source + questions * TOKENS_PER_QUESTION
+
+
+def estimate_question_cost(questions: int) -> int:
+    """Regenerating, converting or varying ``questions`` existing questions."""
+    return BASE_REQUEST_TOKENS + max(1, questions) * TOKENS_PER_QUESTION * 2
+
+
+def estimate_analysis_cost(pages: int) -> int:
+    return BASE_REQUEST_TOKENS + max(1, pages) * TOKENS_PER_ANALYZED_PAGE
+
+
+@dataclass(slots=True)
+class QuotaDecision:
+    allowed: bool
+    cost: int
+    remaining_minute: int
+    remaining_day: int
+    retry_after: int = 0  # seconds, when not allowed
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "X-Quota-Cost": str(self.cost),
+            "X-Quota-Remaining": str(max(0, self.remaining_day)),
+            "X-Quota-Remaining-Minute": str(max(0, self.remaining_minute)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+
+@dataclass(slots=True)
+class _UserState:
+    tokens: float  # local per-minute bucket
+    refilled_at: float
+    minute: int = 0
+    minute_total: int = 0  # last known totals in Redis
+    day: str = ""
+    day_total: int = 0
+    pending: int = 0  # charged here, not yet pushed to Redis
+    synced_at: float = float("-inf")
+
+
+class QuotaEngine:
+    def __init__(
+        self,
+        *,
+        redis_url: str | None,
+        tokens_per_minute: int,
+        tokens_per_day: int,
+        sync_interval_seconds: float = 1.0,
+        sync_threshold: float = 0.8,
+        max_users: int = 10_000,
+    ) -> None:
+        self._per_minute = max(1, tokens_per_minute)
+        self._per_day = max(1, tokens_per_day)
+        self._refill_rate = self._per_minute / 60.0
+        self._sync_interval = sync_interval_seconds
+        self._sync_threshold = sync_threshold
+        self._states: TTLCache[int, _UserState] = TTLCache(
+            maxsize=max(1, max_users), ttl=3600
+        )
+        self._lock = threading.Lock()
+        self._flushed_at = time.monotonic()
+        self._redis: Any = None
+        self._redis_down_until = 0.0
+        if redis_url:
+            import redis
+
+            self._redis = redis.Redis.from_url(
+                redis_url, socket_timeout=0.25, socket_connect_timeout=0.25
+            )
+
+    def charge(self, user_id: int, cost: int) -> QuotaDecision:
+        cost = max(0, cost)
+        # a request larger than the minute budget drains it but can pass
+        minute_cost = min(cost, self._per_minute)
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(user_id, now)
+            if state.tokens < minute_cost:
+                wait = (minute_cost - state.tokens) / self._refill_rate
+                return self._reject(state, cost, math.ceil(wait))
+            stale = now - state.synced_at >= self._sync_interval
+            redis_usable = self._redis_usable()
+            known_day = state.day_total + state.pending
+            over_day = known_day + cost > self._per_day
+            # a stale total may predate refunds settled by other processes
+            if over_day and not (stale and redis_usable):
+                return self._reject(state, cost, _seconds_to_midnight())
+            near_limit = (
+                over_day
+                or known_day + cost >= self._sync_threshold * self._per_day
+                or state.minute_total + state.pending + minute_cost
+                >= self._sync_threshold * self._per_minute
+            )
+            must_sync = redis_usable and (near_limit or stale)
+            state.tokens -= minute_cost
+            if not must_sync:
+                state.pending += cost
+                flush_due = now - self._flushed_at >= self._sync_interval
+                decision = self._decision(state, cost)
+        if not must_sync:
+            if flush_due:
+                self.flush()
+            return decision
+        return self._charge_synced(user_id, cost, minute_cost)
+
+    def settle(self, user_id: int, charged: int | None, actual: int | None) -> None:
+        """Replace an up-front estimate with the usage the model reported."""
+        if charged is None or actual is None:
+            return
+        delta = actual - charged
+        if delta == 0:
+            return
+        with self._lock:
+            state = self._states.get(user_id)
+            if state is not None:
+                state.day_total += delta
+        if not self._redis_usable():
+            return
+        try:
+            key = self._day_key(user_id, _today())
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.incrby(key, delta)
+            pipe.expire(key, _DAY_KEY_TTL)
+            pipe.execute()
+        except Exception as exc:
+            self._redis_failed("settle", exc)
+
+    def refund(self, user_id: int, charged: int) -> None:
+        self.settle(user_id, charged, 0)
+
+    def flush(self) -> None:
+        """Push locally accumulated charges to Redis in one pipeline."""
+        self._sync(None)
+
+    def _charge_synced(
+        self, user_id: int, cost: int, minute_cost: int
+    ) -> QuotaDecision:
+        totals = self._sync((user_id, cost))
+        with self._lock:
+            state = self._state(user_id, time.monotonic())
+            if totals is None:  # Redis failed: trust the local bucket
+                state.pending += cost
+                return self._decision(state, cost)
+            minute_total, day_total = totals
+            # earlier spending in this window plus this request's share
+            over_minute = minute_total - cost + minute_cost > self._per_minute
+            over_day = day_total > self._per_day
+            if not (over_minute or over_day):
+                return self._decision(state, cost)
+            state.tokens += minute_cost
+            state.minute_total -= cost
+            state.day_total -= cost
+        self._undo(user_id, cost)
+        retry_after = _seconds_to_midnight() if over_day else 60 - int(time.time()) % 60
+        return self._reject(state, cost, retry_after)
+
+    def _sync(self, extra: tuple[int, int] | None) -> tuple[int, int] | None:
+        """Flush pending charges (plus ``extra``); returns ``extra``'s totals."""
+        if not self._redis_usable():
+            return None
+        with self._lock:
+            self._flushed_at = time.monotonic()
+            batch = {
+                user_id: state.pending
+                for user_id, state in self._states.items()
+                if state.pending
+            }
+            for user_id in batch:
+                self._states[user_id].pending = 0
+        if extra is not None:
+            batch[extra[0]] = batch.get(extra[0], 0) + extra[1]
+        if not batch:
+            return None
+        minute, day = int(time.time() // 60), _today()
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for user_id, amount in batch.items():
+                minute_key = self._minute_key(user_id, minute)
+                day_key = self._day_key(user_id, day)
+                pipe.incrby(minute_key, amount)
+                pipe.expire(minute_key, _MINUTE_KEY_TTL)
+                pipe.incrby(day_key, amount)
+                pipe.expire(day_key, _DAY_KEY_TTL)
+            results = pipe.execute()
+        except Exception as exc:
+            self._redis_failed("sync", exc)
+            with self._lock:
+                for user_id, amount in batch.items():
+                    if extra is not None and user_id == extra[0]:
+                        amount -= extra[1]
+                    state = self._states.get(user_id)
+                    if state is not None:
+                        state.pending += amount
+            return None
+        synced_at = time.monotonic()
+        with self._lock:
+            for index, user_id in enumerate(batch):
+                state = self._states.get(user_id)
+                if state is not None:
+                    state.minute_total = int(results[index * 4])
+                    state.day_total = int(results[index * 4 + 2])
+                    state.synced_at = synced_at
+        if extra is None:
+            return None
+        index = list(batch).index(extra[0])
+        return int(results[index * 4]), int(results[index * 4 + 2])
+
+    def _undo(self, user_id: int, cost: int) -> None:
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.decrby(self._minute_key(user_id, int(time.time() // 60)), cost)
+            pipe.decrby(self._day_key(user_id, _today()), cost)
+            pipe.execute()
+        except Exception as exc:
+            self._redis_failed("undo", exc)
+
+    def _state(self, user_id: int, now: float) -> _UserState:
+        state = self._states.get(user_id)
+        if state is None:
+            state = _UserState(tokens=float(self._per_minute), refilled_at=now)
+            self._states[user_id] = state
+        else:
+            elapsed = now - state.refilled_at
+            state.tokens = min(
+                float(self._per_minute), state.tokens + elapsed * self._refill_rate
+            )
+            state.refilled_at = now
+        minute, day = int(time.time() // 60), _today()
+        if state.minute != minute:
+            state.minute, state.minute_total = minute, 0
+        if state.day != day:
+            state.day, state.day_total = day, 0
+        return state
+
+    def _decision(self, state: _UserState, cost: int) -> QuotaDecision:
+        return QuotaDecision(
+            allowed=True,
+            cost=cost,
+            remaining_minute=self._remaining_minute(state),
+            remaining_day=self._per_day - state.day_total - state.pending,
+        )
+
+    def _reject(self, state: _UserState, cost: int, retry_after: int) -> QuotaDecision:
+        return QuotaDecision(
+            allowed=False,
+            cost=cost,
+            remaining_minute=self._remaining_minute(state),
+            remaining_day=self._per_day - state.day_total - state.pending,
+            retry_after=max(1, retry_after),
+        )
+
+    def _remaining_minute(self, state: _UserState) -> int:
+        shared = self._per_minute - state.minute_total - state.pending
+        return int(min(state.tokens, shared))
+
+    def _redis_usable(self) -> bool:
+        return self._redis is not None and time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, operation: str, exc: Exception) -> None:
+        self._redis_down_until = time.monotonic() + _REDIS_RETRY_AFTER_SECONDS
+        logger.warning("Quota engine: Redis %s failed: %s", operation, exc)
+
+    @staticmethod
+    def _minute_key(user_id: int, minute: int) -> str:
+        return f"quota:{user_id}:m:{minute}"
+
+    @staticmethod
+    def _day_key(user_id: int, day: str) -> str:
+        return f"quota:{user_id}:d:{day}"
+
+
+def _today() -> str:
+    return datetime.utcnow().strftime("%Y%m%d")
+
+
+def _seconds_to_midnight() -> int:
+    now = datetime.utcnow()
+    midnight = (now + timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return int((midnight - now).total_seconds()) + 1
+
+
+@lru_cache
+def get_quota_engine() -> QuotaEngine:
+    settings = get_settings()
+    return QuotaEngine(
+        redis_url=settings.QUOTA_REDIS_URL,
+        tokens_per_minute=settings.QUOTA_TOKENS_PER_MINUTE,
+        tokens_per_day=settings.QUOTA_TOKENS_PER_DAY,
+        sync_interval_seconds=settings.QUOTA_SYNC_INTERVAL_SECONDS,
+    )
+
+
+__all__ = [
+    "DEFAULT_SOURCE_PAGES",
+    "QuotaDecision",
+    "QuotaEngine",
+    "estimate_analysis_cost",
+    "estimate_generation_cost",
+    "estimate_question_cost",
+    "get_quota_engine",
+]
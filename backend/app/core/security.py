@@ -1,25 +1,47 @@
+from collections.abc import Callable, MutableMapping
 from datetime import datetime, timedelta
-from typing import Annotated, Any, cast
+from functools import lru_cache
+from typing import Annotated, Any
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlmodel import Session, select
+from sqlmodel import select
 
 from app.core.config import get_settings
+from app.core.password_hashing import PasswordHashingExecutor
 from app.db.models import User
-from app.db.session import get_session
+from app.db.session import get_async_session_factory, get_session_factory
+from app.domain.models import Principal
+from app.infrastructure.cache.principal_cache import TieredPrincipalCache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@lru_cache
+def get_password_hashing_executor() -> PasswordHashingExecutor:
+    settings = get_settings()
+    return PasswordHashingExecutor(
+        rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+        max_workers=settings.PASSWORD_HASH_WORKERS,
+        max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+        use_processes=settings.PASSWORD_HASH_USE_PROCESSES,
+    )
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_password_hashing_executor().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_password_hashing_executor().hash(password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    return get_password_hashing_executor().needs_rehash(hashed_password)
+
+
+def run_password_task_in_background(task: Callable[[], None]) -> bool:
+    """Run ``task`` off the request path; False if the backlog is full."""
+    return get_password_hashing_executor().submit_background(task)
 
 
 # JWT
@@ -48,46 +70,153 @@ def decode_access_token(token: str) -> dict[str, Any]:
         return {}
 
 
+_CLAIMS_STATE_KEY = "access_token_claims"
+
+
+def access_token_claims(scope: MutableMapping[str, Any], token: str) -> dict[str, Any]:
+    """``decode_access_token`` at most once per request.
+
+    The result is kept in the ASGI scope state, so middleware that reads the
+    token (Sentry user context) and the auth dependencies share one decode.
+    """
+    state = scope.setdefault("state", {})
+    cached = state.get(_CLAIMS_STATE_KEY)
+    if cached is not None and cached[0] == token:
+        return cached[1]
+    claims = decode_access_token(token)
+    state[_CLAIMS_STATE_KEY] = (token, claims)
+    return claims
+
+
 # OAuth2 + User retrieval
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 
-def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Annotated[Session, Depends(get_session)],
-) -> User:
-    credentials_exception = HTTPException(
+@lru_cache
+def get_principal_cache() -> TieredPrincipalCache:
+    settings = get_settings()
+    return TieredPrincipalCache(
+        redis_url=settings.PRINCIPAL_CACHE_REDIS_URL,
+        local_size=settings.PRINCIPAL_CACHE_LOCAL_SIZE,
+        local_ttl_seconds=settings.PRINCIPAL_CACHE_LOCAL_TTL_SECONDS,
+        ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    )
+
+
+def _token_identity(
+    token: str, scope: MutableMapping[str, Any] | None = None
+) -> tuple[int | None, str | None]:
+    """(user id, email) claims; tokens issued before ``uid`` carry only email."""
+    payload = (
+        decode_access_token(token)
+        if scope is None
+        else access_token_claims(scope, token)
+    )
+    uid = payload.get("uid")
+    email = payload.get("sub")
+    return (
+        uid if isinstance(uid, int) else None,
+        email if isinstance(email, str) else None,
+    )
+
+
+def _principal_stmt(user_id: int | None, email: str | None) -> Any:
+    stmt = select(User.id, User.email, User.terms_accepted)
+    if user_id is not None:
+        return stmt.where(User.id == user_id)
+    return stmt.where(User.email == email)
+
+
+def _to_principal(row: Any) -> Principal | None:
+    if row is None:
+        return None
+    return Principal(id=row[0], email=row[1], terms_accepted=row[2])
+
+
+def resolve_principal(
+    token: str, scope: MutableMapping[str, Any] | None = None
+) -> Principal | None:
+    """Principal of a valid token: the cache first, the user row on a miss.
+
+    Pass the request's ASGI ``scope`` to reuse claims decoded earlier.
+    """
+    user_id, email = _token_identity(token, scope)
+    if user_id is None and email is None:
+        return None
+    cache = get_principal_cache()
+    if user_id is not None:
+        cached = cache.get(user_id)
+        if cached is not None:
+            return cached
+    with get_session_factory()() as db:
+        row = db.exec(_principal_stmt(user_id, email)).first()
+    principal = _to_principal(row)
+    if principal is not None:
+        cache.set(principal)
+    return principal
+
+
+async def resolve_principal_async(
+    token: str, scope: MutableMapping[str, Any] | None = None
+) -> Principal | None:
+    """``resolve_principal`` on the async engine and cache client."""
+    user_id, email = _token_identity(token, scope)
+    if user_id is None and email is None:
+        return None
+    cache = get_principal_cache()
+    if user_id is not None:
+        cached = await cache.get_async(user_id)
+        if cached is not None:
+            return cached
+    async with get_async_session_factory()() as db:
+        row = (await db.exec(_principal_stmt(user_id, email))).first()
+    principal = _to_principal(row)
+    if principal is not None:
+        await cache.set_async(principal)
+    return principal
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    payload = decode_access_token(token)
-    email: str | None = payload.get("sub") if payload else None
-    if email is None:
-        raise credentials_exception
 
-    stmt = select(User).where(User.email == email)
-    user = db.exec(cast(Any, stmt)).first()
 
-    if user is None:
-        raise credentials_exception
+def get_current_user(
+    request: Request,
+    token: Annotated[str, Depends(oauth2_scheme)],
+) -> Principal:
+    principal = resolve_principal(token, request.scope)
+    if principal is None:
+        raise _credentials_exception()
+
+    # read-your-writes: ReadYourWritesMiddleware marks this user after writes
+    request.state.principal_id = principal.id
+    return principal
+
+
+async def get_current_user_async(
+    request: Request,
+    token: Annotated[str, Depends(oauth2_scheme)],
+) -> Principal:
+    """``get_current_user`` for ``async def`` endpoints (asyncpg, no thread hop)."""
+    principal = await resolve_principal_async(token, request.scope)
+    if principal is None:
+        raise _credentials_exception()
+
+    request.state.principal_id = principal.id
+    return principal
 
-    return cast(User, user)
 
 def get_optional_current_user(
     token: Annotated[str | None, Depends(oauth2_scheme_optional)],
-    db: Annotated[Session, Depends(get_session)],
-) -> User | None:
+) -> Principal | None:
     if not token:
         return None
     try:
-        payload = decode_access_token(token)
-        email: str | None = payload.get("sub") if payload else None
-        if email is None:
-            return None
-        stmt = select(User).where(User.email == email)
-        user = db.exec(cast(Any, stmt)).first()
-        return cast(User, user)
+        return resolve_principal(token)
     except Exception:
         return None
@@ -0,0 +1,193 @@
+"""Per-request / per-task SQL statistics from SQLAlchemy engine events.
+
+``track_sql()`` opens a scope (HTTP request, Celery task, a service call in
+a test); every statement executed inside it, on any instrumented engine and
+in any thread or greenlet that inherited the context, is counted and timed.
+Statements are grouped by shape (literals and IN lists collapsed), so the
+same query repeated once per row shows up as an N+1 candidate.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_PLACEHOLDER_LIST = re.compile(r"%\(\w+\)s(?:\s*,\s*%\(\w+\)s)+")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|\$\d+|\?")
+_WHITESPACE = re.compile(r"\s+")
+_START_KEY = "_sql_instrumentation_started"
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[SqlStats | None] = ContextVar("sql_stats", default=None)
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with bind parameters and IN lists collapsed to ``?``."""
+    shape = _PLACEHOLDER_LIST.sub("?", statement)
+    shape = _PLACEHOLDER.sub("?", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass(slots=True)
+class SqlStats:
+    count: int = 0
+    duration: float = 0.0  # seconds spent waiting on the database
+    shapes: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration * 1000
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Shapes executed at least ``threshold`` times (N+1 suspects)."""
+        return [(s, n) for s, n in self.shapes.most_common() if n >= threshold]
+
+    def log_fields(self, n_plus_one_threshold: int) -> dict[str, Any]:
+        repeated = self.repeated(n_plus_one_threshold)
+        return {
+            "sql_count": self.count,
+            "sql_ms": round(self.duration_ms, 2),
+            "sql_distinct": len(self.shapes),
+            "sql_n_plus_one": [
+                {"count": n, "statement": shape[:200]} for shape, n in repeated
+            ],
+        }
+
+
+def current_sql_stats() -> SqlStats | None:
+    return _current.get()
+
+
+def start_sql_tracking() -> tuple[SqlStats, Token[SqlStats | None]]:
+    """Begin a scope whose end is signalled separately (Celery task signals)."""
+    stats = SqlStats()
+    return stats, _current.set(stats)
+
+
+def stop_sql_tracking(token: Token[SqlStats | None]) -> None:
+    _current.reset(token)
+
+
+@contextmanager
+def track_sql() -> Iterator[SqlStats]:
+    """Collect statistics for statements executed inside the block."""
+    stats, token = start_sql_tracking()
+    try:
+        yield stats
+    finally:
+        stop_sql_tracking(token)
+
+
+@contextmanager
+def assert_sql_budget(
+    max_statements: int, *, max_repeats: int | None = None
+) -> Iterator[SqlStats]:
+    """Fail if the block exceeds ``max_statements`` or repeats a statement shape
+    more than ``max_repeats`` times; use around a service call in tests.
+    """
+    with track_sql() as stats:
+        yield stats
+    repeated = stats.repeated(max_repeats + 1) if max_repeats is not None else []
+    if stats.count <= max_statements and not repeated:
+        return
+    listing = "\n".join(
+        f"  {n}x {shape[:160]}" for shape, n in stats.shapes.most_common()
+    )
+    raise AssertionError(
+        f"SQL budget exceeded: {stats.count} statements (max {max_statements})"
+        + (f", repeated shapes (max {max_repeats}x)" if repeated else "")
+        + f":\n{listing}"
+    )
+
+
+def report_sql_stats(
+    stats: SqlStats,
+    *,
+    scope: str,
+    budget: int,
+    n_plus_one_threshold: int,
+    extra: dict[str, Any] | None = None,
+) -> None:
+    """Warn about scopes over the statement budget or with N+1 patterns."""
+    fields = {
+        "sql_scope": scope,
+        **stats.log_fields(n_plus_one_threshold),
+        **(extra or {}),
+    }
+    if stats.count > budget or fields["sql_n_plus_one"]:
+        logger.warning(
+            "SQL %s: %d statements in %.1f ms (%d repeated shapes)",
+            scope,
+            stats.count,
+            stats.duration_ms,
+            len(fields["sql_n_plus_one"]),
+            extra=fields,
+        )
+    elif logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "SQL %s: %d statements in %.1f ms",
+            scope,
+            stats.count,
+            stats.duration_ms,
+            extra=fields,
+        )
+
+
+def _before_cursor_execute(
+    conn: Any, _cursor: Any, _statement: str, _params: Any, _context: Any, _many: bool
+) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Any, _cursor: Any, statement: str, _params: Any, _context: Any, _many: bool
+) -> None:
+    stats = _current.get()
+    starts = conn.info.get(_START_KEY)
+    if stats is None or not starts:
+        return
+    stats.duration += time.perf_counter() - starts.pop()
+    stats.count += 1
+    stats.shapes[statement_shape(statement)] += 1
+
+
+def _handle_error(context: Any) -> None:
+    # a failed statement never reaches after_cursor_execute
+    conn = context.connection
+    starts = conn.info.get(_START_KEY) if conn is not None else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine: Engine) -> Engine:
+    """Attach the listeners once; outside ``track_sql()`` they are no-ops."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+    return engine
+
+
+__all__ = [
+    "SqlStats",
+    "assert_sql_budget",
+    "current_sql_stats",
+    "instrument_engine",
+    "report_sql_stats",
+    "start_sql_tracking",
+    "statement_shape",
+    "stop_sql_tracking",
+    "track_sql",
+]
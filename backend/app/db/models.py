@@ -1,8 +1,8 @@
 from datetime import datetime
 from enum import StrEnum
-from typing import Optional
+from typing import Any, Optional
 
-from sqlalchemy import Column, ForeignKey, Integer, Text, text
+from sqlalchemy import BigInteger, Column, ForeignKey, Index, Integer, Text, text
 from sqlalchemy import Enum as SAEnum
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Field, Relationship, SQLModel
@@ -68,10 +68,20 @@ class PasswordResetToken(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
 
 class Test(SQLModel, table=True):
+    # keyset pagination of list views: owner_id = ? ORDER BY created_at, id DESC
+    __table_args__ = (
+        Index("ix_test_owner_created_id", "owner_id", "created_at", "id"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     owner_id: int = Field(foreign_key="user.id", index=True)
     title: str | None = Field(default="Nowy test")
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # bumped on every content change; keys the test detail cache and ETag
+    revision: int = Field(
+        default=0,
+        sa_column=Column("revision", Integer, nullable=False, server_default=text("0")),
+    )
 
     owner: User | None = Relationship(back_populates="tests")
     question_groups: list["QuestionGroup"] = Relationship(
@@ -216,6 +226,18 @@ class SupportStatus(StrEnum):
     resolved = "resolved"
 
 class Material(SQLModel, table=True):
+    # keyset pagination of list views: owner_id = ? ORDER BY created_at, id DESC
+    # newest material per checksum (list de-dup) and duplicate lookup on delete
+    __table_args__ = (
+        Index("ix_material_owner_created_id", "owner_id", "created_at", "id"),
+        Index(
+            "ix_material_owner_checksum_created",
+            "owner_id",
+            "checksum",
+            text("created_at DESC"),
+        ),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     owner_id: int = Field(
         sa_column=Column(
@@ -256,8 +278,12 @@ class Material(SQLModel, table=True):
         default=None, sa_column=Column(SAEnum(RoutingTier), index=True)
     )
     analysis_version: str | None = Field(default=None, max_length=50)
+    analysis_pipeline: str | None = Field(default=None, max_length=20)
     markdown_twin: str | None = Field(default=None, sa_column=Column(Text))
     thumbnail_path: str | None = Field(default=None)
+    thumbnails: dict | None = Field(
+        default=None, sa_column=Column(JSONB, nullable=True)
+    )
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
 
     owner: User | None = Relationship(back_populates="materials")
@@ -265,6 +291,11 @@ class Material(SQLModel, table=True):
 
 
 class Job(SQLModel, table=True):
+    # keyset pagination of list views: owner_id = ? ORDER BY created_at, id DESC
+    __table_args__ = (
+        Index("ix_job_owner_created_id", "owner_id", "created_at", "id"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     owner_id: int = Field(
         sa_column=Column(
@@ -279,6 +310,19 @@ class Job(SQLModel, table=True):
     payload: dict = Field(default_factory=dict, sa_column=Column(JSONB))
     result: dict | None = Field(default=None, sa_column=Column(JSONB, nullable=True))
     error: str | None = Field(default=None)
+    # copied from payload/result so lookups by test or material hit an index
+    test_id: int | None = Field(
+        default=None,
+        sa_column=Column(
+            Integer, ForeignKey("test.id", ondelete="SET NULL"), index=True
+        ),
+    )
+    material_id: int | None = Field(
+        default=None,
+        sa_column=Column(
+            Integer, ForeignKey("material.id", ondelete="SET NULL"), index=True
+        ),
+    )
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     updated_at: datetime = Field(default_factory=datetime.utcnow, index=True)
 
@@ -313,9 +357,49 @@ class OcrCache(SQLModel, table=True):
     result_ref: str
     cache_key: str = Field(index=True, unique=True, max_length=64)
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
+def _counter() -> Any:
+    # 0 in Python and as the column DEFAULT, which the migrations declare
+    return Field(default=0, sa_column_kwargs={"server_default": text("0")})
+
+
+class UserStats(SQLModel, table=True):
+    """Read model for the dashboard; maintained by the test/file repositories."""
+
+    __tablename__ = "user_stats"
+
+    user_id: int = Field(
+        sa_column=Column(
+            Integer, ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+        )
+    )
+    total_tests: int = _counter()
+    total_questions: int = _counter()
+    total_files: int = _counter()
+    closed_questions: int = _counter()
+    open_questions: int = _counter()
+    easy_questions: int = _counter()
+    medium_questions: int = _counter()
+    hard_questions: int = _counter()
+    last_test_created_at: datetime | None = Field(default=None)
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column_kwargs={"server_default": text("now()")},
+    )
+
+
 class SystemNotification(SQLModel, table=True):
     __tablename__ = "system_notifications"
-    
+    __table_args__ = (
+        Index(
+            "ix_system_notifications_recipient_created",
+            "recipient_id",
+            "created_at",
+            "id",
+        ),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     title: str = Field(max_length=200)
     message: str 
@@ -381,3 +465,34 @@ class SupportTicket(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow, index=True)
 
     user: User | None = Relationship()
+
+
+class OutboxEvent(SQLModel, table=True):
+    """Transactional outbox: domain events written with the change that
+    raised them, delivered by the dispatcher task (app/tasks/outbox.py)."""
+
+    __tablename__ = "outbox_events"
+    # the dispatcher's scan: due, unprocessed events in id order
+    __table_args__ = (
+        Index(
+            "ix_outbox_events_pending",
+            "available_at",
+            "id",
+            postgresql_where=text("processed_at IS NULL"),
+        ),
+    )
+
+    id: int | None = Field(
+        default=None, sa_column=Column(BigInteger, primary_key=True, autoincrement=True)
+    )
+    event_type: str = Field(max_length=100)
+    payload: dict = Field(default_factory=dict, sa_column=Column(JSONB))
+    occurred_at: datetime = Field(default_factory=datetime.utcnow)
+    available_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column_kwargs={"server_default": text("now()")},
+    )
+    attempts: int = _counter()
+    last_error: str | None = Field(default=None)
+    # set once delivered, or given up after OUTBOX_MAX_ATTEMPTS (last_error kept)
+    processed_at: datetime | None = Field(default=None, index=True)
@@ -0,0 +1,141 @@
+"""Routes read-only units of work to the replica when it is fresh enough."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import text
+
+from app.infrastructure.cache.recent_writes import RecentWriteTracker
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind. An idle replica that replayed everything it
+# received is not lagging even if its last replayed commit is old; on a
+# primary (e.g. the same instance under a second URL) this is 0.
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """
+)
+
+
+class ReplicaRouter:
+    """Chooses primary or replica session factories for read-only work.
+
+    The replica is used only while its measured lag is within
+    ``max_lag_seconds`` (re-measured at most every ``check_interval_seconds``)
+    and the principal has not written recently (read-your-writes).
+    """
+
+    def __init__(
+        self,
+        *,
+        primary: Callable[[], Any],
+        replica: Callable[[], Any] | None,
+        replica_engine: Any = None,
+        async_primary: Callable[[], Any] | None = None,
+        async_replica: Callable[[], Any] | None = None,
+        async_replica_engine: Any = None,
+        recent_writes: RecentWriteTracker | None = None,
+        max_lag_seconds: float = 2.0,
+        check_interval_seconds: float = 1.0,
+    ) -> None:
+        self._primary = primary
+        self._replica = replica
+        self._replica_engine = replica_engine
+        self._async_primary = async_primary
+        self._async_replica = async_replica
+        self._async_replica_engine = async_replica_engine
+        self._recent_writes = recent_writes
+        self._max_lag_seconds = max_lag_seconds
+        self._check_interval_seconds = check_interval_seconds
+        self._lock = threading.Lock()
+        self._async_lock: asyncio.Lock | None = None
+        self._checked_at = float("-inf")
+        self._fresh = False
+
+    @property
+    def recent_writes(self) -> RecentWriteTracker | None:
+        return self._recent_writes
+
+    def mark_write(self, user_id: int) -> None:
+        if self._recent_writes is not None:
+            self._recent_writes.mark(user_id)
+
+    def read_session_factory(self, principal_id: int | None) -> Callable[[], Any]:
+        if self._replica is None:
+            return self._primary
+        if principal_id is not None and self._recent_writes is not None:
+            if self._recent_writes.is_recent(principal_id):
+                return self._primary
+        return self._replica if self._replica_is_fresh() else self._primary
+
+    async def read_session_factory_async(
+        self, principal_id: int | None
+    ) -> Callable[[], Any]:
+        if self._async_primary is None:
+            raise RuntimeError("Async session factory is not configured")
+        if self._async_replica is None:
+            return self._async_primary
+        if principal_id is not None and self._recent_writes is not None:
+            if await self._recent_writes.is_recent_async(principal_id):
+                return self._async_primary
+        fresh = await self._replica_is_fresh_async()
+        return self._async_replica if fresh else self._async_primary
+
+    def _replica_is_fresh(self) -> bool:
+        if not self._should_check():
+            return self._fresh
+        with self._lock:
+            if not self._should_check():
+                return self._fresh
+            lag: float | None = None
+            try:
+                with self._replica_engine.connect() as conn:
+                    lag = float(conn.execute(REPLICA_LAG_SQL).scalar() or 0)
+            except Exception as exc:
+                logger.warning("Replica lag check failed: %s", exc)
+            return self._record(lag)
+
+    async def _replica_is_fresh_async(self) -> bool:
+        if not self._should_check():
+            return self._fresh
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            if not self._should_check():
+                return self._fresh
+            lag: float | None = None
+            try:
+                async with self._async_replica_engine.connect() as conn:
+                    result = await conn.execute(REPLICA_LAG_SQL)
+                    lag = float(result.scalar() or 0)
+            except Exception as exc:
+                logger.warning("Replica lag check failed: %s", exc)
+            return self._record(lag)
+
+    def _should_check(self) -> bool:
+        return time.monotonic() - self._checked_at >= self._check_interval_seconds
+
+    def _record(self, lag: float | None) -> bool:
+        fresh = lag is not None and lag <= self._max_lag_seconds
+        if fresh != self._fresh:
+            logger.info("Replica %s (lag=%s s)", "in use" if fresh else "bypassed", lag)
+        self._fresh = fresh
+        self._checked_at = time.monotonic()
+        return fresh
+
+
+__all__ = ["REPLICA_LAG_SQL", "ReplicaRouter"]
@@ -1,21 +1,31 @@
+from collections.abc import AsyncIterator
 from functools import lru_cache
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (  # type: ignore[attr-defined]  # stubs predate 2.0
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker
 from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import Settings, get_settings
+from app.db.instrumentation import instrument_engine
 
 
 @lru_cache
 def _build_engine(database_url: str, sql_echo: bool):
-    return create_engine(
+    engine = create_engine(
         database_url,
         echo=sql_echo,
         pool_size=20,
         max_overflow=20,
         pool_pre_ping=True,
     )
+    return instrument_engine(engine)
 
 
 def get_engine(settings: Settings | None = None):
@@ -49,6 +59,106 @@ def get_session():
         db.close()
 
 
+def get_replica_engine(settings: Settings | None = None):
+    """Engine of DATABASE_REPLICA_URL, or None when no replica is configured."""
+    cfg = settings or get_settings()
+    if not cfg.DATABASE_REPLICA_URL:
+        return None
+    return _build_engine(cfg.DATABASE_REPLICA_URL, cfg.SQL_ECHO)
+
+
+def get_replica_session_factory(settings: Settings | None = None):
+    cfg = settings or get_settings()
+    if not cfg.DATABASE_REPLICA_URL:
+        return None
+    return _build_session_factory(cfg.DATABASE_REPLICA_URL, cfg.SQL_ECHO)
+
+
+def _asyncpg_url(database_url: str) -> str:
+    url = make_url(database_url)
+    return url.set(drivername="postgresql+asyncpg").render_as_string(
+        hide_password=False
+    )
+
+
+def async_database_url(settings: Settings) -> str:
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return _asyncpg_url(settings.DATABASE_URL)
+
+
+def async_replica_url(settings: Settings) -> str | None:
+    if settings.ASYNC_DATABASE_REPLICA_URL:
+        return settings.ASYNC_DATABASE_REPLICA_URL
+    if settings.DATABASE_REPLICA_URL:
+        return _asyncpg_url(settings.DATABASE_REPLICA_URL)
+    return None
+
+
+@lru_cache
+def _build_async_engine(database_url: str, sql_echo: bool, pool_size: int):
+    engine = create_async_engine(
+        database_url,
+        echo=sql_echo,
+        pool_size=pool_size,
+        max_overflow=pool_size,
+        pool_pre_ping=True,
+    )
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+def get_async_engine(settings: Settings | None = None) -> AsyncEngine:
+    cfg = settings or get_settings()
+    return _build_async_engine(
+        async_database_url(cfg), cfg.SQL_ECHO, cfg.ASYNC_DB_POOL_SIZE
+    )
+
+
+@lru_cache
+def _build_async_session_factory(database_url: str, sql_echo: bool, pool_size: int):
+    engine = _build_async_engine(database_url, sql_echo, pool_size)
+    # read-only use: rows are handed out after the session closes
+    return async_sessionmaker(
+        bind=engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+def get_async_session_factory(
+    settings: Settings | None = None,
+) -> async_sessionmaker[AsyncSession]:
+    cfg = settings or get_settings()
+    return _build_async_session_factory(
+        async_database_url(cfg), cfg.SQL_ECHO, cfg.ASYNC_DB_POOL_SIZE
+    )
+
+
+def get_async_replica_engine(settings: Settings | None = None) -> AsyncEngine | None:
+    cfg = settings or get_settings()
+    url = async_replica_url(cfg)
+    if url is None:
+        return None
+    return _build_async_engine(url, cfg.SQL_ECHO, cfg.ASYNC_DB_POOL_SIZE)
+
+
+def get_async_replica_session_factory(
+    settings: Settings | None = None,
+) -> async_sessionmaker[AsyncSession] | None:
+    cfg = settings or get_settings()
+    url = async_replica_url(cfg)
+    if url is None:
+        return None
+    return _build_async_session_factory(url, cfg.SQL_ECHO, cfg.ASYNC_DB_POOL_SIZE)
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    async with get_async_session_factory()() as db:
+        yield db
+
+
 def init_db(create_tables: bool = False, settings: Settings | None = None) -> None:
     if not create_tables:
         return
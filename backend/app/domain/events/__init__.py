@@ -1,10 +1,11 @@
+from .analytics_event import AnalyticsEvent
 from .base import DomainEvent
 from .material_uploaded import MaterialUploaded
 from .test_generated import TestGenerated
 
 __all__ = [
+    "AnalyticsEvent",
     "DomainEvent",
     "MaterialUploaded",
     "TestGenerated",
 ]
-
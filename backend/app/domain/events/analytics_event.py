@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from .base import DomainEvent
+
+
+@dataclass(frozen=True, slots=True)
+class AnalyticsEvent(DomainEvent):
+    """A product analytics event; delivered to PostHog through the outbox."""
+
+    distinct_id: str
+    event: str
+    properties: dict[str, Any] = field(default_factory=dict)
+
+    @staticmethod
+    def create(
+        *,
+        user_id: str | int,
+        event: str,
+        properties: dict[str, Any] | None = None,
+    ) -> AnalyticsEvent:
+        return AnalyticsEvent(
+            occurred_at=datetime.utcnow(),
+            distinct_id=str(user_id),
+            event=event,
+            properties=dict(properties or {}),
+        )
+
+
+__all__ = ["AnalyticsEvent"]
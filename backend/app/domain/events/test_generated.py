@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 
 from .base import DomainEvent
@@ -11,16 +11,29 @@ class TestGenerated(DomainEvent):
     test_id: int
     owner_id: int
     question_count: int
+    title: str = ""
+    source: str = "text"  # "text" or "file"
+    usage: dict[str, int] = field(default_factory=dict)  # LLM token counts
 
     @staticmethod
-    def create(*, test_id: int, owner_id: int, question_count: int) -> TestGenerated:
+    def create(
+        *,
+        test_id: int,
+        owner_id: int,
+        question_count: int,
+        title: str = "",
+        source: str = "text",
+        usage: dict[str, int] | None = None,
+    ) -> TestGenerated:
         return TestGenerated(
             occurred_at=datetime.utcnow(),
             test_id=test_id,
             owner_id=owner_id,
             question_count=question_count,
+            title=title,
+            source=source,
+            usage=dict(usage or {}),
         )
 
 
 __all__ = ["TestGenerated"]
-
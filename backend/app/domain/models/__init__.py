@@ -7,35 +7,57 @@ from .enums import (
     RoutingTier,
 )
 from .file import File
-from .job import Job
-from .material import Material
+from .job import Job, JobSummary
+from .material import Material, MaterialSummary, thumbnail_paths
+from .notification import NotificationFeedItem
 from .ocr_cache import OcrCache
+from .outbox import OutboxMessage
+from .page import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, KeysetCursor, Page
 from .password_reset_token import PasswordResetToken
 from .pdf_export_cache import PdfExportCache
 from .pending_verification import PendingVerification
-from .question import Question
+from .principal import Principal
+from .question import Question, normalize_choices
 from .question_group import QuestionGroup
 from .refresh_token import RefreshToken
-from .test import Test
+from .stored_object import StoredObjectInfo
+from .test import Test, TestDetailProjection
 from .user import User
+from .user_stats import UserStats, UserStatsDelta, difficulty_bucket
 
 __all__ = [
+    "DEFAULT_PAGE_SIZE",
+    "MAX_PAGE_SIZE",
     "AnalysisStatus",
     "File",
     "Job",
     "JobStatus",
+    "JobSummary",
     "JobType",
+    "KeysetCursor",
     "Material",
+    "MaterialSummary",
+    "NotificationFeedItem",
     "OcrCache",
+    "OutboxMessage",
+    "Page",
     "PasswordResetToken",
     "PdfExportCache",
     "PendingVerification",
+    "Principal",
     "ProcessingStatus",
     "Question",
     "QuestionDifficulty",
     "QuestionGroup",
     "RefreshToken",
     "RoutingTier",
+    "StoredObjectInfo",
     "Test",
+    "TestDetailProjection",
     "User",
+    "UserStats",
+    "UserStatsDelta",
+    "difficulty_bucket",
+    "normalize_choices",
+    "thumbnail_paths",
 ]
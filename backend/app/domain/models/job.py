@@ -18,6 +18,34 @@ class Job:
     error: str | None = None
     created_at: datetime | None = None
     updated_at: datetime | None = None
+    # filled by the repository from payload/result["test_id" / "material_id"]
+    test_id: int | None = None
+    material_id: int | None = None
 
+    def linked_id(self, key: str) -> int | None:
+        """``key`` from result, then payload; None when absent or not an id."""
+        for source in (self.result, self.payload):
+            value = (source or {}).get(key)
+            if isinstance(value, bool):
+                continue
+            if isinstance(value, int):
+                return value
+            if isinstance(value, str) and value.isdigit():
+                return int(value)
+        return None
 
-__all__ = ["Job"]
+
+@dataclass(slots=True)
+class JobSummary:
+    """List view of a job: no payload / result JSON."""
+
+    id: int
+    owner_id: int
+    job_type: JobType
+    status: JobStatus
+    error: str | None
+    created_at: datetime
+    updated_at: datetime
+
+
+__all__ = ["Job", "JobSummary"]
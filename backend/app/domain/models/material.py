@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
 
 from .enums import AnalysisStatus, ProcessingStatus, RoutingTier
 from .file import File
@@ -23,8 +25,12 @@ class Material:
     analysis_status: AnalysisStatus = AnalysisStatus.PENDING
     routing_tier: RoutingTier | None = None
     analysis_version: str | None = None
+    # multimodal | text_layer | hybrid | text (see document analyzer)
+    analysis_pipeline: str | None = None
     markdown_twin: str | None = None
     thumbnail_path: str | None = None
+    # size name -> {"path", "width", "height", "format"}
+    thumbnails: dict[str, dict[str, Any]] | None = None
 
     def mark_processed(self, text: str) -> None:
         self.status = ProcessingStatus.DONE
@@ -36,6 +42,44 @@ class Material:
         self.processing_error = error
         self.extracted_text = None
 
+    def thumbnail_paths(self) -> set[str]:
+        return thumbnail_paths(self.thumbnail_path, self.thumbnails)
 
-__all__ = ["Material"]
+
+def thumbnail_paths(
+    thumbnail_path: str | None, thumbnails: dict[str, dict[str, Any]] | None
+) -> set[str]:
+    """Stored keys of a material's thumbnails: the JPEG fallback and variants."""
+    paths = {str(v["path"]) for v in (thumbnails or {}).values() if v.get("path")}
+    if thumbnail_path:
+        paths.add(thumbnail_path)
+    return paths
+
+
+@dataclass(slots=True)
+class MaterialSummary:
+    """List-card view of a material: no extracted_text / markdown_twin."""
+
+    id: int
+    owner_id: int
+    file_id: int
+    filename: str
+    uploaded_at: datetime
+    created_at: datetime
+    mime_type: str | None
+    size_bytes: int | None
+    checksum: str | None
+    page_count: int | None
+    status: ProcessingStatus
+    analysis_status: AnalysisStatus
+    routing_tier: RoutingTier | None
+    analysis_version: str | None
+    analysis_pipeline: str | None
+    processing_error: str | None
+    thumbnail_path: str | None
+    thumbnails: dict[str, dict[str, Any]] | None
+    has_text: bool
+
+
+__all__ = ["Material", "MaterialSummary", "thumbnail_paths"]
 
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(slots=True)
+class NotificationFeedItem:
+    """A broadcast or targeted notification as one user sees it."""
+
+    id: int
+    title: str
+    message: str
+    type: str
+    created_at: datetime
+    is_read: bool
+
+
+__all__ = ["NotificationFeedItem"]
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from app.domain.events import DomainEvent
+
+
+@dataclass(slots=True)
+class OutboxMessage:
+    """A pending outbox row claimed by the dispatcher.
+
+    ``event`` is None when ``event_type`` names no known event class (a row
+    written by a newer release, say); such rows are dead-lettered.
+    """
+
+    id: int
+    event_type: str
+    event: DomainEvent | None
+    attempts: int = 0
+
+
+__all__ = ["OutboxMessage"]
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+@dataclass(frozen=True, slots=True)
+class KeysetCursor:
+    """Position after the last row of a page ordered by (created_at, id) DESC."""
+
+    created_at: datetime
+    id: int
+
+    def encode(self) -> str:
+        raw = json.dumps([self.created_at.isoformat(), self.id]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> KeysetCursor:
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            created_at, row_id = json.loads(raw)
+            return cls(created_at=datetime.fromisoformat(created_at), id=int(row_id))
+        except (binascii.Error, ValueError, TypeError) as exc:
+            raise ValueError("Invalid page cursor") from exc
+
+
+@dataclass(slots=True)
+class Page(Generic[T]):
+    items: list[T] = field(default_factory=list)
+    next_cursor: KeysetCursor | None = None
+
+
+__all__ = ["DEFAULT_PAGE_SIZE", "MAX_PAGE_SIZE", "KeysetCursor", "Page"]
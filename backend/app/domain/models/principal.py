@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """The authenticated user as endpoints see it (cached per request)."""
+
+    id: int
+    email: str
+    terms_accepted: bool
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "email": self.email,
+            "terms_accepted": self.terms_accepted,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Principal:
+        return cls(
+            id=int(data["id"]),
+            email=str(data["email"]),
+            terms_accepted=bool(data["terms_accepted"]),
+        )
+
+
+__all__ = ["Principal"]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from typing import Any
 
 from .enums import QuestionDifficulty
 
@@ -41,5 +42,24 @@ class Question:
         self._validate_choices()
 
 
-__all__ = ["Question"]
+def normalize_choices(
+    is_closed: bool, choices: list[Any] | None, correct_choices: list[Any] | None
+) -> tuple[list[str], list[str]]:
+    """Self-heal stored choices (e.g. LLM mismatches) the way the editor shows them.
+
+    Closed questions get trimmed, non-empty choices and at least one correct
+    choice taken from them; open questions never carry choices.
+    """
+    if not is_closed:
+        return [], []
+    cleaned = [str(c).strip() for c in choices or [] if str(c).strip()]
+    correct = [str(c).strip() for c in correct_choices or [] if str(c).strip()]
+    if cleaned:
+        correct = [c for c in correct if c in cleaned] or [cleaned[0]]
+    elif correct:
+        cleaned = correct[:]
+    return cleaned, correct
+
+
+__all__ = ["Question", "normalize_choices"]
 
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(frozen=True, slots=True)
+class StoredObjectInfo:
+    """Metadata of a stored object, enough for conditional and range GETs."""
+
+    size: int
+    etag: str  # quoted, as sent in the ETag header
+    last_modified: datetime | None = None
+    content_type: str | None = None
+
+
+__all__ = ["StoredObjectInfo"]
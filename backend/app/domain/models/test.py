@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Any
 
 from .enums import QuestionDifficulty
 from .question import Question
@@ -36,5 +37,24 @@ class Test:
         self.questions = [q for q in self.questions if q.id != question_id]
 
 
-__all__ = ["Test"]
+@dataclass(frozen=True, slots=True)
+class TestDetailProjection:
+    """Read-only column values of a test, its groups and questions.
+
+    Used by the editor/export read path to render ``TestDetailOut`` straight
+    from the query result, without building ``Test``/``Question`` entities.
+    """
+
+    test_id: int
+    owner_id: int
+    title: str | None
+    revision: int
+    # [id, label, position], ordered by position, id
+    groups: list[list[Any]]
+    # [id, text, is_closed, difficulty, group_id, choices, correct_choices,
+    #  citations], ordered by position, id
+    questions: list[list[Any]]
+
+
+__all__ = ["Test", "TestDetailProjection"]
 
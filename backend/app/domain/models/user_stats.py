@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, fields
+from datetime import datetime
+
+
+def difficulty_bucket(value: object) -> int:
+    """Map a stored difficulty (int or enum/name) to 1=easy, 2=medium, 3=hard."""
+    raw = getattr(value, "value", value)
+    if isinstance(raw, int) and raw in (1, 2, 3):
+        return raw
+    name = str(getattr(value, "name", raw)).lower()
+    if "medium" in name or name == "2":
+        return 2
+    if "hard" in name or name == "3":
+        return 3
+    return 1
+
+
+@dataclass(slots=True)
+class UserStats:
+    """Per-user dashboard counters, kept up to date by the repositories."""
+
+    user_id: int
+    total_tests: int = 0
+    total_questions: int = 0
+    total_files: int = 0
+    closed_questions: int = 0
+    open_questions: int = 0
+    easy_questions: int = 0
+    medium_questions: int = 0
+    hard_questions: int = 0
+    last_test_created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
+@dataclass(slots=True)
+class UserStatsDelta:
+    """Signed change of the UserStats counters within one transaction."""
+
+    total_tests: int = 0
+    total_questions: int = 0
+    total_files: int = 0
+    closed_questions: int = 0
+    open_questions: int = 0
+    easy_questions: int = 0
+    medium_questions: int = 0
+    hard_questions: int = 0
+    # only moves forward; removals recompute it in the repository
+    last_test_created_at: datetime | None = None
+
+    @classmethod
+    def for_questions(
+        cls, questions: Iterable[tuple[bool, object]], *, sign: int = 1
+    ) -> UserStatsDelta:
+        """Delta for adding (sign=1) or removing (sign=-1) (is_closed, difficulty)."""
+        delta = cls()
+        for is_closed, difficulty in questions:
+            delta.total_questions += sign
+            if is_closed:
+                delta.closed_questions += sign
+            else:
+                delta.open_questions += sign
+            bucket = difficulty_bucket(difficulty)
+            if bucket == 1:
+                delta.easy_questions += sign
+            elif bucket == 2:
+                delta.medium_questions += sign
+            else:
+                delta.hard_questions += sign
+        return delta
+
+    @classmethod
+    def for_question_change(
+        cls,
+        before: Iterable[tuple[bool, object]],
+        after: Iterable[tuple[bool, object]],
+    ) -> UserStatsDelta:
+        return cls.for_questions(before, sign=-1) + cls.for_questions(after)
+
+    def __add__(self, other: UserStatsDelta) -> UserStatsDelta:
+        merged = UserStatsDelta()
+        for f in fields(self):
+            if f.name == "last_test_created_at":
+                continue
+            setattr(merged, f.name, getattr(self, f.name) + getattr(other, f.name))
+        stamps = [
+            s for s in (self.last_test_created_at, other.last_test_created_at) if s
+        ]
+        merged.last_test_created_at = max(stamps) if stamps else None
+        return merged
+
+    def counters(self) -> dict[str, int]:
+        return {
+            f.name: getattr(self, f.name)
+            for f in fields(self)
+            if f.name != "last_test_created_at"
+        }
+
+    @property
+    def is_empty(self) -> bool:
+        return self.last_test_created_at is None and not any(
+            self.counters().values()
+        )
+
+
+__all__ = ["UserStats", "UserStatsDelta", "difficulty_bucket"]
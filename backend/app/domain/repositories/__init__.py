@@ -1,8 +1,14 @@
+from .async_repositories import (
+    AsyncJobRepository,
+    AsyncMaterialRepository,
+    AsyncTestRepository,
+)
 from .file_repository import FileRepository
 from .job_repository import JobRepository
 from .material_repository import MaterialRepository
 from .notification_repository import NotificationRepository
 from .ocr_cache_repository import OcrCacheRepository
+from .outbox_repository import OutboxRepository
 from .password_reset_token_repository import PasswordResetTokenRepository
 from .pdf_export_cache_repository import PdfExportCacheRepository
 from .pending_verification_repository import PendingVerificationRepository
@@ -10,13 +16,18 @@ from .refresh_token_repository import RefreshTokenRepository
 from .support_repository import SupportRepository
 from .test_repository import TestRepository
 from .user_repository import UserRepository
+from .user_stats_repository import UserStatsRepository
 
 __all__ = [
+    "AsyncJobRepository",
+    "AsyncMaterialRepository",
+    "AsyncTestRepository",
     "FileRepository",
     "JobRepository",
     "MaterialRepository",
     "NotificationRepository",
     "OcrCacheRepository",
+    "OutboxRepository",
     "PasswordResetTokenRepository",
     "PdfExportCacheRepository",
     "PendingVerificationRepository",
@@ -24,4 +35,5 @@ __all__ = [
     "SupportRepository",
     "TestRepository",
     "UserRepository",
+    "UserStatsRepository",
 ]
@@ -0,0 +1,54 @@
+"""Read-only async repositories for the hot API read paths.
+
+Writes, and everything Celery runs, stay on the sync repositories.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from app.domain.models import Job, Material, TestDetailProjection
+
+
+class AsyncTestRepository(ABC):
+    @abstractmethod
+    async def get_detail_projection(
+        self, test_id: int
+    ) -> TestDetailProjection | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_revision(self, test_id: int) -> tuple[int, int] | None:
+        """Return ``(owner_id, revision)`` of the test."""
+        raise NotImplementedError
+
+
+class AsyncMaterialRepository(ABC):
+    @abstractmethod
+    async def list_for_user(self, user_id: int) -> list[Material]:
+        raise NotImplementedError
+
+
+class AsyncJobRepository(ABC):
+    @abstractmethod
+    async def get(self, job_id: int) -> Job | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_many(self, owner_id: int, job_ids: list[int]) -> list[Job]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_for_user(self, owner_id: int) -> list[Job]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_updated_since(
+        self, owner_id: int, since: datetime, *, limit: int
+    ) -> list[Job]:
+        """Jobs changed after ``since``, oldest change first."""
+        raise NotImplementedError
+
+
+__all__ = ["AsyncJobRepository", "AsyncMaterialRepository", "AsyncTestRepository"]
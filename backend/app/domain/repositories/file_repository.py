@@ -23,6 +23,11 @@ class FileRepository(ABC):
     def remove(self, file_id: int) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    def remove_many(self, file_ids: Iterable[int]) -> list[File]:
+        """Delete files in one statement; returns the removed rows."""
+        raise NotImplementedError
+
 
 __all__ = ["FileRepository"]
 
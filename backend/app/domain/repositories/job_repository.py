@@ -2,8 +2,9 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from collections.abc import Iterable
+from datetime import datetime
 
-from app.domain.models import Job
+from app.domain.models import Job, JobSummary, KeysetCursor, Page
 
 
 class JobRepository(ABC):
@@ -23,6 +24,13 @@ class JobRepository(ABC):
     def list_for_user(self, owner_id: int) -> Iterable[Job]:
         raise NotImplementedError
 
+    @abstractmethod
+    def list_page(
+        self, owner_id: int, *, cursor: KeysetCursor | None, limit: int
+    ) -> Page[JobSummary]:
+        """Newest first, without the payload/result JSON."""
+        raise NotImplementedError
+
     @abstractmethod
     def get_many(self, owner_id: int, job_ids: list[int]) -> list[Job]:
         """Return jobs that belong to owner and are in job_ids (for batch polling)."""
@@ -32,5 +40,14 @@ class JobRepository(ABC):
     def get_generation_job_by_test_id(self, test_id: int) -> Job | None:
         raise NotImplementedError
 
+    @abstractmethod
+    def purge_finished(self, before: datetime, *, limit: int) -> int:
+        """Delete up to ``limit`` done/failed jobs last updated before ``before``.
+
+        Test generation jobs still linked to a test are kept: they hold the
+        generation config served for that test.
+        """
+        raise NotImplementedError
+
 
 __all__ = ["JobRepository"]
@@ -3,7 +3,7 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from collections.abc import Iterable
 
-from app.domain.models import Material
+from app.domain.models import KeysetCursor, Material, MaterialSummary, Page
 
 
 class MaterialRepository(ABC):
@@ -19,10 +19,28 @@ class MaterialRepository(ABC):
     def get_many(self, material_ids: list[int]) -> list[Material]:
         raise NotImplementedError
 
+    @abstractmethod
+    def get_page_counts(
+        self,
+        owner_id: int,
+        *,
+        material_ids: list[int] | None = None,
+        file_id: int | None = None,
+    ) -> list[int | None]:
+        """Page counts of the owner's materials (by id or by source file)."""
+        raise NotImplementedError
+
     @abstractmethod
     def list_for_user(self, user_id: int) -> Iterable[Material]:
         raise NotImplementedError
 
+    @abstractmethod
+    def list_page(
+        self, owner_id: int, *, cursor: KeysetCursor | None, limit: int
+    ) -> Page[MaterialSummary]:
+        """Newest first, one material per checksum, without the text columns."""
+        raise NotImplementedError
+
     @abstractmethod
     def update(self, material: Material) -> Material:
         raise NotImplementedError
@@ -30,6 +48,16 @@ class MaterialRepository(ABC):
     @abstractmethod
     def remove(self, material_id: int) -> None:
         raise NotImplementedError
+
+    @abstractmethod
+    def remove_by_checksum(
+        self, owner_id: int, checksum: str
+    ) -> tuple[list[int], set[str]]:
+        """Delete all of the owner's materials with ``checksum``.
+
+        Returns their file ids and stored thumbnail paths.
+        """
+        raise NotImplementedError
     
     @abstractmethod
     def get_by_file_id(self, file_id: int) -> Material | None:
@@ -46,8 +74,48 @@ class MaterialRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def list_without_thumbnail(self) -> Iterable[Material]:
-        """List materials with no thumbnail and an associated file (backfill)."""
+    def update_file_info(self, material: Material) -> Material | None:
+        """Persist mime_type, size_bytes and page_count only.
+        Returns None if the material no longer exists."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_thumbnails(self, material: Material) -> Material | None:
+        """Persist thumbnail_path and thumbnails only."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_processing_result(self, material: Material) -> Material | None:
+        """Persist processing and analysis results, leaving thumbnails intact."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_without_thumbnail(
+        self, *, after_id: int = 0, limit: int = 500
+    ) -> list[tuple[int, int]]:
+        """Keyset page of (material_id, owner_id) with no thumbnail (backfill)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def count_without_thumbnail(self, *, after_id: int = 0) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_with_outdated_analysis(
+        self,
+        version: str,
+        *,
+        include_missing: bool = False,
+        after_id: int = 0,
+        limit: int = 500,
+    ) -> list[tuple[int, int]]:
+        """Keyset page of (material_id, owner_id) analyzed with another version."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def count_with_outdated_analysis(
+        self, version: str, *, include_missing: bool = False, after_id: int = 0
+    ) -> int:
         raise NotImplementedError
 
 
@@ -3,13 +3,23 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 
+from app.domain.models import KeysetCursor, NotificationFeedItem, Page
+
 if TYPE_CHECKING:
-    from app.db.models import SystemNotification, UserReadNotification
+    from app.db.models import SystemNotification
 
 class NotificationRepository(ABC):
     @abstractmethod
-    def get_notifications_for_user(self, user_id: int) -> list[SystemNotification]:
-        """Get all global and private notifications for a specific user."""
+    def get_feed(self, user_id: int) -> list[NotificationFeedItem]:
+        """All global and private notifications for a user, newest first,
+        with their read state (one query)."""
+        ...
+
+    @abstractmethod
+    def list_feed_page(
+        self, user_id: int, *, cursor: KeysetCursor | None, limit: int
+    ) -> Page[NotificationFeedItem]:
+        """``get_feed`` one keyset page at a time."""
         ...
 
     @abstractmethod
@@ -18,8 +28,8 @@ class NotificationRepository(ABC):
         ...
 
     @abstractmethod
-    def get_read_notification_ids(self, user_id: int) -> set[int]:
-        """Get IDs of notifications already read by the user."""
+    def count_broadcasts(self) -> int:
+        """Number of global notifications (``recipient_id IS NULL``)."""
         ...
 
     @abstractmethod
@@ -30,19 +40,11 @@ class NotificationRepository(ABC):
         ...
 
     @abstractmethod
-    def get_read_record(
-        self, user_id: int, notification_id: int
-    ) -> UserReadNotification | None:
-        """Get a read record for a specific user and notification."""
-        ...
-
-    @abstractmethod
-    def add_read_record(self, read_record: UserReadNotification) -> None:
-        """Mark a notification as read by adding a record."""
+    def mark_read(self, user_id: int, notification_id: int) -> bool:
+        """Record the read; False if it was already recorded."""
         ...
 
     @abstractmethod
     def add_notification(self, notification: SystemNotification) -> SystemNotification:
         """Add a new system notification."""
         ...
-
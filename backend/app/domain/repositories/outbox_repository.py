@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from datetime import datetime
+
+from app.domain.events import DomainEvent
+from app.domain.models import OutboxMessage
+
+
+class OutboxRepository(ABC):
+    """Domain events stored in the writer's transaction, delivered later."""
+
+    @abstractmethod
+    def add(self, event: DomainEvent) -> None:
+        """Store the event in the current transaction (no commit)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def claim_pending(self, *, limit: int) -> list[OutboxMessage]:
+        """Lock up to ``limit`` due events, oldest first, until commit.
+
+        Rows locked by another dispatcher are skipped, so concurrent
+        dispatchers work on disjoint batches.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def mark_processed(self, message_ids: Sequence[int]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def mark_failed(
+        self, message_id: int, *, error: str, retry_at: datetime | None
+    ) -> None:
+        """Count a failed attempt; ``retry_at`` None gives the event up."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def purge_processed(self, before: datetime, *, limit: int) -> int:
+        """Delete at most ``limit`` events processed before ``before``."""
+        raise NotImplementedError
+
+
+__all__ = ["OutboxRepository"]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from datetime import datetime
 
 from app.domain.models.password_reset_token import PasswordResetToken
 
@@ -22,5 +23,10 @@ class PasswordResetTokenRepository(ABC):
     def delete_by_email(self, email: str) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    def purge_expired(self, before: datetime, *, limit: int) -> int:
+        """Delete up to ``limit`` entries that expired before ``before``."""
+        raise NotImplementedError
+
 
 __all__ = ["PasswordResetTokenRepository"]
@@ -20,12 +20,15 @@ class PdfExportCacheRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def remove_for_test(self, test_id: int) -> None:
+    def remove_for_test(self, test_id: int) -> list[str]:
+        """Delete the test's entries; returns their stored paths."""
         raise NotImplementedError
 
-    def purge_older_than(self, cutoff: datetime) -> int:
-        _ = cutoff
-        return 0
+    @abstractmethod
+    def purge_older_than(self, cutoff: datetime, *, limit: int) -> list[str]:
+        """Delete up to ``limit`` entries created before ``cutoff``; returns
+        their stored paths so the files can be removed."""
+        raise NotImplementedError
 
 
 __all__ = ["PdfExportCacheRepository"]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from datetime import datetime
 
 from app.domain.models import RefreshToken
 
@@ -23,7 +24,8 @@ class RefreshTokenRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def remove_expired(self) -> None:
+    def remove_expired(self, before: datetime, *, limit: int) -> int:
+        """Delete up to ``limit`` tokens that expired before ``before``."""
         raise NotImplementedError
 
 
@@ -1,9 +1,17 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from collections.abc import Iterable
+from collections.abc import Iterable, Mapping
+from typing import Any
 
-from app.domain.models import Question, QuestionGroup, Test
+from app.domain.models import (
+    KeysetCursor,
+    Page,
+    Question,
+    QuestionGroup,
+    Test,
+    TestDetailProjection,
+)
 
 
 class TestRepository(ABC):
@@ -29,10 +37,40 @@ class TestRepository(ABC):
     def get_with_questions(self, test_id: int) -> Test | None:
         raise NotImplementedError
 
+    @abstractmethod
+    def get_detail_projection(self, test_id: int) -> TestDetailProjection | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_revision(self, test_id: int) -> tuple[int, int] | None:
+        """Return ``(owner_id, revision)`` of the test."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def touch(self, test_id: int) -> None:
+        """Bump the test revision; call from every method that changes content."""
+        raise NotImplementedError
+
     @abstractmethod
     def list_for_user(self, user_id: int) -> Iterable[Test]:
         raise NotImplementedError
 
+    @abstractmethod
+    def list_page(
+        self, owner_id: int, *, cursor: KeysetCursor | None, limit: int
+    ) -> Page[Test]:
+        """Newest first; tests are returned without questions."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_ids(self, *, after_id: int = 0, limit: int = 500) -> list[tuple[int, int]]:
+        """Keyset page of (test_id, owner_id) across all users (maintenance)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def count(self, *, after_id: int = 0) -> int:
+        raise NotImplementedError
+
     @abstractmethod
     def remove(self, test_id: int) -> None:
         raise NotImplementedError
@@ -42,6 +80,21 @@ class TestRepository(ABC):
         """Update question positions to match the order of question_ids."""
         raise NotImplementedError
 
+    @abstractmethod
+    def update_questions(
+        self, test_id: int, changes: Mapping[int, Mapping[str, Any]]
+    ) -> int:
+        """Set the given fields per question id; ids outside the test are skipped.
+
+        Returns the number of questions updated.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_questions(self, test_id: int, question_ids: list[int]) -> int:
+        """Delete the test's questions among question_ids; returns how many."""
+        raise NotImplementedError
+
     # --- Question groups ---
 
     @abstractmethod
@@ -26,6 +26,11 @@ class UserRepository(ABC):
     def update(self, user: User) -> User:
         raise NotImplementedError
 
+    @abstractmethod
+    def list_ids(self, *, after_id: int = 0, limit: int = 500) -> list[int]:
+        """Keyset page of user ids (maintenance)."""
+        raise NotImplementedError
+
 
 __all__ = ["UserRepository"]
 
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+
+from app.domain.models import UserStats, UserStatsDelta
+
+
+class UserStatsRepository(ABC):
+    @abstractmethod
+    def get(self, user_id: int) -> UserStats | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def apply_delta(self, user_id: int, delta: UserStatsDelta) -> None:
+        """Add delta to the counters in the current transaction (no commit)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def refresh_last_test_created_at(self, user_id: int) -> None:
+        """Recompute last_test_created_at after a test was removed."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def rebuild(self, user_id: int) -> UserStats:
+        """Recompute all counters of the user from the source tables.
+
+        Inserts the row or overwrites an existing one, so concurrent first
+        reads that both find no row do not conflict.
+        """
+        raise NotImplementedError
+
+
+__all__ = ["UserStatsRepository"]
@@ -1,14 +1,25 @@
+from .analytics_sink import AnalyticsSink
 from .document_analyzer import DocumentAnalyzer
 from .email_sender import EmailSender
 from .file_storage import FileStorage
+from .job_events import JobEventBus, JobEventSubscription
 from .ocr_service import OCRService
+from .payload_cache import PayloadCache
+from .principal_cache import PrincipalCache
 from .question_generator import QuestionGenerator
+from .unread_counter import UnreadCounter
 
 __all__ = [
+    "AnalyticsSink",
     "DocumentAnalyzer",
     "EmailSender",
     "FileStorage",
+    "JobEventBus",
+    "JobEventSubscription",
     "OCRService",
+    "PayloadCache",
+    "PrincipalCache",
     "QuestionGenerator",
+    "UnreadCounter",
 ]
 
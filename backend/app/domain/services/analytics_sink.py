@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Protocol
+
+from app.domain.events import AnalyticsEvent
+
+
+class AnalyticsSink(Protocol):
+    """Product analytics backend, fed by the outbox dispatcher only."""
+
+    def capture_batch(self, events: Sequence[tuple[str, AnalyticsEvent]]) -> None:
+        """Deliver ``(uuid, event)`` pairs in one request; raise on failure.
+
+        The uuid is stable across retries, so a batch sent twice is counted
+        once.
+        """
+        ...
+
+
+__all__ = ["AnalyticsSink"]
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
 from contextlib import AbstractContextManager
 from pathlib import Path
 from typing import Protocol
 
+from app.domain.models import StoredObjectInfo
+
 
 class FileStorage(Protocol):
     def save(
@@ -29,6 +32,31 @@ class FileStorage(Protocol):
         """Provide a local path to the stored object for temporary processing."""
         ...
 
+    def stat(self, *, stored_path: str) -> StoredObjectInfo:
+        """Size, ETag and modification time; raises FileNotFoundError."""
+        ...
 
-__all__ = ["FileStorage"]
+    def iter_bytes(
+        self,
+        *,
+        stored_path: str,
+        start: int = 0,
+        end: int | None = None,
+        chunk_size: int = 256 * 1024,
+    ) -> Iterator[bytes]:
+        """Yield bytes ``start..end`` (inclusive, None = to the end) in chunks."""
+        ...
 
+    def presigned_url(
+        self,
+        *,
+        stored_path: str,
+        expires_in: int,
+        filename: str | None = None,
+        content_type: str | None = None,
+    ) -> str | None:
+        """Short-lived direct URL, or None if the storage cannot serve one."""
+        ...
+
+
+__all__ = ["FileStorage"]
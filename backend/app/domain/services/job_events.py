@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from contextlib import AbstractAsyncContextManager
+from typing import Any, Protocol
+
+
+class JobEventSubscription(Protocol):
+    @property
+    def closed(self) -> bool:
+        """True once events may have been lost; the stream must be resumed."""
+        ...
+
+    async def next(self, timeout: float) -> dict[str, Any] | None:
+        """The next event, or None when ``timeout`` seconds passed without one."""
+        ...
+
+
+class JobEventBus(Protocol):
+    """Fan-out of job status changes to the owner's open streams."""
+
+    def publish(self, owner_id: int, event: dict[str, Any]) -> None:
+        """Best effort; subscribers recover missed events from the database."""
+        ...
+
+    def subscribe(
+        self, owner_id: int
+    ) -> AbstractAsyncContextManager[JobEventSubscription]: ...
+
+
+__all__ = ["JobEventBus", "JobEventSubscription"]
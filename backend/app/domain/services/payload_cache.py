@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import Protocol
+
+
+class PayloadCache(Protocol):
+    """Cache of serialized, versioned payloads (the key embeds the version)."""
+
+    def get(self, key: str) -> bytes | None: ...
+
+    def set(self, key: str, value: bytes) -> None: ...
+
+    async def get_async(self, key: str) -> bytes | None:
+        """``get`` for async endpoints; must not block the event loop."""
+        ...
+
+    async def set_async(self, key: str, value: bytes) -> None: ...
+
+    def record_not_modified(self) -> None:
+        """Count a conditional request answered without building the payload."""
+        ...
+
+
+__all__ = ["PayloadCache"]
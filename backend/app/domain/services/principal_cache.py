@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from typing import Protocol
+
+from app.domain.models.principal import Principal
+
+
+class PrincipalCache(Protocol):
+    """Short-lived cache of authenticated principals keyed by user id."""
+
+    def get(self, user_id: int) -> Principal | None: ...
+
+    def set(self, principal: Principal) -> None: ...
+
+    async def get_async(self, user_id: int) -> Principal | None:
+        """``get`` for async endpoints; must not block the event loop."""
+        ...
+
+    async def set_async(self, principal: Principal) -> None: ...
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop the entry after the user's row changed (call after commit)."""
+        ...
+
+
+__all__ = ["PrincipalCache"]
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import Protocol
+
+
+class UnreadCounter(Protocol):
+    """Cached unread-notification counts; misses fall back to SQL."""
+
+    def get(self, user_id: int) -> int | None: ...
+
+    def prime(self, user_id: int, unread: int, broadcasts: int) -> None:
+        """Store a count read from SQL together with the broadcast total."""
+        ...
+
+    def incr_broadcast(self) -> None:
+        """A notification for everyone was added (call after commit)."""
+        ...
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop one user's count (read or personal notification, after commit)."""
+        ...
+
+    def current_broadcasts(self) -> int | None:
+        """The cached broadcast total, or None when nothing is cached."""
+        ...
+
+    def reset(self) -> None:
+        """Drop every cached count (broadcast deleted or edited)."""
+        ...
+
+
+__all__ = ["UnreadCounter"]
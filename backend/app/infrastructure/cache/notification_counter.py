@@ -0,0 +1,139 @@
+"""Unread-notification counts in Redis, primed from SQL on a miss."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from typing import Any
+
+from app.infrastructure.cache.payload_cache import REDIS_RETRY_AFTER_SECONDS
+
+logger = logging.getLogger(__name__)
+
+_PREFIX = "notif_unread"
+_BROADCASTS_KEY = f"{_PREFIX}:broadcasts"
+
+# Cache the user's count only if the broadcast total it was computed against
+# is still the current one; otherwise a broadcast landed in between.
+_PRIME_LUA = """
+local current = redis.call('GET', KEYS[1])
+if not current then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    current = ARGV[2]
+end
+if tonumber(current) ~= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('SET', KEYS[2], tonumber(ARGV[1]) - tonumber(ARGV[2]), 'EX', ARGV[3])
+return 1
+"""
+
+# Counters are only adjusted while they exist; a missing key is primed from
+# SQL on the next read, so it must not be created from a partial delta.
+_INCR_IF_EXISTS_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return false
+"""
+
+
+class RedisUnreadNotificationCounter:
+    """Per-user unread counts without a per-user write on every broadcast.
+
+    Redis holds the number of broadcasts (notifications for everyone) and,
+    per user, ``unread - broadcasts``; the count is their sum. A new
+    broadcast is one INCR for all users; a read or a personal notification
+    drops only that user's key, which the next read primes again. Deleting
+    or editing a broadcast resets the cache.
+
+    When Redis is unavailable reads miss (callers count in SQL). A write
+    that failed may have left counts stale, so the first successful call
+    afterwards resets the cache.
+    """
+
+    def __init__(self, *, redis_url: str | None, ttl_seconds: int = 600) -> None:
+        self._ttl_seconds = max(1, ttl_seconds)
+        self._redis: Any = None
+        self._redis_down_until = 0.0
+        self._needs_reset = False
+        if redis_url:
+            import redis
+
+            self._redis = redis.Redis.from_url(
+                redis_url, socket_timeout=0.25, socket_connect_timeout=0.25
+            )
+            self._prime_script = self._redis.register_script(_PRIME_LUA)
+            self._incr_script = self._redis.register_script(_INCR_IF_EXISTS_LUA)
+
+    def get(self, user_id: int) -> int | None:
+        values = self._call("mget", lambda r: r.mget(_BROADCASTS_KEY, _key(user_id)))
+        if not values or values[0] is None or values[1] is None:
+            return None
+        return max(0, int(values[0]) + int(values[1]))
+
+    def prime(self, user_id: int, unread: int, broadcasts: int) -> None:
+        self._call(
+            "prime",
+            lambda r: self._prime_script(
+                keys=[_BROADCASTS_KEY, _key(user_id)],
+                args=[unread, broadcasts, self._ttl_seconds],
+            ),
+        )
+
+    def incr_broadcast(self) -> None:
+        self._call(
+            "incr_broadcast",
+            lambda r: self._incr_script(keys=[_BROADCASTS_KEY], args=[1]),
+            write=True,
+        )
+
+    def invalidate(self, user_id: int) -> None:
+        self._call("invalidate", lambda r: r.delete(_key(user_id)), write=True)
+
+    def current_broadcasts(self) -> int | None:
+        raw = self._call("get", lambda r: r.get(_BROADCASTS_KEY))
+        return None if raw is None else int(raw)
+
+    def reset(self) -> None:
+        self._call("reset", self._reset, write=True)
+
+    def _reset(self, client: Any) -> None:
+        # user keys first: until the broadcast total goes, a prime racing
+        # with the reset is rejected by the total mismatch
+        batch: list[Any] = []
+        for key in client.scan_iter(match=f"{_PREFIX}:user:*", count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                client.delete(*batch)
+                batch.clear()
+        if batch:
+            client.delete(*batch)
+        client.delete(_BROADCASTS_KEY)
+
+    def _call(self, name: str, fn: Callable[[Any], Any], *, write: bool = False) -> Any:
+        if self._redis is None:
+            return None
+        if time.monotonic() < self._redis_down_until:
+            if write:
+                self._needs_reset = True
+            return None
+        try:
+            if self._needs_reset:
+                self._reset(self._redis)
+                self._needs_reset = False
+            return fn(self._redis)
+        except Exception as exc:
+            if write:
+                self._needs_reset = True
+            self._redis_down_until = time.monotonic() + REDIS_RETRY_AFTER_SECONDS
+            logger.warning("Unread counter: Redis %s failed: %s", name, exc)
+            return None
+
+
+def _key(user_id: int) -> str:
+    return f"{_PREFIX}:user:{user_id}"
+
+
+__all__ = ["RedisUnreadNotificationCounter"]
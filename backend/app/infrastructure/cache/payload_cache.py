@@ -0,0 +1,161 @@
+"""Two-tier cache for serialized payloads: in-process LRU, then Redis."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from cachetools import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# after a Redis error the shared tier is skipped for a while instead of
+# paying the socket timeout on every request
+REDIS_RETRY_AFTER_SECONDS = 30.0
+
+
+@dataclass(slots=True)
+class CacheStats:
+    local_hits: int = 0
+    redis_hits: int = 0
+    misses: int = 0
+    not_modified: int = 0
+    bytes_saved: int = 0  # payload bytes served without rebuilding them
+    redis_errors: int = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        hits = self.local_hits + self.redis_hits + self.not_modified
+        lookups = hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "redis_errors": self.redis_errors,
+        }
+
+
+class TieredPayloadCache:
+    """Read-through cache for immutable payloads.
+
+    Keys must embed a version (e.g. the test revision). Entries are never
+    invalidated: a bumped version simply stops reading the old key, which
+    then falls out of the LRU and expires in Redis.
+    """
+
+    def __init__(
+        self,
+        *,
+        namespace: str,
+        redis_url: str | None,
+        local_size: int = 256,
+        ttl_seconds: int = 24 * 3600,
+    ) -> None:
+        self._namespace = namespace
+        self._ttl_seconds = ttl_seconds
+        self._local: LRUCache[str, bytes] = LRUCache(maxsize=max(1, local_size))
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+        self._redis: Any = None
+        self._aredis: Any = None
+        self._redis_down_until = 0.0
+        if redis_url:
+            import redis
+            import redis.asyncio
+
+            options = {"socket_timeout": 0.25, "socket_connect_timeout": 0.25}
+            self._redis = redis.Redis.from_url(redis_url, **options)
+            self._aredis = redis.asyncio.Redis.from_url(redis_url, **options)
+
+    def get(self, key: str) -> bytes | None:
+        value = self._get_local(key)
+        if value is not None:
+            return value
+        return self._remember(key, self._redis_call("get", self._redis_key(key)))
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._local[key] = value
+        self._redis_call("set", self._redis_key(key), value, ex=self._ttl_seconds)
+
+    async def get_async(self, key: str) -> bytes | None:
+        value = self._get_local(key)
+        if value is not None:
+            return value
+        value = await self._aredis_call("get", self._redis_key(key))
+        return self._remember(key, value)
+
+    async def set_async(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._local[key] = value
+        await self._aredis_call(
+            "set", self._redis_key(key), value, ex=self._ttl_seconds
+        )
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self._stats.not_modified += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats.snapshot(),
+                "local_entries": len(self._local),
+                "redis_enabled": self._redis is not None,
+            }
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self._namespace}:{key}"
+
+    def _get_local(self, key: str) -> bytes | None:
+        with self._lock:
+            value = self._local.get(key)
+            if value is not None:
+                self._stats.local_hits += 1
+                self._stats.bytes_saved += len(value)
+            return value
+
+    def _remember(self, key: str, value: bytes | None) -> bytes | None:
+        """Account a Redis lookup and keep a hit in the local tier."""
+        with self._lock:
+            if value is None:
+                self._stats.misses += 1
+                return None
+            self._local[key] = value
+            self._stats.redis_hits += 1
+            self._stats.bytes_saved += len(value)
+        return value
+
+    def _redis_call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        if self._redis is None or time.monotonic() < self._redis_down_until:
+            return None
+        try:
+            return getattr(self._redis, method)(*args, **kwargs)
+        except Exception as exc:
+            self._redis_failed(method, exc)
+            return None
+
+    async def _aredis_call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        if self._aredis is None or time.monotonic() < self._redis_down_until:
+            return None
+        try:
+            return await getattr(self._aredis, method)(*args, **kwargs)
+        except Exception as exc:
+            self._redis_failed(method, exc)
+            return None
+
+    def _redis_failed(self, method: str, exc: Exception) -> None:
+        with self._lock:
+            self._stats.redis_errors += 1
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_AFTER_SECONDS
+        logger.warning(
+            "Payload cache %s: Redis %s failed: %s", self._namespace, method, exc
+        )
+
+
+__all__ = ["CacheStats", "TieredPayloadCache"]
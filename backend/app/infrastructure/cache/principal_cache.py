@@ -0,0 +1,136 @@
+"""Two-tier cache of authenticated principals: in-process TTL LRU, then Redis."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from typing import Any
+
+from cachetools import TTLCache
+
+from app.domain.models import Principal
+from app.infrastructure.cache.payload_cache import REDIS_RETRY_AFTER_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class TieredPrincipalCache:
+    """Principals by user id, so authenticated requests skip the user lookup.
+
+    ``invalidate`` clears the local tier of this process and the Redis entry;
+    other processes may serve their local copy for up to ``local_ttl_seconds``,
+    which is therefore kept much shorter than the Redis TTL.
+    """
+
+    def __init__(
+        self,
+        *,
+        redis_url: str | None,
+        local_size: int = 4096,
+        local_ttl_seconds: int = 5,
+        ttl_seconds: int = 60,
+    ) -> None:
+        self._ttl_seconds = max(1, ttl_seconds)
+        self._local: TTLCache[int, Principal] = TTLCache(
+            maxsize=max(1, local_size), ttl=max(1, local_ttl_seconds)
+        )
+        self._lock = threading.Lock()
+        self._redis: Any = None
+        self._aredis: Any = None
+        self._redis_down_until = 0.0
+        if redis_url:
+            import redis
+            import redis.asyncio
+
+            options = {"socket_timeout": 0.25, "socket_connect_timeout": 0.25}
+            self._redis = redis.Redis.from_url(redis_url, **options)
+            self._aredis = redis.asyncio.Redis.from_url(redis_url, **options)
+
+    def get(self, user_id: int) -> Principal | None:
+        principal = self._get_local(user_id)
+        if principal is not None:
+            return principal
+        return self._remember(user_id, self._redis_call("get", self._key(user_id)))
+
+    def set(self, principal: Principal) -> None:
+        with self._lock:
+            self._local[principal.id] = principal
+        self._redis_call(
+            "set", self._key(principal.id), self._dump(principal), ex=self._ttl_seconds
+        )
+
+    async def get_async(self, user_id: int) -> Principal | None:
+        principal = self._get_local(user_id)
+        if principal is not None:
+            return principal
+        raw = await self._aredis_call("get", self._key(user_id))
+        return self._remember(user_id, raw)
+
+    async def set_async(self, principal: Principal) -> None:
+        with self._lock:
+            self._local[principal.id] = principal
+        await self._aredis_call(
+            "set", self._key(principal.id), self._dump(principal), ex=self._ttl_seconds
+        )
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._local.pop(user_id, None)
+        if self._redis is None:
+            return
+        try:
+            # not skipped while Redis is marked down: a stale principal
+            # outliving a password change or deletion is worse than a timeout
+            self._redis.delete(self._key(user_id))
+        except Exception as exc:
+            self._redis_failed("delete", exc)
+
+    def _get_local(self, user_id: int) -> Principal | None:
+        with self._lock:
+            return self._local.get(user_id)
+
+    def _remember(self, user_id: int, raw: bytes | None) -> Principal | None:
+        if raw is None:
+            return None
+        try:
+            principal = Principal.from_dict(json.loads(raw))
+        except (ValueError, KeyError, TypeError):
+            return None
+        with self._lock:
+            self._local[user_id] = principal
+        return principal
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"principal:{user_id}"
+
+    @staticmethod
+    def _dump(principal: Principal) -> bytes:
+        return json.dumps(principal.to_dict()).encode()
+
+    def _redis_call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        if self._redis is None or time.monotonic() < self._redis_down_until:
+            return None
+        try:
+            return getattr(self._redis, method)(*args, **kwargs)
+        except Exception as exc:
+            self._redis_failed(method, exc)
+            return None
+
+    async def _aredis_call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        if self._aredis is None or time.monotonic() < self._redis_down_until:
+            return None
+        try:
+            return await getattr(self._aredis, method)(*args, **kwargs)
+        except Exception as exc:
+            self._redis_failed(method, exc)
+            return None
+
+    def _redis_failed(self, method: str, exc: Exception) -> None:
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_AFTER_SECONDS
+        logger.warning("Principal cache: Redis %s failed: %s", method, exc)
+
+
+__all__ = ["TieredPrincipalCache"]
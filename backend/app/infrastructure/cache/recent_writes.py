@@ -0,0 +1,87 @@
+"""Users who wrote recently; their reads must not go to a lagging replica."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any
+
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class RecentWriteTracker:
+    """Marks a user for ``ttl_seconds`` after a write.
+
+    The local TTL cache answers for the worker that handled the write;
+    Redis makes the mark visible to every API worker. When Redis fails,
+    lookups answer "recent" so reads fall back to the primary.
+    """
+
+    def __init__(self, *, redis_url: str | None, ttl_seconds: int = 10) -> None:
+        self._ttl_seconds = max(1, ttl_seconds)
+        self._local: TTLCache[int, bool] = TTLCache(
+            maxsize=10_000, ttl=self._ttl_seconds
+        )
+        self._lock = threading.Lock()
+        self._redis: Any = None
+        self._aredis: Any = None
+        if redis_url:
+            import redis
+            import redis.asyncio
+
+            options = {"socket_timeout": 0.1, "socket_connect_timeout": 0.1}
+            self._redis = redis.Redis.from_url(redis_url, **options)
+            self._aredis = redis.asyncio.Redis.from_url(redis_url, **options)
+
+    def mark(self, user_id: int) -> None:
+        with self._lock:
+            self._local[user_id] = True
+        if self._redis is None:
+            return
+        try:
+            self._redis.set(self._key(user_id), b"1", ex=self._ttl_seconds)
+        except Exception as exc:
+            logger.warning("Recent-write mark for user %s failed: %s", user_id, exc)
+
+    async def mark_async(self, user_id: int) -> None:
+        with self._lock:
+            self._local[user_id] = True
+        if self._aredis is None:
+            return
+        try:
+            await self._aredis.set(self._key(user_id), b"1", ex=self._ttl_seconds)
+        except Exception as exc:
+            logger.warning("Recent-write mark for user %s failed: %s", user_id, exc)
+
+    def is_recent(self, user_id: int) -> bool:
+        if self._is_recent_locally(user_id):
+            return True
+        if self._redis is None:
+            return False
+        try:
+            return bool(self._redis.exists(self._key(user_id)))
+        except Exception:
+            return True
+
+    async def is_recent_async(self, user_id: int) -> bool:
+        if self._is_recent_locally(user_id):
+            return True
+        if self._aredis is None:
+            return False
+        try:
+            return bool(await self._aredis.exists(self._key(user_id)))
+        except Exception:
+            return True
+
+    def _is_recent_locally(self, user_id: int) -> bool:
+        with self._lock:
+            return user_id in self._local
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"recent_write:{user_id}"
+
+
+__all__ = ["RecentWriteTracker"]
@@ -0,0 +1,109 @@
+"""Per-page classification of PDFs: born-digital text layer vs scan/images."""
+
+from __future__ import annotations
+
+import logging
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+A4_AREA_PT = 595.0 * 842.0
+
+# A page goes through the local text path only if all three hold
+MIN_CHARS_PER_A4 = 200  # text density, normalized to an A4 page
+MIN_GLYPH_COVERAGE = 0.9  # share of extracted glyphs mapped to real characters
+MAX_IMAGE_AREA_RATIO = 0.3  # share of the page covered by raster images
+
+
+@dataclass(slots=True)
+class PageLayout:
+    page_number: int  # 1-based
+    text: str
+    char_count: int
+    text_density: float  # non-whitespace chars per A4-equivalent page
+    glyph_coverage: float
+    image_area_ratio: float
+
+    @property
+    def has_text_layer(self) -> bool:
+        return (
+            self.text_density >= MIN_CHARS_PER_A4
+            and self.glyph_coverage >= MIN_GLYPH_COVERAGE
+            and self.image_area_ratio <= MAX_IMAGE_AREA_RATIO
+        )
+
+
+def classify_pdf_pages(path: Path) -> list[PageLayout]:
+    """Extract text and layout signals for every page; [] if unreadable."""
+    from pypdf import PdfReader
+
+    try:
+        reader = PdfReader(str(path))
+        return [
+            _classify_page(page, number)
+            for number, page in enumerate(reader.pages, start=1)
+        ]
+    except Exception as exc:
+        logger.warning("PDF page classification failed for %s: %s", path, exc)
+        return []
+
+
+def _classify_page(page: Any, page_number: int) -> PageLayout:
+    image_names = _image_xobject_names(page)
+    image_area = 0.0
+
+    def _visit(operator: bytes, operands: list[Any], cm: list[float], _tm: Any) -> None:
+        nonlocal image_area
+        if operator == b"Do" and operands and str(operands[0]) in image_names:
+            # the image is drawn into the unit square mapped by the CTM
+            image_area += abs(cm[0] * cm[3] - cm[1] * cm[2])
+
+    text = page.extract_text(visitor_operand_before=_visit) or ""
+
+    page_area = abs(float(page.mediabox.width) * float(page.mediabox.height))
+    page_area = page_area or A4_AREA_PT
+    glyphs = [ch for ch in text if not ch.isspace()]
+    readable = sum(1 for ch in glyphs if _is_readable(ch))
+    return PageLayout(
+        page_number=page_number,
+        text=text,
+        char_count=len(glyphs),
+        text_density=len(glyphs) * A4_AREA_PT / page_area,
+        glyph_coverage=readable / len(glyphs) if glyphs else 0.0,
+        image_area_ratio=min(1.0, image_area / page_area),
+    )
+
+
+def _image_xobject_names(page: Any) -> set[str]:
+    resources = page.get("/Resources")
+    if resources is None:
+        return set()
+    xobjects = resources.get_object().get("/XObject")
+    if xobjects is None:
+        return set()
+    xobjects = xobjects.get_object()
+    return {
+        str(name)
+        for name in xobjects
+        if xobjects[name].get_object().get("/Subtype") == "/Image"
+    }
+
+
+def _is_readable(ch: str) -> bool:
+    # fonts without a ToUnicode map extract as U+FFFD, control or private-use
+    # code points; those pages need OCR even though they "have text"
+    if ch == "\ufffd":
+        return False
+    return unicodedata.category(ch) not in {"Cc", "Co", "Cn", "Cs"}
+
+
+__all__ = [
+    "MAX_IMAGE_AREA_RATIO",
+    "MIN_CHARS_PER_A4",
+    "MIN_GLYPH_COVERAGE",
+    "PageLayout",
+    "classify_pdf_pages",
+]
@@ -4,6 +4,8 @@ import hashlib
 import json
 import logging
 import mimetypes
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import lru_cache
 from pathlib import Path
 from typing import Any
@@ -22,11 +24,25 @@ from app.infrastructure.cache.cache_utils import (
     hash_payload,
     normalize_config,
 )
+from app.infrastructure.extractors.pdf_layout import classify_pdf_pages
 
+from .page_ranges import PageRange, extract_range, split_pdf
 from .prompts import PromptBuilder
 
 logger = logging.getLogger(__name__)
 
+# share of pages (0-1) that must need reasoning to route the whole document there
+REASONING_PAGE_SHARE = 0.25
+
+# How the markdown twin was produced (recorded as material.analysis_pipeline)
+PIPELINE_MULTIMODAL = "multimodal"  # file upload + vision model
+PIPELINE_TEXT_LAYER = "text_layer"  # every PDF page had a usable text layer
+PIPELINE_HYBRID = "hybrid"  # text pages as text, the rest as file ranges
+PIPELINE_TEXT = "text"  # caller passed plain text, no file
+
+# Gemini bills every PDF page it rasterizes at ~258 input tokens
+PDF_PAGE_VISION_TOKENS = 258
+
 class AnalysisPayload(BaseModel):
     """Schemat danych wyjściowych z modelu Gemini."""
     routing_tier: str
@@ -45,6 +61,9 @@ class GeminiDocumentAnalyzer(DocumentAnalyzer):
     def __init__(self, model_name: str | None = None) -> None:
         settings = get_settings()
         self._model_name = model_name or settings.GEMINI_ANALYSIS_MODEL
+        self._pages_per_range = settings.GEMINI_ANALYSIS_PAGES_PER_RANGE
+        self._max_parallel = max(1, settings.GEMINI_ANALYSIS_MAX_PARALLEL)
+        self._text_layer_fast_path = settings.GEMINI_ANALYSIS_TEXT_LAYER_FAST_PATH
 
     @staticmethod
     @lru_cache
@@ -75,16 +94,98 @@ class GeminiDocumentAnalyzer(DocumentAnalyzer):
                 logger.info("Cache hit for file: %s", file_path)
                 return cached_result
 
-        # When a file is attached, source_text is just a short hint — Gemini reads
-        # the file directly. When there is no file, source_text IS the document.
-        hint_text = (
-            source_text
-            if not file_path
-            else (source_text[:1000] if source_text else "")
+        ranges = (
+            self._split_pages(file_path, mime_type, filename) if file_path else []
+        )
+        started = time.monotonic()
+        if file_path and (
+            len(ranges) > 1 or any(r.text is not None for r in ranges)
+        ):
+            markdown_twin, routing_tier, usage, suggested_title = (
+                self._analyze_page_ranges(
+                    file_path=Path(file_path),
+                    ranges=ranges,
+                    filename=filename,
+                    user_id=user_id,
+                    ocr_cache_repository=ocr_cache_repository,
+                )
+            )
+        else:
+            # When a file is attached, source_text is just a short hint — Gemini
+            # reads the file directly. When there is no file, source_text IS
+            # the document.
+            hint_text = (
+                source_text
+                if not file_path
+                else (source_text[:1000] if source_text else "")
+            )
+            parsed_data, usage = self._generate(
+                hint_text=hint_text,
+                filename=filename,
+                mime_type=mime_type,
+                file_path=file_path,
+            )
+            markdown_twin = parsed_data.markdown_twin.strip()
+            routing_tier = parsed_data.to_tier()
+            suggested_title = parsed_data.suggested_title
+            usage["pipeline"] = PIPELINE_MULTIMODAL if file_path else PIPELINE_TEXT
+
+        usage["duration_sec"] = round(time.monotonic() - started, 3)
+        logger.info(
+            "Analysis of %s: pipeline=%s duration=%.2fs tokens=%s "
+            "text_pages=%s multimodal_pages=%s",
+            filename or file_path,
+            usage.get("pipeline"),
+            usage["duration_sec"],
+            usage.get("total_tokens"),
+            usage.get("text_pages"),
+            usage.get("multimodal_pages"),
         )
-        
+
+        # Save to cache if we have file_path, user_id and repository
+        if file_path and user_id is not None and ocr_cache_repository:
+            try:
+                self._save_to_cache(
+                    file_path=file_path,
+                    filename=filename,
+                    mime_type=mime_type,
+                    user_id=user_id,
+                    markdown_twin=markdown_twin,
+                    routing_tier=routing_tier,
+                    suggested_title=suggested_title,
+                    pipeline=usage.get("pipeline"),
+                    ocr_cache_repository=ocr_cache_repository,
+                )
+            except Exception as exc:
+                # Log error but don't fail the request
+                logger.warning("Failed to save to OCR cache: %s", exc)
+
+        return (
+            markdown_twin,
+            routing_tier,
+            usage,
+            suggested_title,
+        )
+
+    def _generate(
+        self,
+        *,
+        hint_text: str,
+        filename: str | None,
+        mime_type: str | None,
+        file_path: str | None,
+        page_range: PageRange | None = None,
+    ) -> tuple[AnalysisPayload, dict]:
+        """Single Gemini request: optional file upload + analysis prompt."""
         prompt = PromptBuilder.build_document_analysis_prompt(
-            text=hint_text, filename=filename, mime_type=mime_type
+            text=hint_text,
+            filename=filename,
+            mime_type=mime_type,
+            page_range=(
+                (page_range.start, page_range.end, page_range.total)
+                if page_range
+                else None
+            ),
         )
 
         # Używamy klasy Pydantic jako schematu
@@ -95,7 +196,7 @@ class GeminiDocumentAnalyzer(DocumentAnalyzer):
         )
 
         contents: list[Any] = []
-        
+
         if file_path:
             local_path = Path(file_path)
             if not local_path.exists():
@@ -107,6 +208,9 @@ class GeminiDocumentAnalyzer(DocumentAnalyzer):
                 if not mime_type:
                     mime_type = "application/octet-stream"
 
+                display_name = filename or local_path.name
+                if page_range:
+                    display_name += f" (str. {page_range.start}-{page_range.end})"
                 logger.info(
                     "Wysyłanie pliku %s z typem MIME: %s", local_path, mime_type
                 )
@@ -114,7 +218,7 @@ class GeminiDocumentAnalyzer(DocumentAnalyzer):
                     file=local_path,
                     config=types.UploadFileConfig(
                         mime_type=mime_type,
-                        display_name=filename or local_path.name,
+                        display_name=display_name,
                     ),
                 )
                 contents.append(uploaded_file)
@@ -142,7 +246,7 @@ class GeminiDocumentAnalyzer(DocumentAnalyzer):
                 if response.text is None:
                     raise ValueError("Odpowiedź modelu jest pusta")
                 parsed_data = AnalysisPayload.model_validate_json(response.text)
-            
+
             # Upewniamy się, że parsed_data to AnalysisPayload
             if not isinstance(parsed_data, AnalysisPayload):
                 if response.text is None:
@@ -161,35 +265,204 @@ class GeminiDocumentAnalyzer(DocumentAnalyzer):
                 "candidates_tokens": response.usage_metadata.candidates_token_count,
                 "total_tokens": response.usage_metadata.total_token_count,
             }
+        return parsed_data, usage
 
-        markdown_twin = parsed_data.markdown_twin.strip()
-        routing_tier = parsed_data.to_tier()
-        suggested_title = parsed_data.suggested_title
-
-        # Save to cache if we have file_path, user_id and repository
-        if file_path and user_id is not None and ocr_cache_repository:
-            try:
-                self._save_to_cache(
-                    file_path=file_path,
-                    filename=filename,
-                    mime_type=mime_type,
-                    user_id=user_id,
-                    markdown_twin=markdown_twin,
-                    routing_tier=routing_tier,
-                    suggested_title=suggested_title,
-                    ocr_cache_repository=ocr_cache_repository,
-                )
-            except Exception as exc:
-                # Log error but don't fail the request
-                logger.warning("Failed to save to OCR cache: %s", exc)
+    def _split_pages(
+        self, file_path: str, mime_type: str | None, filename: str | None
+    ) -> list[PageRange]:
+        is_pdf = mime_type == "application/pdf" or (
+            (filename or file_path).lower().endswith(".pdf")
+        )
+        if not is_pdf:
+            return []
+        page_texts: dict[int, str] = {}
+        if self._text_layer_fast_path:
+            page_texts = {
+                layout.page_number: layout.text
+                for layout in classify_pdf_pages(Path(file_path))
+                if layout.has_text_layer
+            }
+        if self._pages_per_range <= 0 and not page_texts:
+            return []
+        return split_pdf(
+            Path(file_path), self._pages_per_range, page_texts=page_texts
+        )
 
+    def _analyze_page_ranges(
+        self,
+        *,
+        file_path: Path,
+        ranges: list[PageRange],
+        filename: str | None,
+        user_id: int | None,
+        ocr_cache_repository: OcrCacheRepository | None,
+    ) -> tuple[str, RoutingTier, dict, str | None]:
+        """Analyze page ranges concurrently and stitch them in page order.
+
+        Each range is cached by the hash of its pages' content, so an edited
+        re-upload only sends the changed ranges to Gemini. The cache
+        repository is bound to the caller's session, so it is only touched
+        from this thread.
+        """
+        use_cache = user_id is not None and ocr_cache_repository is not None
+        results: list[AnalysisPayload | None] = [
+            self._get_cached_range(page_range, ocr_cache_repository)
+            if use_cache and ocr_cache_repository
+            else None
+            for page_range in ranges
+        ]
+        pending = [i for i, result in enumerate(results) if result is None]
+        usage: dict[str, Any] = {}
+        errors: list[Exception] = []
+
+        if pending:
+            workers = min(self._max_parallel, len(pending))
+            with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="gemini-range"
+            ) as pool:
+                futures = {
+                    pool.submit(
+                        self._analyze_range, file_path, ranges[i], filename
+                    ): i
+                    for i in pending
+                }
+                for future in as_completed(futures):
+                    index = futures[future]
+                    try:
+                        payload, range_usage = future.result()
+                    except Exception as exc:
+                        errors.append(exc)
+                        continue
+                    results[index] = payload
+                    for key, value in range_usage.items():
+                        usage[key] = int(usage.get(key, 0)) + (value or 0)
+                    if use_cache and ocr_cache_repository and user_id is not None:
+                        self._save_range_to_cache(
+                            ranges[index], payload, user_id, ocr_cache_repository
+                        )
+
+        logger.info(
+            "Analyzed %s in %s page ranges (%s from cache, %s failed)",
+            file_path.name,
+            len(ranges),
+            len(ranges) - len(pending),
+            len(errors),
+        )
+        if errors:
+            # successful ranges are already cached, a retry redoes only the rest
+            raise errors[0]
+
+        text_pages = sum(r.page_count for r in ranges if r.text is not None)
+        multimodal_pages = sum(r.page_count for r in ranges if r.text is None)
+        usage["text_pages"] = text_pages
+        usage["multimodal_pages"] = multimodal_pages
+        usage["vision_tokens_saved_est"] = text_pages * PDF_PAGE_VISION_TOKENS
+        if not multimodal_pages:
+            usage["pipeline"] = PIPELINE_TEXT_LAYER
+        elif text_pages:
+            usage["pipeline"] = PIPELINE_HYBRID
+        else:
+            usage["pipeline"] = PIPELINE_MULTIMODAL
+
+        payloads = [payload for payload in results if payload is not None]
+        markdown_twin = "\n\n".join(
+            text for text in (p.markdown_twin.strip() for p in payloads) if text
+        )
+        suggested_title = next(
+            (p.suggested_title for p in payloads if p.suggested_title), None
+        )
         return (
             markdown_twin,
-            routing_tier,
+            self._combine_tiers(ranges, payloads),
             usage,
             suggested_title,
         )
 
+    def _analyze_range(
+        self, file_path: Path, page_range: PageRange, filename: str | None
+    ) -> tuple[AnalysisPayload, dict]:
+        if page_range.text is not None:
+            # born-digital pages: locally extracted text, no upload/vision call
+            return self._generate(
+                hint_text=page_range.text,
+                filename=filename,
+                mime_type="text/plain",
+                file_path=None,
+                page_range=page_range,
+            )
+        with extract_range(file_path, page_range) as range_path:
+            return self._generate(
+                hint_text="",
+                filename=filename,
+                mime_type="application/pdf",
+                file_path=str(range_path),
+                page_range=page_range,
+            )
+
+    @staticmethod
+    def _combine_tiers(
+        ranges: list[PageRange], payloads: list[AnalysisPayload]
+    ) -> RoutingTier:
+        """REASONING when enough of the document (by pages) needs it."""
+        total_pages = sum(r.page_count for r in ranges) or 1
+        reasoning_pages = sum(
+            r.page_count
+            for r, payload in zip(ranges, payloads, strict=False)
+            if payload.to_tier() == RoutingTier.REASONING
+        )
+        if reasoning_pages / total_pages >= REASONING_PAGE_SHARE:
+            return RoutingTier.REASONING
+        return RoutingTier.FAST
+
+    @staticmethod
+    def _build_range_options_hash(page_range: PageRange) -> str:
+        mode = "text_layer" if page_range.text is not None else "page_range"
+        return hash_payload(normalize_config({"mode": mode, "model": "gemini"}))
+
+    @classmethod
+    def _build_range_cache_key(cls, page_range: PageRange) -> str:
+        # filename is left out on purpose: a renamed re-upload reuses ranges
+        return hash_payload(
+            page_range.fingerprint,
+            cls._build_range_options_hash(page_range),
+            OCR_PIPELINE_VERSION,
+        )
+
+    def _get_cached_range(
+        self, page_range: PageRange, ocr_cache_repository: OcrCacheRepository
+    ) -> AnalysisPayload | None:
+        try:
+            entry = ocr_cache_repository.get_by_key(
+                self._build_range_cache_key(page_range)
+            )
+            if entry:
+                return AnalysisPayload.model_validate_json(entry.result_ref)
+        except Exception as exc:
+            logger.warning("Error checking page range cache: %s", exc)
+        return None
+
+    def _save_range_to_cache(
+        self,
+        page_range: PageRange,
+        payload: AnalysisPayload,
+        user_id: int,
+        ocr_cache_repository: OcrCacheRepository,
+    ) -> None:
+        try:
+            ocr_cache_repository.add(
+                OcrCache(
+                    id=None,
+                    user_id=user_id,
+                    file_hash=page_range.fingerprint,
+                    ocr_options_hash=self._build_range_options_hash(page_range),
+                    pipeline_version=OCR_PIPELINE_VERSION,
+                    result_ref=payload.model_dump_json(),
+                    cache_key=self._build_range_cache_key(page_range),
+                )
+            )
+        except Exception as exc:
+            logger.warning("Failed to save page range to OCR cache: %s", exc)
+
     def _check_cache(
         self,
         *,
@@ -227,7 +500,8 @@ class GeminiDocumentAnalyzer(DocumentAnalyzer):
                     return (
                         markdown_twin,
                         routing_tier,
-                        {},  # usage metadata not cached
+                        # token usage is not cached, only how it was produced
+                        {"pipeline": cached_data.get("pipeline"), "cache_hit": True},
                         suggested_title,
                     )
                 except (json.JSONDecodeError, KeyError):
@@ -253,6 +527,7 @@ class GeminiDocumentAnalyzer(DocumentAnalyzer):
         ocr_cache_repository: OcrCacheRepository,
         routing_tier: RoutingTier | None = None,
         suggested_title: str | None = None,
+        pipeline: str | None = None,
     ) -> None:
         """Save analysis result to cache."""
         try:
@@ -272,6 +547,7 @@ class GeminiDocumentAnalyzer(DocumentAnalyzer):
                 "markdown_twin": markdown_twin,
                 "routing_tier": routing_tier.value if routing_tier else "fast",
                 "suggested_title": suggested_title,
+                "pipeline": pipeline,
             }
             result_ref = json.dumps(result_data, ensure_ascii=False)
 
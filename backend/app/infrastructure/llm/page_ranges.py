@@ -0,0 +1,143 @@
+"""Split PDFs into page ranges for parallel analysis (pypdf)."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Form XObjects may nest other XObjects; deeper trees are hashed only by name
+_MAX_XOBJECT_DEPTH = 3
+
+
+@dataclass(frozen=True, slots=True)
+class PageRange:
+    """Pages ``start..end`` (1-based, inclusive) of a PDF with ``total`` pages.
+
+    ``fingerprint`` hashes the content of the pages only (content streams and
+    embedded images), so re-saving or editing other pages keeps it stable.
+    ``text`` is set when every page has a usable text layer; such ranges are
+    sent to the model as plain text instead of a file upload.
+    """
+
+    start: int
+    end: int
+    total: int
+    fingerprint: str
+    text: str | None = None
+
+    @property
+    def page_count(self) -> int:
+        return self.end - self.start + 1
+
+
+def split_pdf(
+    path: Path,
+    pages_per_range: int,
+    *,
+    page_texts: dict[int, str] | None = None,
+) -> list[PageRange]:
+    """Return page ranges of the PDF; empty list if it can't be read.
+
+    page_texts: 1-based page number -> locally extracted text for pages with
+    a good text layer. Ranges never mix text and multimodal pages.
+    pages_per_range <= 0 keeps each run of same-kind pages in one range.
+    """
+    from pypdf import PdfReader
+
+    try:
+        reader = PdfReader(str(path))
+        page_hashes = [_page_fingerprint(page) for page in reader.pages]
+    except Exception as exc:
+        logger.warning("Cannot split PDF %s into page ranges: %s", path, exc)
+        return []
+
+    texts = page_texts or {}
+    total = len(page_hashes)
+    step = pages_per_range if pages_per_range > 0 else max(1, total)
+    ranges: list[PageRange] = []
+    start = 1
+    while start <= total:
+        is_text = start in texts
+        end = start
+        while (
+            end < total
+            and end - start + 1 < step
+            and ((end + 1) in texts) == is_text
+        ):
+            end += 1
+        chunk = page_hashes[start - 1 : end]
+        ranges.append(
+            PageRange(
+                start=start,
+                end=end,
+                total=total,
+                fingerprint=hashlib.sha256("|".join(chunk).encode()).hexdigest(),
+                text=(
+                    "\n\n".join(texts[n] for n in range(start, end + 1))
+                    if is_text
+                    else None
+                ),
+            )
+        )
+        start = end + 1
+    return ranges
+
+
+@contextmanager
+def extract_range(path: Path, page_range: PageRange) -> Iterator[Path]:
+    """Write the pages of ``page_range`` to a temporary PDF."""
+    from pypdf import PdfReader, PdfWriter
+
+    reader = PdfReader(str(path))
+    writer = PdfWriter()
+    for index in range(page_range.start - 1, page_range.end):
+        writer.add_page(reader.pages[index])
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        writer.write(tmp)
+        tmp_path = Path(tmp.name)
+    try:
+        yield tmp_path
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _page_fingerprint(page: Any) -> str:
+    sha256 = hashlib.sha256()
+    sha256.update(repr(list(page.mediabox)).encode())
+    contents = page.get_contents()
+    if contents is not None:
+        sha256.update(contents.get_data())
+    _hash_xobjects(sha256, page.get("/Resources"), depth=0)
+    return sha256.hexdigest()
+
+
+def _hash_xobjects(sha256: Any, resources: Any, *, depth: int) -> None:
+    if resources is None:
+        return
+    xobjects = resources.get_object().get("/XObject")
+    if xobjects is None:
+        return
+    xobjects = xobjects.get_object()
+    for name in sorted(xobjects.keys()):
+        sha256.update(str(name).encode())
+        if depth >= _MAX_XOBJECT_DEPTH:
+            continue
+        xobject = xobjects[name].get_object()
+        try:
+            sha256.update(xobject.get_data())
+        except Exception:
+            continue
+        if xobject.get("/Subtype") == "/Form":
+            _hash_xobjects(sha256, xobject.get("/Resources"), depth=depth + 1)
+
+
+__all__ = ["PageRange", "extract_range", "split_pdf"]
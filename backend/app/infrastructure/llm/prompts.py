@@ -389,16 +389,29 @@ class PromptBuilder:
 
     @classmethod
     def build_document_analysis_prompt(
-        cls, *, text: str, filename: str | None, mime_type: str | None
+        cls,
+        *,
+        text: str,
+        filename: str | None,
+        mime_type: str | None,
+        page_range: tuple[int, int, int] | None = None,
     ) -> str:
         """
         Prompt for generating a Markdown "document twin" from source text.
+        page_range: (start, end, total) when the file is a fragment of a PDF.
         """
         context = []
         if filename:
             context.append(f"Nazwa pliku: {filename}")
         if mime_type:
             context.append(f"MIME: {mime_type}")
+        if page_range:
+            start, end, total = page_range
+            context.append(
+                f"Fragment dokumentu: strony {start}-{end} z {total}. "
+                "Opisz wyłącznie ten fragment, bez wstępu ani podsumowania "
+                "całego dokumentu."
+            )
         context_header = "\n".join(context)
 
         parts = [
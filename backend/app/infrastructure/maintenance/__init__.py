@@ -0,0 +1,17 @@
+"""Resumable batch maintenance (backfills, re-processing, cache warming)."""
+
+from .runner import (
+    Checkpoint,
+    MaintenanceRunner,
+    MaintenanceStats,
+    MaintenanceTask,
+    RateLimiter,
+)
+
+__all__ = [
+    "Checkpoint",
+    "MaintenanceRunner",
+    "MaintenanceStats",
+    "MaintenanceTask",
+    "RateLimiter",
+]
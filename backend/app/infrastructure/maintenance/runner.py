@@ -0,0 +1,364 @@
+"""Generic, resumable maintenance runner used by ``python -m app.cli``.
+
+Candidates are fetched in keyset pages ``(key, owner_id)`` ordered by key,
+processed by a bounded thread pool and checkpointed as a low watermark:
+the highest key for which every smaller candidate has finished. A crashed
+run resumes from the watermark, so at most the in-flight items are redone.
+Failed items are kept in the checkpoint and retried by the next run; a run
+that finishes every candidate without failures deletes the checkpoint, so
+the one after it starts from the beginning again.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# (after_key, limit) -> [(key, owner_id), ...] ordered by key ascending
+PageFetcher = Callable[[int, int], Sequence[tuple[int, int]]]
+# (owner_id, key) -> True if processed, False if skipped
+ItemProcessor = Callable[[int, int], bool]
+
+
+class RateLimiter:
+    """Thread-safe token bucket; ``acquire`` blocks until a token is free."""
+
+    def __init__(self, rate: float, *, per: float = 1.0, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self._interval = per / rate
+        self._capacity = float(max(1, burst))
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cost: float = 1.0) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._capacity,
+                    self._tokens + (now - self._updated) / self._interval,
+                )
+                self._updated = now
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    return
+                wait_for = (cost - self._tokens) * self._interval
+            time.sleep(wait_for)
+
+
+@dataclass(slots=True)
+class MaintenanceStats:
+    processed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    failed_keys: list[int] = field(default_factory=list)
+
+    @property
+    def done(self) -> int:
+        return self.processed + self.skipped + self.failed
+
+
+class Checkpoint:
+    """JSON checkpoint: ``{"last_key": int, "stats": {...}, "retry": [...]}``.
+
+    ``retry`` holds the ``[key, owner_id]`` pairs that failed (or were not
+    retried yet) and are processed again before the next run continues.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self._path = Path(path)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def load(self) -> tuple[int, MaintenanceStats, dict[int, int]]:
+        """``(last_key, stats, retry)`` with ``retry`` mapping key -> owner_id."""
+        if not self._path.exists():
+            return 0, MaintenanceStats(), {}
+        try:
+            data = json.loads(self._path.read_text())
+            stats = MaintenanceStats(**data.get("stats", {}))
+            retry = {int(key): int(owner_id) for key, owner_id in data.get("retry", [])}
+            return int(data.get("last_key", 0)), stats, retry
+        except Exception as exc:
+            logger.warning("Ignoring unreadable checkpoint %s: %s", self._path, exc)
+            return 0, MaintenanceStats(), {}
+
+    def save(
+        self,
+        last_key: int,
+        stats: MaintenanceStats,
+        retry: dict[int, int] | None = None,
+    ) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_suffix(self._path.suffix + ".tmp")
+        data = {
+            "last_key": last_key,
+            "stats": asdict(stats),
+            "retry": sorted((retry or {}).items()),
+        }
+        tmp.write_text(json.dumps(data))
+        tmp.replace(self._path)  # atomic on POSIX
+
+    def reset(self) -> None:
+        self._path.unlink(missing_ok=True)
+
+
+@dataclass(slots=True)
+class MaintenanceTask:
+    name: str
+    fetch_page: PageFetcher
+    process: ItemProcessor
+    count: Callable[[int], int] | None = None  # (after_key) -> remaining
+    rate_limiters: tuple[RateLimiter, ...] = ()
+
+
+class _Watermark:
+    """Tracks the highest key below which every submitted item finished."""
+
+    def __init__(self, start: int) -> None:
+        self.value = start
+        self._pending: deque[int] = deque()
+        self._finished: set[int] = set()
+
+    def submit(self, key: int) -> None:
+        self._pending.append(key)
+
+    def finish(self, key: int) -> None:
+        self._finished.add(key)
+        while self._pending and self._pending[0] in self._finished:
+            done_key = self._pending.popleft()
+            self._finished.discard(done_key)
+            self.value = done_key
+
+
+class MaintenanceRunner:
+    def __init__(
+        self,
+        task: MaintenanceTask,
+        *,
+        concurrency: int = 4,
+        page_size: int = 200,
+        limit: int | None = None,
+        checkpoint: Checkpoint | None = None,
+        checkpoint_every: float = 5.0,
+        progress_every: float = 2.0,
+        out: Callable[[str], None] = print,
+    ) -> None:
+        self._task = task
+        self._concurrency = max(1, concurrency)
+        self._page_size = max(1, page_size)
+        self._limit = limit
+        self._checkpoint = checkpoint
+        self._checkpoint_every = checkpoint_every
+        self._progress_every = progress_every
+        self._out = out
+
+    def iter_candidates(self, after_key: int = 0) -> Iterator[tuple[int, int]]:
+        """Yield ``(key, owner_id)`` page by page (keyset, no OFFSET)."""
+        yielded = 0
+        while True:
+            page = self._task.fetch_page(after_key, self._page_size)
+            if not page:
+                return
+            for key, owner_id in page:
+                if self._limit is not None and yielded >= self._limit:
+                    return
+                yielded += 1
+                yield key, owner_id
+            after_key = page[-1][0]
+            if len(page) < self._page_size:
+                return
+
+    def preview(self) -> tuple[list[tuple[int, int]], int]:
+        """What ``run`` would process: ``(candidates, total)``; changes nothing."""
+        start_key, _, retry = self._load()
+        candidates = sorted(retry.items())
+        candidates.extend(self._fresh_candidates(start_key, retry))
+        remaining = self._estimate_total(start_key)
+        total = (
+            len(candidates)
+            if remaining is None
+            else remaining + _retried_below(retry, start_key)
+        )
+        return candidates, total
+
+    def run(self) -> MaintenanceStats:
+        start_key, stats, retry = self._load()
+        if start_key or retry:
+            self._out(
+                f"Resuming {self._task.name} after key={start_key}"
+                + (f", retrying {len(retry)} failed" if retry else "")
+            )
+            # retried items are counted again by their new outcome
+            stats.failed = max(0, stats.failed - len(retry))
+            stats.failed_keys = [k for k in stats.failed_keys if k not in retry]
+        total = self._estimate_total(start_key)
+        if total is not None:
+            total += _retried_below(retry, start_key)
+
+        watermark = _Watermark(start_key)
+        started = time.monotonic()
+        last_progress = last_checkpoint = started
+        base_done = stats.done
+        in_flight: dict[Future[bool], tuple[int, int]] = {}
+        pending_retry = dict(retry)  # failed or not yet retried: key -> owner_id
+        submitted = 0
+        finished_all = False
+
+        def _collect(finished: set[Future[bool]]) -> None:
+            for future in finished:
+                key, owner_id = in_flight.pop(future)
+                try:
+                    if future.result():
+                        stats.processed += 1
+                    else:
+                        stats.skipped += 1
+                    pending_retry.pop(key, None)
+                except Exception as exc:
+                    stats.failed += 1
+                    stats.failed_keys.append(key)
+                    pending_retry[key] = owner_id
+                    logger.warning(
+                        "%s failed for key=%s: %s", self._task.name, key, exc
+                    )
+                if key not in retry:
+                    watermark.finish(key)
+
+        def _candidates() -> Iterator[tuple[int, int]]:
+            nonlocal submitted
+            yield from sorted(retry.items())
+            for candidate in self._fresh_candidates(start_key, retry):
+                submitted += 1
+                yield candidate
+
+        with ThreadPoolExecutor(
+            max_workers=self._concurrency, thread_name_prefix=self._task.name
+        ) as pool:
+            try:
+                for key, owner_id in _candidates():
+                    # bounded in-flight window keeps memory flat on huge tables
+                    while len(in_flight) >= self._concurrency * 2:
+                        finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        _collect(finished)
+                    if key not in retry:
+                        watermark.submit(key)
+                    future = pool.submit(self._process_one, owner_id, key)
+                    in_flight[future] = (key, owner_id)
+
+                    now = time.monotonic()
+                    if now - last_progress >= self._progress_every:
+                        self._report(stats, base_done, total, started)
+                        last_progress = now
+                    if self._checkpoint and now - last_checkpoint >= (
+                        self._checkpoint_every
+                    ):
+                        self._checkpoint.save(watermark.value, stats, pending_retry)
+                        last_checkpoint = now
+                while in_flight:
+                    finished, _ = wait(
+                        in_flight,
+                        timeout=self._progress_every,
+                        return_when=FIRST_COMPLETED,
+                    )
+                    _collect(finished)
+                    now = time.monotonic()
+                    if now - last_progress >= self._progress_every:
+                        self._report(stats, base_done, total, started)
+                        last_progress = now
+                # --limit stops before the end; only a full pass may start over
+                finished_all = self._limit is None or submitted < self._limit
+            finally:
+                # also on Ctrl+C: persist what is known to be complete
+                if in_flight:
+                    finished, _ = wait(in_flight)
+                    _collect(finished)
+                if self._checkpoint:
+                    if finished_all and not pending_retry:
+                        self._checkpoint.reset()
+                    else:
+                        self._checkpoint.save(watermark.value, stats, pending_retry)
+
+        self._report(stats, base_done, total, started)
+        return stats
+
+    def _fresh_candidates(
+        self, start_key: int, retry: dict[int, int]
+    ) -> Iterator[tuple[int, int]]:
+        # a failed key above the watermark is already queued by the retry pass
+        for key, owner_id in self.iter_candidates(start_key):
+            if key not in retry:
+                yield key, owner_id
+
+    def _load(self) -> tuple[int, MaintenanceStats, dict[int, int]]:
+        if self._checkpoint is None:
+            return 0, MaintenanceStats(), {}
+        return self._checkpoint.load()
+
+    def _process_one(self, owner_id: int, key: int) -> bool:
+        for limiter in self._task.rate_limiters:
+            limiter.acquire()
+        return self._task.process(owner_id, key)
+
+    def _estimate_total(self, after_key: int) -> int | None:
+        if self._task.count is None:
+            return self._limit
+        try:
+            remaining = self._task.count(after_key)
+        except Exception as exc:
+            logger.warning("Count for %s failed: %s", self._task.name, exc)
+            return self._limit
+        return min(remaining, self._limit) if self._limit is not None else remaining
+
+    def _report(
+        self,
+        stats: MaintenanceStats,
+        base_done: int,
+        total: int | None,
+        started: float,
+    ) -> None:
+        done = stats.done - base_done
+        elapsed = max(time.monotonic() - started, 1e-6)
+        rate = done / elapsed
+        line = (
+            f"[{self._task.name}] {done}"
+            + (f"/{total}" if total is not None else "")
+            + f" ok={stats.processed} skip={stats.skipped} fail={stats.failed}"
+            + f" {rate:.1f}/s"
+        )
+        if total is not None and rate > 0:
+            line += f" eta={_format_seconds((total - done) / rate)}"
+        self._out(line)
+
+
+def _retried_below(retry: dict[int, int], start_key: int) -> int:
+    """Retried keys not already counted among the candidates after ``start_key``."""
+    return sum(1 for key in retry if key <= start_key)
+
+
+def _format_seconds(seconds: float) -> str:
+    seconds = max(0, int(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours:d}:{minutes:02d}:{secs:02d}"
+
+
+__all__ = [
+    "Checkpoint",
+    "MaintenanceRunner",
+    "MaintenanceStats",
+    "MaintenanceTask",
+    "RateLimiter",
+]
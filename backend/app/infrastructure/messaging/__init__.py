@@ -0,0 +1,3 @@
+from .job_events import RedisJobEventBus
+
+__all__ = ["RedisJobEventBus"]
@@ -0,0 +1,158 @@
+"""Job status events over Redis pub/sub, fanned out to local SSE streams."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_RECONNECT_DELAY_SECONDS = 1.0
+_READY_TIMEOUT_SECONDS = 2.0
+
+
+class _Subscription:
+    def __init__(self, queue_size: int) -> None:
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(queue_size)
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def next(self, timeout: float) -> dict[str, Any] | None:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+    def deliver(self, event: dict[str, Any]) -> None:
+        if self._closed:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # a slow client: end its stream, it resumes from Last-Event-ID
+            self.close()
+
+    def close(self) -> None:
+        self._closed = True
+
+
+class RedisJobEventBus:
+    """Publishes on ``<prefix>:<owner_id>``; one pattern subscription per process.
+
+    Every open stream of this process is served by a single Redis
+    connection, not one per client. Messages published while that
+    connection was down are lost, so on reconnect all current subscriptions
+    are closed and their clients resume from the database.
+    """
+
+    def __init__(
+        self, *, redis_url: str, channel_prefix: str = "jobs", queue_size: int = 100
+    ) -> None:
+        import redis
+        import redis.asyncio
+
+        self._redis = redis.Redis.from_url(
+            redis_url, socket_timeout=0.25, socket_connect_timeout=0.25
+        )
+        self._aredis = redis.asyncio.Redis.from_url(redis_url)
+        self._prefix = channel_prefix
+        self._queue_size = max(1, queue_size)
+        self._subscribers: dict[int, set[_Subscription]] = {}
+        self._listener: asyncio.Task[None] | None = None
+        self._ready: asyncio.Event | None = None
+
+    def publish(self, owner_id: int, event: dict[str, Any]) -> None:
+        try:
+            self._redis.publish(self._channel(owner_id), json.dumps(event))
+        except Exception as exc:
+            logger.warning("Job event for owner %s not published: %s", owner_id, exc)
+
+    @asynccontextmanager
+    async def subscribe(self, owner_id: int) -> AsyncIterator[_Subscription]:
+        subscription = _Subscription(self._queue_size)
+        self._subscribers.setdefault(owner_id, set()).add(subscription)
+        if self._ready is None:
+            self._ready = asyncio.Event()
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        try:
+            # callers read missed changes from the database next, so only
+            # return once messages published from now on will arrive
+            await asyncio.wait_for(self._ready.wait(), _READY_TIMEOUT_SECONDS)
+        except TimeoutError:
+            subscription.close()
+        try:
+            yield subscription
+        finally:
+            subscription.close()
+            owners = self._subscribers.get(owner_id)
+            if owners is not None:
+                owners.discard(subscription)
+                if not owners:
+                    del self._subscribers[owner_id]
+
+    async def aclose(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+        await self._aredis.close()
+
+    async def _listen(self) -> None:
+        while self._subscribers:
+            pubsub = self._aredis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(f"{self._prefix}:*")
+                self._set_ready(True)
+                while self._subscribers:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self._dispatch(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Job event subscription lost: %s", exc)
+                self._close_all()
+                await asyncio.sleep(_RECONNECT_DELAY_SECONDS)
+            finally:
+                self._set_ready(False)
+                with suppress(Exception):
+                    await pubsub.close()
+
+    def _set_ready(self, ready: bool) -> None:
+        if self._ready is not None:
+            if ready:
+                self._ready.set()
+            else:
+                self._ready.clear()
+
+    def _dispatch(self, message: dict[str, Any]) -> None:
+        channel = message.get("channel")
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        try:
+            owner_id = int(str(channel).rsplit(":", 1)[1])
+            event = json.loads(message["data"])
+        except (IndexError, KeyError, TypeError, ValueError):
+            return
+        for subscription in list(self._subscribers.get(owner_id, ())):
+            subscription.deliver(event)
+
+    def _close_all(self) -> None:
+        for owners in self._subscribers.values():
+            for subscription in owners:
+                subscription.close()
+
+    def _channel(self, owner_id: int) -> str:
+        return f"{self._prefix}:{owner_id}"
+
+
+__all__ = ["RedisJobEventBus"]
@@ -1,25 +1,45 @@
 import logging
+from contextvars import Token
+from typing import Any
 
-from celery.signals import task_failure, task_success
+from celery.signals import task_failure, task_postrun, task_prerun
 
-from app.infrastructure.monitoring.posthog_client import analytics
+from app.core.config import get_settings
+from app.db.instrumentation import (
+    SqlStats,
+    report_sql_stats,
+    start_sql_tracking,
+    stop_sql_tracking,
+)
+from app.domain.events import AnalyticsEvent
 
 logger = logging.getLogger(__name__)
 
-@task_success.connect
-def on_task_success(sender=None, result=None, **kwargs):
-    """
-    General handler for successful tasks.
-    sender is the task function.
-    """
-    task_name = getattr(sender, "name", "unknown")
-    
-    # We can add more specific logic here if needed
-    if task_name == "app.tasks.process_material":
-        # For this specific task, we've already handled capture inside the task
-        # to get access to material properties. 
-        # But we ensure a flush here.
-        analytics.flush()
+# task_id -> open SQL tracking scope (prerun and postrun run in the same thread)
+_sql_scopes: dict[str, tuple[SqlStats, Token[Any]]] = {}
+
+
+@task_prerun.connect
+def on_task_prerun(task_id=None, task=None, **kwargs):
+    if task_id and get_settings().SQL_INSTRUMENTATION:
+        _sql_scopes[task_id] = start_sql_tracking()
+
+
+@task_postrun.connect
+def on_task_postrun(task_id=None, task=None, state=None, **kwargs):
+    scope = _sql_scopes.pop(task_id, None) if task_id else None
+    if scope is None:
+        return
+    stats, token = scope
+    stop_sql_tracking(token)
+    settings = get_settings()
+    report_sql_stats(
+        stats,
+        scope=f"task {getattr(task, 'name', 'unknown')}",
+        budget=settings.SQL_TASK_STATEMENT_BUDGET,
+        n_plus_one_threshold=settings.SQL_N_PLUS_ONE_THRESHOLD,
+        extra={"task_id": task_id, "task_state": state},
+    )
 
 @task_failure.connect
 def on_task_failure(
@@ -34,7 +54,7 @@ def on_task_failure(
     General handler for failed tasks.
     """
     task_name = getattr(sender, "name", "unknown")
-    
+
     # Extract owner_id if possible (it's usually in args)
     # For material task: args=(job_id, owner_id, material_id)
     # For test generation: args=(job_id, owner_id, payload)
@@ -42,15 +62,21 @@ def on_task_failure(
     if args and len(args) > 1:
         user_id = str(args[1])
 
-    analytics.capture(
+    event = AnalyticsEvent.create(
         user_id=user_id,
         event="task_failed",
         properties={
             "task_name": task_name,
             "task_id": task_id,
             "error": str(exception),
-            "exception_type": type(exception).__name__
-        }
+            "exception_type": type(exception).__name__,
+        },
     )
-    analytics.flush()
+    # the task's own transaction is gone; the event gets one of its own
+    try:
+        from app.bootstrap import get_container
 
+        with get_container().provide_unit_of_work() as uow:
+            uow.outbox.add(event)
+    except Exception:
+        logger.exception("Could not record task_failed for task %s", task_id)
@@ -1,49 +1,52 @@
 from __future__ import annotations
 
-from posthog import Posthog
+from collections.abc import Sequence
+
+from posthog.request import batch_post
 
 from app.core.config import get_settings
+from app.domain.events import AnalyticsEvent
 
 
-class AnalyticsClient:
-    def __init__(self):
-        self._client: Posthog | None = None
-
-    @property
-    def client(self) -> Posthog:
-        if self._client is None:
-            settings = get_settings()
-            api_key = settings.POSTHOG_API_KEY or ""
-            self._client = Posthog(
-                project_api_key=api_key,
-                host=settings.POSTHOG_HOST
-            )
-        return self._client
-
-    def capture(self, user_id: str | int, event: str, properties: dict | None = None):
-        """
-        Capture an event in PostHog.
-        user_id can be a string (email) or an integer (database ID).
-        """
-        settings = get_settings()
-        if not settings.POSTHOG_API_KEY:
-            return
+class PostHogAnalyticsSink:
+    """Sends outbox batches to PostHog's batch endpoint in one request.
+
+    Unlike the PostHog client's background queue, a failed request raises,
+    so the dispatcher retries the batch instead of losing it. Without
+    POSTHOG_API_KEY events are dropped.
+    """
 
-        self.client.capture(
-            distinct_id=str(user_id),
-            event=event,
-            properties=properties or {}
+    def __init__(self, *, api_key: str | None, host: str, timeout: int = 10) -> None:
+        self._api_key = api_key
+        self._host = host
+        self._timeout = timeout
+
+    def capture_batch(self, events: Sequence[tuple[str, AnalyticsEvent]]) -> None:
+        if not self._api_key or not events:
+            return
+        batch_post(
+            self._api_key,
+            host=self._host,
+            gzip=True,
+            timeout=self._timeout,
+            batch=[
+                {
+                    "uuid": uuid,
+                    "event": event.event,
+                    "distinct_id": event.distinct_id,
+                    "properties": event.properties,
+                    "timestamp": event.occurred_at.isoformat() + "Z",
+                }
+                for uuid, event in events
+            ],
         )
 
-    def flush(self):
-        """Force immediate sending of all queued events."""
-        if self._client:
-            self._client.flush()
 
-    def shutdown(self):
-        if self._client:
-            self._client.flush()
-            self._client.shutdown()
+def create_analytics_sink() -> PostHogAnalyticsSink:
+    settings = get_settings()
+    return PostHogAnalyticsSink(
+        api_key=settings.POSTHOG_API_KEY, host=settings.POSTHOG_HOST
+    )
 
-analytics = AnalyticsClient()
 
+__all__ = ["PostHogAnalyticsSink", "create_analytics_sink"]
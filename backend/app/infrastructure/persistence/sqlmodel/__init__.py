@@ -1,5 +1,10 @@
 """SQLModel-based repository implementations."""
 
+from .async_repositories import (
+    SqlModelAsyncJobRepository,
+    SqlModelAsyncMaterialRepository,
+    SqlModelAsyncTestRepository,
+)
 from .mappers import (
     file_to_domain,
     file_to_row,
@@ -21,10 +26,12 @@ from .mappers import (
     refresh_token_to_row,
     test_to_domain,
     test_to_row,
+    user_stats_to_domain,
     user_to_domain,
     user_to_row,
 )
 from .notification_repository import SqlModelNotificationRepository
+from .outbox_repository import SqlModelOutboxRepository
 from .repositories import (
     SqlModelFileRepository,
     SqlModelJobRepository,
@@ -38,13 +45,18 @@ from .repositories import (
     SqlModelUserRepository,
 )
 from .support_repository import SqlModelSupportRepository
+from .user_stats_repository import SqlModelUserStatsRepository
 
 __all__ = [
+    "SqlModelAsyncJobRepository",
+    "SqlModelAsyncMaterialRepository",
+    "SqlModelAsyncTestRepository",
     "SqlModelFileRepository",
     "SqlModelJobRepository",
     "SqlModelMaterialRepository",
     "SqlModelNotificationRepository",
     "SqlModelOcrCacheRepository",
+    "SqlModelOutboxRepository",
     "SqlModelPasswordResetTokenRepository",
     "SqlModelPdfExportCacheRepository",
     "SqlModelPendingVerificationRepository",
@@ -52,6 +64,7 @@ __all__ = [
     "SqlModelSupportRepository",
     "SqlModelTestRepository",
     "SqlModelUserRepository",
+    "SqlModelUserStatsRepository",
     "file_to_domain",
     "file_to_row",
     "job_to_domain",
@@ -72,6 +85,7 @@ __all__ = [
     "refresh_token_to_row",
     "test_to_domain",
     "test_to_row",
+    "user_stats_to_domain",
     "user_to_domain",
     "user_to_row",
 ]
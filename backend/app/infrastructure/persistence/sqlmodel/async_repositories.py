@@ -0,0 +1,80 @@
+"""asyncpg-backed read repositories; statements are shared with the sync ones."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db import models as db_models
+from app.domain.models import Job, Material, TestDetailProjection
+from app.domain.repositories import (
+    AsyncJobRepository,
+    AsyncMaterialRepository,
+    AsyncTestRepository,
+)
+
+from . import mappers, statements
+
+
+class SqlModelAsyncTestRepository(AsyncTestRepository):
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def get_detail_projection(
+        self, test_id: int
+    ) -> TestDetailProjection | None:
+        result = await self._session.execute(
+            statements.test_detail_projection(test_id)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        return statements.test_detail_projection_from_row(test_id, row)
+
+    async def get_revision(self, test_id: int) -> tuple[int, int] | None:
+        result = await self._session.execute(statements.test_revision(test_id))
+        row = result.first()
+        return (int(row[0]), int(row[1])) if row else None
+
+
+class SqlModelAsyncMaterialRepository(AsyncMaterialRepository):
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def list_for_user(self, user_id: int) -> list[Material]:
+        result = await self._session.execute(statements.materials_for_user(user_id))
+        return [mappers.material_to_domain(row) for row in result.scalars()]
+
+
+class SqlModelAsyncJobRepository(AsyncJobRepository):
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def get(self, job_id: int) -> Job | None:
+        db_job = await self._session.get(db_models.Job, job_id)
+        return mappers.job_to_domain(db_job) if db_job else None
+
+    async def get_many(self, owner_id: int, job_ids: list[int]) -> list[Job]:
+        if not job_ids:
+            return []
+        result = await self._session.execute(statements.jobs_by_ids(owner_id, job_ids))
+        return [mappers.job_to_domain(row) for row in result.scalars()]
+
+    async def list_for_user(self, owner_id: int) -> list[Job]:
+        result = await self._session.execute(statements.jobs_for_user(owner_id))
+        return [mappers.job_to_domain(row) for row in result.scalars()]
+
+    async def list_updated_since(
+        self, owner_id: int, since: datetime, *, limit: int
+    ) -> list[Job]:
+        stmt = statements.jobs_updated_since(owner_id, since, limit)
+        result = await self._session.execute(stmt)
+        return [mappers.job_to_domain(row) for row in result.scalars()]
+
+
+__all__ = [
+    "SqlModelAsyncJobRepository",
+    "SqlModelAsyncMaterialRepository",
+    "SqlModelAsyncTestRepository",
+]
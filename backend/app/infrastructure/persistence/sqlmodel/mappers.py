@@ -1,15 +1,28 @@
 from __future__ import annotations
 
+import dataclasses
+import json
 from collections.abc import Iterable
 from datetime import datetime
+from enum import Enum
 from pathlib import Path
+from typing import Any
 
 from app.db import models as db_models
+from app.domain.events import (
+    AnalyticsEvent,
+    DomainEvent,
+    MaterialUploaded,
+    TestGenerated,
+)
 from app.domain.models import (
     File,
     Job,
+    JobSummary,
     Material,
+    MaterialSummary,
     OcrCache,
+    OutboxMessage,
     PasswordResetToken,
     PdfExportCache,
     PendingVerification,
@@ -18,6 +31,8 @@ from app.domain.models import (
     RefreshToken,
     Test,
     User,
+    UserStats,
+    normalize_choices,
 )
 from app.domain.models.enums import (
     AnalysisStatus,
@@ -56,23 +71,10 @@ def user_to_row(user: User) -> db_models.User:
 
 
 def question_to_domain(row: db_models.Question) -> Question:
-    choices = row.choices or []
-    correct_choices = row.correct_choices or []
-    
-    # Self-healing logic for corrupted DB data (e.g. from LLM mismatch)
-    if row.is_closed:
-        # 1. Clean whitespace
-        choices = [str(c).strip() for c in choices if str(c).strip()]
-        correct_choices = [str(c).strip() for c in correct_choices if str(c).strip()]
-        
-        # 2. Ensure consistency
-        if choices:
-            valid_correct = [c for c in correct_choices if c in choices]
-            if not valid_correct:
-                valid_correct = [choices[0]]
-            correct_choices = valid_correct
-        elif correct_choices:
-            choices = correct_choices[:]
+    # Self-healing for corrupted DB data (e.g. from LLM mismatch)
+    choices, correct_choices = normalize_choices(
+        row.is_closed, row.choices, row.correct_choices
+    )
 
     return Question(
         id=row.id,
@@ -103,6 +105,22 @@ def question_to_row(
     )
 
 
+def question_to_values(
+    question: Question, test_id: int, group_id: int
+) -> dict[str, Any]:
+    """Column values for a multi-row INSERT (see bulk_add_questions)."""
+    return {
+        "test_id": test_id,
+        "group_id": group_id,
+        "text": question.text,
+        "is_closed": question.is_closed,
+        "difficulty": question.difficulty.value,
+        "choices": question.choices or None,
+        "correct_choices": question.correct_choices or None,
+        "citations": question.citations or None,
+    }
+
+
 def question_group_to_domain(row: db_models.QuestionGroup) -> QuestionGroup:
     return QuestionGroup(
         id=row.id,
@@ -204,8 +222,10 @@ def material_to_domain(
             )
         ),
         analysis_version=row.analysis_version,
+        analysis_pipeline=row.analysis_pipeline,
         markdown_twin=row.markdown_twin,
         thumbnail_path=row.thumbnail_path,
+        thumbnails=row.thumbnails or None,
     )
 
 
@@ -227,11 +247,56 @@ def material_to_row(material: Material) -> db_models.Material:
         analysis_status=material.analysis_status.value,
         routing_tier=material.routing_tier.value if material.routing_tier else None,
         analysis_version=material.analysis_version,
+        analysis_pipeline=material.analysis_pipeline,
         markdown_twin=material.markdown_twin,
         thumbnail_path=material.thumbnail_path,
+        thumbnails=material.thumbnails or None,
+    )
+
+
+def material_summary_to_domain(row: Any) -> MaterialSummary:
+    """Map a projected material row (see SqlModelMaterialRepository.list_page)."""
+    return MaterialSummary(
+        id=row.id,
+        owner_id=row.owner_id,
+        file_id=row.file_id,
+        filename=row.filename,
+        uploaded_at=row.uploaded_at,
+        created_at=row.created_at,
+        mime_type=row.mime_type,
+        size_bytes=row.size_bytes,
+        checksum=row.checksum,
+        page_count=row.page_count,
+        status=ProcessingStatus(_enum_value(row.processing_status)),
+        analysis_status=AnalysisStatus(_enum_value(row.analysis_status)),
+        routing_tier=(
+            RoutingTier(_enum_value(row.routing_tier)) if row.routing_tier else None
+        ),
+        analysis_version=row.analysis_version,
+        analysis_pipeline=row.analysis_pipeline,
+        processing_error=row.processing_error,
+        thumbnail_path=row.thumbnail_path,
+        thumbnails=row.thumbnails,
+        has_text=bool(row.has_text),
     )
 
 
+def job_summary_to_domain(row: Any) -> JobSummary:
+    return JobSummary(
+        id=row.id,
+        owner_id=row.owner_id,
+        job_type=JobType(_enum_value(row.job_type)),
+        status=JobStatus(_enum_value(row.status)),
+        error=row.error,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+    )
+
+
+def _enum_value(value: Any) -> str:
+    return value.value if isinstance(value, Enum) else str(value)
+
+
 def job_to_domain(row: db_models.Job) -> Job:
     status_value = (
         row.status.value
@@ -253,6 +318,8 @@ def job_to_domain(row: db_models.Job) -> Job:
         error=row.error,
         created_at=row.created_at,
         updated_at=row.updated_at,
+        test_id=row.test_id,
+        material_id=row.material_id,
     )
 
 
@@ -306,6 +373,22 @@ def ocr_cache_to_row(entry: OcrCache) -> db_models.OcrCache:
     )
 
 
+def user_stats_to_domain(row: db_models.UserStats) -> UserStats:
+    return UserStats(
+        user_id=row.user_id,
+        total_tests=row.total_tests,
+        total_questions=row.total_questions,
+        total_files=row.total_files,
+        closed_questions=row.closed_questions,
+        open_questions=row.open_questions,
+        easy_questions=row.easy_questions,
+        medium_questions=row.medium_questions,
+        hard_questions=row.hard_questions,
+        last_test_created_at=row.last_test_created_at,
+        updated_at=row.updated_at,
+    )
+
+
 def job_to_row(job: Job) -> db_models.Job:
     return db_models.Job(
         id=job.id,
@@ -394,13 +477,58 @@ def refresh_token_to_row(token: RefreshToken) -> db_models.RefreshToken:
     )
 
 
+# outbox rows name their event by class name; renaming a class orphans rows
+_EVENT_TYPES: dict[str, type[DomainEvent]] = {
+    cls.__name__: cls for cls in (AnalyticsEvent, MaterialUploaded, TestGenerated)
+}
+
+
+def outbox_event_to_row(event: DomainEvent) -> db_models.OutboxEvent:
+    payload = {
+        f.name: getattr(event, f.name)
+        for f in dataclasses.fields(event)
+        if f.name != "occurred_at"
+    }
+    return db_models.OutboxEvent(
+        event_type=type(event).__name__,
+        # JSONB cannot hold datetimes/enums; analytics properties may
+        payload=json.loads(json.dumps(payload, default=str)),
+        occurred_at=event.occurred_at,
+    )
+
+
+def outbox_message_to_domain(row: db_models.OutboxEvent) -> OutboxMessage:
+    return OutboxMessage(
+        id=int(row.id or 0),
+        event_type=row.event_type,
+        event=_event_from_row(row),
+        attempts=row.attempts,
+    )
+
+
+def _event_from_row(row: db_models.OutboxEvent) -> DomainEvent | None:
+    cls = _EVENT_TYPES.get(row.event_type)
+    if cls is None:
+        return None
+    known = {f.name for f in dataclasses.fields(cls)}
+    values = {k: v for k, v in (row.payload or {}).items() if k in known}
+    try:
+        return cls(**{**values, "occurred_at": row.occurred_at})
+    except TypeError:  # a required field is missing
+        return None
+
+
 __all__ = [
     "file_to_domain",
     "file_to_row",
+    "job_summary_to_domain",
     "job_to_domain",
     "job_to_row",
+    "material_summary_to_domain",
     "material_to_domain",
     "material_to_row",
+    "outbox_event_to_row",
+    "outbox_message_to_domain",
     "password_reset_token_to_domain",
     "password_reset_token_to_row",
     "pending_verification_to_domain",
@@ -409,10 +537,12 @@ __all__ = [
     "question_group_to_row",
     "question_to_domain",
     "question_to_row",
+    "question_to_values",
     "refresh_token_to_domain",
     "refresh_token_to_row",
     "test_to_domain",
     "test_to_row",
+    "user_stats_to_domain",
     "user_to_domain",
     "user_to_row",
 ]
@@ -1,78 +1,125 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import Any, cast
 
-from sqlmodel import Session, col, desc, func, or_, select
+from sqlalchemy import and_, exists
+from sqlalchemy import select as sa_select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, col, func, or_, select
 
 from app.db.models import SystemNotification, UserReadNotification
+from app.domain.models import KeysetCursor, NotificationFeedItem, Page
 from app.domain.repositories.notification_repository import NotificationRepository
 
-if TYPE_CHECKING:
-    pass
+from .repositories import _keyset_page_stmt, _to_page
+
+
+def _visible_to(user_id: int) -> Any:
+    return or_(
+        col(SystemNotification.recipient_id).is_(None),
+        SystemNotification.recipient_id == user_id,
+    )
+
+
+def _feed_stmt(user_id: int) -> Any:
+    """Notifications visible to the user LEFT JOINed with their read record."""
+    read = UserReadNotification
+    is_read = col(read.notification_id).is_not(None).label("is_read")
+    return (
+        sa_select(
+            col(SystemNotification.id),
+            col(SystemNotification.title),
+            col(SystemNotification.message),
+            col(SystemNotification.type),
+            col(SystemNotification.created_at),
+            is_read,
+        )
+        .outerjoin(
+            read,
+            and_(
+                col(read.notification_id) == col(SystemNotification.id),
+                col(read.user_id) == user_id,
+            ),
+        )
+        .where(_visible_to(user_id))
+    )
+
+
+def _to_item(row: Any) -> NotificationFeedItem:
+    return NotificationFeedItem(
+        id=row.id,
+        title=row.title,
+        message=row.message,
+        type=row.type,
+        created_at=row.created_at,
+        is_read=bool(row.is_read),
+    )
+
 
 class SqlModelNotificationRepository(NotificationRepository):
     def __init__(self, session: Session) -> None:
         self._session = session
 
-    def get_notifications_for_user(self, user_id: int) -> list[SystemNotification]:
-        query = select(SystemNotification).where(
-            or_(
-                col(SystemNotification.recipient_id).is_(None),
-                SystemNotification.recipient_id == user_id
-            )
-        ).order_by(desc(SystemNotification.created_at))
-        return list(self._session.exec(query).all())
+    def get_feed(self, user_id: int) -> list[NotificationFeedItem]:
+        stmt = _feed_stmt(user_id).order_by(
+            col(SystemNotification.created_at).desc(),
+            col(SystemNotification.id).desc(),
+        )
+        rows = cast(Any, self._session).exec(stmt).all()
+        return [_to_item(r) for r in rows]
 
-    def get_unread_count_for_user(self, user_id: int) -> int:
-        total_query = select(func.count(SystemNotification.id)).where(
-            or_(
-                col(SystemNotification.recipient_id).is_(None),
-                SystemNotification.recipient_id == user_id
-            )
+    def list_feed_page(
+        self, user_id: int, *, cursor: KeysetCursor | None, limit: int
+    ) -> Page[NotificationFeedItem]:
+        stmt = _keyset_page_stmt(
+            _feed_stmt(user_id),
+            col(SystemNotification.created_at),
+            col(SystemNotification.id),
+            cursor,
+            limit,
         )
-        total_count = self._session.exec(total_query).one()
-        
-        read_query = select(func.count(UserReadNotification.notification_id)).where(
-            UserReadNotification.user_id == user_id
+        rows = list(cast(Any, self._session).exec(stmt).all())
+        return _to_page(rows, limit, _to_item)
+
+    def get_unread_count_for_user(self, user_id: int) -> int:
+        # anti-join: only reads of notifications that still exist count
+        read = UserReadNotification
+        stmt = select(func.count()).where(
+            _visible_to(user_id),
+            ~exists().where(
+                and_(
+                    col(read.user_id) == user_id,
+                    col(read.notification_id) == col(SystemNotification.id),
+                )
+            ),
         )
-        read_count = self._session.exec(read_query).one()
-        
-        return max(0, total_count - read_count)
+        return int(cast(Any, self._session).exec(stmt).one())
 
-    def get_read_notification_ids(self, user_id: int) -> set[int]:
-        read_ids = self._session.exec(
-            select(UserReadNotification.notification_id)
-            .where(UserReadNotification.user_id == user_id)
-        ).all()
-        return set(read_ids)
+    def count_broadcasts(self) -> int:
+        stmt = select(func.count()).where(
+            col(SystemNotification.recipient_id).is_(None)
+        )
+        return int(cast(Any, self._session).exec(stmt).one())
 
     def get_notification_by_id_and_user(
         self, notification_id: int, user_id: int
     ) -> SystemNotification | None:
         query = select(SystemNotification).where(
-            SystemNotification.id == notification_id,
-            or_(
-                col(SystemNotification.recipient_id).is_(None),
-                SystemNotification.recipient_id == user_id
-            )
+            SystemNotification.id == notification_id, _visible_to(user_id)
         )
         return self._session.exec(query).first()
 
-    def get_read_record(
-        self, user_id: int, notification_id: int
-    ) -> UserReadNotification | None:
-        query = select(UserReadNotification).where(
-            UserReadNotification.user_id == user_id,
-            UserReadNotification.notification_id == notification_id
+    def mark_read(self, user_id: int, notification_id: int) -> bool:
+        read = UserReadNotification
+        stmt = (
+            pg_insert(read)
+            .values(user_id=user_id, notification_id=notification_id)
+            .on_conflict_do_nothing()
+            .returning(col(read.notification_id))
         )
-        return self._session.exec(query).first()
-
-    def add_read_record(self, read_record: UserReadNotification) -> None:
-        self._session.add(read_record)
+        return cast(Any, self._session).exec(stmt).first() is not None
 
     def add_notification(self, notification: SystemNotification) -> SystemNotification:
         self._session.add(notification)
-        self._session.commit()
-        self._session.refresh(notification)
+        self._session.flush()
         return notification
-
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, cast
+
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from app.db import models as db_models
+from app.domain.events import DomainEvent
+from app.domain.models import OutboxMessage
+from app.domain.repositories import OutboxRepository
+
+from . import mappers
+from .repositories import _batch_delete_stmt
+
+# last_error is for humans; a traceback-sized message is not needed
+_MAX_ERROR_LENGTH = 1000
+
+
+class SqlModelOutboxRepository(OutboxRepository):
+    def __init__(self, session: Session) -> None:
+        self._session = session
+
+    def add(self, event: DomainEvent) -> None:
+        self._session.add(mappers.outbox_event_to_row(event))
+
+    def claim_pending(self, *, limit: int) -> list[OutboxMessage]:
+        outbox = cast(Any, db_models.OutboxEvent)
+        rows = self._session.exec(
+            select(db_models.OutboxEvent)
+            .where(
+                outbox.processed_at.is_(None),
+                outbox.available_at <= datetime.utcnow(),
+            )
+            .order_by(outbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).all()
+        return [mappers.outbox_message_to_domain(row) for row in rows]
+
+    def mark_processed(self, message_ids: Sequence[int]) -> None:
+        if not message_ids:
+            return
+        outbox = cast(Any, db_models.OutboxEvent)
+        self._session.execute(
+            update(outbox)
+            .where(outbox.id.in_(list(message_ids)))
+            .values(processed_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+
+    def mark_failed(
+        self, message_id: int, *, error: str, retry_at: datetime | None
+    ) -> None:
+        outbox = cast(Any, db_models.OutboxEvent)
+        values: dict[str, Any] = {
+            "attempts": outbox.attempts + 1,
+            "last_error": error[:_MAX_ERROR_LENGTH],
+        }
+        if retry_at is None:
+            values["processed_at"] = datetime.utcnow()
+        else:
+            values["available_at"] = retry_at
+        self._session.execute(
+            update(outbox)
+            .where(outbox.id == message_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+    def purge_processed(self, before: datetime, *, limit: int) -> int:
+        outbox = cast(Any, db_models.OutboxEvent)
+        stmt = _batch_delete_stmt(outbox, outbox.processed_at < before, limit=limit)
+        return int(cast(Any, self._session).exec(stmt).rowcount or 0)
+
+
+__all__ = ["SqlModelOutboxRepository"]
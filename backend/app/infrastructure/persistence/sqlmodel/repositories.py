@@ -1,20 +1,24 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable, Mapping
 from datetime import datetime
-from typing import Any, cast
+from typing import Any, TypeVar, cast
 
-from sqlalchemy import delete, func
+from sqlalchemy import delete, func, insert, tuple_, update
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import aliased, joinedload
 from sqlmodel import Session, select
 
 from app.db import models as db_models
 from app.domain.models import (
     File,
     Job,
+    JobSummary,
+    KeysetCursor,
     Material,
+    MaterialSummary,
     OcrCache,
+    Page,
     PasswordResetToken,
     PdfExportCache,
     PendingVerification,
@@ -22,7 +26,10 @@ from app.domain.models import (
     QuestionGroup,
     RefreshToken,
     Test,
+    TestDetailProjection,
     User,
+    UserStatsDelta,
+    thumbnail_paths,
 )
 from app.domain.repositories import (
     FileRepository,
@@ -37,7 +44,51 @@ from app.domain.repositories import (
     UserRepository,
 )
 
-from . import mappers
+from . import mappers, statements
+from .user_stats_repository import SqlModelUserStatsRepository
+
+T = TypeVar("T")
+
+# keeps multi-row INSERTs well below the 65535 bind-parameter limit
+_INSERT_CHUNK_ROWS = 1000
+
+
+def _keyset_page_stmt(
+    stmt: Any, created_col: Any, id_col: Any, cursor: KeysetCursor | None, limit: int
+) -> Any:
+    """Order by (created_at, id) DESC after ``cursor``; fetch one extra row."""
+    if cursor is not None:
+        after: list[Any] = [cursor.created_at, cursor.id]
+        stmt = stmt.where(tuple_(created_col, id_col) < tuple_(*after))
+    return stmt.order_by(created_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def _to_page(rows: list[Any], limit: int, to_item: Callable[[Any], T]) -> Page[T]:
+    if len(rows) <= limit:
+        return Page(items=[to_item(r) for r in rows])
+    last = rows[limit - 1]
+    return Page(
+        items=[to_item(r) for r in rows[:limit]],
+        next_cursor=KeysetCursor(created_at=last.created_at, id=last.id),
+    )
+
+
+def _batch_delete_stmt(model: Any, *conditions: Any, limit: int) -> Any:
+    """DELETE at most ``limit`` matching rows, skipping rows locked by others,
+    so housekeeping holds short locks and never waits on live traffic."""
+    id_col = model.id
+    batch = (
+        select(id_col)
+        .where(*conditions)
+        .order_by(id_col)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        delete(model)
+        .where(id_col.in_(batch.scalar_subquery()))
+        .execution_options(synchronize_session=False)
+    )
 
 
 class SqlModelUserRepository(UserRepository):
@@ -47,8 +98,7 @@ class SqlModelUserRepository(UserRepository):
     def add(self, user: User) -> User:
         db_user = mappers.user_to_row(user)
         self._session.add(db_user)
-        self._session.commit()
-        self._session.refresh(db_user)
+        self._session.flush()
         return mappers.user_to_domain(db_user)
 
     def get(self, user_id: int) -> User | None:
@@ -56,15 +106,14 @@ class SqlModelUserRepository(UserRepository):
         return mappers.user_to_domain(db_user) if db_user else None
 
     def get_by_email(self, email: str) -> User | None:
-        stmt = select(db_models.User).where(db_models.User.email == email)
-        db_user = cast(Any, self._session).exec(stmt).first()
+        db_user = cast(Any, self._session).exec(statements.user_by_email(email)).first()
         return mappers.user_to_domain(db_user) if db_user else None
 
     def remove(self, user_id: int) -> None:
         db_user = self._session.get(db_models.User, user_id)
         if db_user:
             self._session.delete(db_user)
-            self._session.commit()
+            self._session.flush()
 
     def update(self, user: User) -> User:
         db_user = self._session.get(db_models.User, user.id)
@@ -77,51 +126,102 @@ class SqlModelUserRepository(UserRepository):
         db_user.last_name = user.last_name
         
         self._session.add(db_user)
-        self._session.commit()
-        self._session.refresh(db_user)
+        self._session.flush()
         return mappers.user_to_domain(db_user)
 
+    def list_ids(self, *, after_id: int = 0, limit: int = 500) -> list[int]:
+        id_col = cast(Any, db_models.User.id)
+        stmt = (
+            select(db_models.User.id)
+            .where(id_col > after_id)
+            .order_by(id_col.asc())
+            .limit(limit)
+        )
+        return [int(r) for r in cast(Any, self._session).exec(stmt).all()]
+
 
 class SqlModelTestRepository(TestRepository):
     def __init__(self, session: Session):
         self._session = session
+        self._stats = SqlModelUserStatsRepository(session)
+
+    def _owner_id(self, test_id: int) -> int | None:
+        db_test = self._session.get(db_models.Test, test_id)
+        return db_test.owner_id if db_test else None
+
+    def _track_questions(
+        self, test_id: int, questions: Iterable[tuple[bool, object]], *, sign: int
+    ) -> None:
+        owner_id = self._owner_id(test_id)
+        if owner_id is not None:
+            self._stats.apply_delta(
+                owner_id, UserStatsDelta.for_questions(questions, sign=sign)
+            )
 
     def create(self, test: Test) -> Test:
         db_test = mappers.test_to_row(test)
         self._session.add(db_test)
-        self._session.commit()
-        self._session.refresh(db_test)
+        self._session.flush()
+        self._stats.apply_delta(
+            db_test.owner_id,
+            UserStatsDelta(
+                total_tests=1, last_test_created_at=db_test.created_at
+            ),
+        )
+        self._session.flush()
         return mappers.test_to_domain(db_test)
 
     def add_question(self, test_id: int, question: Question, group_id: int) -> Question:
-        db_question = mappers.question_to_row(
-            question, test_id=test_id, group_id=group_id
-        )
-        count_stmt = select(func.count()).select_from(db_models.Question).where(
-            db_models.Question.group_id == group_id
-        )
-        db_question.position = (self._session.exec(count_stmt).one() or 0)
-        self._session.add(db_question)
-        self._session.commit()
-        self._session.refresh(db_question)
-        return mappers.question_to_domain(db_question)
+        return self.bulk_add_questions(test_id, [question], group_id)[0]
 
     def bulk_add_questions(
         self, test_id: int, questions: list[Question], group_id: int
     ) -> list[Question]:
-        count_stmt = select(func.count()).select_from(db_models.Question).where(
-            db_models.Question.group_id == group_id
-        )
-        base_position = self._session.exec(count_stmt).one() or 0
-        rows = []
-        for i, question in enumerate(questions):
-            row = mappers.question_to_row(question, test_id=test_id, group_id=group_id)
-            row.position = base_position + i
-            rows.append(row)
-        self._session.add_all(rows)
-        self._session.commit()
-        for row in rows:
-            self._session.refresh(row)
+        """Append questions to the group with one multi-row INSERT ... RETURNING.
+
+        Positions continue after the group's current questions; the base is a
+        scalar subquery evaluated by the INSERT itself, so no separate COUNT.
+        """
+        return self._insert_questions(
+            test_id,
+            group_id,
+            [
+                mappers.question_to_values(q, test_id=test_id, group_id=group_id)
+                for q in questions
+            ],
+        )
+
+    def _insert_questions(
+        self, test_id: int, group_id: int, values: list[dict[str, Any]]
+    ) -> list[Question]:
+        if not values:
+            return []
+        question_col = cast(Any, db_models.Question)
+        base_position = (
+            select(func.count())
+            .select_from(db_models.Question)
+            .where(question_col.group_id == group_id)
+            .scalar_subquery()
+        )
+        rows: list[db_models.Question] = []
+        # each chunk's subquery already sees the rows of the previous chunks
+        for offset in range(0, len(values), _INSERT_CHUNK_ROWS):
+            chunk = values[offset : offset + _INSERT_CHUNK_ROWS]
+            stmt = (
+                insert(db_models.Question)
+                .values(
+                    [
+                        {**row, "position": base_position + i}
+                        for i, row in enumerate(chunk)
+                    ]
+                )
+                .returning(db_models.Question)
+            )
+            rows.extend(self._session.scalars(stmt).all())
+        rows.sort(key=lambda r: r.position)
+        self._track_questions(
+            test_id, [(r.is_closed, r.difficulty) for r in rows], sign=1
+        )
         return [mappers.question_to_domain(row) for row in rows]
 
     def get(self, test_id: int) -> Test | None:
@@ -135,6 +235,26 @@ class SqlModelTestRepository(TestRepository):
         questions = list(db_test.questions)
         return mappers.test_to_domain(db_test, questions)
 
+    def get_detail_projection(self, test_id: int) -> TestDetailProjection | None:
+        """Test, groups and questions in one round-trip (json_agg subqueries)."""
+        row = self._session.execute(statements.test_detail_projection(test_id)).first()
+        if row is None:
+            return None
+        return statements.test_detail_projection_from_row(test_id, row)
+
+    def get_revision(self, test_id: int) -> tuple[int, int] | None:
+        row = cast(Any, self._session).exec(statements.test_revision(test_id)).first()
+        return (int(row[0]), int(row[1])) if row else None
+
+    def touch(self, test_id: int) -> None:
+        test = cast(Any, db_models.Test)
+        self._session.execute(
+            update(db_models.Test)
+            .where(test.id == test_id)
+            .values(revision=test.revision + 1)
+            .execution_options(synchronize_session=False)
+        )
+
     def list_for_user(self, user_id: int) -> Iterable[Test]:
         stmt = (
             select(db_models.Test)
@@ -146,12 +266,57 @@ class SqlModelTestRepository(TestRepository):
         rows = cast(Any, self._session).exec(stmt).all()
         return [mappers.test_to_domain(row) for row in rows]
 
+    def list_page(
+        self, owner_id: int, *, cursor: KeysetCursor | None, limit: int
+    ) -> Page[Test]:
+        test = cast(Any, db_models.Test)
+        stmt = select(test.id, test.owner_id, test.title, test.created_at).where(
+            test.owner_id == owner_id
+        )
+        stmt = _keyset_page_stmt(stmt, test.created_at, test.id, cursor, limit)
+        rows = list(self._session.execute(stmt).all())
+        return _to_page(
+            rows,
+            limit,
+            lambda r: Test(
+                id=r.id,
+                owner_id=r.owner_id,
+                title=r.title or "Untitled Test",
+                created_at=r.created_at,
+            ),
+        )
+
+    def list_ids(self, *, after_id: int = 0, limit: int = 500) -> list[tuple[int, int]]:
+        id_col = cast(Any, db_models.Test.id)
+        stmt = (
+            select(db_models.Test.id, db_models.Test.owner_id)
+            .where(id_col > after_id)
+            .order_by(id_col.asc())
+            .limit(limit)
+        )
+        rows = cast(Any, self._session).exec(stmt).all()
+        return [(int(r[0]), int(r[1])) for r in rows]
+
+    def count(self, *, after_id: int = 0) -> int:
+        stmt = (
+            select(func.count())
+            .select_from(db_models.Test)
+            .where(cast(Any, db_models.Test.id) > after_id)
+        )
+        return int(cast(Any, self._session).exec(stmt).one() or 0)
 
     def remove(self, test_id: int) -> None:
         db_test = self._session.get(db_models.Test, test_id)
         if db_test:
+            owner_id = db_test.owner_id
+            questions = [(q.is_closed, q.difficulty) for q in db_test.questions]
+            delta = UserStatsDelta.for_questions(questions, sign=-1)
+            delta.total_tests = -1
             self._session.delete(db_test)
-            self._session.commit()
+            self._session.flush()
+            self._stats.apply_delta(owner_id, delta)
+            self._stats.refresh_last_test_created_at(owner_id)
+            self._session.flush()
 
     def reorder_questions(self, test_id: int, question_ids: list[int]) -> None:
         if not question_ids:
@@ -166,6 +331,46 @@ class SqlModelTestRepository(TestRepository):
             self._session.add(id_to_row[qid])
         self._session.flush()
 
+    def update_questions(
+        self, test_id: int, changes: Mapping[int, Mapping[str, Any]]
+    ) -> int:
+        if not changes:
+            return 0
+        question_col = cast(Any, db_models.Question)
+        stmt = select(db_models.Question).where(
+            question_col.test_id == test_id, question_col.id.in_(list(changes))
+        )
+        rows = list(self._session.exec(stmt).all())
+        before = [(r.is_closed, r.difficulty) for r in rows]
+        for row in rows:
+            for field, value in changes[cast(int, row.id)].items():
+                setattr(row, field, value)
+            self._session.add(row)
+        self._session.flush()
+        owner_id = self._owner_id(test_id)
+        if owner_id is not None:
+            self._stats.apply_delta(
+                owner_id,
+                UserStatsDelta.for_question_change(
+                    before, [(r.is_closed, r.difficulty) for r in rows]
+                ),
+            )
+        return len(rows)
+
+    def delete_questions(self, test_id: int, question_ids: list[int]) -> int:
+        if not question_ids:
+            return 0
+        question_col = cast(Any, db_models.Question)
+        stmt = (
+            delete(db_models.Question)
+            .where(question_col.test_id == test_id, question_col.id.in_(question_ids))
+            .returning(question_col.is_closed, question_col.difficulty)
+            .execution_options(synchronize_session="fetch")
+        )
+        removed = [(r[0], r[1]) for r in self._session.execute(stmt).all()]
+        self._track_questions(test_id, removed, sign=-1)
+        return len(removed)
+
     def get_groups_for_test(self, test_id: int) -> list[QuestionGroup]:
         stmt = (
             select(db_models.QuestionGroup)
@@ -196,8 +401,7 @@ class SqlModelTestRepository(TestRepository):
             position=pos,
         )
         self._session.add(db_group)
-        self._session.commit()
-        self._session.refresh(db_group)
+        self._session.flush()
         return mappers.question_group_to_domain(db_group)
 
     def update_group(
@@ -215,9 +419,16 @@ class SqlModelTestRepository(TestRepository):
         return mappers.question_group_to_domain(row)
 
     def delete_group(self, group_id: int) -> None:
-        stmt = delete(db_models.Question).where(db_models.Question.group_id == group_id)
-        self._session.execute(stmt)
+        question = cast(Any, db_models.Question)
+        stmt = (
+            delete(db_models.Question)
+            .where(question.group_id == group_id)
+            .returning(question.is_closed, question.difficulty)
+        )
+        removed = [(r[0], r[1]) for r in self._session.execute(stmt).all()]
         group_row = self._session.get(db_models.QuestionGroup, group_id)
+        if group_row and removed:
+            self._track_questions(group_row.test_id, removed, sign=-1)
         if group_row:
             self._session.delete(group_row)
         self._session.flush()
@@ -240,27 +451,24 @@ class SqlModelTestRepository(TestRepository):
             .where(db_models.Question.group_id == group_id)
             .order_by(db_models.Question.position, db_models.Question.id)
         )
-        source_questions = list(self._session.exec(stmt).all())
-        new_questions: list[Question] = []
-        for idx, sq in enumerate(source_questions):
-            db_new = db_models.Question(
-                test_id=test_id,
-                group_id=new_group.id,
-                position=idx,
-                text=sq.text,
-                is_closed=sq.is_closed,
-                difficulty=sq.difficulty,
-                choices=sq.choices,
-                correct_choices=sq.correct_choices,
-                citations=sq.citations,
-            )
-            self._session.add(db_new)
-        self._session.flush()
-        stmt_new = select(db_models.Question).where(
-            db_models.Question.group_id == new_group.id
+        # copy the stored columns verbatim (no domain self-healing on the way)
+        new_questions = self._insert_questions(
+            test_id,
+            new_group.id,
+            [
+                {
+                    "test_id": test_id,
+                    "group_id": new_group.id,
+                    "text": sq.text,
+                    "is_closed": sq.is_closed,
+                    "difficulty": sq.difficulty,
+                    "choices": sq.choices,
+                    "correct_choices": sq.correct_choices,
+                    "citations": sq.citations,
+                }
+                for sq in self._session.exec(stmt).all()
+            ],
         )
-        for db_new in self._session.exec(stmt_new).all():
-            new_questions.append(mappers.question_to_domain(db_new))
         return new_group, new_questions
 
     def assign_questions_to_group(self, question_ids: list[int], group_id: int) -> None:
@@ -279,12 +487,13 @@ class SqlModelTestRepository(TestRepository):
 class SqlModelFileRepository(FileRepository):
     def __init__(self, session: Session):
         self._session = session
+        self._stats = SqlModelUserStatsRepository(session)
 
     def add(self, file: File) -> File:
         db_file = mappers.file_to_row(file)
         self._session.add(db_file)
-        self._session.commit()
-        self._session.refresh(db_file)
+        self._stats.apply_delta(db_file.owner_id, UserStatsDelta(total_files=1))
+        self._session.flush()
         return mappers.file_to_domain(db_file)
 
     def get(self, file_id: int) -> File | None:
@@ -299,8 +508,26 @@ class SqlModelFileRepository(FileRepository):
     def remove(self, file_id: int) -> None:
         db_file = self._session.get(db_models.File, file_id)
         if db_file:
+            self._stats.apply_delta(db_file.owner_id, UserStatsDelta(total_files=-1))
             self._session.delete(db_file)
-            self._session.commit()
+            self._session.flush()
+
+    def remove_many(self, file_ids: Iterable[int]) -> list[File]:
+        ids = sorted(set(file_ids))
+        if not ids:
+            return []
+        stmt = (
+            delete(db_models.File)
+            .where(cast(Any, db_models.File.id).in_(ids))
+            .returning(db_models.File)
+        )
+        rows = list(self._session.execute(stmt).scalars())
+        removed_per_owner: dict[int, int] = {}
+        for row in rows:
+            removed_per_owner[row.owner_id] = removed_per_owner.get(row.owner_id, 0) + 1
+        for owner_id, count in removed_per_owner.items():
+            self._stats.apply_delta(owner_id, UserStatsDelta(total_files=-count))
+        return [mappers.file_to_domain(row) for row in rows]
 
 
 class SqlModelMaterialRepository(MaterialRepository):
@@ -310,8 +537,7 @@ class SqlModelMaterialRepository(MaterialRepository):
     def add(self, material: Material) -> Material:
         db_material = mappers.material_to_row(material)
         self._session.add(db_material)
-        self._session.commit()
-        self._session.refresh(db_material)
+        self._session.flush()
         return mappers.material_to_domain(db_material)
 
     def get(self, material_id: int) -> Material | None:
@@ -323,6 +549,21 @@ class SqlModelMaterialRepository(MaterialRepository):
         db_material = cast(Any, self._session).exec(stmt).first()
         return mappers.material_to_domain(db_material) if db_material else None
 
+    def get_page_counts(
+        self,
+        owner_id: int,
+        *,
+        material_ids: list[int] | None = None,
+        file_id: int | None = None,
+    ) -> list[int | None]:
+        material = db_models.Material
+        stmt = select(material.page_count).where(material.owner_id == owner_id)
+        if material_ids is not None:
+            stmt = stmt.where(cast(Any, material.id).in_(material_ids))
+        if file_id is not None:
+            stmt = stmt.where(material.file_id == file_id)
+        return list(cast(Any, self._session).exec(stmt).all())
+
     def get_many(self, material_ids: list[int]) -> list[Material]:
         if not material_ids:
             return []
@@ -363,36 +604,118 @@ class SqlModelMaterialRepository(MaterialRepository):
         return mappers.material_to_domain(row) if row else None
 
     def list_for_user(self, user_id: int) -> Iterable[Material]:
-        stmt = (
-            select(db_models.Material)
-            .where(db_models.Material.owner_id == user_id)
-            .options(joinedload(db_models.Material.file))
-            .order_by(cast(Any, db_models.Material.created_at).desc())
-        )
+        stmt = statements.materials_for_user(user_id)
         rows = cast(Any, self._session).exec(stmt).all()
-        materials: list[Material] = []
-        seen_checksums: set[str] = set()
-        for row in rows:
-            # Jeśli materiał ma checksum i już widzieliśmy ten checksum, pomiń go
-            if row.checksum and row.checksum in seen_checksums:
-                continue
-            if row.checksum:
-                seen_checksums.add(row.checksum)
-            materials.append(mappers.material_to_domain(row))
-        return materials
+        return [mappers.material_to_domain(row) for row in rows]
 
-    def list_without_thumbnail(self) -> Iterable[Material]:
-        stmt = (
-            select(db_models.Material)
+    def list_page(
+        self, owner_id: int, *, cursor: KeysetCursor | None, limit: int
+    ) -> Page[MaterialSummary]:
+        material = cast(Any, db_models.Material)
+        file = cast(Any, db_models.File)
+        newer = aliased(db_models.Material)
+        newer_col = cast(Any, newer)
+        # same semantics as list_for_user: keep the newest material per checksum
+        has_newer_duplicate = (
+            select(newer_col.id)
             .where(
-                db_models.Material.thumbnail_path == None,  # noqa: E711
-                db_models.Material.file_id != None,  # noqa: E711
+                newer_col.owner_id == material.owner_id,
+                newer_col.checksum == material.checksum,
+                tuple_(newer_col.created_at, newer_col.id)
+                > tuple_(material.created_at, material.id),
             )
-            .options(joinedload(db_models.Material.file))
-            .order_by(cast(Any, db_models.Material.id).asc())
+            .exists()
+        )
+        stmt = (
+            select(material.id)
+            .add_columns(
+                material.owner_id,
+                material.file_id,
+                file.filename,
+                file.uploaded_at,
+                material.created_at,
+                material.mime_type,
+                material.size_bytes,
+                material.checksum,
+                material.page_count,
+                material.processing_status,
+                material.analysis_status,
+                material.routing_tier,
+                material.analysis_version,
+                material.analysis_pipeline,
+                material.processing_error,
+                material.thumbnail_path,
+                material.thumbnails,
+                (
+                    material.extracted_text.is_not(None)
+                    | material.markdown_twin.is_not(None)
+                ).label("has_text"),
+            )
+            .join(file, file.id == material.file_id)
+            .where(material.owner_id == owner_id, ~has_newer_duplicate)
+        )
+        stmt = _keyset_page_stmt(stmt, material.created_at, material.id, cursor, limit)
+        rows = list(self._session.execute(stmt).all())
+        return _to_page(rows, limit, mappers.material_summary_to_domain)
+
+    @staticmethod
+    def _without_thumbnail_filter() -> list[Any]:
+        return [
+            db_models.Material.thumbnail_path == None,  # noqa: E711
+            db_models.Material.file_id != None,  # noqa: E711
+        ]
+
+    @staticmethod
+    def _outdated_analysis_filter(version: str, include_missing: bool) -> Any:
+        version_col = cast(Any, db_models.Material.analysis_version)
+        outdated = version_col.is_not(None) & (version_col != version)
+        return (outdated | version_col.is_(None)) if include_missing else outdated
+
+    def _id_page(
+        self, filters: list[Any], after_id: int, limit: int
+    ) -> list[tuple[int, int]]:
+        id_col = cast(Any, db_models.Material.id)
+        stmt = (
+            select(db_models.Material.id, db_models.Material.owner_id)
+            .where(*filters, id_col > after_id)
+            .order_by(id_col.asc())
+            .limit(limit)
         )
         rows = cast(Any, self._session).exec(stmt).all()
-        return [mappers.material_to_domain(row) for row in rows]
+        return [(int(r[0]), int(r[1])) for r in rows]
+
+    def _count(self, filters: list[Any], after_id: int) -> int:
+        stmt = (
+            select(func.count())
+            .select_from(db_models.Material)
+            .where(*filters, cast(Any, db_models.Material.id) > after_id)
+        )
+        return int(cast(Any, self._session).exec(stmt).one() or 0)
+
+    def list_without_thumbnail(
+        self, *, after_id: int = 0, limit: int = 500
+    ) -> list[tuple[int, int]]:
+        return self._id_page(self._without_thumbnail_filter(), after_id, limit)
+
+    def count_without_thumbnail(self, *, after_id: int = 0) -> int:
+        return self._count(self._without_thumbnail_filter(), after_id)
+
+    def list_with_outdated_analysis(
+        self,
+        version: str,
+        *,
+        include_missing: bool = False,
+        after_id: int = 0,
+        limit: int = 500,
+    ) -> list[tuple[int, int]]:
+        filters = [self._outdated_analysis_filter(version, include_missing)]
+        return self._id_page(filters, after_id, limit)
+
+    def count_with_outdated_analysis(
+        self, version: str, *, include_missing: bool = False, after_id: int = 0
+    ) -> int:
+        filters = [self._outdated_analysis_filter(version, include_missing)]
+        return self._count(filters, after_id)
 
     def update(self, material: Material) -> Material:
         db_material = self._session.get(db_models.Material, material.id)
@@ -423,12 +746,57 @@ class SqlModelMaterialRepository(MaterialRepository):
             else None
         )
         db_material.analysis_version = material.analysis_version
+        db_material.analysis_pipeline = material.analysis_pipeline
         db_material.markdown_twin = material.markdown_twin
         db_material.thumbnail_path = material.thumbnail_path
+        db_material.thumbnails = material.thumbnails or None
 
         self._session.add(db_material)
-        self._session.commit()
-        self._session.refresh(db_material)
+        self._session.flush()
+        return mappers.material_to_domain(db_material)
+
+    def update_file_info(self, material: Material) -> Material | None:
+        db_material = self._session.get(db_models.Material, material.id)
+        if not db_material:
+            return None
+        db_material.mime_type = material.mime_type
+        db_material.size_bytes = material.size_bytes
+        db_material.page_count = material.page_count
+        return self._flush(db_material)
+
+    def update_thumbnails(self, material: Material) -> Material | None:
+        db_material = self._session.get(db_models.Material, material.id)
+        if not db_material:
+            return None
+        db_material.thumbnail_path = material.thumbnail_path
+        db_material.thumbnails = material.thumbnails or None
+        return self._flush(db_material)
+
+    def update_processing_result(self, material: Material) -> Material | None:
+        db_material = self._session.get(db_models.Material, material.id)
+        if not db_material:
+            return None
+        db_material.processing_status = db_models.ProcessingStatus(
+            material.status.value
+        )
+        db_material.extracted_text = material.extracted_text
+        db_material.processing_error = material.processing_error
+        db_material.analysis_status = db_models.AnalysisStatus(
+            material.analysis_status.value
+        )
+        db_material.routing_tier = (
+            db_models.RoutingTier(material.routing_tier.value)
+            if material.routing_tier
+            else None
+        )
+        db_material.analysis_version = material.analysis_version
+        db_material.analysis_pipeline = material.analysis_pipeline
+        db_material.markdown_twin = material.markdown_twin
+        return self._flush(db_material)
+
+    def _flush(self, db_material: db_models.Material) -> Material:
+        self._session.add(db_material)
+        self._session.flush()
         return mappers.material_to_domain(db_material)
 
     def update_analysis(self, material: Material) -> Material:
@@ -447,20 +815,36 @@ class SqlModelMaterialRepository(MaterialRepository):
             else None
         )
         db_material.analysis_version = material.analysis_version
+        db_material.analysis_pipeline = material.analysis_pipeline
         db_material.markdown_twin = material.markdown_twin
         if material.processing_error:
             db_material.processing_error = material.processing_error
 
         self._session.add(db_material)
-        self._session.commit()
-        self._session.refresh(db_material)
+        self._session.flush()
         return mappers.material_to_domain(db_material)
 
     def remove(self, material_id: int) -> None:
         db_material = self._session.get(db_models.Material, material_id)
         if db_material:
             self._session.delete(db_material)
-            self._session.commit()
+            self._session.flush()
+
+    def remove_by_checksum(
+        self, owner_id: int, checksum: str
+    ) -> tuple[list[int], set[str]]:
+        material = cast(Any, db_models.Material)
+        stmt = (
+            delete(db_models.Material)
+            .where(material.owner_id == owner_id, material.checksum == checksum)
+            .returning(material.file_id, material.thumbnail_path, material.thumbnails)
+        )
+        file_ids: list[int] = []
+        thumbnails: set[str] = set()
+        for file_id, thumbnail_path, variants in self._session.execute(stmt):
+            file_ids.append(file_id)
+            thumbnails |= thumbnail_paths(thumbnail_path, variants)
+        return file_ids, thumbnails
 
 
 class SqlModelJobRepository(JobRepository):
@@ -469,9 +853,9 @@ class SqlModelJobRepository(JobRepository):
 
     def add(self, job: Job) -> Job:
         row = mappers.job_to_row(job)
+        self._link(row, job)
         self._session.add(row)
-        self._session.commit()
-        self._session.refresh(row)
+        self._session.flush()
         return mappers.job_to_domain(row)
 
     def update(self, job: Job) -> Job:
@@ -485,10 +869,10 @@ class SqlModelJobRepository(JobRepository):
         db_job.error = job.error
         db_job.payload = job.payload or {}
         db_job.updated_at = job.updated_at or datetime.utcnow()
+        self._link(db_job, job)
 
         self._session.add(db_job)
-        self._session.commit()
-        self._session.refresh(db_job)
+        self._session.flush()
         return mappers.job_to_domain(db_job)
 
     def get(self, job_id: int) -> Job | None:
@@ -496,41 +880,84 @@ class SqlModelJobRepository(JobRepository):
         return mappers.job_to_domain(db_job) if db_job else None
 
     def list_for_user(self, owner_id: int):
-        stmt = (
-            select(db_models.Job)
-            .where(db_models.Job.owner_id == owner_id)
-            .order_by(cast(Any, db_models.Job.created_at).desc())
-        )
+        stmt = statements.jobs_for_user(owner_id)
         rows = cast(Any, self._session).exec(stmt).all()
         return [mappers.job_to_domain(row) for row in rows]
 
-    def get_many(self, owner_id: int, job_ids: list[int]) -> list[Job]:
-        if not job_ids:
-            return []
-        job_id_col = cast(Any, db_models.Job.id)
+    def list_page(
+        self, owner_id: int, *, cursor: KeysetCursor | None, limit: int
+    ) -> Page[JobSummary]:
+        job = cast(Any, db_models.Job)
         stmt = (
-            select(db_models.Job)
-            .where(
-                db_models.Job.owner_id == owner_id,
-                job_id_col.in_(job_ids),
+            select(job.id)
+            .add_columns(
+                job.owner_id,
+                job.job_type,
+                job.status,
+                job.error,
+                job.created_at,
+                job.updated_at,
             )
+            .where(job.owner_id == owner_id)
         )
+        stmt = _keyset_page_stmt(stmt, job.created_at, job.id, cursor, limit)
+        rows = list(self._session.execute(stmt).all())
+        return _to_page(rows, limit, mappers.job_summary_to_domain)
+
+    def get_many(self, owner_id: int, job_ids: list[int]) -> list[Job]:
+        if not job_ids:
+            return []
+        stmt = statements.jobs_by_ids(owner_id, job_ids)
         rows = cast(Any, self._session).exec(stmt).all()
         return [mappers.job_to_domain(row) for row in rows]
 
     def get_generation_job_by_test_id(self, test_id: int) -> Job | None:
-
-        # Szukamy joba typu test_generation, którego result zawiera test_id
         stmt = (
             select(db_models.Job)
             .where(
+                db_models.Job.test_id == test_id,
                 db_models.Job.job_type == db_models.JobType.test_generation,
-                cast(Any, db_models.Job.result)["test_id"].astext == str(test_id)
             )
+            .order_by(cast(Any, db_models.Job.created_at).desc())
+            .limit(1)
         )
         row = cast(Any, self._session).exec(stmt).first()
         return mappers.job_to_domain(row) if row else None
 
+    def purge_finished(self, before: datetime, *, limit: int) -> int:
+        job = db_models.Job
+        finished = [db_models.JobStatus.done, db_models.JobStatus.failed]
+        stmt = _batch_delete_stmt(
+            job,
+            cast(Any, job.status).in_(finished),
+            cast(Any, job.updated_at) < before,
+            # the generation job holds the config of its test (GET /tests/{id}/config)
+            ~(
+                (job.job_type == db_models.JobType.test_generation)
+                & cast(Any, job.test_id).isnot(None)
+            ),
+            limit=limit,
+        )
+        return int(cast(Any, self._session).exec(stmt).rowcount or 0)
+
+    @staticmethod
+    def _link(row: db_models.Job, job: Job) -> None:
+        targets = (("test_id", db_models.Test), ("material_id", db_models.Material))
+        for key, model in targets:
+            value = job.linked_id(key)
+            if value == getattr(row, key):
+                continue
+            target_id = cast(Any, model).id
+            # the test/material may be gone by the time a job finishes; link
+            # NULL instead of failing the status update on the foreign key
+            setattr(
+                row,
+                key,
+                None
+                if value is None
+                else select(target_id).where(target_id == value).scalar_subquery(),
+            )
+
 
 class SqlModelPdfExportCacheRepository(PdfExportCacheRepository):
     def __init__(self, session: Session):
@@ -539,8 +966,7 @@ class SqlModelPdfExportCacheRepository(PdfExportCacheRepository):
     def add(self, entry: PdfExportCache) -> PdfExportCache:
         row = mappers.pdf_export_cache_to_row(entry)
         self._session.add(row)
-        self._session.commit()
-        self._session.refresh(row)
+        self._session.flush()
         return mappers.pdf_export_cache_to_domain(row)
 
     def get_by_key(self, cache_key: str) -> PdfExportCache | None:
@@ -554,14 +980,25 @@ class SqlModelPdfExportCacheRepository(PdfExportCacheRepository):
         row = self._session.get(db_models.PdfExportCache, entry_id)
         if row:
             self._session.delete(row)
-            self._session.commit()
+            self._session.flush()
 
-    def remove_for_test(self, test_id: int) -> None:
-        stmt = delete(db_models.PdfExportCache).where(
-            db_models.PdfExportCache.test_id == test_id
+    def remove_for_test(self, test_id: int) -> list[str]:
+        export = db_models.PdfExportCache
+        stmt = (
+            delete(export)
+            .where(cast(Any, export.test_id) == test_id)
+            .returning(cast(Any, export.stored_path))
         )
-        cast(Any, self._session).exec(stmt)
-        self._session.commit()
+        paths = list(cast(Any, self._session).exec(stmt).scalars())
+        self._session.flush()
+        return paths
+
+    def purge_older_than(self, cutoff: datetime, *, limit: int) -> list[str]:
+        export = db_models.PdfExportCache
+        stmt = _batch_delete_stmt(
+            export, cast(Any, export.created_at) < cutoff, limit=limit
+        ).returning(cast(Any, export.stored_path))
+        return list(cast(Any, self._session).exec(stmt).scalars())
 
 
 class SqlModelOcrCacheRepository(OcrCacheRepository):
@@ -570,13 +1007,12 @@ class SqlModelOcrCacheRepository(OcrCacheRepository):
 
     def add(self, entry: OcrCache) -> OcrCache:
         row = mappers.ocr_cache_to_row(entry)
-        self._session.add(row)
         try:
-            self._session.commit()
-            self._session.refresh(row)
+            # savepoint: a concurrent writer must not poison the caller's UoW
+            with self._session.begin_nested():
+                self._session.add(row)
             return mappers.ocr_cache_to_domain(row)
         except IntegrityError:
-            self._session.rollback()
             existing = self.get_by_key(entry.cache_key)
             if existing is not None:
                 return existing
@@ -593,7 +1029,7 @@ class SqlModelOcrCacheRepository(OcrCacheRepository):
         row = self._session.get(db_models.OcrCache, entry_id)
         if row:
             self._session.delete(row)
-            self._session.commit()
+            self._session.flush()
 
 
 class SqlModelPendingVerificationRepository(PendingVerificationRepository):
@@ -616,8 +1052,7 @@ class SqlModelPendingVerificationRepository(PendingVerificationRepository):
         else:
             db_obj = mappers.pending_verification_to_row(pending)
             self._session.add(db_obj)
-        self._session.commit()
-        self._session.refresh(db_obj)
+        self._session.flush()
         return mappers.pending_verification_to_domain(db_obj)
 
     def get_by_email(self, email: str) -> PendingVerification | None:
@@ -641,7 +1076,14 @@ class SqlModelPendingVerificationRepository(PendingVerificationRepository):
         row = cast(Any, self._session).exec(stmt).first()
         if row:
             self._session.delete(row)
-            self._session.commit()
+            self._session.flush()
+
+    def purge_expired(self, before: datetime, *, limit: int) -> int:
+        model = db_models.PendingEmailVerification
+        stmt = _batch_delete_stmt(
+            model, cast(Any, model.expires_at) < before, limit=limit
+        )
+        return int(cast(Any, self._session).exec(stmt).rowcount or 0)
 
 
 class SqlModelPasswordResetTokenRepository(PasswordResetTokenRepository):
@@ -661,8 +1103,7 @@ class SqlModelPasswordResetTokenRepository(PasswordResetTokenRepository):
         else:
             db_obj = mappers.password_reset_token_to_row(token)
             self._session.add(db_obj)
-        self._session.commit()
-        self._session.refresh(db_obj)
+        self._session.flush()
         return mappers.password_reset_token_to_domain(db_obj)
 
     def get_by_email(self, email: str) -> PasswordResetToken | None:
@@ -686,7 +1127,14 @@ class SqlModelPasswordResetTokenRepository(PasswordResetTokenRepository):
         row = cast(Any, self._session).exec(stmt).first()
         if row:
             self._session.delete(row)
-            self._session.commit()
+            self._session.flush()
+
+    def purge_expired(self, before: datetime, *, limit: int) -> int:
+        model = db_models.PasswordResetToken
+        stmt = _batch_delete_stmt(
+            model, cast(Any, model.expires_at) < before, limit=limit
+        )
+        return int(cast(Any, self._session).exec(stmt).rowcount or 0)
 
 
 class SqlModelRefreshTokenRepository(RefreshTokenRepository):
@@ -696,8 +1144,7 @@ class SqlModelRefreshTokenRepository(RefreshTokenRepository):
     def add(self, token: RefreshToken) -> RefreshToken:
         db_token = mappers.refresh_token_to_row(token)
         self._session.add(db_token)
-        self._session.commit()
-        self._session.refresh(db_token)
+        self._session.flush()
         return mappers.refresh_token_to_domain(db_token)
 
     def update(self, token: RefreshToken) -> RefreshToken:
@@ -710,8 +1157,7 @@ class SqlModelRefreshTokenRepository(RefreshTokenRepository):
         db_token.token_hash = token.token_hash
 
         self._session.add(db_token)
-        self._session.commit()
-        self._session.refresh(db_token)
+        self._session.flush()
         return mappers.refresh_token_to_domain(db_token)
 
     def get_by_token_hash(self, token_hash: str) -> RefreshToken | None:
@@ -722,25 +1168,24 @@ class SqlModelRefreshTokenRepository(RefreshTokenRepository):
         return mappers.refresh_token_to_domain(row) if row else None
 
     def revoke_all_for_user(self, user_id: int) -> None:
-        stmt = select(db_models.RefreshToken).where(
-            db_models.RefreshToken.user_id == user_id,
-            db_models.RefreshToken.revoked_at == None,  # noqa: E711
+        token = db_models.RefreshToken
+        stmt = (
+            update(token)
+            .where(
+                cast(Any, token.user_id) == user_id,
+                cast(Any, token.revoked_at).is_(None),
+            )
+            .values(revoked_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
         )
-        tokens = cast(Any, self._session).exec(stmt).all()
-        now = datetime.utcnow()
-        for token in tokens:
-            token.revoked_at = now
-            self._session.add(token)
-        self._session.commit()
+        cast(Any, self._session).exec(stmt)
 
-    def remove_expired(self) -> None:
-        stmt = select(db_models.RefreshToken).where(
-            db_models.RefreshToken.expires_at < datetime.utcnow()
+    def remove_expired(self, before: datetime, *, limit: int) -> int:
+        token = db_models.RefreshToken
+        stmt = _batch_delete_stmt(
+            token, cast(Any, token.expires_at) < before, limit=limit
         )
-        expired_tokens = cast(Any, self._session).exec(stmt).all()
-        for token in expired_tokens:
-            self._session.delete(token)
-        self._session.commit()
+        return int(cast(Any, self._session).exec(stmt).rowcount or 0)
 
 
 __all__ = [
@@ -0,0 +1,148 @@
+"""Read statements shared by the sync and the async repositories."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, cast
+
+from sqlalchemy.dialects.postgresql import JSON, aggregate_order_by
+from sqlalchemy.orm import joinedload
+from sqlmodel import func, select
+
+from app.db import models as db_models
+from app.domain.models import TestDetailProjection
+
+
+def user_by_email(email: str) -> Any:
+    return select(db_models.User).where(db_models.User.email == email)
+
+
+def test_revision(test_id: int) -> Any:
+    return select(db_models.Test.owner_id, db_models.Test.revision).where(
+        db_models.Test.id == test_id
+    )
+
+
+def test_detail_projection(test_id: int) -> Any:
+    """Test, groups and questions in one round-trip (json_agg subqueries)."""
+    test_t = cast(Any, db_models.Test).__table__
+    group_t = cast(Any, db_models.QuestionGroup).__table__
+    question_t = cast(Any, db_models.Question).__table__
+    groups = (
+        select(
+            func.json_agg(
+                aggregate_order_by(
+                    func.json_build_array(
+                        group_t.c.id, group_t.c.label, group_t.c.position
+                    ),
+                    group_t.c.position,
+                    group_t.c.id,
+                ),
+                type_=JSON,
+            )
+        )
+        .where(group_t.c.test_id == test_t.c.id)
+        .scalar_subquery()
+    )
+    questions = (
+        select(
+            func.json_agg(
+                aggregate_order_by(
+                    func.json_build_array(
+                        question_t.c.id,
+                        question_t.c.text,
+                        question_t.c.is_closed,
+                        question_t.c.difficulty,
+                        question_t.c.group_id,
+                        question_t.c.choices,
+                        question_t.c.correct_choices,
+                        question_t.c.citations,
+                    ),
+                    question_t.c.position,
+                    question_t.c.id,
+                ),
+                type_=JSON,
+            )
+        )
+        .where(question_t.c.test_id == test_t.c.id)
+        .scalar_subquery()
+    )
+    return (
+        test_t.select()
+        .with_only_columns(
+            test_t.c.owner_id, test_t.c.title, test_t.c.revision, groups, questions
+        )
+        .where(test_t.c.id == test_id)
+    )
+
+
+def test_detail_projection_from_row(test_id: int, row: Any) -> TestDetailProjection:
+    owner_id, title, revision, group_rows, question_rows = row
+    return TestDetailProjection(
+        test_id=test_id,
+        owner_id=owner_id,
+        title=title,
+        revision=revision,
+        groups=group_rows or [],
+        questions=question_rows or [],
+    )
+
+
+def materials_for_user(user_id: int) -> Any:
+    """Newest material per checksum (ix_material_owner_checksum_created).
+
+    Rows without a checksum are never duplicates.
+    """
+    material = cast(Any, db_models.Material)
+    newest_per_checksum = (
+        select(material.id)
+        .where(material.owner_id == user_id, material.checksum.is_not(None))
+        .distinct(material.checksum)
+        .order_by(material.checksum, material.created_at.desc(), material.id.desc())
+    )
+    return (
+        select(db_models.Material)
+        .where(
+            material.owner_id == user_id,
+            material.checksum.is_(None) | material.id.in_(newest_per_checksum),
+        )
+        .options(joinedload(db_models.Material.file))
+        .order_by(material.created_at.desc())
+    )
+
+
+def jobs_for_user(owner_id: int) -> Any:
+    return (
+        select(db_models.Job)
+        .where(db_models.Job.owner_id == owner_id)
+        .order_by(cast(Any, db_models.Job.created_at).desc())
+    )
+
+
+def jobs_updated_since(owner_id: int, since: datetime, limit: int) -> Any:
+    updated_at = cast(Any, db_models.Job.updated_at)
+    return (
+        select(db_models.Job)
+        .where(db_models.Job.owner_id == owner_id, updated_at > since)
+        .order_by(updated_at.asc())
+        .limit(limit)
+    )
+
+
+def jobs_by_ids(owner_id: int, job_ids: list[int]) -> Any:
+    return select(db_models.Job).where(
+        db_models.Job.owner_id == owner_id,
+        cast(Any, db_models.Job.id).in_(job_ids),
+    )
+
+
+__all__ = [
+    "jobs_by_ids",
+    "jobs_for_user",
+    "jobs_updated_since",
+    "materials_for_user",
+    "test_detail_projection",
+    "test_detail_projection_from_row",
+    "test_revision",
+    "user_by_email",
+]
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, cast
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+
+from app.db import models as db_models
+from app.domain.models import UserStats, UserStatsDelta
+from app.domain.repositories import UserStatsRepository
+
+from . import mappers
+
+
+class SqlModelUserStatsRepository(UserStatsRepository):
+    """Counters are updated with one UPSERT in the caller's transaction."""
+
+    def __init__(self, session: Session) -> None:
+        self._session = session
+
+    def get(self, user_id: int) -> UserStats | None:
+        row = self._session.get(db_models.UserStats, user_id)
+        return mappers.user_stats_to_domain(row) if row else None
+
+    def apply_delta(self, user_id: int, delta: UserStatsDelta) -> None:
+        if delta.is_empty:
+            return
+        table = cast(Any, db_models.UserStats).__table__
+        counters = delta.counters()
+        now = datetime.utcnow()
+        stmt = insert(table).values(
+            user_id=user_id,
+            last_test_created_at=delta.last_test_created_at,
+            updated_at=now,
+            **{name: max(0, value) for name, value in counters.items()},
+        )
+        set_: dict[str, Any] = {
+            name: func.greatest(0, table.c[name] + value)
+            for name, value in counters.items()
+            if value
+        }
+        set_["updated_at"] = now
+        if delta.last_test_created_at is not None:
+            set_["last_test_created_at"] = func.greatest(
+                table.c.last_test_created_at, delta.last_test_created_at
+            )
+        stmt = stmt.on_conflict_do_update(index_elements=["user_id"], set_=set_)
+        self._session.execute(stmt)
+        self._expire(user_id)
+
+    def refresh_last_test_created_at(self, user_id: int) -> None:
+        row = self._session.get(db_models.UserStats, user_id)
+        if row is None:
+            return
+        self._session.flush()
+        row.last_test_created_at = self._session.exec(
+            select(func.max(db_models.Test.created_at)).where(
+                db_models.Test.owner_id == user_id
+            )
+        ).one()
+        row.updated_at = datetime.utcnow()
+        self._session.add(row)
+        self._session.flush()
+
+    def rebuild(self, user_id: int) -> UserStats:
+        self._session.flush()
+        question = cast(Any, db_models.Question)
+        tests_count, last_created = self._session.exec(
+            select(func.count(), func.max(db_models.Test.created_at)).where(
+                db_models.Test.owner_id == user_id
+            )
+        ).one()
+        question_counts = self._session.exec(
+            select(
+                func.count(),
+                func.count().filter(question.is_closed.is_(True)),
+                func.count().filter(question.difficulty == 2),
+                func.count().filter(question.difficulty == 3),
+            )
+            .select_from(db_models.Question)
+            .join(db_models.Test, question.test_id == db_models.Test.id)
+            .where(db_models.Test.owner_id == user_id)
+        ).one()
+        total_q, closed_q, medium_q, hard_q = (int(v or 0) for v in question_counts)
+        files_count = self._session.exec(
+            select(func.count())
+            .select_from(db_models.File)
+            .where(db_models.File.owner_id == user_id)
+        ).one()
+
+        # one UPSERT: a concurrent first read may have inserted the row already
+        values: dict[str, Any] = {
+            "total_tests": int(tests_count or 0),
+            "total_questions": total_q,
+            "total_files": int(files_count or 0),
+            "closed_questions": closed_q,
+            "open_questions": total_q - closed_q,
+            # anything outside 2/3 counts as easy, like the dashboard always did
+            "easy_questions": total_q - medium_q - hard_q,
+            "medium_questions": medium_q,
+            "hard_questions": hard_q,
+            "last_test_created_at": last_created,
+            "updated_at": datetime.utcnow(),
+        }
+        table = cast(Any, db_models.UserStats).__table__
+        stmt = insert(table).values(user_id=user_id, **values)
+        stmt = stmt.on_conflict_do_update(index_elements=["user_id"], set_=values)
+        self._session.execute(stmt)
+        self._expire(user_id)
+        return mappers.user_stats_to_domain(
+            db_models.UserStats(user_id=user_id, **values)
+        )
+
+    def _expire(self, user_id: int) -> None:
+        # the UPSERT bypasses the identity map; drop a stale cached row
+        key = self._session.identity_key(db_models.UserStats, user_id)
+        row = self._session.identity_map.get(key)
+        if row is not None:
+            self._session.expire(row)
+
+
+__all__ = ["SqlModelUserStatsRepository"]
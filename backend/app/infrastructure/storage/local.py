@@ -3,8 +3,10 @@ from __future__ import annotations
 import uuid
 from collections.abc import Iterator
 from contextlib import contextmanager
+from datetime import UTC, datetime
 from pathlib import Path
 
+from app.domain.models import StoredObjectInfo
 from app.domain.services import FileStorage
 
 
@@ -15,7 +17,8 @@ class LocalFileStorage(FileStorage):
 
     def _resolve(self, stored_path: str) -> Path:
         path = Path(stored_path)
-        if not path.is_absolute():
+        # save() returns paths that already start with the base directory
+        if not path.is_absolute() and not path.is_relative_to(self._base_dir):
             path = self._base_dir / path
         return path
 
@@ -56,5 +59,50 @@ class LocalFileStorage(FileStorage):
         path = self._resolve(stored_path)
         yield path
 
+    def stat(self, *, stored_path: str) -> StoredObjectInfo:
+        path = self._resolve(stored_path)
+        try:
+            stat = path.stat()
+        except OSError as exc:
+            raise FileNotFoundError(stored_path) from exc
+        if not path.is_file():
+            raise FileNotFoundError(stored_path)
+        return StoredObjectInfo(
+            size=stat.st_size,
+            etag=f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+            last_modified=datetime.fromtimestamp(stat.st_mtime, tz=UTC),
+        )
+
+    def iter_bytes(
+        self,
+        *,
+        stored_path: str,
+        start: int = 0,
+        end: int | None = None,
+        chunk_size: int = 256 * 1024,
+    ) -> Iterator[bytes]:
+        with self._resolve(stored_path).open("rb") as handle:
+            handle.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                size = chunk_size if remaining is None else min(chunk_size, remaining)
+                chunk = handle.read(size)
+                if not chunk:
+                    return
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def presigned_url(
+        self,
+        *,
+        stored_path: str,
+        expires_in: int,
+        filename: str | None = None,
+        content_type: str | None = None,
+    ) -> str | None:
+        _ = stored_path, expires_in, filename, content_type
+        return None
+
 
 __all__ = ["LocalFileStorage"]
@@ -6,13 +6,17 @@ from collections.abc import Iterator
 from contextlib import contextmanager, suppress
 from pathlib import Path
 from tempfile import NamedTemporaryFile
-from urllib.parse import urlparse
+from urllib.parse import quote, urlparse
 
 import boto3
 from botocore.config import Config
+from botocore.exceptions import ClientError
 
+from app.domain.models import StoredObjectInfo
 from app.domain.services import FileStorage
 
+_MISSING_CODES = {"404", "NoSuchKey", "NotFound"}
+
 
 class R2FileStorage(FileStorage):
     """S3-compatible storage adapter for Cloudflare R2."""
@@ -99,9 +103,8 @@ class R2FileStorage(FileStorage):
 
     @contextmanager
     def download_to_temp(self, *, stored_path: str) -> Iterator[Path]:
-        obj = self._client.get_object(Bucket=self._bucket, Key=stored_path)
         with NamedTemporaryFile(delete=False) as tmp:
-            tmp.write(obj["Body"].read())
+            self._client.download_fileobj(self._bucket, stored_path, tmp)
             tmp.flush()
             tmp_path = Path(tmp.name)
         try:
@@ -110,6 +113,57 @@ class R2FileStorage(FileStorage):
             with suppress(Exception):
                 tmp_path.unlink(missing_ok=True)
 
+    def stat(self, *, stored_path: str) -> StoredObjectInfo:
+        try:
+            head = self._client.head_object(Bucket=self._bucket, Key=stored_path)
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in _MISSING_CODES:
+                raise FileNotFoundError(stored_path) from exc
+            raise
+        return StoredObjectInfo(
+            size=int(head["ContentLength"]),
+            etag=head["ETag"],
+            last_modified=head.get("LastModified"),
+            content_type=head.get("ContentType"),
+        )
+
+    def iter_bytes(
+        self,
+        *,
+        stored_path: str,
+        start: int = 0,
+        end: int | None = None,
+        chunk_size: int = 256 * 1024,
+    ) -> Iterator[bytes]:
+        extra = {}
+        if start or end is not None:
+            extra["Range"] = f"bytes={start}-{'' if end is None else end}"
+        obj = self._client.get_object(Bucket=self._bucket, Key=stored_path, **extra)
+        body = obj["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    def presigned_url(
+        self,
+        *,
+        stored_path: str,
+        expires_in: int,
+        filename: str | None = None,
+        content_type: str | None = None,
+    ) -> str | None:
+        params = {"Bucket": self._bucket, "Key": stored_path}
+        if filename:
+            params["ResponseContentDisposition"] = (
+                f"attachment; filename*=UTF-8''{quote(filename, safe='')}"
+            )
+        if content_type:
+            params["ResponseContentType"] = content_type
+        return self._client.generate_presigned_url(
+            "get_object", Params=params, ExpiresIn=expires_in
+        )
+
 
 __all__ = ["R2FileStorage"]
 
@@ -1,16 +1,24 @@
 """Thumbnail generation utilities."""
 
 from .generator import (
+    FALLBACK_SIZE,
+    THUMBNAIL_SIZES,
+    RenderedThumbnail,
+    ThumbnailSize,
     can_generate_thumbnail,
-    generate_thumbnail_from_image,
-    generate_thumbnail_from_pdf,
+    generate_thumbnails_from_image,
+    generate_thumbnails_from_pdf,
 )
-from .save import generate_and_save_thumbnail
+from .save import SavedThumbnails, generate_and_save_thumbnail
 
 __all__ = [
+    "FALLBACK_SIZE",
+    "THUMBNAIL_SIZES",
+    "RenderedThumbnail",
+    "SavedThumbnails",
+    "ThumbnailSize",
     "can_generate_thumbnail",
     "generate_and_save_thumbnail",
-    "generate_thumbnail_from_image",
-    "generate_thumbnail_from_pdf",
+    "generate_thumbnails_from_image",
+    "generate_thumbnails_from_pdf",
 ]
-
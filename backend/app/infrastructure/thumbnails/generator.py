@@ -4,106 +4,210 @@ from __future__ import annotations
 
 import io
 import math
+from dataclasses import dataclass
 from pathlib import Path
 
-from PIL import Image
+from PIL import Image, features
 
 # A4 ratio: 210mm x 297mm = 1:1.414
 A4_RATIO = math.sqrt(2)  # ~1.414
-THUMBNAIL_WIDTH = 250
-THUMBNAIL_HEIGHT = int(THUMBNAIL_WIDTH * A4_RATIO)  # ~354px
 
 
-def generate_thumbnail_from_pdf(pdf_path: Path) -> bytes | None:
-    """Generate thumbnail from first page of PDF."""
+@dataclass(frozen=True, slots=True)
+class ThumbnailSize:
+    """Named thumbnail variant; the canvas always keeps the A4 ratio."""
+
+    name: str
+    width: int
+
+    @property
+    def height(self) -> int:
+        return int(self.width * A4_RATIO)
+
+
+# list card (library grid), retina card (2x density) and preview modal
+THUMBNAIL_SIZES: tuple[ThumbnailSize, ...] = (
+    ThumbnailSize("card", 250),
+    ThumbnailSize("retina", 500),
+    ThumbnailSize("preview", 800),
+)
+# JPEG fallback is produced for this variant and kept in material.thumbnail_path
+FALLBACK_SIZE = "card"
+
+THUMBNAIL_WIDTH = THUMBNAIL_SIZES[0].width
+THUMBNAIL_HEIGHT = THUMBNAIL_SIZES[0].height  # ~353px
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+
+
+@dataclass(slots=True)
+class RenderedThumbnail:
+    """Encoded thumbnail ready to be stored."""
+
+    size: str
+    width: int
+    height: int
+    format: str  # "webp" | "jpeg"
+    content: bytes
+
+    @property
+    def extension(self) -> str:
+        return ".webp" if self.format == "webp" else ".jpg"
+
+    @property
+    def media_type(self) -> str:
+        return f"image/{self.format}"
+
+
+def webp_supported() -> bool:
+    """True if the installed Pillow was built with libwebp."""
+    try:
+        return bool(features.check("webp"))
+    except Exception:
+        return False
+
+
+def generate_thumbnails_from_pdf(
+    pdf_path: Path,
+    sizes: tuple[ThumbnailSize, ...] = THUMBNAIL_SIZES,
+) -> list[RenderedThumbnail]:
+    """Render the first PDF page once, directly at the largest target width."""
     try:
         from pdf2image import convert_from_path  # type: ignore[attr-defined]
 
-        # Convert first page to image
-        images = convert_from_path(str(pdf_path), first_page=1, last_page=1, dpi=150)
+        max_width = max(size.width for size in sizes)
+        # size=(W, None) makes poppler rasterize straight to W px (scale-to-x),
+        # instead of a full-DPI bitmap that would be downscaled afterwards.
+        images = convert_from_path(
+            str(pdf_path),
+            first_page=1,
+            last_page=1,
+            size=(max_width, None),
+            single_file=True,
+        )
         if not images:
-            return None
+            return []
 
-        image = images[0]
-        return _resize_and_encode(image)
+        return _encode_sizes(_to_rgb(images[0]), sizes)
     except Exception:
-        return None
+        return []
 
 
-def generate_thumbnail_from_image(image_path: Path) -> bytes | None:
-    """Generate thumbnail from image file."""
+def generate_thumbnails_from_image(
+    image_path: Path,
+    sizes: tuple[ThumbnailSize, ...] = THUMBNAIL_SIZES,
+) -> list[RenderedThumbnail]:
+    """Decode the image at reduced resolution and encode all sizes."""
     try:
+        largest = max(sizes, key=lambda s: s.width)
         with Image.open(image_path) as img:
-            # Convert to RGB if necessary (for PNG with transparency, etc.)
-            if img.mode in ("RGBA", "LA", "P"):
-                rgb_img = Image.new("RGB", img.size, (255, 255, 255))
-                if img.mode == "P":
-                    img = img.convert("RGBA")
-                mask = img.split()[-1] if img.mode in ("RGBA", "LA") else None
-                rgb_img.paste(img, mask=mask)
-                img = rgb_img
-            elif img.mode != "RGB":
-                img = img.convert("RGB")
-
-            return _resize_and_encode(img)
+            target = _fit_size(img.size, largest)
+            # For JPEG, draft() configures the decoder to use DCT scaling
+            # (1/2, 1/4, 1/8), so a 24MP photo never gets fully decoded.
+            # thumbnail() then uses Image.reduce() before the final resample.
+            img.draft("RGB", target)
+            img.thumbnail(target, Image.Resampling.LANCZOS, reducing_gap=2.0)
+            return _encode_sizes(_to_rgb(img), sizes)
     except Exception:
-        return None
+        return []
+
+
+def _to_rgb(img: Image.Image) -> Image.Image:
+    """Flatten transparency onto white and convert to RGB."""
+    if img.mode in ("RGBA", "LA", "P"):
+        if img.mode == "P":
+            img = img.convert("RGBA")
+        rgb_img = Image.new("RGB", img.size, (255, 255, 255))
+        rgb_img.paste(img, mask=img.split()[-1])
+        return rgb_img
+    if img.mode != "RGB":
+        return img.convert("RGB")
+    return img
+
+
+def _encode_sizes(
+    image: Image.Image, sizes: tuple[ThumbnailSize, ...]
+) -> list[RenderedThumbnail]:
+    use_webp = webp_supported()
+    rendered: list[RenderedThumbnail] = []
+    for size in sizes:
+        canvas = _fit_on_canvas(image, size)
+        if use_webp:
+            rendered.append(_encode(canvas, size, "webp"))
+        if size.name == FALLBACK_SIZE or not use_webp:
+            rendered.append(_encode(canvas, size, "jpeg"))
+    return rendered
+
+
+def _fit_on_canvas(image: Image.Image, size: ThumbnailSize) -> Image.Image:
+    """Resize image to fit the A4 canvas of the given size and center it."""
+    target_width, target_height = _fit_size(image.size, size)
+
+    if (target_width, target_height) != image.size:
+        resized = image.resize(
+            (target_width, target_height),
+            Image.Resampling.LANCZOS,
+            reducing_gap=2.0,
+        )
+    else:
+        resized = image
+
+    canvas = Image.new("RGB", (size.width, size.height), (255, 255, 255))
+    x_offset = (size.width - target_width) // 2
+    y_offset = (size.height - target_height) // 2
+    canvas.paste(resized, (x_offset, y_offset))
+    return canvas
 
 
-def _resize_and_encode(image: Image.Image) -> bytes:
-    """Resize image to A4 ratio thumbnail and encode as JPEG."""
-    # Calculate target size maintaining A4 ratio
-    img_width, img_height = image.size
+def _fit_size(image_size: tuple[int, int], size: ThumbnailSize) -> tuple[int, int]:
+    """Largest (width, height) of the image that fits the A4 canvas."""
+    img_width, img_height = image_size
     img_ratio = img_height / img_width if img_width > 0 else A4_RATIO
 
-    # If image is wider than A4 ratio, fit to width
-    # If image is taller than A4 ratio, fit to height
+    # If image is taller than A4 ratio, fit to height; otherwise fit to width
     if img_ratio > A4_RATIO:
-        # Image is taller - fit to height
-        target_height = THUMBNAIL_HEIGHT
-        target_width = int(target_height / img_ratio)
-    else:
-        # Image is wider - fit to width
-        target_width = THUMBNAIL_WIDTH
-        target_height = int(target_width * img_ratio)
-
-    # Resize with high-quality resampling
-    resized = image.resize((target_width, target_height), Image.Resampling.LANCZOS)
-
-    # Create canvas with A4 ratio
-    canvas = Image.new("RGB", (THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT), (255, 255, 255))
-    
-    # Center the resized image on canvas
-    x_offset = (THUMBNAIL_WIDTH - target_width) // 2
-    y_offset = (THUMBNAIL_HEIGHT - target_height) // 2
-    canvas.paste(resized, (x_offset, y_offset))
+        target_height = size.height
+        return max(1, int(target_height / img_ratio)), target_height
+    target_width = size.width
+    return target_width, max(1, int(target_width * img_ratio))
+
 
-    # Encode as JPEG
+def _encode(canvas: Image.Image, size: ThumbnailSize, fmt: str) -> RenderedThumbnail:
     buffer = io.BytesIO()
-    canvas.save(buffer, format="JPEG", quality=85, optimize=True)
-    return buffer.getvalue()
+    if fmt == "webp":
+        # method=2: ~2x faster than the default with near-identical size
+        canvas.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=2)
+    else:
+        canvas.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    return RenderedThumbnail(
+        size=size.name,
+        width=size.width,
+        height=size.height,
+        format=fmt,
+        content=buffer.getvalue(),
+    )
 
 
 def can_generate_thumbnail(mime_type: str | None, filename: str | None) -> bool:
     """Check if thumbnail can be generated for this file type."""
     if not mime_type and not filename:
         return False
-    
+
     # PDF
     is_pdf = mime_type == "application/pdf" or (
         filename and filename.lower().endswith(".pdf")
     )
     if is_pdf:
         return True
-    
+
     # Images
     if mime_type and mime_type.startswith("image/"):
         return True
-    
+
     if filename:
         ext = Path(filename).suffix.lower()
         if ext in {".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp"}:
             return True
-    
-    return False
 
+    return False
@@ -3,19 +3,36 @@
 from __future__ import annotations
 
 import logging
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any
 
 from app.domain.services import FileStorage
 
 from .generator import (
+    FALLBACK_SIZE,
+    RenderedThumbnail,
     can_generate_thumbnail,
-    generate_thumbnail_from_image,
-    generate_thumbnail_from_pdf,
+    generate_thumbnails_from_image,
+    generate_thumbnails_from_pdf,
 )
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class SavedThumbnails:
+    """Stored thumbnail set of a material.
+
+    fallback_path: JPEG of the card size (material.thumbnail_path).
+    variants: size name -> {"path", "width", "height", "format"}
+    (material.thumbnails).
+    """
+
+    fallback_path: str
+    variants: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+
 def generate_and_save_thumbnail(
     storage: FileStorage,
     *,
@@ -24,36 +41,50 @@ def generate_and_save_thumbnail(
     local_path: Path,
     mime_type: str | None,
     filename: str | None,
-) -> str | None:
+) -> SavedThumbnails | None:
     """
-    Generate thumbnail from file and save to storage.
-    Associates the stored object with the material via metadata (e.g. R2 material_id).
-    Returns stored_path if successful, None otherwise.
+    Generate all thumbnail sizes from file and save them to storage.
+    Associates stored objects with the material via metadata (e.g. R2 material_id).
+    Returns the stored set if successful, None otherwise.
     """
     if not can_generate_thumbnail(mime_type, filename):
         return None
 
     try:
-        thumbnail_bytes: bytes | None = None
+        rendered: list[RenderedThumbnail] = []
         is_pdf = mime_type == "application/pdf" or (
             filename and filename.lower().endswith(".pdf")
         )
         if is_pdf:
-            thumbnail_bytes = generate_thumbnail_from_pdf(local_path)
+            rendered = generate_thumbnails_from_pdf(local_path)
         elif mime_type and mime_type.startswith("image/"):
-            thumbnail_bytes = generate_thumbnail_from_image(local_path)
+            rendered = generate_thumbnails_from_image(local_path)
 
-        if not thumbnail_bytes:
+        if not rendered:
             return None
 
-        thumbnail_filename = f"thumb_{material_id}.jpg"
-        stored_path = storage.save(
-            owner_id=owner_id,
-            filename=thumbnail_filename,
-            content=thumbnail_bytes,
-            metadata={"material_id": str(material_id)},
-        )
-        return stored_path
+        fallback_path: str | None = None
+        variants: dict[str, dict[str, Any]] = {}
+        for thumb in rendered:
+            stored_path = storage.save(
+                owner_id=owner_id,
+                filename=f"thumb_{material_id}_{thumb.size}{thumb.extension}",
+                content=thumb.content,
+                metadata={"material_id": str(material_id), "size": thumb.size},
+            )
+            if thumb.format == "jpeg" and thumb.size == FALLBACK_SIZE:
+                fallback_path = stored_path
+            if thumb.format == "webp" or thumb.size not in variants:
+                variants[thumb.size] = {
+                    "path": stored_path,
+                    "width": thumb.width,
+                    "height": thumb.height,
+                    "format": thumb.format,
+                }
+
+        if fallback_path is None:
+            return None
+        return SavedThumbnails(fallback_path=fallback_path, variants=variants)
     except Exception as exc:
         logger.warning(
             "Thumbnail generate_and_save failed for material_id=%s: %s",
@@ -1,3 +1,13 @@
+from app.middleware.compression import CompressionMiddleware
 from app.middleware.logging import LoggingMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
+from app.middleware.sql_timing import SqlTimingMiddleware
 
-__all__ = ["LoggingMiddleware"]
+__all__ = [
+    "CompressionMiddleware",
+    "LoggingMiddleware",
+    "RateLimitMiddleware",
+    "ReadYourWritesMiddleware",
+    "SqlTimingMiddleware",
+]
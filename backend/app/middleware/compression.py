@@ -0,0 +1,194 @@
+import zlib
+from typing import Any
+
+import anyio
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# compressing larger bodies would block the event loop noticeably
+_THREAD_THRESHOLD = 256 * 1024
+_COMPRESSIBLE_PREFIXES = ("text/", "application/json", "application/xml")
+_COMPRESSIBLE_TYPES = frozenset(
+    {"application/javascript", "application/problem+json", "image/svg+xml"}
+)
+# streamed as they are produced; compressing would hold events back
+_NEVER_COMPRESSED = frozenset({"text/event-stream"})
+
+
+class CompressionMiddleware:
+    """Brotli or gzip for text responses of at least ``minimum_size`` bytes.
+
+    Brotli is preferred when the client accepts it. Responses that already
+    have a Content-Encoding, partial (206) responses, downloads (byte ranges
+    or Content-Disposition, whose offsets and ETag refer to the stored
+    bytes) and server-sent events pass through untouched. A strong ETag of
+    a compressed response is weakened. Whole bodies over 256 KiB are
+    compressed on a worker thread; streamed bodies are compressed chunk by
+    chunk.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        brotli_quality: int = 4,
+        gzip_level: int = 6,
+    ) -> None:
+        self.app = app
+        self._minimum_size = minimum_size
+        self._brotli_quality = brotli_quality
+        self._gzip_level = gzip_level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = _negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingSend(
+            send,
+            encoding=encoding,
+            minimum_size=self._minimum_size,
+            brotli_quality=self._brotli_quality,
+            gzip_level=self._gzip_level,
+        )
+        await self.app(scope, receive, responder)
+
+
+class _CompressingSend:
+    def __init__(
+        self,
+        send: Send,
+        *,
+        encoding: str,
+        minimum_size: int,
+        brotli_quality: int,
+        gzip_level: int,
+    ) -> None:
+        self._send = send
+        self._encoding = encoding
+        self._minimum_size = minimum_size
+        self._brotli_quality = brotli_quality
+        self._gzip_level = gzip_level
+        self._start: Message | None = None
+        self._passthrough = False
+        self._compressor: Any = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            if _compressible(message):
+                self._start = message  # held until the body size is known
+            else:
+                self._passthrough = True
+                await self._send(message)
+            return
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+        assert self._start is not None
+        body: bytes = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._compressor is None:
+            if not more_body:
+                await self._send_whole(body)
+                return
+            self._compressor = self._new_compressor()
+            headers = self._encoded_headers()
+            del headers["content-length"]
+            await self._send(self._start)
+
+        chunk = self._compress(body)
+        if not more_body:
+            chunk += self._finish()
+        if chunk or not more_body:
+            await self._send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
+
+    async def _send_whole(self, body: bytes) -> None:
+        assert self._start is not None
+        if len(body) < self._minimum_size:
+            MutableHeaders(scope=self._start).add_vary_header("Accept-Encoding")
+            await self._send(self._start)
+            await self._send({"type": "http.response.body", "body": body})
+            return
+        self._compressor = self._new_compressor()
+        if len(body) > _THREAD_THRESHOLD:
+            compressed = await anyio.to_thread.run_sync(self._compress_all, body)
+        else:
+            compressed = self._compress_all(body)
+        headers = self._encoded_headers()
+        headers["Content-Length"] = str(len(compressed))
+        await self._send(self._start)
+        await self._send({"type": "http.response.body", "body": compressed})
+
+    def _encoded_headers(self) -> MutableHeaders:
+        assert self._start is not None
+        headers = MutableHeaders(scope=self._start)
+        headers["Content-Encoding"] = self._encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # the compressed bytes are a different representation
+            headers["ETag"] = f"W/{etag}"
+        return headers
+
+    def _new_compressor(self) -> Any:
+        if self._encoding == "br":
+            return brotli.Compressor(quality=self._brotli_quality)
+        return zlib.compressobj(self._gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def _compress_all(self, body: bytes) -> bytes:
+        return self._compress(body) + self._finish()
+
+    def _compress(self, data: bytes) -> bytes:
+        if not data:
+            return b""
+        if self._encoding == "br":
+            return bytes(self._compressor.process(data))
+        return bytes(self._compressor.compress(data))
+
+    def _finish(self) -> bytes:
+        if self._encoding == "br":
+            return bytes(self._compressor.finish())
+        return bytes(self._compressor.flush())
+
+
+def _negotiate(accept_encoding: str) -> str | None:
+    """``br`` or ``gzip`` if the client accepts it (q > 0), else None."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+    for encoding in ("br", "gzip"):
+        if accepted.get(encoding, 0.0) > 0:
+            return encoding
+    return None
+
+
+def _compressible(start: Message) -> bool:
+    if start["status"] in (204, 206, 304) or start["status"] < 200:
+        return False
+    headers = Headers(raw=start["headers"])
+    if "content-encoding" in headers:
+        return False
+    if "accept-ranges" in headers or "content-disposition" in headers:
+        return False
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in _NEVER_COMPRESSED:
+        return False
+    return content_type in _COMPRESSIBLE_TYPES or content_type.startswith(
+        _COMPRESSIBLE_PREFIXES
+    )
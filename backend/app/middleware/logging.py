@@ -1,38 +1,41 @@
 import logging
 import time
-from collections.abc import Awaitable, Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+class LoggingMiddleware:
     """
     Middleware logging ONLY errors.
     Success logs are removed to reduce synchronous I/O overhead.
     Use Sentry for tracing and monitoring.
     """
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
-        start_time = time.time()
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start_time = time.perf_counter()
         try:
-            return await call_next(request)
+            await self.app(scope, receive, send)
         except Exception as exc:
-            process_time = time.time() - start_time
+            process_time = time.perf_counter() - start_time
+            method, path = scope["method"], scope["path"]
             logger.error(
                 "✗ %s %s - Error: %s - Time: %.3fs",
-                request.method,
-                request.url.path,
+                method,
+                path,
                 str(exc),
                 process_time,
                 exc_info=True,
                 extra={
-                    "method": request.method,
-                    "path": request.url.path,
+                    "method": method,
+                    "path": path,
                     "error": str(exc),
                     "process_time": process_time,
                 },
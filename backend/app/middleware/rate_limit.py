@@ -0,0 +1,56 @@
+from slowapi import Limiter
+from slowapi.middleware import (
+    _find_route_handler,
+    _should_exempt,
+    async_check_limits,
+)
+from starlette.applications import Starlette
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class RateLimitMiddleware:
+    """Applies the limiter's default limits to routes without their own.
+
+    The checks are slowapi's (routes decorated with ``@limiter.limit`` are
+    left to the decorator), in a pure ASGI middleware.
+    ``SlowAPIASGIMiddleware`` is not used because it sends the response
+    start again before every body chunk, which breaks streamed responses.
+    Here rate-limit headers, when enabled, are added once, to the start
+    message.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        app: Starlette = scope["app"]
+        limiter: Limiter = app.state.limiter
+        handler = _find_route_handler(app.routes, scope) if limiter.enabled else None
+        if handler is None or _should_exempt(limiter, handler):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope, receive)
+        error_response, inject_headers = await async_check_limits(
+            limiter, request, handler, app
+        )
+        if error_response is not None:
+            await error_response(scope, receive, send)
+            return
+        if not inject_headers:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                limiter._inject_asgi_headers(
+                    MutableHeaders(scope=message), request.state.view_rate_limit
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,42 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.infrastructure.cache.recent_writes import RecentWriteTracker
+
+_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class ReadYourWritesMiddleware:
+    """Marks the authenticated user after a successful unsafe request.
+
+    ``get_current_user`` stores ``request.state.principal_id``; for the next
+    READ_YOUR_WRITES_SECONDS that user's read-only units of work go to the
+    primary, so a replica that has not replayed the write yet is not read.
+    The mark is set before the response starts, so the client cannot issue
+    its next read ahead of it.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in _SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_marking(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                principal_id = scope.get("state", {}).get("principal_id")
+                if principal_id is not None:
+                    tracker = self._tracker(scope)
+                    if tracker is not None:
+                        await tracker.mark_async(principal_id)
+            await send(message)
+
+        await self.app(scope, receive, send_marking)
+
+    @staticmethod
+    def _tracker(scope: Scope) -> RecentWriteTracker | None:
+        container = getattr(scope["app"].state, "container", None)
+        if container is None:
+            return None
+        return container.provide_replica_router().recent_writes
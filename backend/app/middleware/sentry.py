@@ -1,28 +1,30 @@
 import sentry_sdk
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from app.core.security import decode_access_token
+from app.core.security import access_token_claims
 
 
-class SentryUserContextMiddleware(BaseHTTPMiddleware):
+class SentryUserContextMiddleware:
     """
-    Middleware that extracts user email from JWT and adds it to Sentry context.
-    Does NOT query the database, just decodes the token.
+    Middleware that extracts the user from the JWT and adds it to Sentry context.
+    Does NOT query the database; the decoded claims are kept in the request
+    scope and reused by the auth dependencies.
     """
 
-    async def dispatch(self, request: Request, call_next):
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ")[1]
-            try:
-                payload = decode_access_token(token)
-                email = payload.get("sub")
-                if email:
-                    sentry_sdk.set_user({"email": email})
-            except Exception:
-                # Token invalid or expired - ignore, user is anonymous for Sentry
-                pass
-
-        return await call_next(request)
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            auth_header = Headers(scope=scope).get("authorization")
+            if auth_header and auth_header.startswith("Bearer "):
+                # invalid or expired tokens decode to {}: anonymous for Sentry
+                claims = access_token_claims(scope, auth_header[len("Bearer ") :])
+                email = claims.get("sub")
+                if email:
+                    user = {"email": email}
+                    if isinstance(claims.get("uid"), int):
+                        user["id"] = str(claims["uid"])
+                    sentry_sdk.set_user(user)
+        await self.app(scope, receive, send)
@@ -0,0 +1,53 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.instrumentation import report_sql_stats, track_sql
+
+
+class SqlTimingMiddleware:
+    """Counts the SQL of each request and reports it in ``Server-Timing``.
+
+    Requests over the statement budget or repeating one statement shape
+    (N+1) are logged as warnings with structured ``sql_*`` fields. The
+    header covers the work done before the response started; the log
+    also includes statements run while a streaming body was sent.
+    """
+
+    def __init__(
+        self, app: ASGIApp, *, budget: int, n_plus_one_threshold: int
+    ) -> None:
+        self.app = app
+        self._budget = budget
+        self._n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status_code = 500
+        with track_sql() as stats:
+
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    total_ms = (time.perf_counter() - started) * 1000
+                    MutableHeaders(scope=message)["Server-Timing"] = (
+                        f'db;dur={stats.duration_ms:.1f};desc="{stats.count} queries", '
+                        f"app;dur={total_ms:.1f}"
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
+        total_ms = (time.perf_counter() - started) * 1000
+        route = scope.get("route")
+        report_sql_stats(
+            stats,
+            scope=f"{scope['method']} {getattr(route, 'path', scope['path'])}",
+            budget=self._budget,
+            n_plus_one_threshold=self._n_plus_one_threshold,
+            extra={"status_code": status_code, "duration_ms": total_ms},
+        )
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from typing import Any
+
+from app.celery_app import celery_app
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _get_service() -> Any:
+    # Lazy import to avoid circular imports during app startup
+    from app.bootstrap import get_container
+
+    return get_container().provide_housekeeping_service()
+
+
+def _log(result: Any) -> None:
+    logger.info(
+        "Housekeeping %s: %d rows in %d batches, %.1f ms%s",
+        result.target,
+        result.rows,
+        result.batches,
+        result.duration * 1000,
+        "" if result.complete else " (batch limit reached, continues next run)",
+        extra=result.log_fields(),
+    )
+
+
+@celery_app.task(name="app.tasks.housekeeping.purge_auth_tokens")
+def purge_auth_tokens_task() -> dict[str, int]:
+    """Expired refresh tokens, e-mail verifications and password resets."""
+    service = _get_service()
+    grace = timedelta(hours=get_settings().EXPIRED_TOKEN_GRACE_HOURS)
+    results = [
+        service.purge_expired_refresh_tokens(grace=grace),
+        service.purge_expired_pending_verifications(grace=grace),
+        service.purge_expired_password_reset_tokens(grace=grace),
+    ]
+    for result in results:
+        _log(result)
+    return {result.target: result.rows for result in results}
+
+
+@celery_app.task(name="app.tasks.housekeeping.purge_finished_jobs")
+def purge_finished_jobs_task() -> int:
+    """Done/failed jobs past JOB_RETENTION_DAYS.
+
+    Running jobs and the generation jobs of existing tests are kept.
+    """
+    days = get_settings().JOB_RETENTION_DAYS
+    result = _get_service().purge_finished_jobs(older_than=timedelta(days=days))
+    _log(result)
+    return int(result.rows)
+
+
+@celery_app.task(name="app.tasks.housekeeping.purge_pdf_exports")
+def purge_pdf_exports_task() -> int:
+    """Export cache entries past PDF_EXPORT_RETENTION_DAYS and their files."""
+    from app.tasks.materials import cleanup_user_files_task
+
+    days = get_settings().PDF_EXPORT_RETENTION_DAYS
+    result = _get_service().purge_pdf_exports(older_than=timedelta(days=days))
+    _log(result)
+    if result.stored_paths:
+        cleanup_user_files_task.delay(result.stored_paths, storage_name="exports")
+    return int(result.rows)
+
+
+@celery_app.task(name="app.tasks.housekeeping.purge_outbox")
+def purge_outbox_task() -> int:
+    """Outbox events processed more than OUTBOX_RETENTION_DAYS ago."""
+    days = get_settings().OUTBOX_RETENTION_DAYS
+    result = _get_service().purge_processed_outbox(older_than=timedelta(days=days))
+    _log(result)
+    return int(result.rows)
+
+
+@celery_app.task(name="app.tasks.housekeeping.reconcile_unread_counters")
+def reconcile_unread_counters_task() -> bool:
+    """Reset cached unread counts whose broadcast total drifted from SQL."""
+    from app.bootstrap import get_container
+
+    service = get_container().provide_notification_service()
+    return bool(service.reconcile_unread_counters())
@@ -6,8 +6,8 @@ from typing import Any
 
 from app.api.schemas.materials import MaterialUpdate
 from app.celery_app import celery_app
+from app.domain.events import AnalyticsEvent
 from app.domain.models.enums import JobStatus
-from app.infrastructure.monitoring.posthog_client import analytics
 
 logger = logging.getLogger(__name__)
 
@@ -37,9 +37,15 @@ def process_material_task(
     except Exception as exc:
         logger.exception("Failed to mark job %s as running: %s", job_id, exc)
 
+    stages: dict[str, str] = {}
+
+    def _report_stages(current: dict[str, str]) -> None:
+        stages.update(current)
+        job_service.update_job_stages(job_id=job_id, stages=current)
+
     try:
         material = material_service.process_material(
-            owner_id=owner_id, material_id=material_id
+            owner_id=owner_id, material_id=material_id, on_progress=_report_stages
         )
         # MaterialOut has processing_status as string; DTO maps domain status.
         status_value = (
@@ -93,6 +99,7 @@ def process_material_task(
                         "filename": material.filename,
                         "has_thumbnail": has_thumbnail,
                         "has_markdown_twin": has_markdown_twin,
+                        "stages": stages,
                     },
                 )
                 # Don't raise error - material is usable with thumbnail or markdown_twin
@@ -107,10 +114,12 @@ def process_material_task(
                         "processing_status": material.processing_status,
                         "processing_error": error_msg,
                         "filename": material.filename,
+                        "stages": stages,
                     },
                 )
                 raise ValueError(error_msg)
 
+        duration_sec = time.time() - start_time
         job_service.update_job_status(
             job_id=job_id,
             status=JobStatus.DONE,
@@ -119,35 +128,32 @@ def process_material_task(
                 "processing_status": material.processing_status,
                 "extracted_text": material.extracted_text,
                 "filename": material.filename,
+                "stages": stages,
             },
-        )
-        
-        duration_sec = time.time() - start_time
-        analytics.capture(
-            user_id=owner_id,
-            event="material_processing_completed",
-            properties={
-                "material_id": material.id,
-                "job_id": job_id,
-                "duration_total_sec": duration_sec,
-                "duration_ocr_sec": material.duration_ocr_sec,
-                "cache_hit": material.cache_hit,
-                "status": "success",
-                "mime_type": material.mime_type,
-                "size_mb": (
-                    round(material.size_bytes / (1024 * 1024), 2)
-                    if material.size_bytes
-                    else 0
-                ),
-                "page_count": material.page_count,
-                "char_count": len(material.extracted_text)
-                if material.extracted_text
-                else 0,
-            }
+            analytics=AnalyticsEvent.create(
+                user_id=owner_id,
+                event="material_processing_completed",
+                properties={
+                    "material_id": material.id,
+                    "job_id": job_id,
+                    "duration_total_sec": duration_sec,
+                    "duration_ocr_sec": material.duration_ocr_sec,
+                    "cache_hit": material.cache_hit,
+                    "status": "success",
+                    "mime_type": material.mime_type,
+                    "size_mb": (
+                        round(material.size_bytes / (1024 * 1024), 2)
+                        if material.size_bytes
+                        else 0
+                    ),
+                    "page_count": material.page_count,
+                    "char_count": len(material.extracted_text)
+                    if material.extracted_text
+                    else 0,
+                },
+            ),
         )
 
-        analytics.flush()
-
         return material.id
     except Exception as exc:
         logger.exception("Material processing job %s failed: %s", job_id, exc)
@@ -161,7 +167,11 @@ def process_material_task(
 
 @celery_app.task(name="app.tasks.analyze_material", bind=True)
 def analyze_material_task(
-    self: Any, job_id: int, owner_id: int, material_id: int
+    self: Any,
+    job_id: int,
+    owner_id: int,
+    material_id: int,
+    quota_charged: int | None = None,
 ) -> int:
     _ = self
     start_time = time.time()
@@ -174,7 +184,7 @@ def analyze_material_task(
 
     try:
         material = analysis_service.analyze_material(
-            owner_id=owner_id, material_id=material_id
+            owner_id=owner_id, material_id=material_id, quota_charged=quota_charged
         )
         status_value = (material.analysis_status or "").lower()
         if status_value != JobStatus.DONE.value:
@@ -192,6 +202,7 @@ def analyze_material_task(
             )
             raise ValueError(error_msg)
 
+        duration_sec = time.time() - start_time
         job_service.update_job_status(
             job_id=job_id,
             status=JobStatus.DONE,
@@ -203,30 +214,27 @@ def analyze_material_task(
                 "markdown_twin": material.markdown_twin,
                 "filename": material.filename,
             },
+            analytics=AnalyticsEvent.create(
+                user_id=owner_id,
+                event="material_analysis_completed",
+                properties={
+                    "material_id": material.id,
+                    "job_id": job_id,
+                    "duration_total_sec": duration_sec,
+                    "status": "success",
+                    "routing_tier": material.routing_tier,
+                    "analysis_version": material.analysis_version,
+                    "mime_type": material.mime_type,
+                    "size_mb": (
+                        round(material.size_bytes / (1024 * 1024), 2)
+                        if material.size_bytes
+                        else 0
+                    ),
+                    "page_count": material.page_count,
+                },
+            ),
         )
 
-        duration_sec = time.time() - start_time
-        analytics.capture(
-            user_id=owner_id,
-            event="material_analysis_completed",
-            properties={
-                "material_id": material.id,
-                "job_id": job_id,
-                "duration_total_sec": duration_sec,
-                "status": "success",
-                "routing_tier": material.routing_tier,
-                "analysis_version": material.analysis_version,
-                "mime_type": material.mime_type,
-                "size_mb": (
-                    round(material.size_bytes / (1024 * 1024), 2)
-                    if material.size_bytes
-                    else 0
-                ),
-                "page_count": material.page_count,
-            },
-        )
-
-        analytics.flush()
         return material.id
     except Exception as exc:
         logger.exception("Material analysis job %s failed: %s", job_id, exc)
@@ -239,12 +247,20 @@ def analyze_material_task(
 
 
 @celery_app.task(name="app.tasks.cleanup_user_files")
-def cleanup_user_files_task(file_paths: list[str]) -> None:
-    """Background task to delete physical files from storage."""
+def cleanup_user_files_task(file_paths: list[str], storage_name: str = "files") -> None:
+    """Background task to delete physical files from storage.
+
+    ``storage_name`` selects the storage the paths belong to: "files",
+    "materials" or "exports".
+    """
     from app.bootstrap import get_container
 
     container = get_container()
-    storage = container.provide_file_storage()
+    storage = {
+        "files": container.provide_file_storage,
+        "materials": container.provide_materials_storage,
+        "exports": container.provide_export_storage,
+    }[storage_name]()
 
     for path in file_paths:
         try:
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import logging
+
+from app.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="app.tasks.outbox.dispatch_outbox")
+def dispatch_outbox_task() -> int:
+    """Deliver pending outbox events (analytics) in batches."""
+    # Lazy import to avoid circular imports during app startup
+    from app.bootstrap import get_container
+
+    result = get_container().provide_outbox_dispatcher().dispatch()
+    if result.batches:
+        logger.info(
+            "Outbox: %d delivered, %d retried, %d given up in %d batches, %.1f ms%s",
+            result.delivered,
+            result.retried,
+            result.dead,
+            result.batches,
+            result.duration * 1000,
+            "" if result.complete else " (batch limit reached, continues next run)",
+            extra=result.log_fields(),
+        )
+    return result.delivered
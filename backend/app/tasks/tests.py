@@ -14,7 +14,6 @@ from app.api.schemas.tests import (
 )
 from app.celery_app import celery_app
 from app.domain.models.enums import JobStatus
-from app.infrastructure.monitoring.posthog_client import analytics
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +32,11 @@ def _get_services() -> tuple[Any, Any, Any]:
 
 @celery_app.task(name="app.tasks.generate_test", bind=True)
 def generate_test_task(
-    self: Any, job_id: int, owner_id: int, request_payload: dict[str, Any]
+    self: Any,
+    job_id: int,
+    owner_id: int,
+    request_payload: dict[str, Any],
+    quota_charged: int | None = None,
 ) -> int:
     _ = self
     test_service, job_service, _ = _get_services()
@@ -46,7 +49,7 @@ def generate_test_task(
     try:
         request = TestGenerateRequest(**request_payload)
         response = test_service.generate_test_from_input(
-            request=request, owner_id=owner_id
+            request=request, owner_id=owner_id, quota_charged=quota_charged
         )
         job_service.update_job_status(
             job_id=job_id,
@@ -56,7 +59,6 @@ def generate_test_task(
                 "num_questions": response.num_questions,
             },
         )
-        analytics.flush()
         return response.test_id
     except SoftTimeLimitExceeded:
         logger.exception("Job %s timed out (SoftTimeLimitExceeded)", job_id)
@@ -133,7 +135,6 @@ def export_test_pdf_task(
                 "test_id": test_id,
             },
         )
-        analytics.flush()
         return stored_path
     except Exception as exc:
         logger.exception("PDF export job %s failed: %s", job_id, exc)
@@ -197,7 +198,6 @@ def export_custom_test_pdf_task(
                 "test_id": test_id,
             },
         )
-        analytics.flush()
         return stored_path
     except Exception as exc:
         logger.exception("Custom PDF export job %s failed: %s", job_id, exc)
@@ -233,7 +233,6 @@ def bulk_regenerate_questions_task(
             status=JobStatus.DONE,
             result={"num_regenerated": num_regenerated, "test_id": test_id},
         )
-        analytics.flush()
         return num_regenerated
     except Exception as exc:
         logger.exception("Bulk regeneration job %s failed: %s", job_id, exc)
@@ -274,7 +273,6 @@ def generate_group_ai_variant_task(
             status=JobStatus.DONE,
             result={"group_id": new_group.id, "test_id": test_id},
         )
-        analytics.flush()
         return {"group_id": new_group.id, "test_id": test_id}
     except Exception as exc:
         logger.exception("Group AI variant job %s failed: %s", job_id, exc)
@@ -310,7 +308,6 @@ def bulk_convert_questions_task(
             status=JobStatus.DONE,
             result={"num_converted": num_converted, "test_id": test_id},
         )
-        analytics.flush()
         return num_converted
     except Exception as exc:
         logger.exception("Bulk conversion job %s failed: %s", job_id, exc)
@@ -0,0 +1,81 @@
+"""add user_stats read model
+
+Revision ID: a7c3e9f2d815
+Revises: f4a2b8d1c6e3
+Create Date: 2026-03-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "a7c3e9f2d815"
+down_revision = "f4a2b8d1c6e3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_stats",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("total_tests", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_questions", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_files", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("closed_questions", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("open_questions", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("easy_questions", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("medium_questions", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("hard_questions", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_test_created_at", sa.DateTime(), nullable=True),
+        sa.Column(
+            "updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    # Backfill every existing user in one set-based statement
+    op.execute(
+        """
+        INSERT INTO user_stats (
+            user_id, total_tests, total_questions, total_files,
+            closed_questions, open_questions,
+            easy_questions, medium_questions, hard_questions,
+            last_test_created_at, updated_at
+        )
+        SELECT
+            u.id,
+            COALESCE(t.total_tests, 0),
+            COALESCE(q.total_questions, 0),
+            COALESCE(f.total_files, 0),
+            COALESCE(q.closed_questions, 0),
+            COALESCE(q.total_questions - q.closed_questions, 0),
+            COALESCE(q.total_questions - q.medium_questions - q.hard_questions, 0),
+            COALESCE(q.medium_questions, 0),
+            COALESCE(q.hard_questions, 0),
+            t.last_test_created_at,
+            now()
+        FROM "user" u
+        LEFT JOIN (
+            SELECT owner_id, COUNT(*) AS total_tests,
+                   MAX(created_at) AS last_test_created_at
+            FROM test GROUP BY owner_id
+        ) t ON t.owner_id = u.id
+        LEFT JOIN (
+            SELECT test.owner_id,
+                   COUNT(*) AS total_questions,
+                   COUNT(*) FILTER (WHERE question.is_closed) AS closed_questions,
+                   COUNT(*) FILTER (WHERE question.difficulty = 2) AS medium_questions,
+                   COUNT(*) FILTER (WHERE question.difficulty = 3) AS hard_questions
+            FROM question JOIN test ON test.id = question.test_id
+            GROUP BY test.owner_id
+        ) q ON q.owner_id = u.id
+        LEFT JOIN (
+            SELECT owner_id, COUNT(*) AS total_files FROM file GROUP BY owner_id
+        ) f ON f.owner_id = u.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_stats")
@@ -0,0 +1,52 @@
+"""add outbox_events (transactional outbox)
+
+Revision ID: a9e4d2c7f518
+Revises: f2c8d4a6b913
+Create Date: 2026-04-02 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "a9e4d2c7f518"
+down_revision = "f2c8d4a6b913"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "outbox_events",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("event_type", sa.String(length=100), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=True),
+        sa.Column("occurred_at", sa.DateTime(), nullable=False),
+        sa.Column(
+            "available_at", sa.DateTime(), nullable=False, server_default=sa.func.now()
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("processed_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_outbox_events_pending",
+        "outbox_events",
+        ["available_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("processed_at IS NULL"),
+    )
+    op.create_index(
+        op.f("ix_outbox_events_processed_at"),
+        "outbox_events",
+        ["processed_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_outbox_events_processed_at"), table_name="outbox_events")
+    op.drop_index("ix_outbox_events_pending", table_name="outbox_events")
+    op.drop_table("outbox_events")
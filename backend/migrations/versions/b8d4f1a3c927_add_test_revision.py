@@ -0,0 +1,26 @@
+"""add test.revision for the test detail cache
+
+Revision ID: b8d4f1a3c927
+Revises: a7c3e9f2d815
+Create Date: 2026-03-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "b8d4f1a3c927"
+down_revision = "a7c3e9f2d815"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "test",
+        sa.Column("revision", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("test", "revision")
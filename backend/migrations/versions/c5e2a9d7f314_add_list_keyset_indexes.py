@@ -0,0 +1,31 @@
+"""add (owner_id, created_at, id) indexes for paginated list views
+
+Revision ID: c5e2a9d7f314
+Revises: b8d4f1a3c927
+Create Date: 2026-03-20 10:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = "c5e2a9d7f314"
+down_revision = "b8d4f1a3c927"
+branch_labels = None
+depends_on = None
+
+_TABLES = ("test", "material", "job")
+
+
+def upgrade() -> None:
+    for table in _TABLES:
+        op.create_index(
+            f"ix_{table}_owner_created_id",
+            table,
+            ["owner_id", "created_at", "id"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    for table in _TABLES:
+        op.drop_index(f"ix_{table}_owner_created_id", table_name=table)
@@ -0,0 +1,28 @@
+"""add (owner_id, checksum, created_at DESC) index on material
+
+Revision ID: d3b7f6c1a492
+Revises: c5e2a9d7f314
+Create Date: 2026-03-21 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "d3b7f6c1a492"
+down_revision = "c5e2a9d7f314"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_material_owner_checksum_created",
+        "material",
+        ["owner_id", "checksum", sa.text("created_at DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_material_owner_checksum_created", table_name="material")
@@ -0,0 +1,27 @@
+"""add material thumbnails (multi-size variants with dimensions)
+
+Revision ID: e3f1a7c9b2d4
+Revises: d9e1c2b3a4f5
+Create Date: 2026-03-02 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "e3f1a7c9b2d4"
+down_revision = "d9e1c2b3a4f5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "material",
+        sa.Column("thumbnails", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("material", "thumbnails")
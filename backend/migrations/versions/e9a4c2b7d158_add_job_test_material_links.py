@@ -0,0 +1,47 @@
+"""add indexed job.test_id / job.material_id links
+
+Revision ID: e9a4c2b7d158
+Revises: d3b7f6c1a492
+Create Date: 2026-03-22 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "e9a4c2b7d158"
+down_revision = "d3b7f6c1a492"
+branch_labels = None
+depends_on = None
+
+_LINKS = (("test_id", "test"), ("material_id", "material"))
+
+
+def upgrade() -> None:
+    for column, table in _LINKS:
+        op.add_column("job", sa.Column(column, sa.Integer(), nullable=True))
+        # result wins over payload, as in Job.linked_id; skip dangling ids
+        op.execute(
+            f"""
+            UPDATE job
+            SET {column} = target.id
+            FROM "{table}" AS target
+            WHERE target.id = CASE
+                WHEN job.result ->> '{column}' ~ '^[0-9]+$'
+                    THEN (job.result ->> '{column}')::integer
+                WHEN job.payload ->> '{column}' ~ '^[0-9]+$'
+                    THEN (job.payload ->> '{column}')::integer
+            END
+            """
+        )
+        op.create_index(op.f(f"ix_job_{column}"), "job", [column], unique=False)
+        op.create_foreign_key(
+            f"job_{column}_fkey", "job", table, [column], ["id"], ondelete="SET NULL"
+        )
+
+
+def downgrade() -> None:
+    for column, _table in reversed(_LINKS):
+        op.drop_constraint(f"job_{column}_fkey", "job", type_="foreignkey")
+        op.drop_index(op.f(f"ix_job_{column}"), table_name="job")
+        op.drop_column("job", column)
@@ -0,0 +1,30 @@
+"""add (recipient_id, created_at, id) index for the notification feed
+
+Revision ID: f2c8d4a6b913
+Revises: e9a4c2b7d158
+Create Date: 2026-03-24 10:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = "f2c8d4a6b913"
+down_revision = "e9a4c2b7d158"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_system_notifications_recipient_created",
+        "system_notifications",
+        ["recipient_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_system_notifications_recipient_created",
+        table_name="system_notifications",
+    )
@@ -0,0 +1,26 @@
+"""add material analysis_pipeline
+
+Revision ID: f4a2b8d1c6e3
+Revises: e3f1a7c9b2d4
+Create Date: 2026-03-09 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "f4a2b8d1c6e3"
+down_revision = "e3f1a7c9b2d4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "material",
+        sa.Column("analysis_pipeline", sa.String(length=20), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("material", "analysis_pipeline")
@@ -0,0 +1,81 @@
+"""Shared fixtures.
+
+Database tests run against the PostgreSQL named by ``TEST_DATABASE_URL``
+(its tables are dropped and recreated) and are skipped when it is unset.
+"""
+
+import os
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, SQLModel
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+# Settings are read at import time by parts of the app
+os.environ.setdefault(
+    "DATABASE_URL", TEST_DATABASE_URL or "postgresql://test@localhost/test"
+)
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("GEMINI_API_KEY", "test-gemini-key")
+
+from app.application.unit_of_work import SqlAlchemyUnitOfWork  # noqa: E402
+from app.db import models as db_models  # noqa: E402
+from app.db.instrumentation import (  # noqa: E402
+    SqlStats,
+    assert_sql_budget,
+    instrument_engine,
+)
+
+
+@pytest.fixture(scope="session")
+def engine() -> Iterator[Engine]:
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = instrument_engine(create_engine(TEST_DATABASE_URL))
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine: Engine) -> Iterator[Callable[[], Session]]:
+    yield lambda: Session(engine, autoflush=False)
+    tables = ", ".join(f'"{table.name}"' for table in SQLModel.metadata.sorted_tables)
+    with engine.begin() as connection:
+        connection.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+
+
+@pytest.fixture
+def uow_factory(
+    session_factory: Callable[[], Session],
+) -> Callable[[], SqlAlchemyUnitOfWork]:
+    return lambda: SqlAlchemyUnitOfWork(session_factory)
+
+
+@pytest.fixture
+def sql_budget(engine: Engine) -> Callable[..., AbstractContextManager[SqlStats]]:
+    """``with sql_budget(3, max_repeats=1) as stats:`` around the code under test.
+
+    Counts statements on the instrumented test engine via ``track_sql``.
+    """
+    return assert_sql_budget
+
+
+@pytest.fixture
+def session(session_factory: Callable[[], Session]) -> Iterator[Session]:
+    with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+def owner_id(session: Session) -> int:
+    row = db_models.User(email="owner@example.com", hashed_password="x")
+    session.add(row)
+    session.commit()
+    assert row.id is not None
+    return row.id
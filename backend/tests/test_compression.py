@@ -0,0 +1,136 @@
+import gzip
+
+import brotli
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.middleware import CompressionMiddleware
+
+pytestmark = pytest.mark.anyio
+
+_ITEMS = [{"id": i, "text": f"Question {i}?"} for i in range(200)]
+
+
+async def _json(request: Request) -> Response:
+    return JSONResponse(_ITEMS, headers={"ETag": '"t1-r3"'})
+
+
+async def _small(request: Request) -> Response:
+    return JSONResponse({"ok": True})
+
+
+async def _download(request: Request) -> Response:
+    return Response(
+        b"%PDF-" + b"x" * 5000,
+        media_type="text/plain",
+        headers={"Accept-Ranges": "bytes", "ETag": '"abc"'},
+    )
+
+
+async def _events(request: Request) -> Response:
+    async def stream():
+        yield b"data: " + b"x" * 2000 + b"\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+async def _streamed(request: Request) -> Response:
+    async def stream():
+        for _ in range(5):
+            yield b"line of text\n" * 200
+
+    return StreamingResponse(stream(), media_type="text/plain")
+
+
+_app = CompressionMiddleware(
+    Starlette(
+        routes=[
+            Route("/json", _json),
+            Route("/small", _small),
+            Route("/download", _download),
+            Route("/events", _events),
+            Route("/streamed", _streamed),
+        ]
+    ),
+    minimum_size=1024,
+)
+
+
+async def _get(path: str, accept_encoding: str) -> httpx.Response:
+    transport = httpx.ASGITransport(app=_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        response = await client.get(path, headers={"Accept-Encoding": accept_encoding})
+        await response.aread()
+        return response
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip", "gzip"),
+        ("br;q=0, gzip;q=0.5", "gzip"),
+        ("identity", None),
+        ("br;q=0, gzip;q=0", None),
+        ("", None),
+    ],
+)
+async def test_negotiates_encoding(accept_encoding: str, expected: str | None) -> None:
+    response = await _get("/json", accept_encoding)
+
+    assert response.headers.get("content-encoding") == expected
+    assert response.json() == _ITEMS  # httpx decodes br and gzip
+    if expected is not None:
+        assert "Accept-Encoding" in response.headers["vary"]
+
+
+async def test_compressed_body_and_length() -> None:
+    transport = httpx.ASGITransport(app=_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        async with client.stream(
+            "GET", "/json", headers={"Accept-Encoding": "gzip"}
+        ) as response:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+
+    assert int(response.headers["content-length"]) == len(raw)
+    assert gzip.decompress(raw) == JSONResponse(_ITEMS).body
+    assert response.headers["etag"] == 'W/"t1-r3"'
+
+
+async def test_small_bodies_are_not_compressed() -> None:
+    response = await _get("/small", "br")
+
+    assert "content-encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["vary"]
+
+
+async def test_downloads_and_event_streams_pass_through() -> None:
+    download = await _get("/download", "br, gzip")
+    events = await _get("/events", "br, gzip")
+
+    assert "content-encoding" not in download.headers
+    assert download.headers["etag"] == '"abc"'
+    assert download.headers["content-length"] == "5005"
+    assert "content-encoding" not in events.headers
+
+
+async def test_streamed_bodies_are_compressed_incrementally() -> None:
+    transport = httpx.ASGITransport(app=_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        async with client.stream(
+            "GET", "/streamed", headers={"Accept-Encoding": "br"}
+        ) as response:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+
+    assert response.headers["content-encoding"] == "br"
+    assert "content-length" not in response.headers
+    assert brotli.decompress(raw) == b"line of text\n" * 1000
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+from sqlmodel import Session, select
+
+from app.application.services import HousekeepingService
+from app.db import models as db_models
+
+
+def _job(
+    owner_id: int,
+    job_type: db_models.JobType,
+    status: db_models.JobStatus,
+    *,
+    age: timedelta,
+    test_id: int | None = None,
+) -> db_models.Job:
+    updated_at = datetime.utcnow() - age
+    return db_models.Job(
+        owner_id=owner_id,
+        job_type=job_type,
+        status=status,
+        test_id=test_id,
+        created_at=updated_at,
+        updated_at=updated_at,
+    )
+
+
+def test_purge_keeps_running_recent_and_test_generation_jobs(
+    session: Session, owner_id: int, uow_factory
+) -> None:
+    test = db_models.Test(owner_id=owner_id)
+    session.add(test)
+    session.flush()
+    old = timedelta(days=60)
+    jobs = {
+        "old_export": _job(
+            owner_id, db_models.JobType.pdf_export, db_models.JobStatus.done, age=old
+        ),
+        "old_failed": _job(
+            owner_id,
+            db_models.JobType.test_generation,
+            db_models.JobStatus.failed,
+            age=old,
+        ),
+        "old_running": _job(
+            owner_id, db_models.JobType.pdf_export, db_models.JobStatus.running, age=old
+        ),
+        "recent": _job(
+            owner_id,
+            db_models.JobType.pdf_export,
+            db_models.JobStatus.done,
+            age=timedelta(days=1),
+        ),
+        "generation": _job(
+            owner_id,
+            db_models.JobType.test_generation,
+            db_models.JobStatus.done,
+            age=old,
+            test_id=test.id,
+        ),
+    }
+    session.add_all(jobs.values())
+    session.commit()
+    ids = {name: job.id for name, job in jobs.items()}
+
+    service = HousekeepingService(uow_factory, batch_size=1)
+    result = service.purge_finished_jobs(older_than=timedelta(days=30))
+
+    assert result.rows == 2
+    assert result.complete
+    remaining = set(session.exec(select(db_models.Job.id)).all())
+    assert remaining == {ids["old_running"], ids["recent"], ids["generation"]}
+    with uow_factory() as uow:
+        generation = uow.jobs.get_generation_job_by_test_id(test.id)
+    assert generation is not None
+    assert generation.id == ids["generation"]
+
+
+def test_purge_removes_generation_jobs_of_deleted_tests(
+    session: Session, owner_id: int, uow_factory
+) -> None:
+    test = db_models.Test(owner_id=owner_id)
+    session.add(test)
+    session.flush()
+    job = _job(
+        owner_id,
+        db_models.JobType.test_generation,
+        db_models.JobStatus.done,
+        age=timedelta(days=60),
+        test_id=test.id,
+    )
+    session.add(job)
+    session.commit()
+    session.delete(test)
+    session.commit()
+
+    result = HousekeepingService(uow_factory).purge_finished_jobs(
+        older_than=timedelta(days=30)
+    )
+
+    assert result.rows == 1
+    assert session.exec(select(db_models.Job)).all() == []
@@ -0,0 +1,117 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+
+from app.application.services import JobService
+from app.application.services.job_service import job_event
+from app.domain.models import Job
+from app.domain.models.enums import JobStatus, JobType
+
+pytestmark = pytest.mark.anyio
+
+OWNER_ID = 1
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+class _Subscription:
+    closed = True  # end the stream after the catch-up
+
+
+class _Bus:
+    def publish(self, owner_id: int, event: dict[str, Any]) -> None:
+        pass
+
+    @asynccontextmanager
+    async def subscribe(self, owner_id: int) -> AsyncIterator[_Subscription]:
+        yield _Subscription()
+
+
+class _Jobs:
+    def __init__(self, jobs: list[Job]) -> None:
+        self.jobs = jobs
+        self.reads = 0
+
+    async def list_updated_since(
+        self, owner_id: int, since: datetime, *, limit: int
+    ) -> list[Job]:
+        self.reads += 1
+        newer = [job for job in self.jobs if job.updated_at and job.updated_at > since]
+        return sorted(newer, key=lambda job: job.updated_at or since)[:limit]
+
+
+class _UnitOfWork:
+    def __init__(self, jobs: _Jobs) -> None:
+        self.jobs = jobs
+
+    async def __aenter__(self) -> "_UnitOfWork":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        pass
+
+
+def _jobs(count: int, *, newest: datetime) -> list[Job]:
+    return [
+        Job(
+            id=index + 1,
+            owner_id=OWNER_ID,
+            job_type=JobType.PDF_EXPORT,
+            status=JobStatus.DONE,
+            created_at=newest - timedelta(milliseconds=index + 1),
+            updated_at=newest - timedelta(milliseconds=index + 1),
+        )
+        for index in range(count)
+    ]
+
+
+async def _stream(jobs: _Jobs, last_event_id: str | None) -> list[dict[str, Any]]:
+    service = JobService(
+        lambda: None,  # type: ignore[arg-type, return-value]
+        async_uow_factory=lambda owner_id: _UnitOfWork(jobs),  # type: ignore[arg-type, return-value]
+        event_bus=_Bus(),  # type: ignore[arg-type]
+    )
+    events = service.stream_job_events(
+        owner_id=OWNER_ID,
+        last_event_id=last_event_id,
+        heartbeat_seconds=1,
+        max_seconds=1,
+        replay=timedelta(minutes=5),
+    )
+    return [event async for event in events if event is not None]
+
+
+async def test_resume_replays_changes_after_last_event_id() -> None:
+    now = datetime.utcnow()
+    jobs = _Jobs(_jobs(3, newest=now))
+    last_seen = jobs.jobs[-1]  # the oldest
+
+    events = await _stream(jobs, job_event(last_seen)["id"])
+
+    # the overlap re-sends the last seen job too
+    assert [event["job"]["id"] for event in events] == [3, 2, 1]
+
+
+async def test_last_event_id_older_than_replay_window_resyncs() -> None:
+    jobs = _Jobs(_jobs(3, newest=datetime.utcnow()))
+    stale = job_event(_jobs(1, newest=datetime.utcnow() - timedelta(days=30))[0])
+
+    events = await _stream(jobs, stale["id"])
+
+    assert [event.get("resync") for event in events] == [True]
+    assert jobs.reads == 0
+
+
+async def test_large_catch_up_is_capped_with_a_resync() -> None:
+    jobs = _Jobs(_jobs(5000, newest=datetime.utcnow()))
+
+    events = await _stream(jobs, None)
+
+    assert [event.get("resync") for event in events] == [True]
+    assert jobs.reads == 5  # pages of 200 up to the cap
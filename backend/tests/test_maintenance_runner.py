@@ -0,0 +1,122 @@
+from pathlib import Path
+
+import pytest
+
+from app.infrastructure.maintenance import (
+    Checkpoint,
+    MaintenanceRunner,
+    MaintenanceStats,
+    MaintenanceTask,
+)
+
+
+class _Table:
+    """Candidates ``(key, owner_id)`` with keys 1..size; records processing."""
+
+    def __init__(self, size: int, *, failing: set[int] | None = None) -> None:
+        self.keys = list(range(1, size + 1))
+        self.failing = failing or set()
+        self.processed: list[int] = []
+
+    def fetch_page(self, after_key: int, limit: int) -> list[tuple[int, int]]:
+        return [(key, 100 + key) for key in self.keys if key > after_key][:limit]
+
+    def process(self, owner_id: int, key: int) -> bool:
+        assert owner_id == 100 + key
+        if key in self.failing:
+            raise RuntimeError("storage unavailable")
+        self.processed.append(key)
+        return True
+
+    def count(self, after_key: int) -> int:
+        return sum(1 for key in self.keys if key > after_key)
+
+    def task(self) -> MaintenanceTask:
+        return MaintenanceTask("test", self.fetch_page, self.process, count=self.count)
+
+
+def _runner(table: _Table, checkpoint: Checkpoint, **kwargs) -> MaintenanceRunner:
+    return MaintenanceRunner(
+        table.task(), page_size=3, checkpoint=checkpoint, out=lambda _: None, **kwargs
+    )
+
+
+@pytest.fixture
+def checkpoint(tmp_path: Path) -> Checkpoint:
+    return Checkpoint(tmp_path / "test.json")
+
+
+def test_clean_run_clears_the_checkpoint(checkpoint: Checkpoint) -> None:
+    table = _Table(10)
+
+    stats = _runner(table, checkpoint).run()
+
+    assert stats.processed == 10
+    assert not checkpoint.path.exists()
+    # rows changed since are picked up by the next run
+    _runner(table, checkpoint).run()
+    assert sorted(table.processed) == sorted(table.keys * 2)
+
+
+def test_failed_keys_are_retried_by_the_next_run(checkpoint: Checkpoint) -> None:
+    table = _Table(10, failing={4, 7})
+
+    stats = _runner(table, checkpoint).run()
+
+    assert (stats.processed, stats.failed) == (8, 2)
+    last_key, _, retry = checkpoint.load()
+    assert last_key == 10
+    assert retry == {4: 104, 7: 107}
+
+    table.failing = {7}
+    table.processed.clear()
+    stats = _runner(table, checkpoint).run()
+
+    assert table.processed == [4]
+    assert (stats.processed, stats.failed, stats.failed_keys) == (9, 1, [7])
+    assert checkpoint.load()[2] == {7: 107}
+
+    table.failing.clear()
+    _runner(table, checkpoint).run()
+    assert not checkpoint.path.exists()
+
+
+def test_limited_run_resumes_after_the_watermark(checkpoint: Checkpoint) -> None:
+    table = _Table(10)
+
+    _runner(table, checkpoint, limit=4).run()
+
+    assert checkpoint.load()[0] == 4
+    _runner(table, checkpoint).run()
+    assert sorted(table.processed) == table.keys
+    assert not checkpoint.path.exists()
+
+
+def test_preview_starts_from_the_checkpoint(checkpoint: Checkpoint) -> None:
+    table = _Table(10)
+    checkpoint.save(6, MaintenanceStats(failed=1, failed_keys=[2]), {2: 102})
+
+    candidates, total = _runner(table, checkpoint).preview()
+
+    assert [key for key, _ in candidates] == [2, 7, 8, 9, 10]
+    assert total == 5
+    assert table.processed == []
+    assert checkpoint.load()[0] == 6
+
+
+def test_failed_key_above_the_watermark_runs_once(checkpoint: Checkpoint) -> None:
+    # interrupted run: 5 failed while 3 was still in flight
+    table = _Table(10)
+    checkpoint.save(
+        2, MaintenanceStats(processed=1, failed=1, failed_keys=[5]), {5: 105}
+    )
+
+    candidates, total = _runner(table, checkpoint).preview()
+    assert [key for key, _ in candidates] == [5, 3, 4, 6, 7, 8, 9, 10]
+    assert total == 8
+
+    stats = _runner(table, checkpoint).run()
+
+    assert sorted(table.processed) == [3, 4, 5, 6, 7, 8, 9, 10]
+    assert (stats.processed, stats.failed, stats.failed_keys) == (9, 0, [])
+    assert not checkpoint.path.exists()
@@ -0,0 +1,90 @@
+from typing import Any
+
+from sqlmodel import Session, select
+
+from app.application.services import MaterialService
+from app.db import models as db_models
+
+
+class _RecordingStorage:
+    def __init__(self) -> None:
+        self.deleted: list[str] = []
+
+    def delete(self, *, stored_path: str) -> None:
+        self.deleted.append(stored_path)
+
+
+def _thumbnails(prefix: str) -> dict[str, dict[str, Any]]:
+    return {
+        size: {"path": f"{prefix}_{size}.webp", "width": 1, "height": 1}
+        for size in ("card", "small")
+    }
+
+
+def _material(
+    session: Session, owner_id: int, name: str, *, checksum: str | None
+) -> db_models.Material:
+    file = db_models.File(owner_id=owner_id, filename=name, filepath=f"{name}.pdf")
+    session.add(file)
+    session.flush()
+    assert file.id is not None
+    material = db_models.Material(
+        owner_id=owner_id,
+        file_id=file.id,
+        checksum=checksum,
+        thumbnail_path=f"{name}_card.jpg",
+        thumbnails=_thumbnails(name),
+    )
+    session.add(material)
+    session.commit()
+    return material
+
+
+def _service(uow_factory, storage: _RecordingStorage) -> MaterialService:
+    return MaterialService(
+        uow_factory,
+        storage=storage,  # type: ignore[arg-type]
+        text_extractor=lambda path, mime: "",
+    )
+
+
+def test_delete_material_removes_its_thumbnails(
+    session: Session, owner_id: int, uow_factory
+) -> None:
+    material = _material(session, owner_id, "a", checksum=None)
+    storage = _RecordingStorage()
+
+    _service(uow_factory, storage).delete_material(
+        owner_id=owner_id, material_id=material.id or 0
+    )
+
+    assert sorted(storage.deleted) == [
+        "a.pdf",
+        "a_card.jpg",
+        "a_card.webp",
+        "a_small.webp",
+    ]
+
+
+def test_delete_duplicates_removes_thumbnails_of_every_copy(
+    session: Session, owner_id: int, uow_factory
+) -> None:
+    first = _material(session, owner_id, "a", checksum="abc")
+    _material(session, owner_id, "b", checksum="abc")
+    storage = _RecordingStorage()
+
+    _service(uow_factory, storage).delete_material(
+        owner_id=owner_id, material_id=first.id or 0
+    )
+
+    assert sorted(storage.deleted) == [
+        "a.pdf",
+        "a_card.jpg",
+        "a_card.webp",
+        "a_small.webp",
+        "b.pdf",
+        "b_card.jpg",
+        "b_card.webp",
+        "b_small.webp",
+    ]
+    assert session.exec(select(db_models.Material)).all() == []
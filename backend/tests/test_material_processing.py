@@ -0,0 +1,58 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+from sqlmodel import Session
+
+from app.application.services import MaterialService
+from app.application.services import material_service as material_module
+from app.db import models as db_models
+
+
+class _LocalStorage:
+    def __init__(self, path: Path) -> None:
+        self._path = path
+
+    @contextmanager
+    def download_to_temp(self, *, stored_path: str) -> Iterator[Path]:
+        yield self._path
+
+
+def test_failed_thumbnail_does_not_fail_the_material(
+    session: Session,
+    owner_id: int,
+    uow_factory,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def broken_thumbnail(*args, **kwargs):
+        raise OSError("storage unavailable")
+
+    monkeypatch.setattr(material_module, "can_generate_thumbnail", lambda *a: True)
+    monkeypatch.setattr(
+        material_module, "generate_and_save_thumbnail", broken_thumbnail
+    )
+    local = tmp_path / "notes.txt"
+    local.write_text("Photosynthesis turns light into chemical energy.")
+    file = db_models.File(owner_id=owner_id, filename="notes.txt", filepath="notes.txt")
+    session.add(file)
+    session.flush()
+    assert file.id is not None
+    material = db_models.Material(owner_id=owner_id, file_id=file.id)
+    session.add(material)
+    session.commit()
+    stages: list[dict[str, str]] = []
+    service = MaterialService(
+        uow_factory,
+        storage=_LocalStorage(local),  # type: ignore[arg-type]
+        text_extractor=lambda path, mime: path.read_text(),
+    )
+
+    result = service.process_material(
+        owner_id=owner_id, material_id=material.id or 0, on_progress=stages.append
+    )
+
+    assert (result.processing_status, result.processing_error) == ("done", None)
+    assert stages[-1]["thumbnail"] == "failed"
+    assert stages[-1]["analysis"] == "done"
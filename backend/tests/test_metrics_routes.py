@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.dependencies import get_app_container
+from app.api.routers import metrics
+
+pytestmark = pytest.mark.anyio
+
+
+class _Cache:
+    def stats(self) -> dict[str, int]:
+        return {"hits": 3}
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(metrics.router)
+    container = SimpleNamespace(provide_test_detail_cache=_Cache)
+    app.dependency_overrides[get_app_container] = lambda: container
+    return app
+
+
+async def _get(path: str, headers: dict[str, str] | None = None) -> httpx.Response:
+    transport = httpx.ASGITransport(app=_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        return await client.get(path, headers=headers)
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+def token(monkeypatch: pytest.MonkeyPatch) -> str:
+    monkeypatch.setattr(
+        metrics, "get_settings", lambda: SimpleNamespace(METRICS_TOKEN="s3cret")
+    )
+    return "s3cret"
+
+
+async def test_metrics_are_hidden_without_a_configured_token(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        metrics, "get_settings", lambda: SimpleNamespace(METRICS_TOKEN=None)
+    )
+
+    response = await _get("/metrics/cache", {"Authorization": "Bearer "})
+
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("path", ["/metrics/cache", "/metrics/password-hashing"])
+@pytest.mark.parametrize("authorization", [None, "Bearer wrong", "Basic s3cret"])
+async def test_metrics_require_the_token(
+    token: str, path: str, authorization: str | None
+) -> None:
+    headers = {"Authorization": authorization} if authorization else None
+
+    response = await _get(path, headers)
+
+    assert response.status_code == 401
+
+
+async def test_metrics_with_the_token(token: str) -> None:
+    response = await _get("/metrics/cache", {"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.json() == {"test_detail": {"hits": 3}}
@@ -0,0 +1,100 @@
+from collections.abc import Sequence
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text, update
+from sqlmodel import Session, func, select
+
+from app.application.services import OutboxDispatcher
+from app.db import models as db_models
+from app.domain import models as domain
+from app.domain.events import AnalyticsEvent
+from app.domain.models import OutboxMessage
+
+
+def _event(name: str = "test_viewed") -> AnalyticsEvent:
+    return AnalyticsEvent.create(user_id=1, event=name, properties={"test_id": 7})
+
+
+def _count(session: Session, model: type) -> int:
+    return session.exec(select(func.count()).select_from(model)).one()
+
+
+def test_event_is_stored_with_the_committed_change(
+    session: Session, owner_id: int, uow_factory
+) -> None:
+    event = _event()
+    with uow_factory() as uow:
+        uow.tests.create(domain.Test(id=None, owner_id=owner_id, title="Biology"))
+        uow.outbox.add(event)
+
+    assert _count(session, db_models.Test) == 1
+    with uow_factory() as uow:
+        (message,) = uow.outbox.claim_pending(limit=10)
+    assert message.event == event
+    assert message.attempts == 0
+
+
+def test_rolled_back_unit_of_work_writes_no_events(
+    session: Session, owner_id: int, uow_factory
+) -> None:
+    with pytest.raises(RuntimeError), uow_factory() as uow:
+        uow.tests.create(domain.Test(id=None, owner_id=owner_id, title="Biology"))
+        uow.outbox.add(_event())
+        raise RuntimeError("request failed")
+
+    assert _count(session, db_models.Test) == 0
+    assert _count(session, db_models.OutboxEvent) == 0
+
+
+def test_concurrent_claims_skip_locked_events(uow_factory) -> None:
+    with uow_factory() as uow:
+        for index in range(4):
+            uow.outbox.add(_event(f"event_{index}"))
+
+    with uow_factory() as first, uow_factory() as second:
+        # without SKIP LOCKED the second claim would wait for the first one
+        assert second.session is not None
+        second.session.execute(text("SET LOCAL lock_timeout = '2s'"))
+        claimed_first = first.outbox.claim_pending(limit=2)
+        claimed_second = second.outbox.claim_pending(limit=10)
+
+    first_ids = {message.id for message in claimed_first}
+    second_ids = {message.id for message in claimed_second}
+    assert len(first_ids) == 2
+    assert len(second_ids) == 2
+    assert first_ids.isdisjoint(second_ids)
+
+
+def test_failed_delivery_is_retried_after_backoff(
+    session: Session, uow_factory
+) -> None:
+    with uow_factory() as uow:
+        uow.outbox.add(_event())
+    delivered: list[OutboxMessage] = []
+
+    def unavailable(messages: Sequence[OutboxMessage]) -> None:
+        raise ConnectionError("sink unavailable")
+
+    failing = OutboxDispatcher(uow_factory, handlers={AnalyticsEvent: [unavailable]})
+    working = OutboxDispatcher(
+        uow_factory, handlers={AnalyticsEvent: [delivered.extend]}
+    )
+
+    assert failing.dispatch().retried == 1
+    row = session.exec(select(db_models.OutboxEvent)).one()
+    assert (row.attempts, row.processed_at) == (1, None)
+    assert row.last_error == "ConnectionError: sink unavailable"
+    assert working.dispatch().delivered == 0  # backing off
+
+    session.execute(
+        update(db_models.OutboxEvent).values(available_at=datetime.utcnow())
+    )
+    session.commit()
+
+    assert working.dispatch().delivered == 1
+    (message,) = delivered
+    assert isinstance(message.event, AnalyticsEvent)
+    assert message.event.event == "test_viewed"
+    session.refresh(row)
+    assert row.processed_at is not None
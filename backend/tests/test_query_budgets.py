@@ -0,0 +1,81 @@
+from sqlmodel import Session, select
+
+from app.db import models as db_models
+from app.domain import models as domain
+
+
+def _seed_test(session: Session, owner_id: int, *, groups: int, per_group: int):
+    test = db_models.Test(owner_id=owner_id, title="Biology")
+    session.add(test)
+    session.flush()
+    assert test.id is not None
+    group_ids = []
+    for index in range(groups):
+        group = db_models.QuestionGroup(test_id=test.id, label=f"G{index}")
+        session.add(group)
+        session.flush()
+        assert group.id is not None
+        group_ids.append(group.id)
+        for position in range(per_group):
+            session.add(
+                db_models.Question(
+                    test_id=test.id,
+                    group_id=group.id,
+                    position=position,
+                    text=f"Question {position}?",
+                    choices=["a", "b"],
+                    correct_choices=["a"],
+                )
+            )
+    session.commit()
+    return test.id, group_ids
+
+
+def _question(index: int) -> domain.Question:
+    return domain.Question(
+        id=None,
+        text=f"New question {index}?",
+        is_closed=True,
+        difficulty=domain.QuestionDifficulty.MEDIUM,
+        choices=["yes", "no"],
+        correct_choices=["yes"],
+    )
+
+
+def test_bulk_add_questions_is_one_insert(
+    sql_budget, session: Session, owner_id: int, uow_factory
+) -> None:
+    test_id, (group_id,) = _seed_test(session, owner_id, groups=1, per_group=3)
+
+    with uow_factory() as uow:
+        # the INSERT, the owner lookup and the user_stats UPSERT
+        with sql_budget(3, max_repeats=1) as stats:
+            added = uow.tests.bulk_add_questions(
+                test_id, [_question(i) for i in range(50)], group_id
+            )
+
+    inserts = [
+        shape for shape in stats.shapes if shape.startswith("INSERT INTO question ")
+    ]
+    assert len(inserts) == 1
+    assert len(added) == 50
+    positions = session.exec(
+        select(db_models.Question.position)
+        .where(db_models.Question.group_id == group_id)
+        .order_by(db_models.Question.position)
+    ).all()
+    assert positions == list(range(53))
+
+
+def test_detail_projection_is_one_statement(
+    sql_budget, session: Session, owner_id: int, uow_factory
+) -> None:
+    test_id, _ = _seed_test(session, owner_id, groups=3, per_group=40)
+
+    with uow_factory() as uow:
+        with sql_budget(1):
+            projection = uow.tests.get_detail_projection(test_id)
+
+    assert projection is not None
+    assert len(projection.groups) == 3
+    assert len(projection.questions) == 120
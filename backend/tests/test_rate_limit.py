@@ -0,0 +1,73 @@
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.util import get_remote_address
+
+from app.middleware import RateLimitMiddleware
+
+pytestmark = pytest.mark.anyio
+
+
+def _app(*, headers_enabled: bool = False) -> FastAPI:
+    limiter = Limiter(
+        key_func=get_remote_address,
+        storage_uri="memory://",
+        default_limits=["2/minute"],
+        headers_enabled=headers_enabled,
+    )
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+    app.add_middleware(RateLimitMiddleware)
+
+    @app.get("/items")
+    def items() -> dict[str, bool]:
+        return {"ok": True}
+
+    @app.get("/limited")
+    @limiter.limit("5/minute")
+    def limited(request: Request) -> dict[str, bool]:
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream() -> StreamingResponse:
+        return StreamingResponse(
+            iter([b"data: 1\n\n", b"data: 2\n\n"]), media_type="text/event-stream"
+        )
+
+    return app
+
+
+async def _get(app: FastAPI, path: str, times: int) -> list[httpx.Response]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        return [await client.get(path) for _ in range(times)]
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+async def test_default_limit_applies_to_undecorated_routes() -> None:
+    responses = await _get(_app(), "/items", 3)
+
+    assert [r.status_code for r in responses] == [200, 200, 429]
+
+
+async def test_decorated_route_is_left_to_its_own_limit() -> None:
+    responses = await _get(_app(), "/limited", 3)
+
+    assert [r.status_code for r in responses] == [200, 200, 200]
+
+
+async def test_streamed_response_passes_with_headers() -> None:
+    (response,) = await _get(_app(headers_enabled=True), "/stream", 1)
+
+    assert response.status_code == 200
+    assert response.text == "data: 1\n\ndata: 2\n\n"
+    assert response.headers["X-RateLimit-Limit"] == "2"
+    assert response.headers["X-RateLimit-Remaining"] == "1"
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+from sentry_sdk.types import Event
+
+from app.core.monitoring import SamplingPolicy
+
+_STARTED = datetime(2024, 5, 1, 12, 0)
+
+
+@pytest.fixture
+def policy() -> SamplingPolicy:
+    return SamplingPolicy(
+        default_rate=0.0,
+        rates={"/tests/generate": 1.0},
+        polling=["/jobs/{job_id}"],
+        polling_rate=0.25,
+        slow_ms=2000.0,
+    )
+
+
+def _request(path: str, parent_sampled: bool | None = None) -> dict[str, Any]:
+    return {
+        "parent_sampled": parent_sampled,
+        "asgi_scope": {"type": "http", "path": path},
+        "transaction_context": {"name": path, "op": "http.server"},
+    }
+
+
+def _transaction(
+    name: str,
+    *,
+    duration: float = 0.1,
+    status: str = "ok",
+    op: str = "http.server",
+    **trace: Any,
+) -> Event:
+    return {
+        "type": "transaction",
+        "transaction": name,
+        "start_timestamp": _STARTED,
+        "timestamp": _STARTED + timedelta(seconds=duration),
+        "contexts": {"trace": {"op": op, "status": status, **trace}},
+    }
+
+
+def _sampled_parent() -> dict[str, Any]:
+    return {
+        "parent_span_id": "b0e6f15b45c36b12",
+        "dynamic_sampling_context": {"sampled": "true", "sample_rate": "0.1"},
+    }
+
+
+def test_sampler_follows_the_parent_decision(policy: SamplingPolicy) -> None:
+    assert policy.traces_sampler(_request("/jobs/7", parent_sampled=True)) == 1.0
+    assert policy.traces_sampler(_request("/materials", parent_sampled=False)) == 0.0
+    assert policy.traces_sampler(_request("/jobs/7", parent_sampled=False)) == 0.0
+
+
+def test_sampler_samples_polling_up_front(policy: SamplingPolicy) -> None:
+    assert policy.traces_sampler(_request("/jobs/7")) == 0.25
+    assert policy.traces_sampler(_request("/materials")) == 1.0
+    task = {"parent_sampled": None, "celery_job": {"task": "app.tasks.x"}}
+    assert policy.traces_sampler(task) == 1.0
+
+
+def test_failed_and_slow_requests_are_kept(policy: SamplingPolicy) -> None:
+    failed = _transaction("/materials", status="internal_error")
+    slow = _transaction("/materials", duration=2.5)
+    assert policy.before_send_transaction(failed, {}) is failed
+    assert policy.before_send_transaction(slow, {}) is slow
+
+
+def test_rest_is_kept_at_the_route_rate(policy: SamplingPolicy) -> None:
+    assert policy.before_send_transaction(_transaction("/materials"), {}) is None
+    kept = _transaction("/tests/generate")
+    assert policy.before_send_transaction(kept, {}) is kept
+    polled = _transaction("/jobs/{job_id}")
+    assert policy.before_send_transaction(polled, {}) is polled
+
+
+def test_request_with_a_sampled_parent_is_kept(policy: SamplingPolicy) -> None:
+    event = _transaction("/materials", **_sampled_parent())
+    assert policy.before_send_transaction(event, {}) is event
+
+
+def test_task_is_decided_at_its_own_rate(policy: SamplingPolicy) -> None:
+    # tasks always have a sampled parent: the request that queued them
+    event = _transaction("app.tasks.x", op="queue.task.celery", **_sampled_parent())
+    assert policy.before_send_transaction(event, {}) is None
+
+
+def test_new_trace_is_not_a_sampled_parent(policy: SamplingPolicy) -> None:
+    event = _transaction("/materials", dynamic_sampling_context={"sampled": "true"})
+    assert policy.before_send_transaction(event, {}) is None
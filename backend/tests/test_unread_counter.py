@@ -0,0 +1,70 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sqlmodel import Session
+
+from app.application.interfaces import UnitOfWork
+from app.application.services import NotificationService
+from app.db import models as db_models
+
+
+class _MemoryCounter:
+    """UnreadCounter keeping ``unread - broadcasts`` per user, like Redis."""
+
+    def __init__(self) -> None:
+        self.broadcasts: int | None = None
+        self.users: dict[int, int] = {}
+
+    def get(self, user_id: int) -> int | None:
+        if self.broadcasts is None or user_id not in self.users:
+            return None
+        return self.broadcasts + self.users[user_id]
+
+    def prime(self, user_id: int, unread: int, broadcasts: int) -> None:
+        if self.broadcasts is None:
+            self.broadcasts = broadcasts
+        if self.broadcasts == broadcasts:
+            self.users[user_id] = unread - broadcasts
+
+    def incr_broadcast(self) -> None:
+        if self.broadcasts is not None:
+            self.broadcasts += 1
+
+    def invalidate(self, user_id: int) -> None:
+        self.users.pop(user_id, None)
+
+    def current_broadcasts(self) -> int | None:
+        return self.broadcasts
+
+    def reset(self) -> None:
+        self.broadcasts = None
+        self.users.clear()
+
+
+def test_read_drops_a_count_primed_after_its_commit(
+    session: Session, owner_id: int, uow_factory
+) -> None:
+    notifications = [
+        db_models.SystemNotification(title="t", message="m", recipient_id=owner_id)
+        for _ in range(2)
+    ]
+    session.add_all(notifications)
+    session.commit()
+    counter = _MemoryCounter()
+    reader = NotificationService(uow_factory, unread_counter=counter)
+
+    @contextmanager
+    def prime_after_commit() -> Iterator[UnitOfWork]:
+        # another request reads the count between the commit and the cache update
+        with uow_factory() as uow:
+            yield uow
+        assert reader.get_unread_count(owner_id).count == 1
+
+    service = NotificationService(
+        prime_after_commit,  # type: ignore[arg-type]
+        unread_counter=counter,
+        read_uow_factory=lambda _: uow_factory(),
+    )
+    service.mark_as_read(owner_id, notifications[0].id or 0)
+
+    assert service.get_unread_count(owner_id).count == 1
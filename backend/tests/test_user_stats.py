@@ -0,0 +1,154 @@
+import dataclasses
+import threading
+import time
+
+from sqlmodel import Session
+
+from app.api.schemas.tests import (
+    BulkDeleteQuestionsRequest,
+    BulkUpdateQuestionsRequest,
+    QuestionCreate,
+    QuestionUpdate,
+)
+from app.application import services
+from app.db import models as db_models
+from app.domain.models import UserStats
+
+
+def test_rebuild_counts_questions_by_kind(
+    session: Session, owner_id: int, uow_factory
+) -> None:
+    test = db_models.Test(owner_id=owner_id)
+    session.add(test)
+    session.flush()
+    group = db_models.QuestionGroup(test_id=test.id, label="A")
+    session.add(group)
+    session.flush()
+    for is_closed, difficulty in [(True, 1), (True, 2), (False, 3)]:
+        session.add(
+            db_models.Question(
+                test_id=test.id,
+                group_id=group.id,
+                text="?",
+                is_closed=is_closed,
+                difficulty=difficulty,
+            )
+        )
+    session.commit()
+
+    with uow_factory() as uow:
+        stats = uow.user_stats.rebuild(owner_id)
+
+    assert stats.total_tests == 1
+    assert stats.total_questions == 3
+    assert (stats.closed_questions, stats.open_questions) == (2, 1)
+    assert (stats.easy_questions, stats.medium_questions, stats.hard_questions) == (
+        1,
+        1,
+        1,
+    )
+    with uow_factory() as uow:
+        assert uow.user_stats.get(owner_id) == stats
+
+
+def test_rebuild_races_with_a_concurrent_first_read(owner_id: int, uow_factory) -> None:
+    results: list[UserStats] = []
+    with uow_factory() as first:
+        first.user_stats.rebuild(owner_id)  # inserted, not yet committed
+        with uow_factory() as second:
+            # blocks on first's row lock, then must update instead of failing
+            racer = threading.Thread(
+                target=lambda: results.append(second.user_stats.rebuild(owner_id))
+            )
+            racer.start()
+            time.sleep(0.2)
+            first.commit()
+            racer.join(timeout=5)
+
+    assert len(results) == 1
+    assert results[0].user_id == owner_id
+
+
+def _counters(stats: UserStats | None) -> dict[str, object]:
+    assert stats is not None
+    return {
+        name: value
+        for name, value in dataclasses.asdict(stats).items()
+        if name != "updated_at"
+    }
+
+
+def _assert_matches_rebuild(uow_factory, owner_id: int) -> None:
+    with uow_factory() as uow:
+        maintained = _counters(uow.user_stats.get(owner_id))
+    with uow_factory() as uow:
+        assert maintained == _counters(uow.user_stats.rebuild(owner_id))
+
+
+def test_counters_maintained_on_writes_match_a_rebuild(
+    owner_id: int, uow_factory
+) -> None:
+    service = services.TestService(
+        uow_factory,
+        question_generator_fast=None,  # type: ignore[arg-type]
+        question_generator_reasoning=None,  # type: ignore[arg-type]
+        storage=None,  # type: ignore[arg-type]
+    )
+    test_id = service.create_empty_test(owner_id=owner_id, title="T").id
+    with uow_factory() as uow:
+        group_id = uow.tests.get_groups_for_test(test_id)[0].id
+    _assert_matches_rebuild(uow_factory, owner_id)
+
+    ids = [
+        service.add_question(
+            owner_id=owner_id,
+            test_id=test_id,
+            payload=QuestionCreate(
+                text=f"Q{i}?",
+                is_closed=is_closed,
+                difficulty=difficulty,
+                group_id=group_id,
+                choices=["a", "b"] if is_closed else None,
+                correct_choices=["a"] if is_closed else None,
+            ),
+        ).id
+        for i, (is_closed, difficulty) in enumerate(
+            [(True, 1), (True, 2), (False, 3), (False, 1)]
+        )
+    ]
+    _assert_matches_rebuild(uow_factory, owner_id)
+
+    service.update_question(
+        owner_id=owner_id,
+        test_id=test_id,
+        question_id=ids[0],
+        payload=QuestionUpdate(is_closed=False, difficulty=3),
+    )
+    _assert_matches_rebuild(uow_factory, owner_id)
+
+    service.bulk_update_questions(
+        owner_id=owner_id,
+        test_id=test_id,
+        payload=BulkUpdateQuestionsRequest(question_ids=ids[1:3], difficulty=2),
+    )
+    _assert_matches_rebuild(uow_factory, owner_id)
+
+    service.duplicate_group(owner_id=owner_id, test_id=test_id, group_id=group_id)
+    _assert_matches_rebuild(uow_factory, owner_id)
+
+    service.bulk_delete_questions(
+        owner_id=owner_id,
+        test_id=test_id,
+        payload=BulkDeleteQuestionsRequest(question_ids=ids[:2]),
+    )
+    _assert_matches_rebuild(uow_factory, owner_id)
+
+    service.delete_question(owner_id=owner_id, test_id=test_id, question_id=ids[2])
+    _assert_matches_rebuild(uow_factory, owner_id)
+
+    service.delete_test(owner_id=owner_id, test_id=test_id)
+    _assert_matches_rebuild(uow_factory, owner_id)
+    with uow_factory() as uow:
+        stats = uow.user_stats.get(owner_id)
+    assert stats is not None
+    assert (stats.total_tests, stats.total_questions) == (0, 0)